@@ -5,9 +5,11 @@ Assembles the `main` click group from individual command modules.
 import click
 
 from stembot.cli.bench import bench
+from stembot.cli.deadletters import dead_letters
 from stembot.cli.delete import delete
 from stembot.cli.discover import discover
 from stembot.cli.put import put
+from stembot.cli.queuestats import queue_stats
 from stembot.cli.run import run
 from stembot.cli.stat import stat
 
@@ -23,8 +25,10 @@ def main():
 
 
 main.add_command(bench)
+main.add_command(dead_letters)
 main.add_command(delete)
 main.add_command(discover)
 main.add_command(put)
+main.add_command(queue_stats)
 main.add_command(run)
 main.add_command(stat)
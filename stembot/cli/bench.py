@@ -1,13 +1,12 @@
 """bench command — benchmark agent throughput across multiple payload sizes."""
-import time
 from concurrent.futures import ThreadPoolExecutor
 
 import click
 
 from stembot.executor.agent import AgentClient
 from stembot.models.config import CONFIG
-from stembot.models.control import Benchmark, CheckTicket, CloseTicket, ControlFormTicket
-from stembot.cli.utils import KB, MB, format_bytes, format_bandwidth
+from stembot.models.control import Benchmark, CloseTicket, ControlFormTicket, WaitTicket
+from stembot.cli.utils import KB, MB, format_bytes, format_bandwidth, wait_ticket
 
 
 # pylint: disable=too-many-locals
@@ -36,19 +35,12 @@ def _bench(agtuuid: str, size: int = 1, concurrency: int = 1, timeout: int = 15)
 
     assert size > 0 and concurrency > 0 and timeout > 0
 
-    def poll_ticket(ticket: ControlFormTicket) -> CheckTicket:
-        it = time.time()
-        check = CheckTicket(tckuuid=ticket.tckuuid, create_time=ticket.create_time)
-        check = client.send_control_form(check)
-        backoff = 1
-        while check.service_time is None and time.time() - it < timeout:
-            time.sleep(backoff)
-            check = client.send_control_form(check)
-            backoff = min(backoff * 2, timeout)
+    def poll_ticket(ticket: ControlFormTicket) -> WaitTicket:
+        wait = wait_ticket(ticket, client, timeout)
         client.send_control_form(CloseTicket(tckuuid=ticket.tckuuid))
-        return check
+        return wait
 
-    def run_batch(form_factory) -> list[CheckTicket]:
+    def run_batch(form_factory) -> list[WaitTicket]:
         tickets = [ControlFormTicket(dst=agtuuid, form=form_factory()) for _ in range(concurrency)]
         with ThreadPoolExecutor(max_workers=concurrency) as executor:
             tickets = list(executor.map(client.send_control_form, tickets))
@@ -60,8 +52,8 @@ def _bench(agtuuid: str, size: int = 1, concurrency: int = 1, timeout: int = 15)
     # Inbound: receive `size` bytes from the agent
     inbound_checks  = run_batch(lambda: Benchmark(outbound_size=None, inbound_size=size))
 
-    def calc(checks: list[CheckTicket], bytes_per_ticket: int) -> tuple[float, int, float]:
-        completed = [c for c in checks if c.service_time is not None]
+    def calc(checks: list[WaitTicket], bytes_per_ticket: int) -> tuple[float, int, float]:
+        completed = [c for c in checks if c.service_time is not None and c.create_time is not None]
         if not completed:
             return 0.0, 0, 0.0
         elapsed     = max(c.service_time - c.create_time for c in completed)
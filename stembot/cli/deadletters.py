@@ -0,0 +1,51 @@
+"""dead-letters command — inspect messages an agent could not deliver."""
+import datetime
+import json
+import sys
+
+import click
+
+from stembot.cli.utils import poll_ticket
+from stembot.executor.agent import AgentClient
+from stembot.models.config import CONFIG
+from stembot.models.control import ControlFormTicket, GetDeadLetters
+
+
+@click.command(name='dead-letters')
+@click.argument('agtuuid', required=True)
+@click.option('-d', '--dest', type=str, default=None, help='Only show dead letters for this destination agent')
+@click.option('-p', '--purge', is_flag=True, help='Remove the shown dead letters from the agent')
+@click.option('-t', '--timeout', type=int, default=15, help='Timeout in seconds (default: 15)')
+def dead_letters(agtuuid: str, dest: str | None, purge: bool, timeout: int):
+    """Show messages an agent could not deliver before they expired.
+
+    Retrieves the dead letters kept by an agent, oldest first, with the
+    reason each message could not be delivered and the next hop it was
+    waiting on.
+
+    Args:
+        agtuuid: UUID of the agent to query
+        dest: Only show dead letters for this destination agent
+        purge: Remove the shown dead letters from the agent
+        timeout: Maximum seconds to wait for the response (default: 15)
+
+    Exits:
+        With exit code 1 if the ticket times out or errors occur.
+    """
+    client = AgentClient(url=CONFIG.client_control_url)
+    ticket = client.send_control_form(ControlFormTicket(dst=agtuuid, form=GetDeadLetters(dest=dest, purge=purge)))
+    ticket = poll_ticket(ticket, client, timeout)
+
+    if error := ticket.error or ticket.form.error:
+        click.echo(error.strip(), err=True)
+        sys.exit(1)
+
+    if ticket.service_time is None:
+        click.echo(f"{ticket.form.type} ticket never serviced!", err=True)
+        sys.exit(1)
+
+    for dead_letter in ticket.form.dead_letters:
+        dead_time = datetime.datetime.fromtimestamp(dead_letter.dead_time).isoformat()
+        click.echo(click.style(f"{dead_time} {dead_letter.message.get('type')} → {dead_letter.dest}", bold=True))
+        click.echo(f"   Reason: {dead_letter.reason}")
+        click.echo(f"   {json.dumps(dead_letter.message)}")
@@ -1,13 +1,229 @@
 """put command — transfer a file from source to destination."""
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import click
 
-from stembot.cli.utils import poll_ticket
+from stembot.cli.utils import MB, poll_ticket
+from stembot.enums import DigestType, FileCodec
 from stembot.executor.agent import AgentClient
-from stembot.executor.file import load_file_to_form, write_file_from_form
+from stembot.executor.codec import available_codecs
+from stembot.executor.file import get_file_signature_to_form, load_file_chunk_to_form, load_file_delta_to_form
+from stembot.executor.file import load_file_to_form, write_file_chunk_from_form, write_file_delta_from_form
+from stembot.executor.file import write_file_from_form
 from stembot.models.config import CONFIG
-from stembot.models.control import ControlFormTicket, LoadFile, WriteFile
+from stembot.models.control import ControlForm, ControlFormTicket, GetConfig, GetFileSignature, LoadFile
+from stembot.models.control import LoadFileChunk
+from stembot.models.control import LoadFileDelta, WriteFile, WriteFileChunk, WriteFileDelta
+
+CHUNK_RETRIES = 3
+
+# Executor functions for running file forms against the local filesystem
+LOCAL_FILE_FORMS = {
+    LoadFileChunk:    load_file_chunk_to_form,
+    WriteFileChunk:   write_file_chunk_from_form,
+    GetFileSignature: get_file_signature_to_form,
+    LoadFileDelta:    load_file_delta_to_form,
+    WriteFileDelta:   write_file_delta_from_form
+}
+
+
+def _run_file_form(client: AgentClient, agtuuid: str | None, form: ControlForm, timeout: int) -> ControlForm:
+    """Run a file form on an agent through a ticket, or locally if no agent is given.
+
+    Ticket level failures are folded into form.error so callers only have to
+    inspect the returned form.
+
+    Args:
+        client: AgentClient connected to the local agent's control endpoint
+        agtuuid: UUID of the agent to run the form on (None for local filesystem)
+        form: Chunk or delta file form to run
+        timeout: Maximum seconds to wait for the ticket to be serviced
+
+    Returns:
+        The serviced form.
+    """
+    if agtuuid is None:
+        return LOCAL_FILE_FORMS[type(form)](form)
+
+    ticket = client.send_control_form(ControlFormTicket(dst=agtuuid, form=form))
+    ticket = poll_ticket(ticket, client, timeout)
+
+    if ticket.service_time is None:
+        form.error = f"{form.type} ticket never serviced!"
+        return form
+
+    if ticket.error:
+        ticket.form.error = ticket.error
+
+    return ticket.form
+
+
+def _destination_codecs(client: AgentClient, agtuuid: str | None, timeout: int) -> list[FileCodec] | None:
+    """Return the codecs the destination can decompress, so the source only chooses among them.
+
+    Args:
+        client: AgentClient connected to the local agent's control endpoint
+        agtuuid: UUID of the destination agent (None for local filesystem)
+        timeout: Maximum seconds to wait for the ticket to be serviced
+
+    Returns:
+        The destination's codecs, or None if they could not be read, limiting
+        the source to zlib and no compression.
+    """
+    if agtuuid is None:
+        return available_codecs()
+
+    ticket = client.send_control_form(ControlFormTicket(dst=agtuuid, form=GetConfig()))
+    ticket = poll_ticket(ticket, client, timeout)
+
+    if ticket.service_time is None or ticket.error or ticket.form.error:
+        return None
+
+    codecs = getattr(ticket.form, 'codecs', None)
+    return [FileCodec(codec) for codec in codecs] if codecs is not None else None
+
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+def _put_delta(
+    client: AgentClient, src_path: str, dst_path: str, src_agtuuid: str | None, dst_agtuuid: str | None,
+    timeout: int, codec: FileCodec | None, codecs: list[FileCodec] | None, digest_type: DigestType | None
+) -> tuple[int | None, int, str | None, bool]:
+    """Transfer a file as an rsync-style delta against the destination's copy.
+
+    The destination signs its existing file, the source encodes its file
+    against the signature, and the destination rebuilds and verifies it.
+
+    Returns:
+        Tuple of (file size, bytes of compressed delta, error message or None,
+        whether a full transfer should be attempted instead).
+    """
+    signature = _run_file_form(client, dst_agtuuid, GetFileSignature(path=dst_path), timeout)
+    if signature.error:
+        return None, 0, signature.error, True
+
+    load_form = _run_file_form(client, src_agtuuid, LoadFileDelta(
+        path=src_path,
+        block_size=signature.block_size,
+        weak=signature.weak,
+        strong=signature.strong,
+        base_size=signature.size,
+        codec=codec,
+        codecs=codecs,
+        digest_type=digest_type
+    ), timeout)
+    if load_form.error:
+        return None, 0, load_form.error, False
+
+    delta_size = len(load_form.b64zlib) * 3 // 4
+
+    write_form = _run_file_form(client, dst_agtuuid, WriteFileDelta(
+        b64zlib=load_form.b64zlib,
+        path=dst_path,
+        block_size=signature.block_size,
+        size=load_form.size,
+        md5sum=load_form.md5sum,
+        codec=load_form.codec,
+        digest_type=load_form.digest_type,
+        digest=load_form.digest
+    ), timeout)
+
+    # A failed rebuild leaves the destination untouched, so a full transfer is safe
+    return load_form.size, delta_size, write_form.error, write_form.error is not None
+
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments, too-many-locals
+def _put_chunked(
+    client: AgentClient, src_path: str, dst_path: str, src_agtuuid: str | None, dst_agtuuid: str | None,
+    timeout: int, chunk_size: int, window: int, resume: int | None, codec: FileCodec | None,
+    codecs: list[FileCodec] | None, digest_type: DigestType | None
+) -> tuple[int | None, int, str | None]:
+    """Transfer a file in chunks with a sliding window of in-flight chunks.
+
+    Up to `window` chunks are read from the source and written to the
+    destination concurrently. A failed chunk is retried from its own offset
+    up to CHUNK_RETRIES times before the transfer is abandoned. The offset
+    below which every chunk has been acknowledged is reported so an
+    interrupted transfer can be resumed. A resumed transfer restarts at the
+    acknowledged offset the interrupted one reported, since chunks past it
+    may have been written out of order around a chunk that never arrived.
+    The destination's size only bounds that offset and is never trusted as
+    progress, so an unrelated file already at the destination is overwritten.
+
+    Returns:
+        Tuple of (file size, acknowledged offset, error message or None).
+    """
+    probe = _run_file_form(client, src_agtuuid, LoadFileChunk(path=src_path, length=0), timeout)
+    if probe.error:
+        return None, 0, probe.error
+    size = probe.size
+
+    start = 0
+    if resume:
+        stat = _run_file_form(client, dst_agtuuid, LoadFileChunk(path=dst_path, length=0), timeout)
+        if stat.error:
+            return size, 0, stat.error
+        if resume > min(stat.size, size):
+            return size, 0, f"Resume offset {resume} is past the end of the destination or source file"
+        # Always rewrite the last chunk so the destination is truncated to the source's size
+        start = min(resume, (max(size, 1) - 1) // chunk_size * chunk_size)
+        click.echo(f"Resuming at offset {start}...")
+
+    def copy_chunk(offset: int) -> str | None:
+        load_form = _run_file_form(
+            client, src_agtuuid, LoadFileChunk(
+                path=src_path, offset=offset, length=chunk_size, codec=codec, codecs=codecs,
+                digest_type=digest_type
+            ), timeout)
+        if load_form.error:
+            return load_form.error
+
+        write_form = WriteFileChunk(
+            b64zlib=load_form.b64zlib,
+            path=dst_path,
+            offset=offset,
+            length=load_form.length,
+            size=size,
+            md5sum=load_form.md5sum,
+            codec=load_form.codec,
+            digest_type=load_form.digest_type,
+            digest=load_form.digest
+        )
+        return _run_file_form(client, dst_agtuuid, write_form, timeout).error
+
+    offsets  = iter(range(start, max(size, 1), chunk_size))
+    pending  = {}
+    attempts = {}
+    acked    = set()
+    acked_offset = start
+    error    = None
+
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        while True:
+            while error is None and len(pending) < window and (offset := next(offsets, None)) is not None:
+                pending[executor.submit(copy_chunk, offset)] = offset
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                offset = pending.pop(future)
+                if chunk_error := future.result():
+                    attempts[offset] = attempts.get(offset, 0) + 1
+                    if attempts[offset] < CHUNK_RETRIES and error is None:
+                        click.echo(f"Retrying chunk at offset {offset}: {chunk_error}", err=True)
+                        pending[executor.submit(copy_chunk, offset)] = offset
+                    elif error is None:
+                        error = chunk_error
+                    continue
+
+                acked.add(offset)
+                while acked_offset in acked:
+                    acked.discard(acked_offset)
+                    acked_offset += chunk_size
+
+    return size, min(acked_offset, size), error
 
 
 # pylint: disable=too-many-branches, too-many-statements, too-many-locals, too-many-arguments, line-too-long
@@ -17,7 +233,17 @@ from stembot.models.control import ControlFormTicket, LoadFile, WriteFile
 @click.option('-t', '--timeout', type=int, default=15, help='Timeout in seconds (default: 15)')
 @click.option('-s', '--src-agtuuid', type=str, default=None)
 @click.option('-d', '--dst-agtuuid', type=str, default=None)
-def put(src_path: str, dst_path: str | None, timeout: int, src_agtuuid: str | None, dst_agtuuid: str | None):
+@click.option('-c', '--chunk-size', type=int, default=0, help='Transfer in chunks of this many MB (default: 0, whole file)')
+@click.option('-w', '--window', type=int, default=4, help='Chunks in flight during a chunked transfer (default: 4)')
+@click.option('-r', '--resume', type=int, default=None, help='Resume an interrupted chunked transfer from the acknowledged offset it reported')
+@click.option('-z', '--codec', type=click.Choice([c.value for c in FileCodec]), default=None, help='Compression codec (default: chosen by the source agent)')
+@click.option('-g', '--digest', type=click.Choice([d.value for d in DigestType]), default=None, help='Digest algorithm (default: md5)')
+@click.option('-a', '--atomic', is_flag=True, help='Write to a temporary file and rename it into place once verified')
+@click.option('-D', '--delta', is_flag=True, help='Only send the blocks that differ from the existing destination file')
+def put(
+    src_path: str, dst_path: str | None, timeout: int, src_agtuuid: str | None, dst_agtuuid: str | None,
+    chunk_size: int, window: int, resume: int | None, codec: str | None, digest: str | None, atomic: bool, delta: bool
+):
     """Transfer a file from source to destination.
 
     Transfers a file between two agents or between local filesystem and
@@ -30,6 +256,15 @@ def put(src_path: str, dst_path: str | None, timeout: int, src_agtuuid: str | No
         timeout: Maximum seconds to wait for operations (default: 15)
         src_agtuuid: UUID of source agent (if None, reads from local filesystem)
         dst_agtuuid: UUID of destination agent (if None, writes to local filesystem)
+        chunk_size: Chunk size in MB for a chunked transfer (0 sends the whole file at once)
+        window: Number of chunks in flight during a chunked transfer (default: 4)
+        resume: Resume a chunked transfer from the acknowledged offset an interrupted one reported
+        codec: Compression codec (if None, the source agent chooses one from the file contents
+               among the codecs the destination reports, or zlib if it reports none)
+        digest: Digest algorithm used to verify the transfer (if None, MD5)
+        atomic: Write to a temporary file and rename it into place (whole file transfers only)
+        delta: Send an rsync-style delta against the destination's existing file, falling
+               back to a whole file transfer if the destination file is missing or the delta fails
 
     Displays:
         - Transfer details (source and destination locations)
@@ -38,10 +273,61 @@ def put(src_path: str, dst_path: str | None, timeout: int, src_agtuuid: str | No
         - Error messages if read or write operations fail
 
     Note:
-        Uses LoadFile and WriteFile forms with zlib compression and
-        MD5 verification for integrity checking.
+        Uses LoadFile and WriteFile forms with negotiated compression and
+        MD5 verification for integrity checking. Chunked transfers use
+        LoadFileChunk and WriteFileChunk forms with a per-chunk MD5. Delta
+        transfers use GetFileSignature, LoadFileDelta and WriteFileDelta forms.
     """
     client = AgentClient(url=CONFIG.client_control_url)
+    codec       = FileCodec(codec) if codec else None
+    digest_type = DigestType(digest) if digest else None
+    codecs      = _destination_codecs(client, dst_agtuuid, timeout * 2) if codec is None else None
+
+    if delta:
+        src_location = f"{src_agtuuid}:{src_path}" if src_agtuuid else f"local:{src_path}"
+        dst_location = f"{dst_agtuuid}:{dst_path}" if dst_agtuuid else f"local:{dst_path}"
+        click.echo(f"Transferring {src_location} to {dst_location} as a delta...")
+
+        start_time = time.time()
+        size, delta_size, error, fall_back = _put_delta(
+            client, src_path, dst_path, src_agtuuid, dst_agtuuid, timeout * 2, codec, codecs, digest_type
+        )
+        elapsed_time = time.time() - start_time
+
+        if not error:
+            click.echo(f"   Size..................... {size} bytes")
+            click.echo(f"   Delta Size............... {delta_size} bytes")
+            click.echo(f"   Total Elapsed Time....... {elapsed_time:.3f} seconds")
+            click.echo(click.style("✓ Transfer Complete", fg='green', bold=True))
+            return
+
+        click.echo(click.style(f"❌ {error}", fg='red', bold=True), err=True)
+        if not fall_back:
+            return
+        click.echo("Falling back to a whole file transfer...", err=True)
+
+    if chunk_size > 0:
+        src_location = f"{src_agtuuid}:{src_path}" if src_agtuuid else f"local:{src_path}"
+        dst_location = f"{dst_agtuuid}:{dst_path}" if dst_agtuuid else f"local:{dst_path}"
+        click.echo(f"Transferring {src_location} to {dst_location} in {chunk_size} MB chunks...")
+
+        start_time = time.time()
+        size, acked_offset, error = _put_chunked(
+            client, src_path, dst_path, src_agtuuid, dst_agtuuid,
+            timeout * 2, chunk_size * MB, max(window, 1), resume, codec, codecs, digest_type
+        )
+        elapsed_time = time.time() - start_time
+
+        click.echo(f"   Size..................... {size} bytes")
+        click.echo(f"   Acknowledged Offset...... {acked_offset} bytes")
+        click.echo(f"   Total Elapsed Time....... {elapsed_time:.3f} seconds")
+
+        if error:
+            click.echo(click.style(f"❌ {error}", fg='red', bold=True), err=True)
+            click.echo(f"Rerun with --resume {acked_offset} to continue the transfer.", err=True)
+        else:
+            click.echo(click.style("✓ Transfer Complete", fg='green', bold=True))
+        return
 
     # Track timing for read and write operations
     read_start_time    = None
@@ -52,7 +338,7 @@ def put(src_path: str, dst_path: str | None, timeout: int, src_agtuuid: str | No
     write_error        = None
 
     # Load file from source
-    load_form = LoadFile(path=src_path)
+    load_form = LoadFile(path=src_path, codec=codec, codecs=codecs, digest_type=digest_type)
 
     if src_agtuuid:
         click.echo(f"Reading from {src_agtuuid}:{src_path}...")
@@ -86,8 +372,10 @@ def put(src_path: str, dst_path: str | None, timeout: int, src_agtuuid: str | No
             click.echo(load_form.error, err=True)
 
     # Write file to destination
-    write_form = WriteFile(b64zlib=load_form.b64zlib, md5sum=load_form.md5sum, size=load_form.size, path=dst_path) \
-        if not read_error else None
+    write_form = WriteFile(
+        b64zlib=load_form.b64zlib, md5sum=load_form.md5sum, size=load_form.size, codec=load_form.codec,
+        digest_type=load_form.digest_type, digest=load_form.digest, atomic=atomic, path=dst_path
+    ) if not read_error else None
 
     if dst_agtuuid and not read_error:
         click.echo(f"Writing to {dst_agtuuid}:{dst_path}...")
@@ -144,7 +432,11 @@ def put(src_path: str, dst_path: str | None, timeout: int, src_agtuuid: str | No
     md5sum = load_form.md5sum if hasattr(load_form, 'md5sum') and load_form.md5sum else 'N/A'
 
     click.echo(f"   Size..................... {size} bytes")
-    click.echo(f"   MD5 Checksum............. {md5sum}")
+    if load_form.digest_type:
+        click.echo(f"   {str(load_form.digest_type) + ' Digest':.<25} {load_form.digest or 'N/A'}")
+    else:
+        click.echo(f"   MD5 Checksum............. {md5sum}")
+    click.echo(f"   Codec.................... {load_form.codec or 'N/A'}")
 
     # Display timing information
     click.echo()
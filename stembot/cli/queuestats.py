@@ -0,0 +1,50 @@
+"""queue-stats command — inspect an agent's message queue usage and shedding."""
+import sys
+
+import click
+
+from stembot.cli.utils import poll_ticket
+from stembot.executor.agent import AgentClient
+from stembot.models.config import CONFIG
+from stembot.models.control import ControlFormTicket, GetQueueStats
+
+
+@click.command(name='queue-stats')
+@click.argument('agtuuid', required=True)
+@click.option('-t', '--timeout', type=int, default=15, help='Timeout in seconds (default: 15)')
+def queue_stats(agtuuid: str, timeout: int):
+    """Show an agent's message queue usage and the messages it has shed.
+
+    Retrieves the messages and bytes queued by an agent and the queued
+    messages it dropped or new messages it rejected because its message
+    queue was full, in total and per destination.
+
+    Args:
+        agtuuid: UUID of the agent to query
+        timeout: Maximum seconds to wait for the response (default: 15)
+
+    Exits:
+        With exit code 1 if the ticket times out or errors occur.
+    """
+    client = AgentClient(url=CONFIG.client_control_url)
+    ticket = client.send_control_form(ControlFormTicket(dst=agtuuid, form=GetQueueStats()))
+    ticket = poll_ticket(ticket, client, timeout)
+
+    if error := ticket.error or ticket.form.error:
+        click.echo(error.strip(), err=True)
+        sys.exit(1)
+
+    if ticket.service_time is None:
+        click.echo(f"{ticket.form.type} ticket never serviced!", err=True)
+        sys.exit(1)
+
+    form = ticket.form
+    click.echo(click.style(
+        f"{form.messages} messages, {form.size} bytes queued; {form.dropped} dropped, {form.rejected} rejected",
+        bold=True
+    ))
+    for stats in sorted(form.destinations, key=lambda stats: stats.size, reverse=True):
+        click.echo(
+            f"   {stats.dest}: {stats.messages} messages, {stats.size} bytes; "
+            f"{stats.dropped} dropped, {stats.rejected} rejected"
+        )
@@ -3,27 +3,29 @@ import sys
 
 import click
 
-from stembot.cli.utils import poll_ticket
+from stembot.cli.utils import poll_ticket, poll_tickets
 from stembot.executor.agent import AgentClient
 from stembot.models.config import CONFIG
-from stembot.models.control import ControlFormTicket, SyncProcess
+from stembot.models.control import ControlFormTicket, CreateTickets, MulticastTicket, SyncProcess
 
 
 @click.command()
-@click.argument('agtuuid', required=True)
+@click.argument('agtuuids', nargs=-1, required=True)
 @click.argument('command', required=True)
 @click.option('-t', '--timeout', type=int, default=15, help='Timeout in seconds (default: 15)')
-def run(agtuuid: str, command: str, timeout: int):
-    """Execute a command on a remote agent.
+@click.option('-m', '--multicast', is_flag=True, help='Send one copy per next hop along a distribution tree')
+def run(agtuuids: tuple[str, ...], command: str, timeout: int, multicast: bool):
+    """Execute a command on one or more remote agents.
 
     Sends a command to a remote agent for execution via subprocess.
     Polls for completion with timeout and displays stdout/stderr output.
     Exits with the remote process's return code.
 
     Args:
-        agtuuid: UUID of the agent to execute the command on
+        agtuuids: UUIDs of the agents to execute the command on
         command: Command to execute (string or shell command)
         timeout: Maximum seconds to wait for execution (default: 15)
+        multicast: Send the command to several agents as a multicast
 
     Displays:
         - Standard output from the remote process
@@ -31,16 +33,24 @@ def run(agtuuid: str, command: str, timeout: int):
 
     Exits:
         With the remote process's return code (0 for success, non-zero for error)
-        or exit code 1 if ticket service times out or errors occur.
+        or exit code 1 if ticket service times out or errors occur. With several
+        agents, exits 1 if any agent's process fails.
 
     Note:
         Uses SyncProcess with timeout enforcement. The poll timeout is
         2x the specified timeout to allow process execution time plus polling.
+        Several agents are sent the command in one CREATE_TICKETS request, or
+        one MULTICAST_TICKET request with --multicast, and their results are
+        collected as they arrive.
     """
     client       = AgentClient(url=CONFIG.client_control_url)
     sync_process = SyncProcess(command=command, timeout=timeout)
-    ticket       = client.send_control_form(ControlFormTicket(dst=agtuuid, form=sync_process))
-    ticket       = poll_ticket(ticket, client, timeout * 2)
+
+    if len(agtuuids) > 1 or multicast:
+        _run_many(client, agtuuids, sync_process, timeout, multicast)
+
+    ticket = client.send_control_form(ControlFormTicket(dst=agtuuids[0], form=sync_process))
+    ticket = poll_ticket(ticket, client, timeout * 2)
 
     if stdout := ticket.form.stdout:
         click.echo(stdout.strip())
@@ -54,3 +64,49 @@ def run(agtuuid: str, command: str, timeout: int):
     if error := ticket.error:
         click.echo(error.strip(), err=True)
         sys.exit(1)
+
+
+def _run_many(client: AgentClient, agtuuids: tuple[str, ...], sync_process: SyncProcess, timeout: int, multicast: bool):
+    """Execute a command on several agents and display each agent's output.
+
+    Args:
+        client: AgentClient to use for sending the batch requests
+        agtuuids: UUIDs of the agents to execute the command on
+        sync_process: SyncProcess form sent to every agent
+        timeout: Maximum seconds the command may run
+        multicast: Send the command as a multicast rather than one ticket per agent
+    """
+    agtuuids = tuple(dict.fromkeys(agtuuids))
+    if multicast:
+        create = client.send_control_form(MulticastTicket(dsts=list(agtuuids), form=sync_process))
+    else:
+        create = client.send_control_form(CreateTickets(dsts=list(agtuuids), form=sync_process))
+    if error := create.error:
+        click.echo(error.strip(), err=True)
+        sys.exit(1)
+
+    tckuuids  = [ticket.tckuuid for ticket in create.tickets]
+    collected = poll_tickets(tckuuids, client, timeout * 2)
+
+    failed = False
+    for agtuuid, tckuuid in zip(agtuuids, tckuuids):
+        click.echo(click.style(f"== {agtuuid} ==", fg='cyan', bold=True))
+        ticket = collected.get(tckuuid)
+
+        if ticket is None:
+            click.echo('Timed out waiting for the command to complete', err=True)
+            failed = True
+            continue
+
+        if stdout := ticket.form.stdout:
+            click.echo(stdout.strip())
+
+        if stderr := ticket.form.stderr:
+            click.echo(stderr.strip(), err=True)
+
+        if error := ticket.error:
+            click.echo(error.strip(), err=True)
+
+        failed = failed or bool(ticket.form.status) or bool(ticket.error)
+
+    sys.exit(1 if failed else 0)
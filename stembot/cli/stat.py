@@ -7,7 +7,8 @@ import click
 from stembot.enums import ControlFormType
 from stembot.executor.agent import AgentClient
 from stembot.models.config import CONFIG
-from stembot.models.control import CheckTicket, CloseTicket, ControlFormTicket, GetConfig, GetPeers, GetRoutes
+from stembot.models.control import CloseTicket, ControlFormTicket, GetConfig, GetPeers, GetRoutes
+from stembot.cli.utils import poll_ticket, wait_ticket
 
 # pylint: disable=too-many-statements, too-many-locals, too-many-branches
 @click.command()
@@ -17,8 +18,8 @@ def stat(agtuuid: str, timeout: int):
     """Retrieve and display agent statistics.
 
     Queries an agent for its current configuration, network peers, routes,
-    and hop information (multi-hop route trace). Uses ticket-based polling
-    with timeout to wait for responses.
+    and hop information (multi-hop route trace). Waits on the tickets with
+    WAIT_TICKET requests, with timeout, for responses.
 
     Args:
         agtuuid: UUID of the agent to query
@@ -27,7 +28,7 @@ def stat(agtuuid: str, timeout: int):
     Displays:
         - Elapsed time for the entire query operation
         - Configuration dictionary
-        - List of known peers with URLs and polling status
+        - List of known peers with URLs, polling status and measured link metrics
         - List of routes with destination UUIDs, gateway UUIDs, and weights
         - Network hops showing the route trace with timestamps
 
@@ -41,49 +42,22 @@ def stat(agtuuid: str, timeout: int):
     peers_form  = client.send_control_form(ControlFormTicket(dst=agtuuid, form=GetPeers()))
     routes_form = client.send_control_form(ControlFormTicket(dst=agtuuid, form=GetRoutes()))
 
-    it = time.time()
-    check = CheckTicket(tckuuid=config_form.tckuuid, create_time=config_form.create_time)
-    check = client.send_control_form(check)
-    while check.service_time is None and time.time() - it < timeout:
-        time.sleep(1)
-        check = client.send_control_form(check)
+    it   = time.time()
+    wait = wait_ticket(config_form, client, timeout)
 
-    if check.service_time and check.create_time:
-        et = check.service_time - check.create_time
+    if wait.service_time and wait.create_time:
+        et = wait.service_time - wait.create_time
     else:
         et = time.time() - it
 
-    if check.service_time is not None:
+    if wait.service_time is not None:
         config_form.type = ControlFormType.READ_TICKET
         config_form = client.send_control_form(config_form)
 
     client.send_control_form(CloseTicket(tckuuid=config_form.tckuuid))
 
-    it = time.time()
-    check = CheckTicket(tckuuid=peers_form.tckuuid, create_time=peers_form.create_time)
-    check = client.send_control_form(check)
-    while check.service_time is None and time.time() - it < timeout:
-        time.sleep(1)
-        check = client.send_control_form(check)
-
-    if check.service_time is not None:
-        peers_form.type = ControlFormType.READ_TICKET
-        peers_form = client.send_control_form(peers_form)
-
-    client.send_control_form(CloseTicket(tckuuid=peers_form.tckuuid))
-
-    it = time.time()
-    check = CheckTicket(tckuuid=routes_form.tckuuid, create_time=routes_form.create_time)
-    check = client.send_control_form(check)
-    while check.service_time is None and time.time() - it < timeout:
-        time.sleep(1)
-        check = client.send_control_form(check)
-
-    if check.service_time is not None:
-        routes_form.type = ControlFormType.READ_TICKET
-        routes_form = client.send_control_form(routes_form)
-
-    client.send_control_form(CloseTicket(tckuuid=routes_form.tckuuid))
+    peers_form  = poll_ticket(peers_form, client, timeout)
+    routes_form = poll_ticket(routes_form, client, timeout)
 
     for form in (config_form, peers_form, routes_form):
         if error := form.error:
@@ -121,9 +95,12 @@ def stat(agtuuid: str, timeout: int):
     click.echo()
     click.echo(click.style("👥 Network Peers", fg='cyan', bold=True))
     for peer in peers:
+        rtt_display  = 'n/a' if peer.rtt_ms is None else f"{peer.rtt_ms:.1f} ms"
         peer_display = (
             f"   {peer.agtuuid:.<36} "
             f"Polling: {str(peer.polling): <5} "
+            f"RTT: {rtt_display: <10} "
+            f"Loss: {peer.loss:.0%} "
             f"URL: {peer.url}"
         )
         click.echo(peer_display)
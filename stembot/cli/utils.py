@@ -1,9 +1,10 @@
 """Shared utilities for the CLI."""
 import time
+from typing import Dict, List
 
 from stembot.enums import ControlFormType
 from stembot.executor.agent import AgentClient
-from stembot.models.control import CheckTicket, CloseTicket, ControlFormTicket
+from stembot.models.control import CheckTickets, CloseTicket, CollectTickets, ControlFormTicket, WaitTicket
 
 
 KB = 1024
@@ -51,35 +52,88 @@ def format_bandwidth(bytes_per_second: int | float) -> str:
     return f"{bytes_per_second / GB:.1f} GB/s"
 
 
+def wait_ticket(ticket: ControlFormTicket, client: AgentClient, timeout: int) -> WaitTicket:
+    """Wait until a ticket is serviced or timeout is reached.
+
+    Sends WAIT_TICKET requests, which the agent holds open until the ticket is
+    serviced, so the ticket's completion is seen as soon as it happens.
+
+    Args:
+        ticket: ControlFormTicket to wait for
+        client: AgentClient to use for sending wait requests
+        timeout: Maximum seconds to wait for the ticket to be serviced
+
+    Returns:
+        WaitTicket with service_time set if serviced, or create_time unset if the ticket does not exist
+    """
+    deadline = time.time() + timeout
+    wait = WaitTicket(tckuuid=ticket.tckuuid, wait_secs=timeout)
+    wait = client.send_control_form(wait)
+    while wait.service_time is None and wait.create_time is not None and wait.error is None:
+        if (remaining := deadline - time.time()) <= 0:
+            break
+        wait.wait_secs = remaining
+        wait = client.send_control_form(wait)
+    return wait
+
+
 def poll_ticket(ticket: ControlFormTicket, client: AgentClient, timeout: int) -> ControlFormTicket:
-    """Poll a ticket until it is serviced or timeout is reached.
+    """Wait for a ticket until it is serviced or timeout is reached.
 
     If serviced, updates the ticket by sending a READ_TICKET request.
-    Exponential backoff is used for polling intervals,
-    starting at 1 second and doubling each time up to the timeout.
-    Ticket is closed after polling regardless of outcome.
+    Ticket is closed after waiting regardless of outcome.
 
     Args:
-        ticket: ControlFormTicket to poll
-        client: AgentClient to use for sending check requests
+        ticket: ControlFormTicket to wait for
+        client: AgentClient to use for sending wait requests
         timeout: Maximum seconds to wait for the ticket to be serviced
 
     Returns:
         Updated ControlFormTicket with service_time if serviced, or original ticket if timed out
     """
-    it = time.time()
-    check = CheckTicket(tckuuid=ticket.tckuuid, create_time=ticket.create_time)
-    check = client.send_control_form(check)
-    backoff = 1
-    while check.service_time is None and time.time() - it < timeout:
-        time.sleep(backoff)
-        backoff = min(backoff * 2, timeout - (time.time() - it))
-        check = client.send_control_form(check)
-
-    if check.service_time is not None:
+    wait = wait_ticket(ticket, client, timeout)
+
+    if wait.service_time is not None:
         ticket.type = ControlFormType.READ_TICKET
         ticket = client.send_control_form(ticket)
 
     client.send_control_form(CloseTicket(tckuuid=ticket.tckuuid))
 
     return ticket
+
+
+def poll_tickets(tckuuids: List[str], client: AgentClient, timeout: int) -> Dict[str, ControlFormTicket]:
+    """Collect many tickets as they are serviced until all are collected or timeout is reached.
+
+    Waits for any pending ticket to be serviced with a CHECK_TICKETS request, then
+    reads and closes the serviced tickets with a COLLECT_TICKETS request. Tickets
+    still pending at the timeout are closed.
+
+    Args:
+        tckuuids: UUIDs of the tickets to collect
+        client: AgentClient to use for sending check and collect requests
+        timeout: Maximum seconds to wait for the tickets to be serviced
+
+    Returns:
+        Serviced ControlFormTickets by tckuuid
+    """
+    deadline  = time.time() + timeout
+    collected = {}
+    pending   = list(tckuuids)
+    while pending:
+        for ticket in client.send_control_form(CollectTickets(tckuuids=pending)).tickets:
+            collected[ticket.tckuuid] = ticket
+
+        pending = [tckuuid for tckuuid in pending if tckuuid not in collected]
+        if not pending or (remaining := deadline - time.time()) <= 0:
+            break
+
+        check = client.send_control_form(CheckTickets(tckuuids=pending, wait_secs=remaining))
+        if check.error:
+            break
+        pending = [ticket.tckuuid for ticket in check.tickets if ticket.create_time is not None]
+
+    for tckuuid in pending:
+        client.send_control_form(CloseTicket(tckuuid=tckuuid))
+
+    return collected
@@ -9,6 +9,7 @@ import os
 import click
 
 from stembot.dao import kvstore
+from stembot.enums import RoutingMode, ShedPolicy
 from stembot.models.config import LogLevel
 
 def _load_from_environment():
@@ -29,6 +30,25 @@ def _load_from_environment():
     - AGT_MAX_WEIGHT: Maximum route weight for routing decisions
     - AGT_TICKET_TIMEOUT_SECS: Seconds before a ticket is considered expired
     - AGT_MESSAGE_TIMEOUT_SECS: Seconds before a pending message is discarded
+    - AGT_FRAMED_WIRE: Send framed binary request bodies (true/false)
+    - AGT_RETRY_BACKOFF_SECS: Delay before retrying a next hop after its first failed delivery
+    - AGT_RETRY_BACKOFF_MAX_SECS: Maximum delay between retries of a failing next hop
+    - AGT_BREAKER_THRESHOLD: Consecutive failed deliveries that open a next hop's circuit breaker
+    - AGT_RETRY_BUDGET: Maximum queued messages replayed per second
+    - AGT_DEAD_LETTER_SECS: Seconds dead letters are kept for inspection
+    - AGT_DEDUP_WINDOW_SECS: Seconds receipts of messages are kept to drop repeated deliveries
+    - AGT_QUEUE_MAX_MESSAGES: Maximum messages held in the message queue
+    - AGT_QUEUE_MAX_BYTES: Maximum bytes held in the message queue
+    - AGT_DEST_MAX_MESSAGES: Maximum messages held in the message queue for one destination
+    - AGT_DEST_MAX_BYTES: Maximum bytes held in the message queue for one destination
+    - AGT_SHED_POLICY: How a full message queue sheds load (DROP_OLDEST/REJECT_NEWEST)
+    - AGT_ADVERT_REFRESH_SECS: Seconds between full route tables advertised to a peer
+    - AGT_HOLD_DOWN_SECS: Seconds a destination that lost its last route is held down (0 disables)
+    - AGT_LONG_POLL_SECS: Seconds a messages request from a polling agent is held open (0 disables)
+    - AGT_POLLING_CHANNEL: Poll peers over a persistent streaming channel (true/false)
+    - AGT_CHANNEL_WINDOW: Maximum messages per channel record and polled messages routed at a time
+    - AGT_POLL_MAX_MESSAGES: Maximum messages returned to a polling agent per response
+    - AGT_POLL_MAX_BYTES: Maximum bytes of messages returned to a polling agent per response
     """
     if agtuuid := os.environ.get('AGT_UUID'):
         kvstore.commit('agtuuid', agtuuid)
@@ -87,6 +107,86 @@ def _load_from_environment():
         kvstore.commit('message_timeout_secs', int(message_timeout_secs))
         click.echo(f"✓ Loaded AGT_MESSAGE_TIMEOUT_SECS: {message_timeout_secs}")
 
+    if framed_wire := os.environ.get('AGT_FRAMED_WIRE'):
+        kvstore.commit('framed_wire', framed_wire.lower() in ('1', 'true', 'yes'))
+        click.echo(f"✓ Loaded AGT_FRAMED_WIRE: {framed_wire}")
+
+    if retry_backoff_secs := os.environ.get('AGT_RETRY_BACKOFF_SECS'):
+        kvstore.commit('retry_backoff_secs', int(retry_backoff_secs))
+        click.echo(f"✓ Loaded AGT_RETRY_BACKOFF_SECS: {retry_backoff_secs}")
+
+    if retry_backoff_max_secs := os.environ.get('AGT_RETRY_BACKOFF_MAX_SECS'):
+        kvstore.commit('retry_backoff_max_secs', int(retry_backoff_max_secs))
+        click.echo(f"✓ Loaded AGT_RETRY_BACKOFF_MAX_SECS: {retry_backoff_max_secs}")
+
+    if breaker_threshold := os.environ.get('AGT_BREAKER_THRESHOLD'):
+        kvstore.commit('breaker_threshold', int(breaker_threshold))
+        click.echo(f"✓ Loaded AGT_BREAKER_THRESHOLD: {breaker_threshold}")
+
+    if retry_budget := os.environ.get('AGT_RETRY_BUDGET'):
+        kvstore.commit('retry_budget', int(retry_budget))
+        click.echo(f"✓ Loaded AGT_RETRY_BUDGET: {retry_budget}")
+
+    if dead_letter_secs := os.environ.get('AGT_DEAD_LETTER_SECS'):
+        kvstore.commit('dead_letter_secs', int(dead_letter_secs))
+        click.echo(f"✓ Loaded AGT_DEAD_LETTER_SECS: {dead_letter_secs}")
+
+    if dedup_window_secs := os.environ.get('AGT_DEDUP_WINDOW_SECS'):
+        kvstore.commit('dedup_window_secs', int(dedup_window_secs))
+        click.echo(f"✓ Loaded AGT_DEDUP_WINDOW_SECS: {dedup_window_secs}")
+
+    if queue_max_messages := os.environ.get('AGT_QUEUE_MAX_MESSAGES'):
+        kvstore.commit('queue_max_messages', int(queue_max_messages))
+        click.echo(f"✓ Loaded AGT_QUEUE_MAX_MESSAGES: {queue_max_messages}")
+
+    if queue_max_bytes := os.environ.get('AGT_QUEUE_MAX_BYTES'):
+        kvstore.commit('queue_max_bytes', int(queue_max_bytes))
+        click.echo(f"✓ Loaded AGT_QUEUE_MAX_BYTES: {queue_max_bytes}")
+
+    if dest_max_messages := os.environ.get('AGT_DEST_MAX_MESSAGES'):
+        kvstore.commit('dest_max_messages', int(dest_max_messages))
+        click.echo(f"✓ Loaded AGT_DEST_MAX_MESSAGES: {dest_max_messages}")
+
+    if dest_max_bytes := os.environ.get('AGT_DEST_MAX_BYTES'):
+        kvstore.commit('dest_max_bytes', int(dest_max_bytes))
+        click.echo(f"✓ Loaded AGT_DEST_MAX_BYTES: {dest_max_bytes}")
+
+    if shed_policy := os.environ.get('AGT_SHED_POLICY'):
+        kvstore.commit('shed_policy', ShedPolicy[shed_policy.upper()])
+        click.echo(f"✓ Loaded AGT_SHED_POLICY: {shed_policy}")
+
+    if routing_mode := os.environ.get('AGT_ROUTING_MODE'):
+        kvstore.commit('routing_mode', RoutingMode[routing_mode.upper()])
+        click.echo(f"✓ Loaded AGT_ROUTING_MODE: {routing_mode}")
+
+    if advert_refresh_secs := os.environ.get('AGT_ADVERT_REFRESH_SECS'):
+        kvstore.commit('advert_refresh_secs', int(advert_refresh_secs))
+        click.echo(f"✓ Loaded AGT_ADVERT_REFRESH_SECS: {advert_refresh_secs}")
+
+    if hold_down_secs := os.environ.get('AGT_HOLD_DOWN_SECS'):
+        kvstore.commit('hold_down_secs', int(hold_down_secs))
+        click.echo(f"✓ Loaded AGT_HOLD_DOWN_SECS: {hold_down_secs}")
+
+    if long_poll_secs := os.environ.get('AGT_LONG_POLL_SECS'):
+        kvstore.commit('long_poll_secs', int(long_poll_secs))
+        click.echo(f"✓ Loaded AGT_LONG_POLL_SECS: {long_poll_secs}")
+
+    if polling_channel := os.environ.get('AGT_POLLING_CHANNEL'):
+        kvstore.commit('polling_channel', polling_channel.lower() in ('1', 'true', 'yes'))
+        click.echo(f"✓ Loaded AGT_POLLING_CHANNEL: {polling_channel}")
+
+    if channel_window := os.environ.get('AGT_CHANNEL_WINDOW'):
+        kvstore.commit('channel_window', int(channel_window))
+        click.echo(f"✓ Loaded AGT_CHANNEL_WINDOW: {channel_window}")
+
+    if poll_max_messages := os.environ.get('AGT_POLL_MAX_MESSAGES'):
+        kvstore.commit('poll_max_messages', int(poll_max_messages))
+        click.echo(f"✓ Loaded AGT_POLL_MAX_MESSAGES: {poll_max_messages}")
+
+    if poll_max_bytes := os.environ.get('AGT_POLL_MAX_BYTES'):
+        kvstore.commit('poll_max_bytes', int(poll_max_bytes))
+        click.echo(f"✓ Loaded AGT_POLL_MAX_BYTES: {poll_max_bytes}")
+
 
 def _display_config():
     """Display current configuration settings in a formatted table."""
@@ -94,20 +194,40 @@ def _display_config():
     click.echo("Current Configuration")
     click.echo("="*50)
     config_items = [
-        ('Client Control URL',   kvstore.get('client_control_url')),
-        ('Agent ID',             kvstore.get('agtuuid')),
-        ('Host',                 kvstore.get('socket_host')),
-        ('Port',                 kvstore.get('socket_port')),
-        ('Workers',              kvstore.get('workers')),
-        ('Log Path',             kvstore.get('log_path')),
-        ('Log Level App',        kvstore.get('log_level_app')),
-        ('Log Level API',        kvstore.get('log_level_api')),
-        ('Peer Timeout Secs',    kvstore.get('peer_timeout_secs')),
-        ('Peer Refresh Secs',    kvstore.get('peer_refresh_secs')),
-        ('Max Weight',           kvstore.get('max_weight')),
-        ('Ticket Timeout Secs',  kvstore.get('ticket_timeout_secs')),
-        ('Message Timeout Secs', kvstore.get('message_timeout_secs')),
-        ('Secret Digest',        kvstore.get('secret_digest').hex() if kvstore.get('secret_digest') else None),
+        ('Client Control URL',     kvstore.get('client_control_url')),
+        ('Agent ID',               kvstore.get('agtuuid')),
+        ('Host',                   kvstore.get('socket_host')),
+        ('Port',                   kvstore.get('socket_port')),
+        ('Workers',                kvstore.get('workers')),
+        ('Log Path',               kvstore.get('log_path')),
+        ('Log Level App',          kvstore.get('log_level_app')),
+        ('Log Level API',          kvstore.get('log_level_api')),
+        ('Peer Timeout Secs',      kvstore.get('peer_timeout_secs')),
+        ('Peer Refresh Secs',      kvstore.get('peer_refresh_secs')),
+        ('Max Weight',             kvstore.get('max_weight')),
+        ('Ticket Timeout Secs',    kvstore.get('ticket_timeout_secs')),
+        ('Message Timeout Secs',   kvstore.get('message_timeout_secs')),
+        ('Framed Wire',            kvstore.get('framed_wire')),
+        ('Retry Backoff Secs',     kvstore.get('retry_backoff_secs')),
+        ('Retry Backoff Max Secs', kvstore.get('retry_backoff_max_secs')),
+        ('Breaker Threshold',      kvstore.get('breaker_threshold')),
+        ('Retry Budget',           kvstore.get('retry_budget')),
+        ('Dead Letter Secs',       kvstore.get('dead_letter_secs')),
+        ('Dedup Window Secs',      kvstore.get('dedup_window_secs')),
+        ('Queue Max Messages',     kvstore.get('queue_max_messages')),
+        ('Queue Max Bytes',        kvstore.get('queue_max_bytes')),
+        ('Dest Max Messages',      kvstore.get('dest_max_messages')),
+        ('Dest Max Bytes',         kvstore.get('dest_max_bytes')),
+        ('Shed Policy',            kvstore.get('shed_policy')),
+        ('Routing Mode',           kvstore.get('routing_mode')),
+        ('Advert Refresh Secs',    kvstore.get('advert_refresh_secs')),
+        ('Hold Down Secs',         kvstore.get('hold_down_secs')),
+        ('Long Poll Secs',         kvstore.get('long_poll_secs')),
+        ('Polling Channel',        kvstore.get('polling_channel')),
+        ('Channel Window',         kvstore.get('channel_window')),
+        ('Poll Max Messages',      kvstore.get('poll_max_messages')),
+        ('Poll Max Bytes',         kvstore.get('poll_max_bytes')),
+        ('Secret Digest',          kvstore.get('secret_digest').hex() if kvstore.get('secret_digest') else None),
     ]
     for key, value in config_items:
         # Truncate long values for display
@@ -132,6 +252,26 @@ def _display_config():
 @click.option('--max-weight',           type=int,                                                            help='Maximum route weight for routing decisions')
 @click.option('--ticket-timeout-secs',  type=int,                                                            help='Seconds before a ticket is considered expired')
 @click.option('--message-timeout-secs', type=int,                                                            help='Seconds before a pending message is discarded')
+@click.option('--framed-wire/--json-wire', default=None,                                                     help='Send framed binary or JSON request bodies')
+@click.option('--retry-backoff-secs',   type=int,                                                            help='Delay before retrying a next hop after its first failed delivery')
+@click.option('--retry-backoff-max-secs', type=int,                                                          help='Maximum delay between retries of a failing next hop')
+@click.option('--breaker-threshold',    type=int,                                                            help='Consecutive failed deliveries that open a next hop circuit breaker')
+@click.option('--retry-budget',         type=int,                                                            help='Maximum queued messages replayed per second')
+@click.option('--dead-letter-secs',     type=int,                                                            help='Seconds dead letters are kept for inspection')
+@click.option('--dedup-window-secs',    type=int,                                                            help='Seconds receipts of messages are kept to drop repeated deliveries')
+@click.option('--queue-max-messages',   type=int,                                                            help='Maximum messages held in the message queue')
+@click.option('--queue-max-bytes',      type=int,                                                            help='Maximum bytes held in the message queue')
+@click.option('--dest-max-messages',    type=int,                                                            help='Maximum messages held in the message queue for one destination')
+@click.option('--dest-max-bytes',       type=int,                                                            help='Maximum bytes held in the message queue for one destination')
+@click.option('--long-poll-secs',       type=int,                                                            help='Seconds a messages request from a polling agent is held open (0 disables)')
+@click.option('--polling-channel/--polling-requests', default=None,                                          help='Poll peers over a persistent streaming channel or with separate requests')
+@click.option('--channel-window',       type=int,                                                            help='Maximum messages per channel record and polled messages routed at a time')
+@click.option('--poll-max-messages',    type=int,                                                            help='Maximum messages returned to a polling agent per response')
+@click.option('--poll-max-bytes',       type=int,                                                            help='Maximum bytes of messages returned to a polling agent per response')
+@click.option('--shed-policy',          type=click.Choice([p.name for p in ShedPolicy], case_sensitive=False), help='How a full message queue sheds load')
+@click.option('--routing-mode',         type=click.Choice([m.name for m in RoutingMode], case_sensitive=False), help='How the agent computes its routes')
+@click.option('--advert-refresh-secs',  type=int,                                                            help='Seconds between full route tables advertised to a peer')
+@click.option('--hold-down-secs',       type=int,                                                            help='Seconds a destination that lost its last route is held down (0 disables)')
 @click.option('--client-local',         is_flag=True,                                                        help='Set client control URL to local host (http://127.0.0.1:<port>/control)')
 @click.option('-v', '--view',           is_flag=True,                                                        help='View current configuration settings')
 @click.option('-e', '--load-env',       is_flag=True,                                                        help='Load configuration from environment variables')
@@ -139,8 +279,13 @@ def main(
     agtuuid: str | None, port: int | None, host: str | None, secret: str | None, log_path: str | None,
     client_url: str | None, workers: int | None, log_level_app: str | None, log_level_api: str | None,
     peer_timeout_secs: int | None, peer_refresh_secs: int | None, max_weight: int | None,
-    ticket_timeout_secs: int | None, message_timeout_secs: int | None,
-    client_local: bool, view: bool, load_env: bool
+    ticket_timeout_secs: int | None, message_timeout_secs: int | None, framed_wire: bool | None,
+    queue_max_messages: int | None, queue_max_bytes: int | None, dest_max_messages: int | None,
+    dest_max_bytes: int | None, long_poll_secs: int | None, polling_channel: bool | None, channel_window: int | None,
+    poll_max_messages: int | None, poll_max_bytes: int | None, shed_policy: str | None, routing_mode: str | None,
+    retry_backoff_secs: int | None, retry_backoff_max_secs: int | None, breaker_threshold: int | None,
+    retry_budget: int | None, dead_letter_secs: int | None, dedup_window_secs: int | None,
+    advert_refresh_secs: int | None, hold_down_secs: int | None, client_local: bool, view: bool, load_env: bool
 ):
     # Load from environment if requested
     if load_env:
@@ -205,6 +350,86 @@ def main(
         kvstore.commit('message_timeout_secs', message_timeout_secs)
         click.echo(f"✓ Set Message Timeout Secs: {message_timeout_secs}")
 
+    if framed_wire is not None:
+        kvstore.commit('framed_wire', framed_wire)
+        click.echo(f"✓ Set Framed Wire: {framed_wire}")
+
+    if retry_backoff_secs:
+        kvstore.commit('retry_backoff_secs', retry_backoff_secs)
+        click.echo(f"✓ Set Retry Backoff Secs: {retry_backoff_secs}")
+
+    if retry_backoff_max_secs:
+        kvstore.commit('retry_backoff_max_secs', retry_backoff_max_secs)
+        click.echo(f"✓ Set Retry Backoff Max Secs: {retry_backoff_max_secs}")
+
+    if breaker_threshold:
+        kvstore.commit('breaker_threshold', breaker_threshold)
+        click.echo(f"✓ Set Breaker Threshold: {breaker_threshold}")
+
+    if retry_budget:
+        kvstore.commit('retry_budget', retry_budget)
+        click.echo(f"✓ Set Retry Budget: {retry_budget}")
+
+    if dead_letter_secs:
+        kvstore.commit('dead_letter_secs', dead_letter_secs)
+        click.echo(f"✓ Set Dead Letter Secs: {dead_letter_secs}")
+
+    if dedup_window_secs:
+        kvstore.commit('dedup_window_secs', dedup_window_secs)
+        click.echo(f"✓ Set Dedup Window Secs: {dedup_window_secs}")
+
+    if queue_max_messages:
+        kvstore.commit('queue_max_messages', queue_max_messages)
+        click.echo(f"✓ Set Queue Max Messages: {queue_max_messages}")
+
+    if queue_max_bytes:
+        kvstore.commit('queue_max_bytes', queue_max_bytes)
+        click.echo(f"✓ Set Queue Max Bytes: {queue_max_bytes}")
+
+    if dest_max_messages:
+        kvstore.commit('dest_max_messages', dest_max_messages)
+        click.echo(f"✓ Set Dest Max Messages: {dest_max_messages}")
+
+    if dest_max_bytes:
+        kvstore.commit('dest_max_bytes', dest_max_bytes)
+        click.echo(f"✓ Set Dest Max Bytes: {dest_max_bytes}")
+
+    if shed_policy:
+        kvstore.commit('shed_policy', ShedPolicy[shed_policy.upper()])
+        click.echo(f"✓ Set Shed Policy: {shed_policy.upper()}")
+
+    if routing_mode:
+        kvstore.commit('routing_mode', RoutingMode[routing_mode.upper()])
+        click.echo(f"✓ Set Routing Mode: {routing_mode.upper()}")
+
+    if advert_refresh_secs:
+        kvstore.commit('advert_refresh_secs', advert_refresh_secs)
+        click.echo(f"✓ Set Advert Refresh Secs: {advert_refresh_secs}")
+
+    if hold_down_secs is not None:
+        kvstore.commit('hold_down_secs', hold_down_secs)
+        click.echo(f"✓ Set Hold Down Secs: {hold_down_secs}")
+
+    if long_poll_secs is not None:
+        kvstore.commit('long_poll_secs', long_poll_secs)
+        click.echo(f"✓ Set Long Poll Secs: {long_poll_secs}")
+
+    if polling_channel is not None:
+        kvstore.commit('polling_channel', polling_channel)
+        click.echo(f"✓ Set Polling Channel: {polling_channel}")
+
+    if channel_window:
+        kvstore.commit('channel_window', channel_window)
+        click.echo(f"✓ Set Channel Window: {channel_window}")
+
+    if poll_max_messages:
+        kvstore.commit('poll_max_messages', poll_max_messages)
+        click.echo(f"✓ Set Poll Max Messages: {poll_max_messages}")
+
+    if poll_max_bytes:
+        kvstore.commit('poll_max_bytes', poll_max_bytes)
+        click.echo(f"✓ Set Poll Max Bytes: {poll_max_bytes}")
+
     if client_local:
         local_url = f"http://127.0.0.1:{kvstore.get('socket_port')}/control"
         kvstore.commit('client_control_url', local_url)
@@ -217,7 +442,11 @@ def main(
     # Show help message if no options provided
     if not any([agtuuid, host, port, log_path, secret, client_url, workers, log_level_app, log_level_api,
                   peer_timeout_secs, peer_refresh_secs, max_weight, ticket_timeout_secs, message_timeout_secs,
-                  client_local, load_env, view]):
+                  framed_wire is not None, queue_max_messages, queue_max_bytes, dest_max_messages, dest_max_bytes,
+                  long_poll_secs is not None, polling_channel is not None, channel_window, poll_max_messages,
+                  poll_max_bytes, shed_policy, routing_mode, retry_backoff_secs, retry_backoff_max_secs,
+                  breaker_threshold, retry_budget, dead_letter_secs, dedup_window_secs, advert_refresh_secs,
+                  hold_down_secs is not None, client_local, load_env, view]):
         click.echo("No options provided. Use --help for usage information.")
 
 
@@ -147,6 +147,7 @@ class Collection(Document, Generic[T]):
 
             $contains:   Value contains another value
             $inside:     Value in another value
+            $oneof:      Value equals one of a comma separated list of values
             $startswith: Value starts with
             $endswith:   Value ends with
 
@@ -159,6 +160,13 @@ class Collection(Document, Generic[T]):
             limit: Used to specify the maximum number of results to return.
                 This is not a valid attribute name and cannot be used as an attribute name
                 in a collection.
+            order_by: Comma separated attribute names to order the results by. An attribute
+                prefixed with - is ordered descending. Objects missing an attribute are ordered
+                last. This is not a valid attribute name and cannot be used as an attribute name
+                in a collection.
+            max_bytes: Used to specify the maximum number of bytes the results may occupy. The
+                first result is returned regardless of its size. This is not a valid attribute
+                name and cannot be used as an attribute name in a collection.
 
         Args:
             params:
@@ -204,14 +212,16 @@ class Collection(Document, Generic[T]):
                         coluuid=self.coluuid,
                         objuuid=objuuid,
                         connection_str=self.connection_str,
-                        model=self.model
+                        model=self.model,
+                        document=self
                     )
                 )
             except pydantic.ValidationError as error:
                 Object(
                     coluuid=self.coluuid,
                     objuuid=objuuid,
-                    connection_str=self.connection_str
+                    connection_str=self.connection_str,
+                    document=self
                 ).destroy()
                 logging.warning('Discarding invalid %s:%s', self.model.__name__, objuuid)
                 logging.debug(error)
@@ -251,7 +261,8 @@ class Collection(Document, Generic[T]):
                         coluuid=self.coluuid,
                         objuuid=objuuid,
                         connection_str=self.connection_str,
-                        model=self.model
+                        model=self.model,
+                        document=self
                     )
                 )
             except pydantic.ValidationError as error:
@@ -262,6 +273,50 @@ class Collection(Document, Generic[T]):
 
         return objects
 
+    @synchronized
+    def delete(self, *params: str, **kwparams: Any) -> int:
+        """This method deletes the collection objects matching attribute values to the key
+        word arguments applied to this method, without loading them. Unlike pop(), the
+        objects are deleted in bulk and are not returned. Accepts the same operators,
+        modifiers, params, and kwparams as find().
+
+        Returns:
+            The number of objects deleted.
+        """
+        if len(params) == 0 and len(kwparams) == 0:
+            objuuids = self.list_objuuids()
+        else:
+            objuuids = Document.find_objuuids(self, self.coluuid, *params, **kwparams)
+
+        Document.delete_objects(self, objuuids)
+
+        return len(objuuids)
+
+    @synchronized
+    def increment(self, attribute: str, amount: Union[int, float], *params: str, **kwparams: Any) -> int:
+        """This method adds an amount to a numeric attribute of the collection objects matching
+        attribute values to the key word arguments applied to this method, without loading
+        them. The stored objects and the attribute's index are updated in bulk. Accepts the
+        same operators, modifiers, params, and kwparams as find().
+
+        Args:
+            attribute:
+                Name of the attribute to increment. The attribute must be indexed by the
+                collection, and objects whose attribute is not a number are left unchanged.
+
+            amount:
+                The amount to add, which may be negative.
+
+        Returns:
+            The number of objects updated.
+        """
+        if len(params) == 0 and len(kwparams) == 0:
+            objuuids = self.list_objuuids()
+        else:
+            objuuids = Document.find_objuuids(self, self.coluuid, *params, **kwparams)
+
+        return Document.increment_objects(self, self.coluuid, objuuids, attribute, amount)
+
     @synchronized
     def find_objuuids(self, *params: str, **kwparams: Any) -> List[str]:
         """This method finds and returns a list of collection object UUIDs by matching attribute
@@ -277,6 +332,7 @@ class Collection(Document, Generic[T]):
 
             $contains:   Value contains another value
             $inside:     Value in another value
+            $oneof:      Value equals one of a comma separated list of values
             $startswith: Value starts with
             $endswith:   Value ends with
 
@@ -289,6 +345,13 @@ class Collection(Document, Generic[T]):
             limit: Used to specify the maximum number of results to return.
                 This is not a valid attribute name and cannot be used as an attribute name
                 in a collection.
+            order_by: Comma separated attribute names to order the results by. An attribute
+                prefixed with - is ordered descending. Objects missing an attribute are ordered
+                last. This is not a valid attribute name and cannot be used as an attribute name
+                in a collection.
+            max_bytes: Used to specify the maximum number of bytes the results may occupy. The
+                first result is returned regardless of its size. This is not a valid attribute
+                name and cannot be used as an attribute name in a collection.
 
         Args:
             params:
@@ -350,13 +413,15 @@ class Collection(Document, Generic[T]):
                 self.coluuid,
                 objuuid=objuuid,
                 connection_str=self.connection_str,
-                model=self.model
+                model=self.model,
+                document=self
             )
         except pydantic.ValidationError as error:
             Object(
                 coluuid=self.coluuid,
                 objuuid=objuuid,
-                connection_str=self.connection_str
+                connection_str=self.connection_str,
+                document=self
             ).destroy()
             logging.error('Discarding invalid %s:%s', self.model.__name__, objuuid)
             logging.debug(error)
@@ -418,6 +483,42 @@ class Collection(Document, Generic[T]):
 
         return self.get_object(objuuid)
 
+    @overload
+    def insert_object(self: 'Collection[T]', obj: Union[Dict, T]) -> Optional[Object[T]]:
+        ...
+
+    @overload
+    def insert_object(self, obj: Union[Dict, pydantic.BaseModel]) -> Optional[Object]:
+        ...
+
+    @synchronized
+    def insert_object(self, obj: Union[Dict, pydantic.BaseModel]) -> Union[Object[T], Object, None]:
+        """This method stores an object unless an object with its UUID already exists. The
+        check and the insert happen under the collection's lock, so of several concurrent
+        inserts of the same UUID exactly one succeeds.
+
+        Args:
+            obj:
+                The object to store, as a dictionary or model.
+
+        Returns:
+            The new collection object, or None if the UUID already existed.
+        """
+        if self.model:
+            obj = self.model.model_validate(obj)
+            objuuid = getattr(obj, 'objuuid', None)
+        else:
+            objuuid = obj.get('objuuid')
+
+        if objuuid is not None:
+            try:
+                Document.get_object(self, objuuid)
+                return None
+            except IndexError:
+                pass
+
+        return self.upsert_object(obj)
+
     @synchronized
     def list_objuuids(self) -> List[str]:
         """This method returns a list of every object UUID in the collection.
@@ -426,3 +527,18 @@ class Collection(Document, Generic[T]):
             A list of object UUIDs.
         """
         return Document.list_collection_objects(self, self.coluuid)
+
+    @synchronized
+    def measure(self, attribute: str = None) -> Dict[Any, tuple[int, int]]:
+        """This method returns the number of objects in the collection and the
+        number of bytes they occupy, optionally grouped by an attribute's value.
+
+        Args:
+            attribute:
+                Name of the attribute to group by. If omitted, the whole collection
+                is measured under the key None.
+
+        Returns:
+            A dictionary of (object count, byte count) tuples keyed by attribute value.
+        """
+        return Document.measure_collection(self, self.coluuid, attribute)
@@ -13,11 +13,14 @@ import sqlite3
 import pydantic
 
 from .utils import (
-    Operator, get_uuid_str, read_key_at_path, coerce
+    Operator, get_uuid_str, json_path, read_key_at_path, coerce
 )
 
 DEFAULT_CONNECTION_STR    = "default.sqlite"
-RESERVED_ATTRIBUTES_NAMES = ['limit']
+RESERVED_ATTRIBUTES_NAMES = ['limit', 'order_by', 'max_bytes']
+
+# Object UUIDs bound to a single bulk statement, below SQLite's limit on bound parameters
+BULK_CHUNK_SIZE = 500
 
 
 class _JSONEncoder(json.JSONEncoder):
@@ -35,6 +38,15 @@ def _json_hook(obj: dict):
     return obj
 
 
+def _order_key(value: str | None, descending: bool) -> tuple:
+    """Sort key for an indexed value. Numbers sort before strings and missing values sort last."""
+    if value is None:
+        return (-1 if descending else 1, 0, 0)
+
+    value = coerce(value)
+    return (0, 0 if isinstance(value, (int, float)) else 1, value)
+
+
 class Document:
     """This class wraps and abstracts that database and the SQL driving
     functions. The class manages objects, collections, and collection
@@ -206,6 +218,7 @@ class Document:
 
             $contains:   Value contains another value
             $inside:     Value in another value
+            $oneof:      Value equals one of a comma separated list of values
             $startswith: Value starts with
             $endswith:   Value ends with
 
@@ -215,6 +228,13 @@ class Document:
             limit: Used to specify the maximum number of results to return.
                 This is not a valid attribute name and cannot be used as an attribute name
                 in a collection.
+            order_by: Comma separated attribute names to order the results by. An attribute
+                prefixed with - is ordered descending. Objects missing an attribute are ordered
+                last. This is not a valid attribute name and cannot be used as an attribute name
+                in a collection.
+            max_bytes: Used to specify the maximum number of bytes the results may occupy. The
+                first result is returned regardless of its size. This is not a valid attribute
+                name and cannot be used as an attribute name in a collection.
 
         Modifiers:
             ! Negation
@@ -290,6 +310,14 @@ class Document:
             logging.error(error_str)
             raise ValueError(error_str)
 
+        # process max bytes
+        max_bytes = kwparams.get('max_bytes')
+        max_bytes = int(max_bytes) if max_bytes is not None else None
+        if max_bytes is not None and max_bytes < 1:
+            error_str = f'max_bytes must be a positive integer: {max_bytes}'
+            logging.error(error_str)
+            raise ValueError(error_str)
+
         # process queries
         for attribute, expression in queries:
             expression = str(expression)
@@ -395,6 +423,16 @@ class Document:
                 )
                 objuuid_lists.append([row[0] for row in self.cursor.fetchall()])
 
+            elif operator == Operator.ONEOF:
+                subjects = subject.split(',')
+                self.cursor.execute(
+                    f"select OBJUUID from TBL_INDEX \
+                     where ATTRIBUTE = ? and VALUE {'not in' if negation else 'in'} \
+                     ({', '.join('?' * len(subjects))}) and COLUUID = ?;",
+                    (attribute, *subjects, coluuid)
+                )
+                objuuid_lists.append([row[0] for row in self.cursor.fetchall()])
+
             else:
                 self.cursor.execute(
                     "select OBJUUID, VALUE from TBL_INDEX \
@@ -440,9 +478,50 @@ class Document:
         for objuuid_list in objuuid_lists[1:]:
             objuuids = objuuids & set(objuuid_list)
 
+        objuuids = list(objuuids)
+
+        # process order by, applying the least significant attribute first so each stable sort
+        # preserves the order of the attributes after it
+        order_by = kwparams.get('order_by')
+        for attribute in reversed([a.strip() for a in str(order_by or '').split(',') if a.strip()]):
+            descending = attribute.startswith('-')
+            attribute  = attribute.lstrip('-')
+
+            values = {}
+            for start in range(0, len(objuuids), BULK_CHUNK_SIZE):
+                chunk = objuuids[start:start + BULK_CHUNK_SIZE]
+                self.cursor.execute(
+                    f"select OBJUUID, VALUE from TBL_INDEX \
+                     where ATTRIBUTE = ? and COLUUID = ? and OBJUUID in ({', '.join('?' * len(chunk))});",
+                    (attribute, coluuid, *chunk)
+                )
+                values.update(self.cursor.fetchall())
+            objuuids.sort(key=lambda objuuid: _order_key(values.get(objuuid), descending), reverse=descending)
+
         if limit is not None:
-            return list(objuuids)[:limit]
-        return list(objuuids)
+            objuuids = objuuids[:limit]
+
+        # process max bytes with a running total of the object sizes in result order, always keeping
+        # the first object so an oversized object can still be found
+        if max_bytes is not None:
+            total = 0
+            for start in range(0, len(objuuids), BULK_CHUNK_SIZE):
+                chunk = objuuids[start:start + BULK_CHUNK_SIZE]
+                self.cursor.execute(
+                    f"with ORDERED(POSITION, OBJUUID) as (values {', '.join(['(?, ?)'] * len(chunk))}) \
+                     select ORDERED.POSITION, sum(coalesce(length(TBL_OBJECTS.VALUE), 0)) \
+                     over (order by ORDERED.POSITION) from ORDERED \
+                     left join TBL_OBJECTS on TBL_OBJECTS.OBJUUID = ORDERED.OBJUUID \
+                     order by ORDERED.POSITION;",
+                    [value for position, objuuid in enumerate(chunk, start) for value in (position, objuuid)]
+                )
+                running = 0
+                for position, running in self.cursor.fetchall():
+                    if position and total + running > max_bytes:
+                        return objuuids[:position]
+                total += running
+
+        return objuuids
 
     def delete_object(self, objuuid: str):
         """This function deletes an object.
@@ -453,6 +532,84 @@ class Document:
         self.cursor.execute("delete from TBL_OBJECTS where OBJUUID = ?;", (objuuid,))
         self.connection.commit()
 
+    def delete_objects(self, objuuids: List[str]):
+        """This function deletes a list of objects with one statement per
+        BULK_CHUNK_SIZE objects, in a single transaction.
+
+        Args:
+            objuuids:
+                The objects' UUIDs."""
+        for start in range(0, len(objuuids), BULK_CHUNK_SIZE):
+            chunk = objuuids[start:start + BULK_CHUNK_SIZE]
+            self.cursor.execute(
+                f"delete from TBL_OBJECTS where OBJUUID in ({', '.join('?' * len(chunk))});",
+                chunk
+            )
+        self.connection.commit()
+
+    def increment_objects(self, coluuid: str, objuuids: List[str], attribute: str, amount: Union[int, float]) -> int:
+        """This function adds an amount to a numeric attribute of a list of objects, updating
+        the stored objects and their index values in place with one statement per
+        BULK_CHUNK_SIZE objects, in a single transaction. Objects whose attribute is missing
+        or not a number are left unchanged.
+
+        Args:
+            coluuid:
+                The collection UUID.
+
+            objuuids:
+                The objects' UUIDs.
+
+            attribute:
+                The name of an attribute of the collection.
+
+            amount:
+                The amount to add, which may be negative.
+
+        Returns:
+            The number of objects updated.
+
+        Raises:
+            ValueError:
+                This is raised when the collection has no such attribute.
+        """
+        attributes = self.list_attributes(coluuid)
+        if attribute not in attributes:
+            error_str = f'"{attribute}" is not an attribute of the collection.'
+            logging.error(error_str)
+            raise ValueError(error_str)
+
+        path    = json_path(attributes[attribute])
+        indexed = [name for name, other in attributes.items() if other == attributes[attribute]]
+        updated = 0
+
+        for start in range(0, len(objuuids), BULK_CHUNK_SIZE):
+            chunk = objuuids[start:start + BULK_CHUNK_SIZE]
+            self.cursor.execute(
+                f"select OBJUUID from TBL_OBJECTS \
+                 where OBJUUID in ({', '.join('?' * len(chunk))}) and json_type(VALUE, ?) in ('integer', 'real');",
+                (*chunk, path)
+            )
+            chunk = [row[0] for row in self.cursor.fetchall()]
+            if not chunk:
+                continue
+
+            self.cursor.execute(
+                f"update TBL_OBJECTS set VALUE = json_set(VALUE, ?, json_extract(VALUE, ?) + ?) \
+                 where OBJUUID in ({', '.join('?' * len(chunk))});",
+                (path, path, amount, *chunk)
+            )
+            self.cursor.execute(
+                f"update TBL_INDEX set VALUE = cast(VALUE + ? as text) \
+                 where ATTRIBUTE in ({', '.join('?' * len(indexed))}) and COLUUID = ? \
+                 and OBJUUID in ({', '.join('?' * len(chunk))});",
+                (amount, *indexed, coluuid, *chunk)
+            )
+            updated += len(chunk)
+
+        self.connection.commit()
+        return updated
+
     def create_attribute(self, coluuid: str, attribute: str, path: str):
         """This function creates a new attribute for a collection. Upon creation of
         the attribute, all of the collection's objects are indexed with the new
@@ -612,6 +769,38 @@ class Document:
         self.cursor.execute("select OBJUUID from TBL_OBJECTS where COLUUID = ?;", (coluuid,))
         return [row[0] for row in self.cursor.fetchall()]
 
+    def measure_collection(self, coluuid: str, attribute: str = None) -> Dict[Any, tuple[int, int]]:
+        """This function returns the number of objects in a collection and the
+        number of bytes they occupy, optionally grouped by an attribute's value.
+
+        Args:
+            coluuid:
+                The collection's UUID.
+
+            attribute:
+                Name of the attribute to group by. Objects missing the attribute
+                are not counted. If omitted, the whole collection is measured under
+                the key None.
+
+        Returns:
+            A dictionary of (object count, byte count) tuples keyed by attribute value.
+        """
+        if attribute is None:
+            self.cursor.execute(
+                "select count(*), coalesce(sum(length(VALUE)), 0) from TBL_OBJECTS where COLUUID = ?;",
+                (coluuid,)
+            )
+            count, size = self.cursor.fetchone()
+            return {None: (count, size)}
+
+        self.cursor.execute(
+            "select i.VALUE, count(*), coalesce(sum(length(o.VALUE)), 0) from TBL_INDEX i \
+             join TBL_OBJECTS o on o.OBJUUID = i.OBJUUID \
+             where i.COLUUID = ? and i.ATTRIBUTE = ? group by i.VALUE;",
+            (coluuid, attribute)
+        )
+        return {row[0]: (row[1], row[2]) for row in self.cursor.fetchall()}
+
     def __del__(self):
         """This destructor function closes the database connection."""
         self.connection.close()
@@ -17,10 +17,11 @@ class _ObjectTyped(Generic[T]):
         self.model_class = model_class
 
     def __call__(self, coluuid: str, objuuid: str,
-                 connection_str: str=DEFAULT_CONNECTION_STR):
+                 connection_str: str=DEFAULT_CONNECTION_STR,
+                 document: Optional[Document]=None):
         """Create an Object instance with the captured model type."""
         return Object(coluuid, objuuid, connection_str=connection_str,
-                     model=self.model_class)
+                     model=self.model_class, document=document)
 
 class Object(Document, Generic[T]):
     """This class encapsulates a collection object and implements methods
@@ -43,7 +44,8 @@ class Object(Document, Generic[T]):
     def __init__(
             self, coluuid: str, objuuid: str,
             connection_str: str=DEFAULT_CONNECTION_STR,
-            model: Optional[T]=None
+            model: Optional[T]=None,
+            document: Optional[Document]=None
         ):
         """This function initializes an instance of a collection object. It
         initializes a document instance and loads the object from it.
@@ -60,8 +62,20 @@ class Object(Document, Generic[T]):
 
             model:
                 Pydantic model to enforce.
+
+            document:
+                An open document, such as the collection the object was found in, whose
+                connection the object shares instead of opening its own. The document is
+                kept open for as long as the object.
             """
-        Document.__init__(self, connection_str=connection_str)
+        self.document = document
+        if document is None:
+            Document.__init__(self, connection_str=connection_str)
+        else:
+            self.connection_str = document.connection_str
+            self.connection     = document.connection
+            self.cursor         = document.connection.cursor()
+
         self.objuuid             = objuuid
         self.coluuid             = coluuid
 
@@ -100,6 +114,11 @@ class Object(Document, Generic[T]):
         Document.delete_object(self, self.objuuid)
         self.object = None
 
+    def __del__(self):
+        """Close the object's connection unless it is shared with a document."""
+        if self.document is None:
+            Document.__del__(self)
+
     def __str__(self):
         """Implements str for pretty printing an object"""
         try:
@@ -1,11 +1,29 @@
 """DAO Unit Tests"""
 from random import random
+from threading import RLock
+import gc
 import unittest
+from unittest.mock import patch
 
 from pydantic import BaseModel, Field
 
 from .collection import Collection
 from .object import Object
+from .utils import LOCKS
+
+
+class _CountingLock:
+    """An RLock that counts how often it is acquired."""
+    def __init__(self):
+        self.lock = RLock()
+        self.acquired = 0
+
+    def __enter__(self):
+        self.acquired += 1
+        return self.lock.__enter__()
+
+    def __exit__(self, *args):
+        return self.lock.__exit__(*args)
 
 
 class TestCollection(unittest.TestCase):
@@ -51,6 +69,41 @@ class TestCollection(unittest.TestCase):
         """Test find all"""
         self.assertEqual(len(self.collection.find()), 4)
 
+    def test_objects_share_the_collection_connection(self):
+        """Found objects use their collection's connection and keep it open."""
+        self.assertIs(self.collection.find(name='apple')[0].connection, self.collection.connection)
+
+        item = Collection(self.collection.collection_name, self.collection.connection_str).find(name='grape')[0]
+        item.object['size'] = 3
+        item.commit()
+        self.assertEqual(self.collection.find(name='grape')[0].object['size'], 3)
+
+    def test_objects_share_the_collection_lock(self):
+        """Found objects synchronize on their collection's lock."""
+        item = self.collection.find(name='apple')[0]
+        self.assertEqual(item.connection_str, self.collection.connection_str)
+
+        lock = _CountingLock()
+        with patch.dict(LOCKS, {self.collection.connection_str: lock}):
+            item.object['size'] = 5
+            item.commit()
+            self.collection.find(size=5)
+        self.assertEqual(lock.acquired, 2)
+
+    def test_released_objects_leave_the_collection_connection_open(self):
+        """Objects sharing a connection do not close it when they are released."""
+        items = self.collection.find()
+        del items
+        gc.collect()
+        self.assertEqual(len(self.collection.find()), 4)
+
+    def test_standalone_objects_open_their_own_connection(self):
+        """Objects created without a document keep opening their own connection."""
+        objuuid = self.collection.find(name='lime')[0].objuuid
+        item = Object(self.collection.coluuid, objuuid, self.collection.connection_str)
+        self.assertIsNot(item.connection, self.collection.connection)
+        self.assertEqual(item.object['name'], 'lime')
+
     def test_find_op_startswith(self):
         """Test starts with operator"""
         self.assertEqual(len(self.collection.find(name='$startswith:lem')), 1)
@@ -67,6 +120,16 @@ class TestCollection(unittest.TestCase):
         """Test inside operator"""
         self.assertEqual(len(self.collection.find(color='$inside:red and yellow')), 2)
 
+    def test_find_op_oneof(self):
+        """Test one of operator"""
+        self.assertEqual(len(self.collection.find(color='$oneof:red,yellow')), 2)
+        self.assertEqual(len(self.collection.find(color='$oneof:green')), 2)
+        self.assertEqual(len(self.collection.find(color='$oneof:re,ellow')), 0)
+
+    def test_find_op_not_oneof(self):
+        """Test negated one of operator"""
+        self.assertEqual(len(self.collection.find(color='$!oneof:red,yellow')), 2)
+
     def test_find_op_regex(self):
         """Test regex operator"""
         self.assertEqual(len(self.collection.find(color='$regex:^gr.*n$')), 2)
@@ -121,6 +184,62 @@ class TestCollection(unittest.TestCase):
         self.assertEqual(len(items), 2)
 
 
+class TestCollectionBulk(unittest.TestCase):
+    """Test bulk delete and increment of the objects matching a query."""
+    def setUp(self):
+        """Initialize a test collection with indexed sizes."""
+        test_id = random()
+        self.collection = Collection(f'collection-bulk-{test_id}', 'file::memory:?cache=shared')
+
+        self.collection.create_attribute('color', '/color')
+        self.collection.create_attribute('size', '/size')
+
+        for color, size in (('red', 4), ('green', 2), ('yellow', 2), ('green', 1), ('blue', 'large')):
+            self.collection.build_object(color=color, size=size)
+
+    def tearDown(self):
+        """Cleanup test collection"""
+        self.collection.destroy()
+
+    def test_delete(self):
+        """Test delete removes the matching objects and their index"""
+        self.assertEqual(self.collection.delete(color='$!oneof:red,yellow'), 3)
+        self.assertEqual(sorted(item.object['color'] for item in self.collection.find()), ['red', 'yellow'])
+        self.assertEqual(self.collection.find(color='green'), [])
+
+        self.assertEqual(self.collection.delete(color='purple'), 0)
+        self.assertEqual(self.collection.delete(), 2)
+        self.assertEqual(self.collection.find(), [])
+
+    def test_increment(self):
+        """Test increment updates the matching objects and their index"""
+        self.assertEqual(self.collection.increment('size', 3, color='green'), 2)
+
+        self.assertEqual(sorted(item.object['size'] for item in self.collection.find(color='green')), [4, 5])
+        self.assertEqual(len(self.collection.find(size='$gte:4')), 3)
+        self.assertEqual(len(self.collection.find(size=2)), 1)
+
+    def test_increment_skips_non_numbers(self):
+        """Test increment leaves objects whose attribute is not a number unchanged"""
+        self.assertEqual(self.collection.increment('size', -0.5), 4)
+        self.assertEqual(self.collection.find(color='blue')[0].object['size'], 'large')
+        self.assertEqual(self.collection.find(color='red')[0].object['size'], 3.5)
+        self.assertEqual(len(self.collection.find(size=0.5)), 1)
+
+    def test_increment_requires_attribute(self):
+        """Test increment of an attribute the collection does not index"""
+        with self.assertRaises(ValueError):
+            self.collection.increment('weight', 1)
+
+    def test_insert_object(self):
+        """Test insert stores an object only if its UUID does not exist yet"""
+        self.assertIsNotNone(self.collection.insert_object({'objuuid': 'fig', 'color': 'purple', 'size': 1}))
+        self.assertIsNone(self.collection.insert_object({'objuuid': 'fig', 'color': 'black', 'size': 2}))
+        self.assertEqual(self.collection.get_object('fig').object['color'], 'purple')
+        self.assertEqual(len(self.collection.find(color='black')), 0)
+        self.assertIsNotNone(self.collection.insert_object({'color': 'black'}))
+
+
 class TestCollectionReservedAndLimit(unittest.TestCase):
     """Test reserved attribute name enforcement and limit behavior."""
 
@@ -213,6 +332,178 @@ class TestCollectionReservedAndLimit(unittest.TestCase):
         self.assertEqual(len(results), 2)
 
 
+class TestCollectionOrderBy(unittest.TestCase):
+    """Test ordering results with the reserved order_by parameter."""
+
+    def setUp(self):
+        """Initialize a test collection with four items and three indexed attributes."""
+        test_id = random()
+        self.collection = Collection(f'collection-order-{test_id}', 'file::memory:?cache=shared')
+
+        self.collection.create_attribute('color', '/color')
+        self.collection.create_attribute('size',  '/size')
+        self.collection.create_attribute('name',  '/name')
+
+        for name, color, size in [
+            ('apple', 'red',    4),
+            ('lime',  'green',  2),
+            ('lemon', 'yellow', 12),
+            ('grape', 'green',  1),
+        ]:
+            item = self.collection.get_object()
+            item.object['name']  = name
+            item.object['color'] = color
+            item.object['size']  = size
+            item.commit()
+
+    def tearDown(self):
+        """Cleanup test collection."""
+        self.collection.destroy()
+
+    def names(self, **kwparams):
+        return [item.object['name'] for item in self.collection.find(size='$gte:0', **kwparams)]
+
+    def test_create_attribute_reserved_name_order_by_raises(self):
+        """create_attribute should raise ValueError for the reserved name 'order_by'."""
+        with self.assertRaises(ValueError):
+            self.collection.create_attribute('order_by', '/order_by')
+
+    def test_order_by_numeric(self):
+        """Numeric values are ordered numerically rather than as strings."""
+        self.assertEqual(self.names(order_by='size'), ['grape', 'lime', 'apple', 'lemon'])
+
+    def test_order_by_descending(self):
+        """A - prefix orders descending."""
+        self.assertEqual(self.names(order_by='-size'), ['lemon', 'apple', 'lime', 'grape'])
+
+    def test_order_by_multiple_attributes(self):
+        """Later attributes break ties in earlier ones."""
+        self.assertEqual(self.names(order_by='color,-size'), ['lime', 'grape', 'apple', 'lemon'])
+
+    def test_order_by_applies_before_limit(self):
+        """limit keeps the first results in order."""
+        self.assertEqual(self.names(order_by='size', limit=2), ['grape', 'lime'])
+
+    def test_order_by_missing_values_last(self):
+        """Objects missing the ordered attribute are ordered last in either direction."""
+        item = self.collection.get_object()
+        item.object['name'] = 'kiwi'
+        item.object['size'] = 3
+        item.commit()
+
+        self.assertEqual(self.names(order_by='color')[-1], 'kiwi')
+        self.assertEqual(self.names(order_by='-color')[-1], 'kiwi')
+
+    def test_pop_order_by(self):
+        """pop returns objects in order."""
+        popped = self.collection.pop(color='green', order_by='size')
+        self.assertEqual([item.object['name'] for item in popped], ['grape', 'lime'])
+
+
+class TestCollectionMaxBytes(unittest.TestCase):
+    """Test limiting the bytes of results with the reserved max_bytes parameter."""
+
+    def setUp(self):
+        """Initialize a test collection with three items of different sizes."""
+        test_id = random()
+        self.collection = Collection(f'collection-max-bytes-{test_id}', 'file::memory:?cache=shared')
+        self.collection.create_attribute('rank', '/rank')
+
+        for rank, padding in enumerate([100, 100, 1000]):
+            item = self.collection.get_object()
+            item.object['rank']    = rank
+            item.object['padding'] = 'x' * padding
+            item.commit()
+
+        self.sizes = [size for _, (_, size) in sorted(self.collection.measure('rank').items())]
+        self.size  = sum(self.sizes)
+
+    def tearDown(self):
+        """Cleanup test collection."""
+        self.collection.destroy()
+
+    def ranks(self, **kwparams):
+        return [item.object['rank'] for item in self.collection.find(rank='$gte:0', order_by='rank', **kwparams)]
+
+    def test_create_attribute_reserved_name_max_bytes_raises(self):
+        """create_attribute should raise ValueError for the reserved name 'max_bytes'."""
+        with self.assertRaises(ValueError):
+            self.collection.create_attribute('max_bytes', '/max_bytes')
+
+    def test_max_bytes_keeps_results_that_fit(self):
+        """Results are returned in order until the next one would exceed max_bytes."""
+        self.assertEqual(self.ranks(max_bytes=self.sizes[0] + self.sizes[1]), [0, 1])
+        self.assertEqual(self.ranks(max_bytes=self.size - 1), [0, 1])
+
+    def test_max_bytes_larger_than_results(self):
+        """max_bytes larger than every result returns all of them."""
+        self.assertEqual(self.ranks(max_bytes=self.size), [0, 1, 2])
+
+    def test_max_bytes_returns_first_result(self):
+        """The first result is returned even if it exceeds max_bytes alone."""
+        self.assertEqual(self.ranks(max_bytes=1), [0])
+
+    def test_max_bytes_across_chunks(self):
+        """The running total carries across the chunks the sizes are read in."""
+        with patch('stembot.dao.document.BULK_CHUNK_SIZE', 1):
+            self.assertEqual(self.ranks(max_bytes=self.sizes[0] + self.sizes[1]), [0, 1])
+            self.assertEqual(self.ranks(max_bytes=self.size), [0, 1, 2])
+
+    def test_max_bytes_with_limit(self):
+        """limit and max_bytes both apply."""
+        self.assertEqual(self.ranks(max_bytes=self.size, limit=1), [0])
+
+    def test_max_bytes_zero_raises(self):
+        """max_bytes=0 should raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.collection.find(rank='$gte:0', max_bytes=0)
+
+    def test_pop_max_bytes(self):
+        """pop only removes the objects it returns."""
+        popped = self.collection.pop(rank='$gte:0', order_by='-rank', max_bytes=self.size - 1)
+        self.assertEqual([item.object['rank'] for item in popped], [2, 1])
+        self.assertEqual(self.ranks(), [0])
+
+
+
+class TestCollectionMeasure(unittest.TestCase):
+    """Test measuring object counts and sizes with measure."""
+
+    def setUp(self):
+        """Initialize a test collection with three items and one indexed attribute."""
+        test_id = random()
+        self.collection = Collection(f'collection-measure-{test_id}', 'file::memory:?cache=shared')
+        self.collection.create_attribute('color', '/color')
+
+        for name, color in [('apple', 'red'), ('lime', 'green'), ('grape', 'green')]:
+            item = self.collection.get_object()
+            item.object['name']  = name
+            item.object['color'] = color
+            item.commit()
+
+    def tearDown(self):
+        """Cleanup test collection."""
+        self.collection.destroy()
+
+    def test_measure_collection(self):
+        """Without an attribute the whole collection is measured under None."""
+        usage = self.collection.measure()
+        self.assertEqual(list(usage), [None])
+        self.assertEqual(usage[None][0], 3)
+        self.assertGreater(usage[None][1], 0)
+
+    def test_measure_by_attribute(self):
+        """Counts and sizes are grouped by the attribute's value."""
+        usage = self.collection.measure('color')
+        self.assertEqual({color: count for color, (count, _) in usage.items()}, {'red': 1, 'green': 2})
+        self.assertEqual(sum(size for _, size in usage.values()), self.collection.measure()[None][1])
+
+    def test_measure_empty_collection(self):
+        """An empty collection measures as zero."""
+        self.collection.pop(color='$!eq:none')
+        self.assertEqual(self.collection.measure(), {None: (0, 0)})
+        self.assertEqual(self.collection.measure('color'), {})
+
 class Item(BaseModel):
     """Test model for typing verification."""
     name:    str = Field(default='')
@@ -41,6 +41,7 @@ class Operator(Enum):
     LT         = auto()
     LTE        = auto()
     INSIDE     = auto()
+    ONEOF      = auto()
     CONTAINS   = auto()
     STARTSWITH = auto()
     ENDSWITH   = auto()
@@ -113,6 +114,32 @@ def read_key_at_path(path: str, object_to_inspect: Any) -> Any:
     return current_object
 
 
+def json_path(path: str) -> str:
+    """This function converts an attribute path string to a SQLite JSON path.
+
+    Path strings are tokenized like read_key_at_path(); tokens that are integers
+    become array indices and all other tokens become object keys.
+
+        /keyA/1/keyB -> $."keyA"[1]."keyB"
+
+    Args:
+        path:
+            The attribute path string.
+
+    Returns:
+        The SQLite JSON path.
+    """
+    delimeter = path[0]
+
+    converted = '$'
+    for token in path[1:].split(delimeter):
+        try:
+            converted += f'[{int(token)}]'
+        except ValueError:
+            converted += f'."{token}"'
+    return converted
+
+
 def coerce(item: Any) -> Any:
     """This is a type coercion function for coercing a type for an item.
 
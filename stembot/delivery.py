@@ -0,0 +1,332 @@
+"""Next hop backoff, circuit breaking, dead letters, and shedding counters for message delivery.
+
+Tracks the delivery health of each next hop peer so that a peer which stops
+answering is not sent one failing request per queued message per second.
+
+Backoff and circuit breaking:
+- Each consecutive failed delivery to a next hop defers further deliveries to
+  it by an exponentially growing, jittered delay (retry_backoff_secs doubling
+  up to retry_backoff_max_secs).
+- Once the failures reach breaker_threshold the hop's breaker opens. When the
+  delay passes, a single delivery is let through as a probe (half open) while
+  the others keep waiting. A successful delivery closes the breaker.
+
+Dead letters:
+- Messages that expire before they can be delivered are kept in the
+  dead_letters collection, with the reason they could not be delivered, for
+  dead_letter_secs. They can be inspected with the GetDeadLetters control form.
+
+Shedding counters:
+- Messages shed by a full message queue (see stembot.messaging) are counted
+  per destination in the shed_counters collection, both queued messages
+  dropped to make room and new messages rejected.
+- The messages and bytes queued for each destination are counted in the
+  queue_usage collection as messages are queued and removed, so the queue
+  quotas are checked without measuring the queue. The counts are reset to
+  the measured usage periodically to correct any drift.
+
+Receipts:
+- The msguuid of every message received from another agent is kept in the
+  receipts collection for dedup_window_secs. A message received again, because
+  a delivery was retried after its acknowledgement was lost, is acknowledged
+  without being processed again. The receipt is recorded before the message
+  is processed, so a retry that arrives while the first delivery is still
+  being processed is dropped too.
+
+Hop health and receipts are kept in collections so they are shared by the
+server workers and the background tasks.
+"""
+
+import logging
+
+from random import uniform
+from time import time
+from typing import Dict, List
+
+from stembot.dao import Collection
+from stembot.enums import BreakerState, NetworkMessageType
+from stembot.models.config import CONFIG
+from stembot.models.delivery import DeadLetter, HopHealth, QueueUsage, Receipt, ShedCounter
+from stembot.models.network import NetworkMessage
+from stembot.scheduling import scheduled
+
+# A probe that has not reported back within this time is assumed lost
+PROBE_TIMEOUT_SECS = 60
+
+
+def backoff_secs(failures: int) -> float:
+    """Return the jittered delay before retrying a hop after consecutive failures.
+
+    Args:
+        failures: Consecutive failed deliveries to the hop.
+
+    Returns:
+        Seconds to defer deliveries to the hop.
+    """
+    delay = min(CONFIG.retry_backoff_secs * 2 ** (failures - 1), CONFIG.retry_backoff_max_secs)
+    return delay * uniform(0.5, 1.0)
+
+
+def acquire_hop(agtuuid: str) -> bool:
+    """Check whether a delivery to a next hop may be attempted now.
+
+    Hops without failures are always available. A hop in backoff is not
+    available until its retry time. When the retry time of an open breaker
+    passes, the first caller is let through as the probe and the breaker is
+    half opened until the probe reports back.
+
+    Args:
+        agtuuid: UUID of the next hop agent.
+
+    Returns:
+        True if the delivery may be attempted.
+    """
+    hops = Collection[HopHealth]('hops').find(agtuuid=agtuuid)
+    if not hops:
+        return True
+
+    hop = hops[0]
+    if hop.object.retry_time and hop.object.retry_time > time():
+        return False
+
+    if hop.object.state != BreakerState.CLOSED:
+        hop.object.state      = BreakerState.HALF_OPEN
+        hop.object.retry_time = time() + PROBE_TIMEOUT_SECS
+        hop.commit()
+
+    return True
+
+
+def record_success(agtuuid: str) -> None:
+    """Record a successful delivery to a next hop, closing its breaker.
+
+    Args:
+        agtuuid: UUID of the next hop agent.
+    """
+    Collection[HopHealth]('hops').pop(agtuuid=agtuuid)
+
+
+def record_failure(agtuuid: str, error: str) -> None:
+    """Record a failed delivery to a next hop and defer further deliveries.
+
+    Args:
+        agtuuid: UUID of the next hop agent.
+        error: The delivery error.
+    """
+    hops  = Collection[HopHealth]('hops')
+    found = hops.find(agtuuid=agtuuid)
+    hop   = found[0].object if found else HopHealth(agtuuid=agtuuid)
+
+    hop.failures  += 1
+    hop.error      = error
+    hop.retry_time = time() + backoff_secs(hop.failures)
+
+    if hop.failures >= CONFIG.breaker_threshold:
+        if hop.state != BreakerState.OPEN:
+            logging.warning('Opening circuit breaker for %s: %s', agtuuid, error)
+        hop.state = BreakerState.OPEN
+
+    hops.upsert_object(hop)
+
+
+def deferred_hops() -> List[str]:
+    """Return the UUIDs of next hops whose deliveries are currently deferred."""
+    return [hop.object.agtuuid for hop in Collection[HopHealth]('hops').find(retry_time=f'$gt:{time()}')]
+
+
+def broken_hops() -> List[str]:
+    """Return the UUIDs of next hops whose circuit breakers are open or half open."""
+    return [hop.object.agtuuid for hop in Collection[HopHealth]('hops').find(state=f'$!eq:{BreakerState.CLOSED}')]
+
+
+def get_hop_health(agtuuid: str) -> HopHealth | None:
+    """Return the delivery health of a next hop, or None if it is healthy."""
+    for hop in Collection[HopHealth]('hops').find(agtuuid=agtuuid):
+        return hop.object
+    return None
+
+
+def dead_letter(message: NetworkMessage, reason: str, hop: str | None = None) -> None:
+    """Store an undeliverable message as a dead letter.
+
+    Args:
+        message: The undeliverable network message.
+        reason: Why the message could not be delivered.
+        hop: UUID of the next hop the message was waiting on, if any.
+    """
+    dumped = message.model_dump(mode='json', exclude={'objuuid', 'coluuid'})
+    if isinstance(dumped.get('form'), dict):
+        dumped['form'].pop('b64zlib', None)
+        dumped['form'].pop('payload', None)
+
+    logging.warning('Dead lettering %s for %s: %s', message.type, message.dest, reason)
+    Collection[DeadLetter]('dead_letters').upsert_object(
+        DeadLetter(message=dumped, dest=message.dest, hop=hop, reason=reason)
+    )
+
+
+def get_dead_letters(dest: str | None = None, purge: bool = False) -> List[DeadLetter]:
+    """Return dead letters, oldest first.
+
+    Args:
+        dest: Only return dead letters for this destination agent (None for all).
+        purge: Remove the returned dead letters.
+
+    Returns:
+        A list of DeadLetter objects.
+    """
+    dead_letters = Collection[DeadLetter]('dead_letters')
+    query        = {'dead_time': '$gte:0', 'order_by': 'dead_time'}
+    if dest is not None:
+        query['dest'] = dest
+
+    found = dead_letters.pop(**query) if purge else dead_letters.find(**query)
+    return [dead_letter.object for dead_letter in found]
+
+
+def count_shed(dest: str | None, dropped: int = 0, rejected: int = 0) -> None:
+    """Add to the counts of messages shed from the message queue for a destination.
+
+    Args:
+        dest: UUID of the shed messages' destination agent.
+        dropped: Queued messages dropped to make room for newer messages.
+        rejected: New messages rejected because the queue was full.
+    """
+    counters = Collection[ShedCounter]('shed_counters')
+    found    = counters.find(dest=str(dest))
+    counter  = found[0].object if found else ShedCounter(dest=dest)
+
+    counter.dropped  += dropped
+    counter.rejected += rejected
+    counter.shed_time = time()
+
+    counters.upsert_object(counter)
+
+
+def get_shed_counters() -> Dict[str | None, ShedCounter]:
+    """Return the counts of messages shed from the message queue.
+
+    Returns:
+        A dictionary of ShedCounter objects keyed by destination agent UUID.
+    """
+    return {counter.object.dest: counter.object for counter in Collection[ShedCounter]('shed_counters').find()}
+
+
+def count_queued(dest: str | None, messages: int, size: int) -> None:
+    """Add to the counts of messages queued for a destination.
+
+    The counts of a destination are kept in one object, so concurrent first
+    counts for a destination replace rather than duplicate each other.
+
+    Args:
+        dest: UUID of the messages' destination agent.
+        messages: Messages queued, or negative for messages removed from the queue.
+        size: Bytes queued, or negative for bytes removed from the queue.
+    """
+    usage = Collection[QueueUsage]('queue_usage')
+    if usage.increment('messages', messages, dest=str(dest)):
+        usage.increment('size', size, dest=str(dest))
+    else:
+        usage.upsert_object(QueueUsage(dest=dest, messages=messages, size=size, objuuid=f'dest-{dest}'))
+
+
+def get_queue_usage() -> Dict[str | None, tuple[int, int]]:
+    """Return the counts of queued messages.
+
+    Returns:
+        A dictionary of (message count, byte count) tuples keyed by destination agent UUID.
+    """
+    counts: Dict[str | None, tuple[int, int]] = {}
+    for usage in Collection[QueueUsage]('queue_usage').find():
+        messages, size = counts.get(usage.object.dest, (0, 0))
+        counts[usage.object.dest] = (messages + usage.object.messages, size + usage.object.size)
+    return counts
+
+
+def reset_queue_usage(counts: Dict[str | None, tuple[int, int]]) -> None:
+    """Replace the counts of queued messages with measured counts.
+
+    Args:
+        counts: A dictionary of (message count, byte count) tuples keyed by destination agent UUID.
+    """
+    usage = Collection[QueueUsage]('queue_usage')
+    usage.delete()
+    for dest, (messages, size) in counts.items():
+        usage.upsert_object(QueueUsage(dest=dest, messages=messages, size=size, objuuid=f'dest-{dest}'))
+
+
+def _deduplicated(message: NetworkMessage) -> bool:
+    """Return whether repeated deliveries of a message are dropped.
+
+    Messages without a msguuid and messages requests, which are safe to
+    repeat, are never treated as repeated deliveries.
+    """
+    return message.msguuid is not None and message.type != NetworkMessageType.MESSAGES_REQUEST
+
+
+def is_repeated(message: NetworkMessage) -> bool:
+    """Return whether a message from another agent was already received.
+
+    Args:
+        message: The received message.
+
+    Returns:
+        True if a receipt of the message was recorded within dedup_window_secs.
+    """
+    if not _deduplicated(message):
+        return False
+
+    if Collection[Receipt]('receipts').find_objuuids(msguuid=message.msguuid):
+        logging.info('Dropping repeated %s %s from %s', message.type, message.msguuid, message.isrc)
+        return True
+    return False
+
+
+def record_receipt(message: NetworkMessage) -> bool:
+    """Record the receipt of a message from another agent.
+
+    Called once the message was processed, routed or queued, so a delivery
+    that failed before then is processed again when it is retried. The
+    receipt is keyed on the msguuid and inserted only if absent, so of
+    several concurrent deliveries of the message exactly one records it.
+
+    Args:
+        message: The received message.
+
+    Returns:
+        True if the receipt was recorded, or False if it already was or the
+        message is not deduplicated.
+    """
+    if not _deduplicated(message):
+        return False
+
+    return Collection[Receipt]('receipts').insert_object(
+        Receipt(msguuid=message.msguuid, objuuid=message.msguuid)
+    ) is not None
+
+
+@scheduled(every_secs=60)
+def expire_receipts() -> None:
+    """Remove receipts older than dedup_window_secs."""
+    Collection[Receipt]('receipts').pop(receipt_time=f'$lt:{time()-CONFIG.dedup_window_secs}')
+
+
+@scheduled(every_secs=60)
+def expire_dead_letters() -> None:
+    """Remove dead letters older than dead_letter_secs."""
+    Collection[DeadLetter]('dead_letters').pop(dead_time=f'$lt:{time()-CONFIG.dead_letter_secs}')
+
+
+# Indexed attributes of the collections this module owns, keyed by collection name
+INDEXED_ATTRIBUTES = {
+    'hops':          (HopHealth,   ('agtuuid', 'retry_time', 'state')),
+    'dead_letters':  (DeadLetter,  ('dest', 'dead_time')),
+    'shed_counters': (ShedCounter, ('dest',)),
+    'queue_usage':   (QueueUsage,  ('dest', 'messages', 'size')),
+    'receipts':      (Receipt,     ('msguuid', 'receipt_time')),
+}
+
+for name, (model, attributes) in INDEXED_ATTRIBUTES.items():
+    collection = Collection[model](name)
+    for attribute in attributes:
+        collection.create_attribute(attribute, f'/{attribute}')
@@ -5,7 +5,7 @@ and network messages used in inter-agent communication. All enum values are
 automatically converted to uppercase in their string representation.
 """
 
-from enum import StrEnum, auto
+from enum import IntEnum, StrEnum, auto
 
 
 class UpperCaseStrEnum(StrEnum):
@@ -34,27 +34,51 @@ class ControlFormType(UpperCaseStrEnum):
         SYNC_PROCESS: Synchronize and execute a remote process.
         WRITE_FILE: Write data to a file on the remote agent.
         LOAD_FILE: Load and retrieve file data from the remote agent.
+        WRITE_FILE_CHUNK: Write a single chunk of a file on the remote agent.
+        LOAD_FILE_CHUNK: Load a single chunk of a file from the remote agent.
+        GET_FILE_SIGNATURE: Retrieve the block checksums of a file for delta transfers.
+        LOAD_FILE_DELTA: Load a file as a delta against another file's block checksums.
+        WRITE_FILE_DELTA: Rebuild a file on the remote agent from a delta.
         CREATE_TICKET: Create a new ticket for routed messages.
         READ_TICKET: Read the contents of a ticket.
         CLOSE_TICKET: Close and remove a ticket.
         CHECK_TICKET: Check the status of a ticket.
+        WAIT_TICKET: Wait for a ticket to be serviced and return its status.
+        CREATE_TICKETS: Create tickets delivering the same form to many agents.
+        CHECK_TICKETS: Check the status of many tickets.
+        COLLECT_TICKETS: Read and close the serviced tickets among many tickets.
+        MULTICAST_TICKET: Create tickets delivering the same form to many agents along a distribution tree.
         GET_CONFIG: Retrieve the agent's current configuration.
+        GET_DEAD_LETTERS: Retrieve messages that expired before they could be delivered.
+        GET_QUEUE_STATS: Retrieve the message queue usage and shedding counters.
         BENCHMARK: Run a benchmark test on the remote agent.
     """
-    CREATE_PEER    = auto()
-    DISCOVER_PEER  = auto()
-    DELETE_PEERS   = auto()
-    GET_PEERS      = auto()
-    GET_ROUTES     = auto()
-    SYNC_PROCESS   = auto()
-    WRITE_FILE     = auto()
-    LOAD_FILE      = auto()
-    BENCHMARK      = auto()
-    CREATE_TICKET  = auto()
-    READ_TICKET    = auto()
-    CLOSE_TICKET   = auto()
-    CHECK_TICKET   = auto()
-    GET_CONFIG     = auto()
+    CREATE_PEER        = auto()
+    DISCOVER_PEER      = auto()
+    DELETE_PEERS       = auto()
+    GET_PEERS          = auto()
+    GET_ROUTES         = auto()
+    SYNC_PROCESS       = auto()
+    WRITE_FILE         = auto()
+    LOAD_FILE          = auto()
+    WRITE_FILE_CHUNK   = auto()
+    LOAD_FILE_CHUNK    = auto()
+    GET_FILE_SIGNATURE = auto()
+    LOAD_FILE_DELTA    = auto()
+    WRITE_FILE_DELTA   = auto()
+    BENCHMARK          = auto()
+    CREATE_TICKET      = auto()
+    READ_TICKET        = auto()
+    CLOSE_TICKET       = auto()
+    CHECK_TICKET       = auto()
+    WAIT_TICKET        = auto()
+    CREATE_TICKETS     = auto()
+    CHECK_TICKETS      = auto()
+    COLLECT_TICKETS    = auto()
+    MULTICAST_TICKET   = auto()
+    GET_CONFIG         = auto()
+    GET_DEAD_LETTERS   = auto()
+    GET_QUEUE_STATS    = auto()
 
 
 class NetworkMessageType(UpperCaseStrEnum):
@@ -66,24 +90,86 @@ class NetworkMessageType(UpperCaseStrEnum):
 
     Attributes:
         ADVERTISEMENT: Route advertisement from a peer.
+        ADVERTISEMENT_ACK: Acknowledgement of the sequence number of the last advertisement applied.
+        LINK_STATE: Signed record of an agent's links to its peers, flooded to every agent in link state mode.
         MESSAGES_REQUEST: Request to retrieve pending messages from a peer.
         MESSAGES_RESPONSE: Response containing pending messages for requester.
         TICKET_REQUEST: Request to execute a control form via ticket mechanism.
         TICKET_RESPONSE: Response with ticket execution results.
         TICKET_TRACE_RESPONSE: Trace response for multi-hop ticket delivery.
+        MULTICAST_REQUEST: Request to execute a control form on a set of agents, split at each agent by next hop.
+        MULTICAST_RESPONSE: Aggregated results of a multicast request from a branch of its distribution tree.
         PING: Simple connectivity check message.
         ACKNOWLEDGEMENT: Generic acknowledgement of message receipt.
     """
     ADVERTISEMENT         = auto()
+    ADVERTISEMENT_ACK     = auto()
+    LINK_STATE            = auto()
     MESSAGES_REQUEST      = auto()
     MESSAGES_RESPONSE     = auto()
     TICKET_REQUEST        = auto()
     TICKET_RESPONSE       = auto()
     TICKET_TRACE_RESPONSE = auto()
+    MULTICAST_REQUEST     = auto()
+    MULTICAST_RESPONSE    = auto()
     PING                  = auto()
     ACKNOWLEDGEMENT       = auto()
 
 
+class MessagePriority(IntEnum):
+    """Delivery priority classes for queued network messages.
+
+    Queued messages are delivered in ascending priority value, first in first
+    out within a class, so routing and housekeeping traffic is never stuck
+    behind a backlog of bulk transfers.
+
+    Attributes:
+        CONTROL: Pings, acknowledgements, advertisements, polling, and traces.
+        TICKET: Tickets carrying ordinary control forms.
+        BULK: Tickets carrying file transfer and benchmark forms.
+    """
+    CONTROL = 0
+    TICKET  = 1
+    BULK    = 2
+
+
+class BreakerState(UpperCaseStrEnum):
+    """Circuit breaker states for next hop delivery.
+
+    Attributes:
+        CLOSED: Deliveries proceed, backing off after each consecutive failure.
+        OPEN: Deliveries are deferred until the retry time, then one is let through as a probe.
+        HALF_OPEN: A probe delivery is in flight; other deliveries wait for its outcome.
+    """
+    CLOSED    = auto()
+    OPEN      = auto()
+    HALF_OPEN = auto()
+
+
+class ShedPolicy(UpperCaseStrEnum):
+    """Load shedding policies for a full message queue.
+
+    Attributes:
+        DROP_OLDEST: Drop the oldest queued messages of the same or a lower priority class
+                     to make room for a new message.
+        REJECT_NEWEST: Reject new messages while the queue is full.
+    """
+    DROP_OLDEST   = auto()
+    REJECT_NEWEST = auto()
+
+
+class RoutingMode(UpperCaseStrEnum):
+    """How agents compute their routes.
+
+    Attributes:
+        DISTANCE_VECTOR: Agents advertise their route tables to their peers, and route by hop count.
+        LINK_STATE: Agents flood records of their links' measured round trip times and loss to every agent,
+                    and route along the shortest paths computed from them.
+    """
+    DISTANCE_VECTOR = auto()
+    LINK_STATE      = auto()
+
+
 class TaskStatus(UpperCaseStrEnum):
     """Status values for scheduled tasks in the agent's task scheduler.
 
@@ -97,3 +183,44 @@ class TaskStatus(UpperCaseStrEnum):
     RUNNING  = auto()
     STOPPED  = auto()
     DISABLED = auto()
+
+
+class FileCodec(UpperCaseStrEnum):
+    """Compression codecs for file payloads.
+
+    Selects how the b64zlib field of the file forms is compressed. A request
+    without a codec lets the agent choose one from a sample of the data, and
+    a payload without a codec is zlib compressed for compatibility with agents
+    that predate codec negotiation.
+
+    Attributes:
+        NONE: Payload is not compressed.
+        ZLIB_1: Fastest zlib compression.
+        ZLIB_6: Default zlib compression.
+        ZLIB_9: Best zlib compression.
+        ZSTD: Zstandard compression (requires the zstandard package).
+        LZ4: LZ4 frame compression (requires the lz4 package).
+    """
+    NONE   = auto()
+    ZLIB_1 = auto()
+    ZLIB_6 = auto()
+    ZLIB_9 = auto()
+    ZSTD   = auto()
+    LZ4    = auto()
+
+
+class DigestType(UpperCaseStrEnum):
+    """Digest algorithms for verifying file payloads.
+
+    Selects the algorithm the digest field of the file forms is computed
+    with. Forms without a digest type are verified with md5sum for
+    compatibility with agents that predate digest negotiation.
+
+    Attributes:
+        MD5: MD5 digest.
+        BLAKE2B: BLAKE2b digest (faster than MD5 on 64-bit hosts).
+        XXHASH: XXH3 128-bit digest (requires the xxhash package).
+    """
+    MD5     = auto()
+    BLAKE2B = auto()
+    XXHASH  = auto()
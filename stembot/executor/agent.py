@@ -14,8 +14,10 @@ Key features:
 - Automatic retry with exponential backoff
 - Optimized timeouts (5s connect, 30s read)
 - Type-safe control form/network message handling via Pydantic
+- Optional framed binary bodies for bulk payloads (see stembot.executor.frame)
+- Persistent polling channels streaming sealed records (see stembot.executor.channel)
 """
-from typing import TypeVar
+from typing import Iterator, TypeVar
 import logging
 import requests
 from requests.adapters import HTTPAdapter
@@ -23,9 +25,12 @@ from urllib3.util.retry import Retry
 
 from Crypto.Cipher import AES
 
+from stembot.dao.utils import get_uuid_str
+from stembot.executor.channel import CHANNEL_CONTENT_TYPE, open_records
+from stembot.executor.frame import BINARY_CONTENT_TYPE, FRAME_CONTENT_TYPE, dump_body, load_body
 from stembot.models.config import CONFIG
 from stembot.models.control import ControlForm
-from stembot.models.network import NetworkMessage
+from stembot.models.network import NetworkMessage, NetworkMessagesRequest
 
 # Generic type variable bound to ControlForm
 T = TypeVar('T', bound=ControlForm)
@@ -45,6 +50,7 @@ class AgentClient:
         url: The base URL of the remote agent (e.g., http://agent:8080).
         session: A requests.Session object with connection pooling and retry
                configuration, reused across requests to the same agent.
+        transferred_bytes: Bytes sent and received by the last network message exchanged.
     """
     def __init__(self, url: str) -> None:
         """Initialize an agent client for a remote agent URL.
@@ -58,6 +64,7 @@ class AgentClient:
             url: The base URL of the remote agent to communicate with.
         """
         self.url = url
+        self.transferred_bytes = 0
 
         if url in SESSION_POOL:
             self.session = SESSION_POOL[url]
@@ -113,12 +120,12 @@ class AgentClient:
 
         request_cipher = AES.new(CONFIG.key, AES.MODE_EAX)
 
-        cipher_text, tag = request_cipher.encrypt_and_digest(form.model_dump_json().encode())
+        cipher_text, tag = request_cipher.encrypt_and_digest(dump_body(form, CONFIG.framed_wire))
 
         headers = {
             'Nonce': request_cipher.nonce.hex(),
             'Tag': tag.hex(),
-            'Content-Type': 'application/binary',
+            'Content-Type': FRAME_CONTENT_TYPE if CONFIG.framed_wire else BINARY_CONTENT_TYPE,
             'Content-Length': str(len(cipher_text))
         }
 
@@ -139,7 +146,7 @@ class AgentClient:
         plain_text = response_cipher.decrypt(response.content)
         response_cipher.verify(bytes.fromhex(response.headers['Tag']))
         # Return the response as the same type as the request
-        return type(form).model_validate_json(plain_text)
+        return load_body(type(form), plain_text, response.headers.get('Content-Type') == FRAME_CONTENT_TYPE)
 
     def send_network_message(self, message: NetworkMessage) -> NetworkMessage:
         """Send a network message and receive a response.
@@ -148,7 +155,8 @@ class AgentClient:
         receives a network message response. Request and response bodies are raw
         binary AES-256 EAX ciphertext. The nonce and MAC tag are transmitted as
         hex strings in the Nonce and Tag headers. Automatically sets the message
-        source (isrc) to the local agent UUID.
+        source (isrc) to the local agent UUID, and assigns a msguuid to messages
+        sent for the first time so that a resent message is only processed once.
 
         Uses session pooling for connection reuse and configured timeouts:
         - Connect timeout: 5 seconds
@@ -169,13 +177,15 @@ class AgentClient:
         request_cipher = AES.new(CONFIG.key, AES.MODE_EAX)
 
         message.isrc = CONFIG.agtuuid
+        if message.msguuid is None:
+            message.msguuid = get_uuid_str()
 
-        ciphertext, tag = request_cipher.encrypt_and_digest(message.model_dump_json().encode())
+        ciphertext, tag = request_cipher.encrypt_and_digest(dump_body(message, CONFIG.framed_wire))
 
         headers = {
             'Nonce': request_cipher.nonce.hex(),
             'Tag': tag.hex(),
-            'Content-Type': 'application/binary',
+            'Content-Type': FRAME_CONTENT_TYPE if CONFIG.framed_wire else BINARY_CONTENT_TYPE,
             'Content-Length': str(len(ciphertext))
         }
 
@@ -196,4 +206,67 @@ class AgentClient:
         plain_text = response_cipher.decrypt(response.content)
         response_cipher.verify(bytes.fromhex(response.headers['Tag']))
 
-        return NetworkMessage.model_validate_json(plain_text)
+        self.transferred_bytes = len(ciphertext) + len(response.content)
+
+        return load_body(NetworkMessage, plain_text, response.headers.get('Content-Type') == FRAME_CONTENT_TYPE)
+
+    def open_channel(self, message: NetworkMessagesRequest) -> Iterator[NetworkMessage]:
+        """Open a persistent polling channel and receive messages as they are queued.
+
+        Sends an encrypted messages request with stream set to the agent's /mpi
+        endpoint and yields the NetworkMessagesResponse in each record the agent
+        streams back, until the connection is closed. An agent that does not
+        support channels answers with a single response, which is yielded before
+        returning. Automatically sets the message source (isrc) to the local
+        agent UUID.
+
+        Args:
+            message: The messages request opening the channel.
+
+        Yields:
+            NetworkMessage responses from the agent.
+
+        Raises:
+            requests.HTTPError: If the HTTP response has a non-2xx status code.
+            ValueError: If a record fails decryption or validation.
+        """
+        logging.debug('%s -> %s', message.type, message.dest)
+
+        request_cipher = AES.new(CONFIG.key, AES.MODE_EAX)
+
+        message.isrc   = CONFIG.agtuuid
+        message.stream = True
+
+        ciphertext, tag = request_cipher.encrypt_and_digest(dump_body(message, CONFIG.framed_wire))
+
+        headers = {
+            'Nonce': request_cipher.nonce.hex(),
+            'Tag': tag.hex(),
+            'Content-Type': FRAME_CONTENT_TYPE if CONFIG.framed_wire else BINARY_CONTENT_TYPE,
+            'Content-Length': str(len(ciphertext))
+        }
+
+        # The read timeout applies between records, which arrive at least every heartbeat
+        with self.session.post(
+            self.url,
+            data=ciphertext,
+            headers=headers,
+            timeout=(5.0, 60.0),  # (connect timeout, read timeout)
+            stream=True
+        ) as response:
+            response.raise_for_status()
+
+            if response.headers.get('Content-Type') != CHANNEL_CONTENT_TYPE:
+                response_cipher = AES.new(
+                    CONFIG.key, AES.MODE_EAX,
+                    nonce=bytes.fromhex(response.headers['Nonce'])
+                )
+
+                plain_text = response_cipher.decrypt(response.content)
+                response_cipher.verify(bytes.fromhex(response.headers['Tag']))
+
+                yield load_body(NetworkMessage, plain_text, response.headers.get('Content-Type') == FRAME_CONTENT_TYPE)
+                return
+
+            for plain_text in open_records(response.raw.read):
+                yield load_body(NetworkMessage, plain_text, CONFIG.framed_wire)
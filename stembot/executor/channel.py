@@ -0,0 +1,82 @@
+"""Sealed record stream for persistent polling channels.
+
+A polling agent can only dial out, so instead of sending one messages request
+per poll it may open a channel: a single messages request whose response is
+streamed for as long as the connection stays up. The parent agent writes a
+record whenever messages for the polling agent or its subtree are queued, and
+an empty record every heartbeat so both sides notice a dead connection.
+
+Record layout (the length is a big-endian uint32):
+
+    nonce (16 bytes) | tag (16 bytes) | ciphertext length | ciphertext
+
+Each record is sealed separately with AES-256 EAX, so the nonce and tag cannot
+travel in HTTP headers as they do for single requests. The plain text of a
+record is a NetworkMessagesResponse in the format of the request that opened
+the channel (JSON text or a frame, see stembot.executor.frame).
+"""
+import struct
+from typing import Callable, Iterator
+
+from Crypto.Cipher import AES
+
+from stembot.models.config import CONFIG
+
+CHANNEL_CONTENT_TYPE = 'application/x-stembot-channel'
+
+# Seconds between records when no messages are queued
+HEARTBEAT_SECS = 15
+
+NONCE_SIZE = 16
+TAG_SIZE   = 16
+LENGTH     = struct.Struct('>I')
+
+
+def seal_record(plain_text: bytes) -> bytes:
+    """Encrypt a record for a channel.
+
+    Args:
+        plain_text: The record's plain text.
+
+    Returns:
+        The sealed record bytes.
+    """
+    cipher = AES.new(CONFIG.key, AES.MODE_EAX)
+    cipher_text, tag = cipher.encrypt_and_digest(plain_text)
+    return b''.join([cipher.nonce, tag, LENGTH.pack(len(cipher_text)), cipher_text])
+
+
+def _read_exactly(read: Callable[[int], bytes], size: int) -> bytes | None:
+    """Read exactly size bytes, or return None if the stream ends first."""
+    data = b''
+    while len(data) < size:
+        chunk = read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def open_records(read: Callable[[int], bytes]) -> Iterator[bytes]:
+    """Decrypt the records of a channel until the stream ends.
+
+    Args:
+        read: Reads up to the given number of bytes from the stream, returning
+            no bytes once the stream has ended.
+
+    Yields:
+        The plain text of each record.
+
+    Raises:
+        ValueError: If a record fails authentication or the stream ends inside a record.
+    """
+    while header := _read_exactly(read, NONCE_SIZE + TAG_SIZE + LENGTH.size):
+        nonce, tag = header[:NONCE_SIZE], header[NONCE_SIZE:NONCE_SIZE + TAG_SIZE]
+        (length,)  = LENGTH.unpack_from(header, NONCE_SIZE + TAG_SIZE)
+
+        cipher_text = _read_exactly(read, length)
+        if cipher_text is None:
+            raise ValueError('Truncated channel record')
+
+        cipher = AES.new(CONFIG.key, AES.MODE_EAX, nonce=nonce)
+        yield cipher.decrypt_and_verify(cipher_text, tag)
@@ -0,0 +1,278 @@
+"""Compression codecs for file payloads.
+
+Compresses and decompresses file payloads with the codec named on the file
+forms, and chooses a codec automatically when a request does not name one.
+
+Automatic selection:
+- Small payloads use zlib level 9, which is cheap at that size.
+- Larger payloads are sampled at a few evenly spaced windows and compressed
+  with zlib level 1. Payloads that do not shrink (tarballs, images, archives)
+  are sent uncompressed. Others use zstd if both this agent and the destination
+  have it, or zlib level 6.
+
+The codecs the destination can decompress are passed along with the request
+(see available_codecs()). When they are not known, only the codecs every agent
+has, zlib and none, are chosen.
+
+Compressors and decompressors are incremental so payloads can be streamed
+through them block by block instead of being held in memory uncompressed.
+
+zstd and lz4 are optional. They are only chosen automatically or accepted when
+the corresponding package is importable; otherwise the form fails with an
+error naming the missing codec.
+"""
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+from stembot.enums import FileCodec
+
+AUTO_SMALL_SIZE  = 64 * 1024
+AUTO_SAMPLE_SIZE = 16 * 1024
+AUTO_SAMPLES     = 4
+AUTO_MAX_RATIO   = 0.9
+
+ZLIB_LEVELS = {
+    FileCodec.ZLIB_1: 1,
+    FileCodec.ZLIB_6: 6,
+    FileCodec.ZLIB_9: 9
+}
+
+
+def available_codecs() -> list[FileCodec]:
+    """Return the codecs this agent can compress and decompress."""
+    codecs = [FileCodec.NONE, *ZLIB_LEVELS]
+    if zstandard is not None:
+        codecs.append(FileCodec.ZSTD)
+    if lz4_frame is not None:
+        codecs.append(FileCodec.LZ4)
+    return codecs
+
+
+def _choose_from_samples(samples: list[bytes], accepted: list[FileCodec] | None) -> FileCodec:
+    sampled = sum(len(sample) for sample in samples)
+    packed  = sum(len(zlib.compress(sample, level=1)) for sample in samples)
+
+    if packed >= sampled * AUTO_MAX_RATIO:
+        return FileCodec.NONE
+
+    if zstandard is not None and FileCodec.ZSTD in (accepted or []):
+        return FileCodec.ZSTD
+
+    return FileCodec.ZLIB_6
+
+
+def _sample_offsets(size: int) -> list[int]:
+    stride = (size - AUTO_SAMPLE_SIZE) // (AUTO_SAMPLES - 1)
+    return [i * stride for i in range(AUTO_SAMPLES)]
+
+
+def choose_codec(data: bytes, accepted: list[FileCodec] | None = None) -> FileCodec:
+    """Choose a codec for a payload from a sample of its compressibility.
+
+    Args:
+        data: The uncompressed payload.
+        accepted: Codecs the destination can decompress (None if not known).
+
+    Returns:
+        The codec to compress the payload with.
+    """
+    if len(data) <= AUTO_SMALL_SIZE:
+        return FileCodec.ZLIB_9
+
+    return _choose_from_samples(
+        [data[offset:offset + AUTO_SAMPLE_SIZE] for offset in _sample_offsets(len(data))], accepted
+    )
+
+
+def choose_file_codec(fd: int, size: int, accepted: list[FileCodec] | None = None) -> FileCodec:
+    """Choose a codec for a file from samples read in place.
+
+    Args:
+        fd: File descriptor of the open file.
+        size: Size of the file in bytes.
+        accepted: Codecs the destination can decompress (None if not known).
+
+    Returns:
+        The codec to compress the file with.
+    """
+    if size <= AUTO_SMALL_SIZE:
+        return FileCodec.ZLIB_9
+
+    return _choose_from_samples([os.pread(fd, AUTO_SAMPLE_SIZE, offset) for offset in _sample_offsets(size)], accepted)
+
+
+def resolve_codec(data: bytes, codec: FileCodec | None, accepted: list[FileCodec] | None = None) -> FileCodec:
+    """Return the requested codec, or choose one the destination accepts if none was requested."""
+    return choose_codec(data, accepted) if codec is None else codec
+
+
+def _check_available(codec: FileCodec):
+    if codec not in available_codecs():
+        raise ValueError(f'{codec} codec is not available on this agent')
+
+
+class _Identity:
+    """Pass-through compressor and decompressor for the NONE codec."""
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b''
+
+
+class _LZ4Compressor:
+    """Adapt the LZ4 frame compressor to the compress()/flush() interface."""
+    def __init__(self):
+        self.compressor = lz4_frame.LZ4FrameCompressor()
+        self.header     = self.compressor.begin()
+
+    def compress(self, data: bytes) -> bytes:
+        header, self.header = self.header, b''
+        return header + self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        header, self.header = self.header, b''
+        return header + self.compressor.flush()
+
+
+class _LZ4Decompressor:
+    """Adapt the LZ4 frame decompressor to the decompress()/flush() interface."""
+    def __init__(self):
+        self.decompressor = lz4_frame.LZ4FrameDecompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        return b''
+
+
+class _ZstdDecompressor:
+    """Adapt the zstd decompressor to the decompress()/flush() interface."""
+    def __init__(self):
+        self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self.decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        return b''
+
+
+def compressor(codec: FileCodec):
+    """Create an incremental compressor.
+
+    Args:
+        codec: The codec to compress with.
+
+    Returns:
+        An object with compress(data) and flush() methods returning compressed bytes.
+
+    Raises:
+        ValueError: If the codec is not available on this agent.
+    """
+    _check_available(codec)
+
+    if codec in ZLIB_LEVELS:
+        return zlib.compressobj(level=ZLIB_LEVELS[codec])
+
+    if codec == FileCodec.ZSTD:
+        return zstandard.ZstdCompressor().compressobj()
+
+    if codec == FileCodec.LZ4:
+        return _LZ4Compressor()
+
+    return _Identity()
+
+
+def decompressor(codec: FileCodec | None):
+    """Create an incremental decompressor.
+
+    Args:
+        codec: The codec the payload was compressed with (None for zlib).
+
+    Returns:
+        An object with decompress(data) and flush() methods returning uncompressed bytes.
+
+    Raises:
+        ValueError: If the codec is not available on this agent.
+    """
+    if codec is None or codec in ZLIB_LEVELS:
+        return zlib.decompressobj()
+
+    _check_available(codec)
+
+    if codec == FileCodec.ZSTD:
+        return _ZstdDecompressor()
+
+    if codec == FileCodec.LZ4:
+        return _LZ4Decompressor()
+
+    return _Identity()
+
+
+def compress(data: bytes, codec: FileCodec) -> bytes:
+    """Compress a payload.
+
+    Args:
+        data: The uncompressed payload.
+        codec: The codec to compress with.
+
+    Returns:
+        The compressed payload.
+
+    Raises:
+        ValueError: If the codec is not available on this agent.
+    """
+    _check_available(codec)
+
+    if codec in ZLIB_LEVELS:
+        return zlib.compress(data, level=ZLIB_LEVELS[codec])
+
+    if codec == FileCodec.ZSTD:
+        return zstandard.ZstdCompressor().compress(data)
+
+    if codec == FileCodec.LZ4:
+        return lz4_frame.compress(data)
+
+    return data
+
+
+def decompress(data: bytes, codec: FileCodec | None) -> bytes:
+    """Decompress a payload.
+
+    Args:
+        data: The compressed payload.
+        codec: The codec the payload was compressed with (None for zlib).
+
+    Returns:
+        The uncompressed payload.
+
+    Raises:
+        ValueError: If the codec is not available on this agent.
+    """
+    if codec is None or codec in ZLIB_LEVELS:
+        return zlib.decompress(data)
+
+    _check_available(codec)
+
+    if codec == FileCodec.ZSTD:
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+    if codec == FileCodec.LZ4:
+        return lz4_frame.decompress(data)
+
+    return data
@@ -0,0 +1,218 @@
+"""Rsync-style delta encoding for file transfers.
+
+The destination splits its existing file into fixed size blocks and reports a
+weak and a strong checksum for each one. The source slides a window over its
+own file, rolling the weak checksum one byte at a time, and whenever the window
+matches a destination block (weak and strong) it emits a reference to that
+block instead of the data. Everything else is emitted as literal data. The
+destination rebuilds the file from its own blocks and the literals.
+
+Checksums:
+- weak: Adler-32 of the block, rolled in O(1) per byte on the source
+- strong: 64-bit BLAKE2b of the block, checked only when the weak checksum matches
+
+Delta layout (all integers are big-endian uint32):
+
+    (b'C' | first block | block count)  copy a run of destination blocks
+    (b'D' | length | data)              literal data
+
+The delta only describes the content. Callers compress it for transport and
+verify the rebuilt file against a digest of the whole source file, which also
+catches the rare strong checksum collision.
+"""
+import hashlib
+import math
+import mmap
+import struct
+import zlib
+from typing import BinaryIO, Iterator
+
+# Blocks are sized near the square root of the file, within these bounds
+MIN_BLOCK_SIZE = 1024
+MAX_BLOCK_SIZE = 128 * 1024
+
+ADLER_MOD = 65521
+
+COPY = b'C'
+DATA = b'D'
+
+COPY_OP   = struct.Struct('>II')
+LENGTH_OP = struct.Struct('>I')
+
+
+def choose_block_size(size: int) -> int:
+    """Choose a block size for a file of the given size."""
+    return min(max(math.isqrt(size) // MIN_BLOCK_SIZE * MIN_BLOCK_SIZE, MIN_BLOCK_SIZE), MAX_BLOCK_SIZE)
+
+
+def strong_checksum(block: bytes) -> str:
+    """Return the strong checksum of a block."""
+    return hashlib.blake2b(block, digest_size=8).hexdigest()
+
+
+def roll(weak: int, out_byte: int, in_byte: int, block_size: int) -> int:
+    """Slide an Adler-32 window by one byte.
+
+    Args:
+        weak: Adler-32 of the current window.
+        out_byte: The byte leaving the window.
+        in_byte: The byte entering the window.
+        block_size: The window length.
+
+    Returns:
+        Adler-32 of the window shifted by one byte.
+    """
+    a = ((weak & 0xffff) - out_byte + in_byte) % ADLER_MOD
+    b = ((weak >> 16) - block_size * out_byte + a - 1) % ADLER_MOD
+    return (b << 16) | a
+
+
+def file_signatures(file: BinaryIO, block_size: int) -> tuple[list[int], list[str]]:
+    """Compute the weak and strong checksums of every block of a file.
+
+    Args:
+        file: The file opened for binary reading.
+        block_size: The block size in bytes.
+
+    Returns:
+        Tuple of (weak checksums, strong checksums) in block order. The last
+        block may be shorter than block_size.
+    """
+    weak   = []
+    strong = []
+    while block := file.read(block_size):
+        weak.append(zlib.adler32(block))
+        strong.append(strong_checksum(block))
+    return weak, strong
+
+
+def encode_delta(data: bytes | mmap.mmap, block_size: int, weak: list[int], strong: list[str], size: int) -> bytes:
+    """Encode a file as a delta against the destination's block checksums.
+
+    Args:
+        data: The source file contents (bytes or a memory map).
+        block_size: The destination's block size.
+        weak: The destination's weak block checksums.
+        strong: The destination's strong block checksums.
+        size: The size of the destination file.
+
+    Returns:
+        The delta.
+    """
+    blocks = {}
+    for index, checksum in enumerate(weak):
+        blocks.setdefault(checksum, []).append(index)
+
+    tail_length = size - (len(weak) - 1) * block_size if weak else 0
+
+    ops      = []
+    run      = None # [first block, block count] of the pending copy run
+    literal  = 0    # Start of the pending literal data
+    position = 0
+    length   = len(data)
+
+    def emit_copy(index: int):
+        nonlocal run
+        if literal < position:
+            flush_run()
+            ops.append(DATA + LENGTH_OP.pack(position - literal) + data[literal:position])
+        if run and run[0] + run[1] == index:
+            run[1] += 1
+        else:
+            flush_run()
+            run = [index, 1]
+
+    def flush_run():
+        nonlocal run
+        if run:
+            ops.append(COPY + COPY_OP.pack(*run))
+            run = None
+
+    def match(start: int, end: int, checksum: int) -> int | None:
+        candidates = blocks.get(checksum)
+        if not candidates:
+            return None
+        digest = strong_checksum(data[start:end])
+        for index in candidates:
+            if strong[index] == digest and (index < len(weak) - 1 or tail_length == end - start):
+                return index
+        return None
+
+    # The rolling checksum is inlined as its two halves; this loop runs once per unmatched byte
+    checksum = zlib.adler32(data[0:block_size]) if length >= block_size else 0
+    low      = checksum & 0xffff
+    high     = checksum >> 16
+    last     = length - block_size
+    while position <= last:
+        checksum = (high << 16) | low
+        if checksum in blocks and (index := match(position, position + block_size, checksum)) is not None:
+            emit_copy(index)
+            position += block_size
+            literal   = position
+            if position <= last:
+                checksum = zlib.adler32(data[position:position + block_size])
+                low      = checksum & 0xffff
+                high     = checksum >> 16
+            continue
+
+        if position < last:
+            out_byte = data[position]
+            low      = (low - out_byte + data[position + block_size]) % ADLER_MOD
+            high     = (high - block_size * out_byte + low - 1) % ADLER_MOD
+        position += 1
+
+    # The final short block can only match the destination's final short block
+    if 0 < length - position < block_size and length - position == tail_length:
+        if (index := match(position, length, zlib.adler32(data[position:length]))) is not None:
+            emit_copy(index)
+            position = length
+            literal  = length
+
+    if literal < length:
+        flush_run()
+        ops.append(DATA + LENGTH_OP.pack(length - literal) + data[literal:length])
+
+    flush_run()
+    return b''.join(ops)
+
+
+def iter_delta(delta: bytes, base: BinaryIO, block_size: int, read_size: int) -> Iterator[bytes]:
+    """Rebuild a file from a delta and the destination's existing file.
+
+    Args:
+        delta: The delta.
+        base: The destination's existing file opened for binary reading.
+        block_size: The block size the delta was encoded with.
+        read_size: Maximum bytes to read from the base file at once.
+
+    Yields:
+        The rebuilt file contents in order.
+
+    Raises:
+        ValueError: If the delta is malformed or refers past the base file.
+    """
+    view   = memoryview(delta)
+    offset = 0
+    while offset < len(view):
+        op      = bytes(view[offset:offset + 1])
+        offset += 1
+
+        if op == COPY:
+            first, count = COPY_OP.unpack_from(view, offset)
+            offset      += COPY_OP.size
+            base.seek(first * block_size)
+            remaining = count * block_size
+            while remaining > 0 and (block := base.read(min(read_size, remaining))):
+                remaining -= len(block)
+                yield block
+            if remaining > 0 and base.read(1):
+                raise ValueError('Delta copy is short of the base file')
+        elif op == DATA:
+            (length,) = LENGTH_OP.unpack_from(view, offset)
+            offset   += LENGTH_OP.size
+            if offset + length > len(view):
+                raise ValueError('Truncated delta')
+            yield bytes(view[offset:offset + length])
+            offset += length
+        else:
+            raise ValueError(f'Invalid delta op {op!r}')
@@ -0,0 +1,46 @@
+"""Digest algorithms for verifying file payloads.
+
+Creates incremental hash objects for the digest type named on the file forms
+so payloads can be hashed block by block while they are read or written.
+xxhash is optional and only accepted when the package is importable.
+"""
+import hashlib
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+from stembot.enums import DigestType
+
+
+def available_digests() -> list[DigestType]:
+    """Return the digest types this agent can compute."""
+    digests = [DigestType.MD5, DigestType.BLAKE2B]
+    if xxhash is not None:
+        digests.append(DigestType.XXHASH)
+    return digests
+
+
+def new_digest(digest_type: DigestType | None):
+    """Create an incremental hash object.
+
+    Args:
+        digest_type: The digest algorithm (None for MD5).
+
+    Returns:
+        A hash object with update() and hexdigest() methods.
+
+    Raises:
+        ValueError: If the digest type is not available on this agent.
+    """
+    if digest_type in (None, DigestType.MD5):
+        return hashlib.md5()
+
+    if digest_type == DigestType.BLAKE2B:
+        return hashlib.blake2b()
+
+    if digest_type == DigestType.XXHASH and xxhash is not None:
+        return xxhash.xxh3_128()
+
+    raise ValueError(f'{digest_type} digest is not available on this agent')
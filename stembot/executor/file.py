@@ -1,36 +1,126 @@
 """File I/O operations with compression and integrity verification.
 
 Provides utilities for reading and writing files as part of control form execution.
-All file data is compressed with zlib (compression level 9) and base64-encoded for
-transport. Includes MD5 checksum verification to ensure data integrity and SHA-like
-hashing for validation.
+File data is compressed with a negotiated codec (see stembot.executor.codec) and
+base64-encoded for transport. Includes digest verification (see stembot.executor.digest)
+to ensure data integrity.
 
 Supported operations:
 - Load files into LoadFile forms with compression and checksums
 - Extract bytes from LoadFile forms with integrity verification
 - Create WriteFile forms from raw bytes
 - Write files from WriteFile forms with decompression and validation
+- Load and write individual file chunks for chunked, resumable transfers
+- Sign, load and write file deltas for rsync-style transfers (see stembot.executor.delta)
 
 Key features:
-- Zlib compression (level 9) for bandwidth efficiency
+- Codec negotiation, with automatic selection from a sampled compressibility check
+  so already-compressed files are not recompressed
 - Base64 encoding for safe transport
-- MD5 checksum verification on read and write
+- Streaming digests (MD5 by default, BLAKE2b or xxhash on request) computed
+  while files are read and written, so file data is never read twice
+- Optional atomic writes through a temporary file renamed into place, keeping
+  the permissions of the file being replaced
 - Exception handling with error logging
 """
 
 from base64 import b64encode, b64decode
-import hashlib
 import logging
-import zlib
+import mmap
+import os
+import stat
+from typing import BinaryIO, Iterator
+
+from stembot.dao.utils import get_uuid_str
+from stembot.enums import DigestType, FileCodec
+from stembot.executor.codec import choose_file_codec, compress, compressor, decompress, decompressor, resolve_codec
+from stembot.executor.delta import choose_block_size, encode_delta, file_signatures, iter_delta
+from stembot.executor.digest import new_digest
+from stembot.models.control import GetFileSignature, LoadFile, LoadFileChunk, LoadFileDelta, WriteFile, WriteFileChunk
+from stembot.models.control import WriteFileDelta
+
+# Size of the blocks files are streamed through the codec and digest in
+BLOCK_SIZE = 1024 * 1024
+
+FileForm = LoadFile | WriteFile | LoadFileChunk | WriteFileChunk | LoadFileDelta | WriteFileDelta
+
+
+def _set_digest(form: FileForm, hexdigest: str):
+    """Store a digest in md5sum, or in digest if the form names a digest type."""
+    if form.digest_type is None:
+        form.md5sum = hexdigest
+    else:
+        form.digest = hexdigest
+
+
+def _expected_digest(form: FileForm) -> str | None:
+    """Return the digest a form's content is verified against."""
+    return form.md5sum if form.digest_type is None else form.digest
+
+
+def _verify(form: FileForm, hexdigest: str, size: int | None = None):
+    """Raise ValueError if content does not match a form's digest or size."""
+    if hexdigest != _expected_digest(form):
+        raise ValueError(f'{form.digest_type or DigestType.MD5} digest mismatch for {form.path}')
+    if form.size is not None and size is not None and size != form.size:
+        raise ValueError(f'Size mismatch for {form.path}: {size} bytes, expected {form.size}')
+
+
+def _iter_blocks(compressed: bytes, codec: FileCodec | None) -> Iterator[bytes]:
+    """Decompress data block by block through a codec."""
+    unpacker = decompressor(codec)
+    for offset in range(0, len(compressed), BLOCK_SIZE):
+        yield unpacker.decompress(compressed[offset:offset + BLOCK_SIZE])
+    yield unpacker.flush()
+
+
+def _digest_blocks(
+    blocks: Iterator[bytes], digest_type: DigestType | None, file: BinaryIO | None = None
+) -> tuple[str, int]:
+    """Digest blocks, writing them to file and syncing it if one is given.
+
+    Returns:
+        Tuple of (hex digest, size in bytes).
+    """
+    digest = new_digest(digest_type)
+    size = 0
+    for block in blocks:
+        size += len(block)
+        digest.update(block)
+        if file is not None:
+            file.write(block)
+    if file is not None:
+        file.flush()
+        os.fsync(file.fileno())
+    return digest.hexdigest(), size
+
+
+def _open_temp_file(path: str) -> tuple[str, int]:
+    """Create a temporary file next to path for an atomic replace.
+
+    The temporary file takes the permissions of the file it will replace, or
+    the default permissions for a new file if there is none.
+
+    Returns:
+        Tuple of (temporary path, file descriptor open for writing).
+    """
+    temp_path = os.path.join(
+        os.path.dirname(os.path.abspath(path)),
+        f'.{os.path.basename(path)}.{get_uuid_str()}.tmp'
+    )
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    if os.path.exists(path):
+        os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+    return temp_path, fd
 
-from stembot.models.control import LoadFile, WriteFile
 
 def load_file_to_form(form: LoadFile) -> LoadFile:
     """Read a file from disk and populate a LoadFile form with compressed data.
 
-    Opens a file at the specified path, reads its contents, compresses with zlib
-    (level 9), encodes as base64, and calculates MD5 checksum. Stores compressed
-    data and metadata in the LoadFile form for transmission to remote agents.
+    Streams the file at the specified path block by block through the
+    requested codec (or one chosen from samples of the file) and digest, then
+    encodes the compressed data as base64. The uncompressed file is never
+    held in memory.
 
     On error, sets form.error with the exception message and returns the form.
 
@@ -41,21 +131,34 @@ def load_file_to_form(form: LoadFile) -> LoadFile:
         The same LoadFile form with populated fields:
         - b64zlib: Base64-encoded compressed file contents
         - size: Original uncompressed file size in bytes
-        - md5sum: MD5 checksum of original data for integrity verification
+        - md5sum: MD5 checksum of original data (if no digest_type is set)
+        - digest: Digest of original data (if digest_type is set)
+        - codec: Codec the contents were compressed with
         - error: None on success, exception message on failure
     """
     try:
         logging.debug(form.path)
         with open(form.path, 'rb') as file:
-            data = file.read()
-            form.size = len(data)
-            form.md5sum = hashlib.md5(data).hexdigest()
-            form.b64zlib = b64encode(zlib.compress(data, level=9)).decode()
+            size = os.fstat(file.fileno()).st_size
+            codec = form.codec or choose_file_codec(file.fileno(), size, form.codecs)
+            packer = compressor(codec)
+            digest = new_digest(form.digest_type)
+            blocks = []
+            form.size = 0
+            while block := file.read(BLOCK_SIZE):
+                form.size += len(block)
+                digest.update(block)
+                blocks.append(packer.compress(block))
+            blocks.append(packer.flush())
+            form.codec = codec
+            _set_digest(form, digest.hexdigest())
+            form.b64zlib = b64encode(b''.join(blocks)).decode()
             form.error = None
     except Exception as exception: # pylint: disable=broad-except
         form.error = str(exception)
         form.size = None
         form.md5sum = None
+        form.digest = None
         logging.error(form.error)
     return form
 
@@ -63,58 +166,78 @@ def load_file_to_form(form: LoadFile) -> LoadFile:
 def load_bytes_from_form(form: LoadFile) -> bytes:
     """Extract and decompress file data from a LoadFile form.
 
-    Decodes base64 and decompresses zlib data from a LoadFile form, then
-    verifies integrity with MD5 checksum comparison. Used to extract the
+    Decodes base64 and decompresses data with the form's codec, then
+    verifies integrity with the form's digest. Used to extract the
     original file contents after receiving a LoadFile response from a remote agent.
 
     Args:
-        form: A LoadFile form containing b64zlib (compressed data) and md5sum.
+        form: A LoadFile form containing b64zlib (compressed data) and md5sum or digest.
 
     Returns:
         The original uncompressed file data as bytes.
 
     Raises:
-        AssertionError: If error is set or MD5 checksum verification fails.
+        AssertionError: If error is set or digest verification fails.
         zlib.error: If decompression fails.
     """
-    data = zlib.decompress(b64decode(form.b64zlib))
+    data = decompress(b64decode(form.b64zlib), form.codec)
     assert form.error is None
-    assert hashlib.md5(data).hexdigest() == form.md5sum
+    digest = new_digest(form.digest_type)
+    digest.update(data)
+    assert digest.hexdigest() == _expected_digest(form)
     return data
 
 
-def load_form_from_bytes(data: bytes) -> WriteFile:
+def load_form_from_bytes(
+    data: bytes, codec: FileCodec | None = None, digest_type: DigestType | None = None
+) -> WriteFile:
     """Create a WriteFile form from raw bytes.
 
-    Compresses raw data with zlib (level 9), encodes as base64, and calculates
-    MD5 checksum. Wraps the compressed data in a WriteFile form ready for
-    sending to a remote agent to write to disk.
+    Compresses raw data with the given codec (or one chosen from the data),
+    encodes as base64, and calculates its digest.
 
     Args:
         data: The file contents as raw bytes to write.
+        codec: Codec to compress the data with (None chooses one from the data).
+        digest_type: Digest algorithm to verify the data with (None for md5sum).
 
     Returns:
         A WriteFile form containing:
         - b64zlib: Base64-encoded compressed data
-        - md5sum: MD5 checksum of original data
+        - md5sum: MD5 checksum of original data (if no digest_type is given)
+        - digest: Digest of original data (if digest_type is given)
         - size: Original uncompressed size in bytes
+        - codec: Codec the data was compressed with
         - path: Set to ':memory:' (placeholder, should be set by caller)
     """
     logging.debug('%s bytes', len(data))
-    return WriteFile(
-        b64zlib=b64encode(zlib.compress(data, level=9)),
-        md5sum=hashlib.md5(data).hexdigest(),
+    codec = resolve_codec(data, codec)
+    digest = new_digest(digest_type)
+    digest.update(data)
+    form = WriteFile(
+        b64zlib=b64encode(compress(data, codec)),
         size=len(data),
+        codec=codec,
+        digest_type=digest_type,
         path=':memory:'
     )
+    _set_digest(form, digest.hexdigest())
+    return form
 
 
 def write_file_from_form(form: WriteFile) -> WriteFile:
     """Write file data from a WriteFile form to disk.
 
-    Decompresses zlib-compressed data from a WriteFile form, verifies MD5
-    checksum, and writes to the specified path. Verifies the written file
-    by re-reading and checking its MD5 matches the original.
+    Streams the compressed data from a WriteFile form through the form's codec
+    and digest straight to disk, then fsyncs the file. The file is never re-read.
+
+    If form.atomic is set, the data is written to a temporary file in the
+    destination directory that is only renamed over form.path once verified,
+    so readers never see a partial or corrupt file. Otherwise the data is
+    verified against the digest and size before form.path is opened, so a
+    corrupt payload never truncates the existing file, and is then written in
+    place. This decompresses the data twice, and readers may still see a
+    partially written file, or a partial file may be left if the write fails.
 
     On success, clears b64zlib from the form to save memory. On error, sets
     form.error with the exception message.
@@ -123,7 +246,7 @@ def write_file_from_form(form: WriteFile) -> WriteFile:
         form: A WriteFile form with:
             - b64zlib: Base64-encoded compressed file contents
             - path: Destination file path
-            - md5sum: Expected MD5 checksum
+            - md5sum or digest: Expected checksum
             - error: Should be None initially
 
     Returns:
@@ -134,18 +257,237 @@ def write_file_from_form(form: WriteFile) -> WriteFile:
     Raises:
         (Caught internally and returned as form.error)
     """
+    temp_path = None
     try:
         logging.debug(form.path)
-        with open(form.path, 'wb') as file:
-            data = zlib.decompress(b64decode(form.b64zlib))
-            assert form.error is None
-            assert hashlib.md5(data).hexdigest() == form.md5sum
+        if form.error is not None:
+            raise ValueError(form.error)
+        compressed = b64decode(form.b64zlib)
+
+        if form.atomic:
+            temp_path, fd = _open_temp_file(form.path)
+            with os.fdopen(fd, 'wb') as file:
+                _verify(form, *_digest_blocks(_iter_blocks(compressed, form.codec), form.digest_type, file))
+            os.replace(temp_path, form.path)
+            temp_path = None
+        else:
+            _verify(form, *_digest_blocks(_iter_blocks(compressed, form.codec), form.digest_type))
+            with open(form.path, 'wb') as file:
+                _digest_blocks(_iter_blocks(compressed, form.codec), form.digest_type, file)
+
+        form.b64zlib = ""
+    except Exception as exception: # pylint: disable=broad-except
+        form.error = str(exception)
+        logging.error(form.error)
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+    return form
+
+
+def load_file_chunk_to_form(form: LoadFileChunk) -> LoadFileChunk:
+    """Read a single chunk of a file from disk into a LoadFileChunk form.
+
+    Seeks to form.offset and reads at most form.length bytes. Only the chunk
+    is held in memory, so arbitrarily large files can be read in pieces. The
+    total file size is always reported so the caller can plan the transfer.
+
+    On error, sets form.error with the exception message and returns the form.
+
+    Args:
+        form: A LoadFileChunk form with path, offset and length set.
+
+    Returns:
+        The same LoadFileChunk form with populated fields:
+        - b64zlib: Base64-encoded compressed chunk contents
+        - length: Actual number of bytes read (short at end of file)
+        - size: Total file size in bytes
+        - md5sum: MD5 checksum of the chunk (if no digest_type is set)
+        - digest: Digest of the chunk (if digest_type is set)
+        - codec: Codec the chunk was compressed with
+        - error: None on success, exception message on failure
+    """
+    try:
+        logging.debug('%s@%s', form.path, form.offset)
+        with open(form.path, 'rb') as file:
+            form.size = os.fstat(file.fileno()).st_size
+            file.seek(form.offset)
+            data = file.read(form.length)
+            form.length = len(data)
+            digest = new_digest(form.digest_type)
+            digest.update(data)
+            _set_digest(form, digest.hexdigest())
+            form.codec = resolve_codec(data, form.codec, form.codecs)
+            form.b64zlib = b64encode(compress(data, form.codec)).decode()
+            form.error = None
+    except Exception as exception: # pylint: disable=broad-except
+        form.error = str(exception)
+        form.size = None
+        form.md5sum = None
+        form.digest = None
+        logging.error(form.error)
+    return form
+
+
+def write_file_chunk_from_form(form: WriteFileChunk) -> WriteFileChunk:
+    """Write a single chunk from a WriteFileChunk form to disk.
+
+    Decompresses and verifies the chunk against its digest before
+    writing it at form.offset. The file is created if it does not exist and
+    is never truncated below the chunk, so chunks may be written in any order.
+    If form.size is set and the file is larger, it is truncated to that size.
+
+    On success, clears b64zlib from the form. On error, sets form.error with
+    the exception message.
+
+    Args:
+        form: A WriteFileChunk form with b64zlib, path, offset and md5sum or digest set.
+
+    Returns:
+        The same WriteFileChunk form with error and b64zlib updated.
+    """
+    try:
+        logging.debug('%s@%s', form.path, form.offset)
+        data = decompress(b64decode(form.b64zlib), form.codec)
+        digest = new_digest(form.digest_type)
+        digest.update(data)
+        if form.error is not None:
+            raise ValueError(form.error)
+        if len(data) != form.length:
+            raise ValueError(f'Chunk length mismatch for {form.path}: {len(data)} bytes, expected {form.length}')
+        _verify(form, digest.hexdigest())
+        with open(form.path, 'r+b' if os.path.exists(form.path) else 'w+b') as file:
+            file.seek(form.offset)
             file.write(data)
+            if form.size is not None and os.fstat(file.fileno()).st_size > form.size:
+                file.truncate(form.size)
+        form.b64zlib = ""
+        form.error = None
+    except Exception as exception: # pylint: disable=broad-except
+        form.error = str(exception)
+        logging.error(form.error)
+    return form
+
+
+def get_file_signature_to_form(form: GetFileSignature) -> GetFileSignature:
+    """Compute the block checksums of a file into a GetFileSignature form.
+
+    On error, sets form.error with the exception message and returns the form.
+
+    Args:
+        form: A GetFileSignature form with path set, and optionally block_size.
+
+    Returns:
+        The same GetFileSignature form with populated fields:
+        - block_size: Block size used (chosen from the file size if 0)
+        - size: File size in bytes
+        - weak: Weak checksum of each block
+        - strong: Strong checksum of each block
+        - error: None on success, exception message on failure
+    """
+    try:
+        logging.debug(form.path)
+        with open(form.path, 'rb') as file:
+            form.size = os.fstat(file.fileno()).st_size
+            form.block_size = form.block_size or choose_block_size(form.size)
+            form.weak, form.strong = file_signatures(file, form.block_size)
             form.error = None
+    except Exception as exception: # pylint: disable=broad-except
+        form.error = str(exception)
+        form.size = None
+        form.weak = []
+        form.strong = []
+        logging.error(form.error)
+    return form
+
+
+def load_file_delta_to_form(form: LoadFileDelta) -> LoadFileDelta:
+    """Encode a file as a delta against another file's block checksums.
+
+    Memory maps the file so only the literal data of the delta is copied,
+    hashes the whole file for verification by the destination, and
+    compresses the delta with the requested codec (or one chosen from it).
+    The destination's checksums are cleared from the response.
+
+    On error, sets form.error with the exception message and returns the form.
+
+    Args:
+        form: A LoadFileDelta form with path, block_size, weak, strong and base_size set.
+
+    Returns:
+        The same LoadFileDelta form with populated fields:
+        - b64zlib: Base64-encoded compressed delta
+        - size: File size in bytes
+        - md5sum: MD5 checksum of the file (if no digest_type is set)
+        - digest: Digest of the file (if digest_type is set)
+        - codec: Codec the delta was compressed with
+        - error: None on success, exception message on failure
+    """
+    try:
+        logging.debug(form.path)
         with open(form.path, 'rb') as file:
-            assert hashlib.md5(file.read()).hexdigest() == form.md5sum
+            form.size = os.fstat(file.fileno()).st_size
+            digest = new_digest(form.digest_type)
+            if form.size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    digest.update(data)
+                    delta = encode_delta(data, form.block_size, form.weak, form.strong, form.base_size)
+            else:
+                delta = b''
+            _set_digest(form, digest.hexdigest())
+            form.codec = resolve_codec(delta, form.codec, form.codecs)
+            form.b64zlib = b64encode(compress(delta, form.codec)).decode()
+            form.error = None
+    except Exception as exception: # pylint: disable=broad-except
+        form.error = str(exception)
+        form.size = None
+        form.md5sum = None
+        form.digest = None
+        logging.error(form.error)
+    form.weak = []
+    form.strong = []
+    return form
+
+
+def write_file_delta_from_form(form: WriteFileDelta) -> WriteFileDelta:
+    """Rebuild a file from a WriteFileDelta form and the existing file.
+
+    Streams the blocks of the existing file referenced by the delta and the
+    delta's literal data into a temporary file, hashing as it writes. The
+    temporary file is fsynced, verified against the digest and size of the
+    source file, and renamed over the existing file. On any failure the
+    existing file is left untouched.
+
+    On success, clears b64zlib from the form. On error, sets form.error with
+    the exception message.
+
+    Args:
+        form: A WriteFileDelta form with b64zlib, path, block_size, size and md5sum or digest set.
+
+    Returns:
+        The same WriteFileDelta form with error and b64zlib updated.
+    """
+    temp_path = None
+    try:
+        logging.debug(form.path)
+        if form.error is not None:
+            raise ValueError(form.error)
+        delta = decompress(b64decode(form.b64zlib), form.codec)
+
+        temp_path, fd = _open_temp_file(form.path)
+        with open(form.path, 'rb') as base, os.fdopen(fd, 'wb') as file:
+            _verify(form, *_digest_blocks(
+                iter_delta(delta, base, form.block_size, BLOCK_SIZE), form.digest_type, file
+            ))
+
+        os.replace(temp_path, form.path)
+        temp_path = None
+
         form.b64zlib = ""
     except Exception as exception: # pylint: disable=broad-except
         form.error = str(exception)
         logging.error(form.error)
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
     return form
@@ -0,0 +1,177 @@
+"""Framed binary wire format for control forms and network messages.
+
+The default wire format is the model's JSON text, in which every file and
+benchmark payload travels as base64 (or '0' * size) inside a JSON string. A
+frame carries the same JSON with the bulk payloads lifted out and appended as
+raw bytes, so payloads cross the wire without the 33% base64 inflation and the
+JSON encoder and parser never scan them.
+
+Frame layout (all integers are big-endian uint32):
+
+    MAGIC | header length | header JSON | (blob length | blob bytes)*
+
+Each bulk field in the header is replaced by {"$blob": index}, where index is
+the position of its blob in the frame. Bulk fields are found at any depth, so
+payloads nested in tickets or in polled message lists are lifted out as well.
+
+Bulk fields:
+- b64zlib: carried as the decoded base64 bytes
+- payload: carried as the UTF-8 bytes
+
+The models themselves are unchanged and still serialize to the canonical JSON
+shared with stembot-rust; framing only applies between two agents when it is
+enabled with the framed_wire configuration setting. A server always replies
+in the format of the request it received.
+"""
+import json
+import struct
+from base64 import b64decode, b64encode
+from typing import Any, Type, TypeVar
+
+from pydantic import BaseModel
+
+FRAME_CONTENT_TYPE  = 'application/x-stembot-frame'
+BINARY_CONTENT_TYPE = 'application/binary'
+MAGIC               = b'STF1'
+BLOB_KEY            = '$blob'
+
+# Bulk fields and how they are converted to and from raw bytes
+BULK_FIELDS = {
+    'b64zlib': (b64decode,           lambda blob: b64encode(blob).decode()),
+    'payload': (lambda s: s.encode(), lambda blob: blob.decode())
+}
+
+LENGTH = struct.Struct('>I')
+
+M = TypeVar('M', bound=BaseModel)
+
+
+def _lift_blobs(value: Any, blobs: list[bytes]) -> Any:
+    """Recursively replace bulk field values with blob references."""
+    if isinstance(value, dict):
+        lifted = {}
+        for key, item in value.items():
+            if key in BULK_FIELDS and isinstance(item, str) and item:
+                lifted[key] = {BLOB_KEY: len(blobs)}
+                blobs.append(BULK_FIELDS[key][0](item))
+            else:
+                lifted[key] = _lift_blobs(item, blobs)
+        return lifted
+
+    if isinstance(value, list):
+        return [_lift_blobs(item, blobs) for item in value]
+
+    return value
+
+
+def _restore_blobs(value: Any, blobs: list[bytes]) -> Any:
+    """Recursively replace blob references with bulk field values."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in BULK_FIELDS and isinstance(item, dict) and BLOB_KEY in item:
+                value[key] = BULK_FIELDS[key][1](blobs[item[BLOB_KEY]])
+            else:
+                value[key] = _restore_blobs(item, blobs)
+        return value
+
+    if isinstance(value, list):
+        return [_restore_blobs(item, blobs) for item in value]
+
+    return value
+
+
+def dump_frame(model: BaseModel) -> bytes:
+    """Serialize a model to a frame.
+
+    Args:
+        model: The control form or network message to serialize.
+
+    Returns:
+        The frame bytes.
+    """
+    blobs  = []
+    header = json.dumps(
+        _lift_blobs(model.model_dump(mode='json'), blobs),
+        separators=(',', ':')
+    ).encode()
+
+    parts = [MAGIC, LENGTH.pack(len(header)), header]
+    for blob in blobs:
+        parts.append(LENGTH.pack(len(blob)))
+        parts.append(blob)
+
+    return b''.join(parts)
+
+
+def load_frame(data: bytes) -> dict:
+    """Deserialize a frame to the model's JSON compatible dictionary.
+
+    Args:
+        data: The frame bytes.
+
+    Returns:
+        The dictionary the model would have been dumped to in JSON mode.
+
+    Raises:
+        ValueError: If the data is not a well-formed frame.
+    """
+    view = memoryview(data)
+
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError('Invalid frame magic')
+
+    offset = len(MAGIC)
+    blobs  = []
+    header = None
+
+    while offset < len(view):
+        if offset + LENGTH.size > len(view):
+            raise ValueError('Truncated frame')
+        (length,) = LENGTH.unpack_from(view, offset)
+        offset   += LENGTH.size
+
+        if offset + length > len(view):
+            raise ValueError('Truncated frame')
+        chunk   = bytes(view[offset:offset + length])
+        offset += length
+
+        if header is None:
+            header = json.loads(chunk)
+        else:
+            blobs.append(chunk)
+
+    if header is None:
+        raise ValueError('Missing frame header')
+
+    return _restore_blobs(header, blobs)
+
+
+def dump_body(model: BaseModel, framed: bool) -> bytes:
+    """Serialize a model as a frame or as JSON text.
+
+    Args:
+        model: The control form or network message to serialize.
+        framed: Serialize to a frame rather than JSON text.
+
+    Returns:
+        The plain text request or response body.
+    """
+    if framed:
+        return dump_frame(model)
+    return model.model_dump_json().encode()
+
+
+def load_body(model_type: Type[M], data: bytes, framed: bool) -> M:
+    """Deserialize a model from a frame or from JSON text.
+
+    Args:
+        model_type: The model class to validate the body as.
+        data: The plain text request or response body.
+        framed: The body is a frame rather than JSON text.
+
+    Returns:
+        The validated model.
+    """
+    if framed:
+        return model_type.model_validate(load_frame(data))
+    return model_type.model_validate_json(data)
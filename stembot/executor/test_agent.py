@@ -20,8 +20,10 @@ Protocol summary:
 Test fixtures:
     TEST_KEY     = SHA256("stembot-test-key")   [32-byte AES-256 key]
     TEST_AGTUUID = "test-agent-id-1"
+TEST_MSGUUID = "test-message-id-1"
 """
 import hashlib
+import io
 import json
 import unittest
 from unittest.mock import MagicMock, patch
@@ -29,9 +31,10 @@ from unittest.mock import MagicMock, patch
 from Crypto.Cipher import AES
 
 from stembot.executor.agent import SESSION_POOL, AgentClient
+from stembot.executor.channel import CHANNEL_CONTENT_TYPE, seal_record
 from stembot.models.config import CONFIG
 from stembot.models.control import GetConfig
-from stembot.models.network import NetworkMessage, Ping
+from stembot.models.network import NetworkMessage, NetworkMessagesRequest, NetworkMessagesResponse, Ping
 
 # ---------------------------------------------------------------------------
 # Fixed test fixtures — must match the values used in stembot-rust tests
@@ -39,17 +42,19 @@ from stembot.models.network import NetworkMessage, Ping
 
 TEST_KEY     = hashlib.sha256(b'stembot-test-key').digest()  # 32-byte AES-256 key
 TEST_AGTUUID = "test-agent-id-1"
+TEST_MSGUUID = "test-message-id-1"
 
 TEST_CTRL_URL = "http://test.local:8080/control"
 TEST_MPI_URL  = "http://test.local:8080/mpi"
 
 # Canonical JSON payloads (expected wire format after decryption)
 EXPECTED_GET_CONFIG_JSON = (
-    '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null}'
+    '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null,"codecs":null}'
 )
 EXPECTED_PING_JSON = (
     '{"type":"ping","dest":null,"src":"test-agent-id-1","isrc":"test-agent-id-1",'
-    '"timestamp":1000.0,"objuuid":null,"coluuid":null}'
+    '"timestamp":1000.0,"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":"test-message-id-1",'
+    '"size":null}'
 )
 
 
@@ -260,12 +265,29 @@ class TestSendNetworkMessage(unittest.TestCase):
         """
         with patch.object(self.client.session, 'post') as mock_post:
             mock_post.return_value = self.mock_resp
-            self.client.send_network_message(Ping(src=TEST_AGTUUID, timestamp=1000.0))
+            self.client.send_network_message(Ping(src=TEST_AGTUUID, timestamp=1000.0, msguuid=TEST_MSGUUID))
             headers   = mock_post.call_args.kwargs['headers']
             body      = mock_post.call_args.kwargs['data']
             plaintext = _decrypt_request(TEST_KEY, headers, body)
             self.assertEqual(json.loads(plaintext.decode()), json.loads(EXPECTED_PING_JSON))
 
+    def test_msguuid_assigned_once(self):
+        """A message is assigned a msguuid when first sent and keeps it when resent."""
+        message = Ping(src=TEST_AGTUUID, timestamp=1000.0)
+        with patch.object(self.client.session, 'post') as mock_post:
+            mock_post.return_value = self.mock_resp
+            self.client.send_network_message(message)
+            msguuid = message.msguuid
+            self.client.send_network_message(message)
+
+            sent = [
+                json.loads(_decrypt_request(TEST_KEY, call.kwargs['headers'], call.kwargs['data']))
+                for call in mock_post.call_args_list
+            ]
+
+        self.assertIsNotNone(msguuid)
+        self.assertEqual([body['msguuid'] for body in sent], [msguuid, msguuid])
+
     def test_body_mac_verifies(self):
         """Decryption with the Nonce header must pass the AES-EAX MAC check (Tag header)."""
         with patch.object(self.client.session, 'post') as mock_post:
@@ -284,5 +306,71 @@ class TestSendNetworkMessage(unittest.TestCase):
             self.assertIsInstance(result, NetworkMessage)
 
 
+# ---------------------------------------------------------------------------
+# open_channel tests
+# ---------------------------------------------------------------------------
+
+class TestOpenChannel(unittest.TestCase):
+    """Verify AgentClient.open_channel streams records and falls back to a single response."""
+
+    def setUp(self):
+        self._key_patch     = patch.object(CONFIG, 'key',     TEST_KEY)
+        self._agtuuid_patch = patch.object(CONFIG, 'agtuuid', TEST_AGTUUID)
+        self._key_patch.start()
+        self._agtuuid_patch.start()
+        SESSION_POOL.pop(TEST_MPI_URL, None)
+        self.client = AgentClient(url=TEST_MPI_URL)
+
+    def tearDown(self):
+        self._key_patch.stop()
+        self._agtuuid_patch.stop()
+        SESSION_POOL.pop(TEST_MPI_URL, None)
+
+    def _open(self, mock_resp):
+        mock_resp.__enter__.return_value = mock_resp
+        with patch.object(self.client.session, 'post') as mock_post:
+            mock_post.return_value = mock_resp
+            messages = list(self.client.open_channel(NetworkMessagesRequest(limit=10)))
+        return mock_post, messages
+
+    def test_request_sets_stream(self):
+        mock_resp = MagicMock()
+        mock_resp.headers = {'Content-Type': CHANNEL_CONTENT_TYPE}
+        mock_resp.raw = io.BytesIO(b'')
+
+        mock_post, _ = self._open(mock_resp)
+
+        _, kwargs = mock_post.call_args
+        plaintext = json.loads(_decrypt_request(TEST_KEY, kwargs['headers'], kwargs['data']))
+        self.assertTrue(kwargs['stream'])
+        self.assertTrue(plaintext['stream'])
+        self.assertEqual(plaintext['isrc'], TEST_AGTUUID)
+
+    def test_records_are_yielded(self):
+        records = b''.join(
+            seal_record(NetworkMessagesResponse(messages=messages).model_dump_json().encode())
+            for messages in ([], [Ping(dest=TEST_AGTUUID)])
+        )
+        mock_resp = MagicMock()
+        mock_resp.headers = {'Content-Type': CHANNEL_CONTENT_TYPE}
+        mock_resp.raw = io.BytesIO(records)
+
+        _, messages = self._open(mock_resp)
+
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0].messages, [])
+        self.assertEqual(messages[1].messages[0]['type'], 'ping')
+
+    def test_single_response_fallback(self):
+        mock_resp = _make_encrypted_response(
+            TEST_KEY, NetworkMessagesResponse(messages=[]).model_dump_json().encode()
+        )
+
+        _, messages = self._open(mock_resp)
+
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].type, 'messages_response')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,66 @@
+"""Unit tests for stembot.executor.channel.
+
+Verifies that channel records are sealed separately, decrypt back to their
+plain text in order, and that tampered or truncated records are rejected.
+
+Record layout (for porting):
+    nonce (16 bytes) | tag (16 bytes) | uint32 ciphertext length | ciphertext
+"""
+import hashlib
+import io
+import struct
+import unittest
+from unittest.mock import patch
+
+from Crypto.Cipher import AES
+
+from stembot.executor.channel import open_records, seal_record
+from stembot.models.config import CONFIG
+
+TEST_KEY = hashlib.sha256(b'stembot-test-key').digest()
+
+
+class TestChannelRecords(unittest.TestCase):
+    """Verify the sealed record layout and round trip."""
+
+    def setUp(self):
+        self._key_patch = patch.object(CONFIG, 'key', TEST_KEY)
+        self._key_patch.start()
+        self.addCleanup(self._key_patch.stop)
+
+    def test_record_layout(self):
+        record = seal_record(b'{"type":"messages_response"}')
+
+        nonce, tag  = record[:16], record[16:32]
+        (length,)   = struct.unpack_from('>I', record, 32)
+        cipher_text = record[36:]
+
+        self.assertEqual(length, len(cipher_text))
+        cipher = AES.new(TEST_KEY, AES.MODE_EAX, nonce=nonce)
+        self.assertEqual(cipher.decrypt_and_verify(cipher_text, tag), b'{"type":"messages_response"}')
+
+    def test_records_round_trip_in_order(self):
+        stream = io.BytesIO(seal_record(b'first') + seal_record(b'') + seal_record(b'third'))
+        self.assertEqual(list(open_records(stream.read)), [b'first', b'', b'third'])
+
+    def test_records_are_sealed_separately(self):
+        self.assertNotEqual(seal_record(b'same')[:16], seal_record(b'same')[:16])
+
+    def test_partial_reads(self):
+        data   = seal_record(b'first') + seal_record(b'second')
+        stream = io.BytesIO(data)
+        self.assertEqual(list(open_records(lambda size: stream.read(min(size, 3)))), [b'first', b'second'])
+
+    def test_tampered_record_raises(self):
+        record = bytearray(seal_record(b'payload'))
+        record[-1] ^= 0xFF
+        with self.assertRaises(ValueError):
+            list(open_records(io.BytesIO(bytes(record)).read))
+
+    def test_truncated_record_raises(self):
+        with self.assertRaises(ValueError):
+            list(open_records(io.BytesIO(seal_record(b'payload')[:-2]).read))
+
+
+if __name__ == '__main__':
+    unittest.main()
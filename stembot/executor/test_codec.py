@@ -0,0 +1,75 @@
+"""Unit tests for stembot.executor.codec."""
+import os
+import unittest
+import zlib
+
+from stembot.enums import FileCodec
+from stembot.executor.codec import AUTO_SMALL_SIZE, available_codecs, choose_codec, compress, decompress
+from stembot.executor.codec import resolve_codec
+
+COMPRESSIBLE_DATA   = b"hello, stembot!" * 16384
+INCOMPRESSIBLE_DATA = os.urandom(AUTO_SMALL_SIZE * 4)
+
+
+class TestChooseCodec(unittest.TestCase):
+    """Verify automatic codec selection."""
+
+    def test_small_payload_uses_zlib_9(self):
+        """Small payloads keep the legacy zlib level 9 encoding."""
+        self.assertEqual(choose_codec(b"hello, stembot!"), FileCodec.ZLIB_9)
+
+    def test_incompressible_payload_is_not_compressed(self):
+        """Payloads that do not shrink in the sample are sent as is."""
+        self.assertEqual(choose_codec(INCOMPRESSIBLE_DATA), FileCodec.NONE)
+
+    def test_already_compressed_payload_is_not_compressed(self):
+        """Already compressed payloads are detected as incompressible."""
+        self.assertEqual(choose_codec(zlib.compress(INCOMPRESSIBLE_DATA)), FileCodec.NONE)
+
+    def test_compressible_payload_is_compressed(self):
+        """Compressible payloads use a fast codec."""
+        self.assertIn(choose_codec(COMPRESSIBLE_DATA, list(FileCodec)), (FileCodec.ZSTD, FileCodec.ZLIB_6))
+
+    def test_unknown_destination_codecs_use_zlib(self):
+        """Without the destination's codecs, only codecs every agent has are chosen."""
+        self.assertEqual(choose_codec(COMPRESSIBLE_DATA), FileCodec.ZLIB_6)
+
+    def test_destination_without_zstd_uses_zlib(self):
+        """Zstandard is only chosen when the destination can decompress it."""
+        accepted = [codec for codec in FileCodec if codec != FileCodec.ZSTD]
+        self.assertEqual(choose_codec(COMPRESSIBLE_DATA, accepted), FileCodec.ZLIB_6)
+
+    def test_shared_zstd_is_chosen(self):
+        """Zstandard is chosen when both agents have it."""
+        expected = FileCodec.ZSTD if FileCodec.ZSTD in available_codecs() else FileCodec.ZLIB_6
+        self.assertEqual(choose_codec(COMPRESSIBLE_DATA, [FileCodec.ZSTD]), expected)
+
+    def test_requested_codec_is_kept(self):
+        """A requested codec overrides automatic selection."""
+        self.assertEqual(resolve_codec(INCOMPRESSIBLE_DATA, FileCodec.ZLIB_1), FileCodec.ZLIB_1)
+
+
+class TestCompress(unittest.TestCase):
+    """Verify every available codec round-trips."""
+
+    def test_round_trip(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec):
+                self.assertEqual(decompress(compress(COMPRESSIBLE_DATA, codec), codec), COMPRESSIBLE_DATA)
+
+    def test_none_codec_is_identity(self):
+        self.assertEqual(compress(COMPRESSIBLE_DATA, FileCodec.NONE), COMPRESSIBLE_DATA)
+
+    def test_missing_codec_is_zlib(self):
+        """Payloads without a codec are zlib compressed."""
+        self.assertEqual(decompress(zlib.compress(COMPRESSIBLE_DATA, 9), None), COMPRESSIBLE_DATA)
+
+    def test_unavailable_codec_raises(self):
+        for codec in set(FileCodec) - set(available_codecs()):
+            with self.subTest(codec=codec):
+                with self.assertRaises(ValueError):
+                    compress(COMPRESSIBLE_DATA, codec)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Unit tests for stembot.executor.delta and the delta file forms."""
+import io
+import os
+import random
+import tempfile
+import unittest
+import zlib
+from base64 import b64decode
+
+from stembot.executor.codec import decompress
+from stembot.executor.delta import COPY, COPY_OP, DATA, LENGTH_OP, encode_delta, file_signatures, iter_delta, roll
+from stembot.executor.file import get_file_signature_to_form, load_file_delta_to_form, write_file_delta_from_form
+from stembot.models.control import GetFileSignature, LoadFileDelta, WriteFileDelta
+
+BLOCK_SIZE = 1024
+
+
+def _rebuild(old: bytes, new: bytes) -> tuple[bytes, bytes]:
+    weak, strong = file_signatures(io.BytesIO(old), BLOCK_SIZE)
+    delta        = encode_delta(new, BLOCK_SIZE, weak, strong, len(old))
+    return delta, b''.join(iter_delta(delta, io.BytesIO(old), BLOCK_SIZE, 4096))
+
+
+def _ops(delta: bytes) -> list[tuple]:
+    ops, offset = [], 0
+    while offset < len(delta):
+        if delta[offset:offset + 1] == COPY:
+            ops.append(('copy', *COPY_OP.unpack_from(delta, offset + 1)))
+            offset += 1 + COPY_OP.size
+        else:
+            (length,) = LENGTH_OP.unpack_from(delta, offset + 1)
+            ops.append(('data', length))
+            offset += 1 + LENGTH_OP.size + length
+    return ops
+
+
+class TestRollingChecksum(unittest.TestCase):
+    """Verify the rolling checksum matches Adler-32 at every offset."""
+
+    def test_roll_matches_adler32(self):
+        data     = random.Random(1).randbytes(4 * BLOCK_SIZE)
+        checksum = zlib.adler32(data[:BLOCK_SIZE])
+        for position in range(len(data) - BLOCK_SIZE):
+            checksum = roll(checksum, data[position], data[position + BLOCK_SIZE], BLOCK_SIZE)
+            self.assertEqual(checksum, zlib.adler32(data[position + 1:position + 1 + BLOCK_SIZE]))
+
+
+class TestDelta(unittest.TestCase):
+    """Verify deltas rebuild the source and only carry changed data."""
+
+    def setUp(self):
+        self.old = random.Random(2).randbytes(64 * BLOCK_SIZE + 300)
+
+    def test_identical_file_is_all_copies(self):
+        delta, rebuilt = _rebuild(self.old, self.old)
+        self.assertEqual(rebuilt, self.old)
+        self.assertEqual(_ops(delta), [('copy', 0, 65)])
+
+    def test_modified_block(self):
+        new = bytearray(self.old)
+        new[10 * BLOCK_SIZE + 5] ^= 0xff
+        delta, rebuilt = _rebuild(self.old, bytes(new))
+        self.assertEqual(rebuilt, bytes(new))
+        self.assertLess(len(delta), 2 * BLOCK_SIZE)
+
+    def test_insertion_resynchronizes(self):
+        new = self.old[:5000] + b'inserted bytes' + self.old[5000:]
+        delta, rebuilt = _rebuild(self.old, new)
+        self.assertEqual(rebuilt, new)
+        self.assertLess(len(delta), 2 * BLOCK_SIZE)
+
+    def test_deletion_and_tail_change(self):
+        new = self.old[:3000] + self.old[9000:-10] + b'new tail'
+        delta, rebuilt = _rebuild(self.old, new)
+        self.assertEqual(rebuilt, new)
+        self.assertLess(len(delta), 2 * BLOCK_SIZE)
+
+    def test_empty_destination(self):
+        delta, rebuilt = _rebuild(b'', self.old)
+        self.assertEqual(rebuilt, self.old)
+        self.assertEqual(delta[:1], DATA)
+
+    def test_empty_source(self):
+        delta, rebuilt = _rebuild(self.old, b'')
+        self.assertEqual((delta, rebuilt), (b'', b''))
+
+    def test_short_source(self):
+        delta, rebuilt = _rebuild(self.old, self.old[:100])
+        self.assertEqual(rebuilt, self.old[:100])
+
+    def test_copy_runs_are_merged(self):
+        delta, _ = _rebuild(self.old, self.old[:-300] + b'appended')
+        self.assertEqual(_ops(delta), [('copy', 0, 64), ('data', 8)])
+
+
+class TestDeltaForms(unittest.TestCase):
+    """Verify a delta transfer through the file form functions."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.dir, 'src')
+        self.dst = os.path.join(self.dir, 'dst')
+
+        old = random.Random(3).randbytes(256 * 1024)
+        self.new = old[:100000] + b'changed' + old[100007:]
+        with open(self.src, 'wb') as file:
+            file.write(self.new)
+        with open(self.dst, 'wb') as file:
+            file.write(old)
+        os.chmod(self.dst, 0o750)
+
+    def tearDown(self):
+        for name in os.listdir(self.dir):
+            os.unlink(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    def transfer(self, tamper: bool = False) -> WriteFileDelta:
+        signature = get_file_signature_to_form(GetFileSignature(path=self.dst))
+        self.assertIsNone(signature.error)
+
+        load_form = load_file_delta_to_form(LoadFileDelta(
+            path=self.src,
+            block_size=signature.block_size,
+            weak=signature.weak,
+            strong=signature.strong,
+            base_size=signature.size
+        ))
+        self.assertIsNone(load_form.error)
+        self.assertEqual(load_form.weak, [])
+        self.assertLess(len(decompress(b64decode(load_form.b64zlib), load_form.codec)), 8 * 1024)
+
+        return write_file_delta_from_form(WriteFileDelta(
+            b64zlib=load_form.b64zlib,
+            path=self.dst,
+            block_size=signature.block_size,
+            size=load_form.size,
+            md5sum="0" * 32 if tamper else load_form.md5sum,
+            codec=load_form.codec
+        ))
+
+    def test_delta_transfer(self):
+        """The destination is rebuilt and keeps its permissions."""
+        self.assertIsNone(self.transfer().error)
+        with open(self.dst, 'rb') as file:
+            self.assertEqual(file.read(), self.new)
+        self.assertEqual(os.stat(self.dst).st_mode & 0o777, 0o750)
+        self.assertEqual(sorted(os.listdir(self.dir)), ['dst', 'src'])
+
+    def test_failed_verification_keeps_destination(self):
+        """A delta failing verification leaves the destination untouched."""
+        with open(self.dst, 'rb') as file:
+            old = file.read()
+        self.assertIsNotNone(self.transfer(tamper=True).error)
+        with open(self.dst, 'rb') as file:
+            self.assertEqual(file.read(), old)
+        self.assertEqual(sorted(os.listdir(self.dir)), ['dst', 'src'])
+
+    def test_missing_destination_reports_error(self):
+        """Signing a missing file reports an error so the caller can fall back."""
+        self.assertIsNotNone(get_file_signature_to_form(GetFileSignature(path=self.dst + '.missing')).error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,11 +26,14 @@ from base64 import b64decode, b64encode
 
 from stembot.executor.file import (
     load_bytes_from_form,
+    load_file_chunk_to_form,
     load_file_to_form,
     load_form_from_bytes,
+    write_file_chunk_from_form,
     write_file_from_form,
 )
-from stembot.models.control import LoadFile, WriteFile
+from stembot.enums import DigestType
+from stembot.models.control import LoadFile, LoadFileChunk, WriteFile, WriteFileChunk
 
 # ---------------------------------------------------------------------------
 # Canonical test fixtures — identical values must be used in stembot-rust
@@ -265,5 +268,176 @@ class TestFileRoundTrip(unittest.TestCase):
         self.assertEqual(load_form.size, TEST_SIZE)
 
 
+# ---------------------------------------------------------------------------
+# Streaming digests and atomic writes
+# ---------------------------------------------------------------------------
+
+class TestDigestsAndAtomicWrites(unittest.TestCase):
+    """Verify digest negotiation and atomic write semantics."""
+
+    def setUp(self):
+        self.dir  = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'out')
+
+    def tearDown(self):
+        for name in os.listdir(self.dir):
+            os.unlink(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    def test_blake2b_round_trip(self):
+        """A BLAKE2b digest is carried in digest and verified on write and load."""
+        write_form      = load_form_from_bytes(TEST_DATA, digest_type=DigestType.BLAKE2B)
+        write_form.path = self.path
+
+        self.assertIsNone(write_form.md5sum)
+        self.assertEqual(write_form.digest, hashlib.blake2b(TEST_DATA).hexdigest())
+        self.assertIsNone(write_file_from_form(write_form).error)
+
+        load_form = load_file_to_form(LoadFile(path=self.path, digest_type=DigestType.BLAKE2B))
+        self.assertEqual(load_form.digest, hashlib.blake2b(TEST_DATA).hexdigest())
+        self.assertEqual(load_bytes_from_form(load_form), TEST_DATA)
+
+    def test_digest_mismatch_sets_error(self):
+        """A payload failing verification reports an error."""
+        write_form        = load_form_from_bytes(TEST_DATA, digest_type=DigestType.BLAKE2B)
+        write_form.path   = self.path
+        write_form.digest = "0" * 128
+
+        self.assertIsNotNone(write_file_from_form(write_form).error)
+
+    def test_atomic_write(self):
+        """An atomic write leaves only the destination file behind."""
+        write_form        = load_form_from_bytes(TEST_DATA)
+        write_form.path   = self.path
+        write_form.atomic = True
+
+        self.assertIsNone(write_file_from_form(write_form).error)
+        self.assertEqual(os.listdir(self.dir), ['out'])
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), TEST_DATA)
+
+    def test_failed_atomic_write_keeps_original(self):
+        """A failed atomic write leaves the existing file untouched."""
+        with open(self.path, 'wb') as file:
+            file.write(b'original')
+
+        write_form        = load_form_from_bytes(TEST_DATA)
+        write_form.path   = self.path
+        write_form.atomic = True
+        write_form.md5sum = "0" * 32
+
+        self.assertIsNotNone(write_file_from_form(write_form).error)
+        self.assertEqual(os.listdir(self.dir), ['out'])
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), b'original')
+
+    def test_failed_write_keeps_original(self):
+        """A payload failing verification is rejected before the file is truncated."""
+        with open(self.path, 'wb') as file:
+            file.write(b'original')
+
+        write_form        = load_form_from_bytes(TEST_DATA)
+        write_form.path   = self.path
+        write_form.md5sum = "0" * 32
+
+        self.assertIn('digest mismatch', write_file_from_form(write_form).error)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), b'original')
+
+    def test_large_file_streams_in_blocks(self):
+        """Files larger than a block round-trip through the streaming path."""
+        data = os.urandom(1024 * 1024) + TEST_DATA * 100000
+        with open(self.path, 'wb') as file:
+            file.write(data)
+
+        load_form = load_file_to_form(LoadFile(path=self.path))
+
+        self.assertEqual(load_form.size, len(data))
+        self.assertEqual(load_form.md5sum, hashlib.md5(data).hexdigest())
+        self.assertEqual(load_bytes_from_form(load_form), data)
+
+
+# ---------------------------------------------------------------------------
+# load_file_chunk_to_form / write_file_chunk_from_form
+# ---------------------------------------------------------------------------
+
+class TestFileChunks(unittest.TestCase):
+    """Verify chunked reads and out-of-order chunked writes."""
+
+    def setUp(self):
+        fd, self.src_path = tempfile.mkstemp()
+        os.write(fd, TEST_DATA)
+        os.close(fd)
+        fd, self.dst_path = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        for path in (self.src_path, self.dst_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def copy_chunk(self, offset: int, length: int) -> WriteFileChunk:
+        load_form = load_file_chunk_to_form(LoadFileChunk(path=self.src_path, offset=offset, length=length))
+        return write_file_chunk_from_form(WriteFileChunk(
+            b64zlib=load_form.b64zlib,
+            path=self.dst_path,
+            offset=offset,
+            length=load_form.length,
+            size=load_form.size,
+            md5sum=load_form.md5sum
+        ))
+
+    def test_zero_length_reports_size(self):
+        """A zero length chunk request only reports the file size."""
+        form = load_file_chunk_to_form(LoadFileChunk(path=self.src_path, length=0))
+        self.assertIsNone(form.error)
+        self.assertEqual(form.size, TEST_SIZE)
+        self.assertEqual(form.length, 0)
+
+    def test_chunk_md5sum_is_for_chunk(self):
+        """md5sum of a chunk covers only the chunk bytes."""
+        form = load_file_chunk_to_form(LoadFileChunk(path=self.src_path, offset=7, length=8))
+        self.assertEqual(b64decode(form.b64zlib), zlib.compress(TEST_DATA[7:], 9))
+        self.assertEqual(form.md5sum, hashlib.md5(TEST_DATA[7:]).hexdigest())
+
+    def test_chunk_past_end_is_short(self):
+        """A chunk overlapping the end of the file is truncated to the file."""
+        form = load_file_chunk_to_form(LoadFileChunk(path=self.src_path, offset=10, length=100))
+        self.assertEqual(form.length, TEST_SIZE - 10)
+
+    def test_out_of_order_chunks(self):
+        """Chunks written in any order reassemble the original file."""
+        for offset in (12, 0, 8, 4):
+            self.assertIsNone(self.copy_chunk(offset, 4).error)
+
+        with open(self.dst_path, 'rb') as file:
+            self.assertEqual(file.read(), TEST_DATA)
+
+    def test_rewritten_chunk_truncates_to_size(self):
+        """A destination longer than the source is truncated to the source size."""
+        with open(self.dst_path, 'wb') as file:
+            file.write(TEST_DATA * 2)
+
+        form = self.copy_chunk(0, TEST_SIZE)
+
+        self.assertIsNone(form.error)
+        self.assertEqual(form.b64zlib, '')
+        with open(self.dst_path, 'rb') as file:
+            self.assertEqual(file.read(), TEST_DATA)
+
+    def test_md5_mismatch_sets_error(self):
+        """A chunk failing verification is not written."""
+        form = write_file_chunk_from_form(WriteFileChunk(
+            b64zlib=TEST_B64ZLIB,
+            path=self.dst_path,
+            offset=0,
+            length=TEST_SIZE,
+            size=TEST_SIZE,
+            md5sum="0" * 32
+        ))
+        self.assertIsNotNone(form.error)
+        self.assertEqual(os.path.getsize(self.dst_path), 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,120 @@
+"""Unit tests for stembot.executor.frame.
+
+Verifies that bulk payloads are carried as raw bytes after the JSON header and
+that every model survives a frame round-trip unchanged, including payloads
+nested inside tickets and polled message lists.
+
+Frame layout (for porting):
+    MAGIC | uint32 header length | header JSON | (uint32 blob length | blob)*
+"""
+import json
+import os
+import struct
+import unittest
+import zlib
+from base64 import b64encode
+
+from stembot.executor.frame import MAGIC, dump_body, dump_frame, load_body, load_frame
+from stembot.models.control import Benchmark, ControlForm, ControlFormTicket, GetConfig, WriteFile
+from stembot.models.network import NetworkMessage, NetworkMessagesResponse, NetworkTicket
+
+TEST_DATA    = b"hello, stembot!" * 64
+TEST_B64ZLIB = b64encode(zlib.compress(TEST_DATA, 9)).decode()
+
+
+def _header(frame: bytes) -> dict:
+    (length,) = struct.unpack_from('>I', frame, len(MAGIC))
+    start     = len(MAGIC) + 4
+    return json.loads(frame[start:start + length])
+
+
+class TestFrameLayout(unittest.TestCase):
+    """Verify the frame layout and blob extraction."""
+
+    def test_magic(self):
+        """Frames start with the magic bytes."""
+        self.assertTrue(dump_frame(GetConfig()).startswith(MAGIC))
+
+    def test_header_without_blobs_is_model_json(self):
+        """Models without bulk fields frame as their JSON alone."""
+        form = GetConfig()
+        self.assertEqual(_header(dump_frame(form)), json.loads(form.model_dump_json()))
+
+    def test_b64zlib_is_raw(self):
+        """b64zlib is replaced by a blob reference and carried decoded."""
+        frame = dump_frame(WriteFile(b64zlib=TEST_B64ZLIB, path='/tmp/out'))
+        self.assertEqual(_header(frame)['b64zlib'], {'$blob': 0})
+        self.assertTrue(frame.endswith(zlib.compress(TEST_DATA, 9)))
+
+    def test_frame_is_smaller_than_json(self):
+        """Incompressible payloads no longer carry the base64 overhead."""
+        form = WriteFile(b64zlib=b64encode(os.urandom(3 * 1024)).decode(), path='/tmp/out')
+        self.assertLess(len(dump_frame(form)), len(form.model_dump_json()) * 0.8)
+
+    def test_benchmark_payload_is_raw(self):
+        """Benchmark payloads are carried as raw bytes."""
+        frame = dump_frame(Benchmark(outbound_size=1024, inbound_size=None, payload='0' * 1024))
+        self.assertEqual(_header(frame)['payload'], {'$blob': 0})
+        self.assertTrue(frame.endswith(b'0' * 1024))
+
+    def test_empty_and_null_payloads_stay_inline(self):
+        """Empty and null bulk fields are not lifted out."""
+        header = _header(dump_frame(WriteFile(b64zlib='', path='/tmp/out')))
+        self.assertEqual(header['b64zlib'], '')
+
+    def test_invalid_magic_raises(self):
+        """Data without the magic bytes is rejected."""
+        with self.assertRaises(ValueError):
+            load_frame(b'{"type":"get_config"}')
+
+    def test_truncated_frame_raises(self):
+        """Frames cut short are rejected."""
+        frame = dump_frame(WriteFile(b64zlib=TEST_B64ZLIB, path='/tmp/out'))
+        with self.assertRaises(ValueError):
+            load_frame(frame[:-1])
+
+
+class TestFrameRoundTrip(unittest.TestCase):
+    """Verify models survive a frame round-trip unchanged."""
+
+    def assert_round_trip(self, model, model_type):
+        self.assertEqual(
+            json.loads(load_body(model_type, dump_body(model, True), True).model_dump_json()),
+            json.loads(model.model_dump_json())
+        )
+
+    def test_write_file(self):
+        self.assert_round_trip(WriteFile(b64zlib=TEST_B64ZLIB, path='/tmp/out', size=15), ControlForm)
+
+    def test_benchmark(self):
+        self.assert_round_trip(Benchmark(outbound_size=8, inbound_size=8, payload='0' * 8), ControlForm)
+
+    def test_control_form_ticket(self):
+        ticket = ControlFormTicket(dst='agent-b', form=WriteFile(b64zlib=TEST_B64ZLIB, path='/tmp/out'))
+        self.assert_round_trip(ticket, ControlForm)
+
+    def test_network_ticket(self):
+        ticket = NetworkTicket(
+            dest='agent-b', tckuuid='t1', form=WriteFile(b64zlib=TEST_B64ZLIB, path='/tmp/out'), type='ticket_request'
+        )
+        self.assert_round_trip(ticket, NetworkMessage)
+
+    def test_nested_messages(self):
+        ticket   = NetworkTicket(
+            dest='agent-b', tckuuid='t1', form=WriteFile(b64zlib=TEST_B64ZLIB, path='/tmp/out'), type='ticket_request'
+        )
+        response = NetworkMessagesResponse(dest='agent-b', messages=[ticket.model_dump(), ticket.model_dump()])
+        frame    = dump_frame(response)
+
+        self.assertEqual(frame.count(zlib.compress(TEST_DATA, 9)), 2)
+        self.assert_round_trip(response, NetworkMessage)
+
+    def test_json_body(self):
+        """Unframed bodies are the model's JSON text."""
+        form = GetConfig()
+        self.assertEqual(dump_body(form, False), form.model_dump_json().encode())
+        self.assertEqual(load_body(GetConfig, dump_body(form, False), False), form)
+
+
+if __name__ == '__main__':
+    unittest.main()
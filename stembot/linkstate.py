@@ -0,0 +1,321 @@
+"""Link state routing along latency weighted shortest paths.
+
+In link state mode (routing_mode LINK_STATE) agents do not advertise route
+tables. Instead each agent describes its links to its peers, with their
+measured round trip times and loss, in a link state record that is flooded
+to every agent in the network. Each agent computes the shortest paths to
+every other agent from the records with Dijkstra's algorithm, and keeps the
+first hop and cost of each path in the routes collection used to forward
+messages (see stembot.messaging.next_hop).
+
+Records:
+- Each agent describes its links with the smoothed round trip times and loss
+  measured on its peers (see stembot.peering.measure_peer).
+- A new record is originated when the agent's peers change or the cost of a
+  link changes by more than LINK_COST_CHANGE, and otherwise every
+  advert_refresh_secs. Records not refreshed for three times that are
+  expired.
+- Records are signed with an HMAC-SHA256 keyed with the network key. Records
+  with a bad signature are dropped, as are records no newer than the one
+  already kept from the same agent. Newer records are kept and flooded on to
+  every peer except the one they came from. The signature protects the
+  integrity of records only: every agent holds the network key, so any agent
+  can sign a record on behalf of another.
+- A link is only used in a path if the agent at its other end lists a link
+  back, so a link that failed in one direction is not used in either.
+- Link costs are round trip times in milliseconds, inflated by loss.
+"""
+
+import hashlib
+import hmac
+import heapq
+import json
+import logging
+
+from threading import Thread
+from time import time
+from typing import Dict, List, Tuple
+
+from stembot.dao import Collection
+from stembot.delivery import broken_hops
+from stembot.enums import RoutingMode
+from stembot.messaging import forward_network_message
+from stembot.models.config import CONFIG
+from stembot.models.network import LinkState
+from stembot.models.routing import Link, LinkStateRecord, Peer, Route
+from stembot.peering import prune
+from stembot.scheduling import scheduled
+from stembot.signals import read_signal, touch_signal
+
+# File whose modification time signals the routing task that link state records changed
+LINK_STATE_SIGNAL_PATH = 'link_states.signal'
+
+# Round trip time assumed for links that have not been measured
+DEFAULT_RTT_MS = 100.0
+
+# Relative change in the cost of a link that makes an agent originate a new record
+LINK_COST_CHANGE = 0.2
+
+# The link state signal when routes were last computed
+ROUTED_LINK_STATE_SIGNAL = 0
+
+
+
+def link_cost(link: Link) -> int:
+    """Return the cost of a link: its round trip time in milliseconds, inflated by its loss.
+
+    Args:
+        link: The link.
+
+    Returns:
+        The cost of the link, at least 1.
+    """
+    rtt_ms = DEFAULT_RTT_MS if link.rtt_ms is None else link.rtt_ms
+    return max(1, round(rtt_ms / (1.0 - min(link.loss, 0.9))))
+
+
+def sign_link_state(agtuuid: str, seq: int, links: List[Link]) -> str:
+    """Return the signature of a link state record.
+
+    The signature is keyed with the network key shared by every agent, so it
+    shows a record was not corrupted and came from a holder of the key, but
+    not which agent originated it. Any agent can sign a record for another.
+
+    Args:
+        agtuuid: UUID of the agent the links are from.
+        seq: Sequence number of the record.
+        links: The agent's links.
+
+    Returns:
+        The hex HMAC-SHA256 of the record, keyed with the network key.
+    """
+    payload = json.dumps(
+        {
+            'agtuuid': agtuuid,
+            'seq': seq,
+            'links': [link.model_dump(mode='json', include={'agtuuid', 'rtt_ms', 'loss'}) for link in links]
+        },
+        sort_keys=True
+    )
+    return hmac.new(CONFIG.key, payload.encode(), hashlib.sha256).hexdigest()
+
+
+def current_links() -> List[Link]:
+    """Return this agent's links to its peers, leaving out peers whose circuit breakers are open.
+
+    Returns:
+        The link to each peer, with the peer's smoothed round trip time and loss.
+    """
+    prune()
+
+    broken = set(broken_hops())
+
+    return [
+        Link(agtuuid=peer.object.agtuuid, rtt_ms=peer.object.rtt_ms, loss=peer.object.loss)
+        for peer in Collection[Peer]('peers').find(agtuuid="$!eq:None")
+        if peer.object.agtuuid not in broken
+    ]
+
+
+def links_changed(old: List[Link], new: List[Link]) -> bool:
+    """Check whether an agent's links changed enough to originate a new record.
+
+    Args:
+        old: The links in the agent's last record.
+        new: The agent's current links.
+
+    Returns:
+        True if the peers differ or the cost of a link changed by more than LINK_COST_CHANGE.
+    """
+    old_costs = {link.agtuuid: link_cost(link) for link in old}
+    new_costs = {link.agtuuid: link_cost(link) for link in new}
+
+    if old_costs.keys() != new_costs.keys():
+        return True
+
+    return any(abs(new_costs[agtuuid] - cost) > LINK_COST_CHANGE * cost for agtuuid, cost in old_costs.items())
+
+
+def flood_link_state(link_state: LinkState, excluded: List[str]) -> None:
+    """Send a copy of a link state record to every peer not excluded.
+
+    Args:
+        link_state: The record to flood.
+        excluded: UUIDs of the agents not to send the record to.
+    """
+    for peer in Collection[Peer]('peers').find(agtuuid="$!eq:None"):
+        if peer.object.agtuuid in excluded:
+            continue
+        copy = link_state.model_copy(update={'dest': peer.object.agtuuid, 'msguuid': None})
+        Thread(target=forward_network_message, args=(copy,)).start()
+
+
+def originate_link_state() -> LinkState | None:
+    """Originate and flood a record of this agent's links if they changed or the last record is due a refresh.
+
+    Returns:
+        The record originated, or None if the last record still describes the links.
+    """
+    records = Collection[LinkStateRecord]('link_states')
+    found   = records.find(agtuuid=CONFIG.agtuuid)
+    record  = found[0].object if found else None
+    links   = current_links()
+
+    if (
+        record is not None and
+        not links_changed(record.links, links) and
+        time() - record.receive_time < CONFIG.advert_refresh_secs
+    ):
+        return None
+
+    # Start from the clock so a restarted agent does not reuse sequence numbers
+    seq = max(record.seq + 1 if record else 0, int(time() * 1000))
+
+    records.upsert_object(
+        LinkStateRecord(agtuuid=CONFIG.agtuuid, seq=seq, links=links, objuuid=record.objuuid if record else None)
+    )
+    touch_signal(LINK_STATE_SIGNAL_PATH)
+
+    link_state = LinkState(
+        src=CONFIG.agtuuid,
+        agtuuid=CONFIG.agtuuid,
+        seq=seq,
+        links=links,
+        signature=sign_link_state(CONFIG.agtuuid, seq, links)
+    )
+    flood_link_state(link_state, [])
+    return link_state
+
+
+def process_link_state(link_state: LinkState) -> bool:
+    """Keep and flood on a link state record newer than the one kept from its agent.
+
+    Args:
+        link_state: The record received from a peer.
+
+    Returns:
+        True if the record was kept, False if it was dropped.
+    """
+    if not hmac.compare_digest(
+        link_state.signature or '',
+        sign_link_state(link_state.agtuuid, link_state.seq, link_state.links)
+    ):
+        logging.warning('Dropping link state record from %s with a bad signature', link_state.agtuuid)
+        return False
+
+    if link_state.agtuuid == CONFIG.agtuuid:
+        return False
+
+    records = Collection[LinkStateRecord]('link_states')
+    found   = records.find(agtuuid=link_state.agtuuid)
+    record  = found[0].object if found else None
+
+    if record is not None and record.seq >= link_state.seq:
+        return False
+
+    records.upsert_object(
+        LinkStateRecord(
+            agtuuid=link_state.agtuuid,
+            seq=link_state.seq,
+            links=link_state.links,
+            objuuid=record.objuuid if record else None
+        )
+    )
+    touch_signal(LINK_STATE_SIGNAL_PATH)
+
+    flood_link_state(link_state, [link_state.isrc, link_state.agtuuid])
+    return True
+
+
+def shortest_paths(links: Dict[str, List[Link]], source: str) -> Dict[str, Tuple[str, int]]:
+    """Compute the shortest paths from an agent to every agent reachable through the links.
+
+    A link from another agent is only used if the agent at its other end
+    lists a link back. Links from the source are always used.
+
+    Args:
+        links: The links from each agent, keyed by agent UUID.
+        source: UUID of the agent the paths start from.
+
+    Returns:
+        The first hop and cost of the shortest path to each reachable agent, keyed by agent UUID.
+    """
+    neighbors = {agtuuid: {link.agtuuid for link in agent_links} for agtuuid, agent_links in links.items()}
+
+    paths   = {}
+    visited = set()
+    queue   = [(0, source, None)]
+
+    while queue:
+        cost, agtuuid, hop = heapq.heappop(queue)
+        if agtuuid in visited:
+            continue
+        visited.add(agtuuid)
+        if agtuuid != source:
+            paths[agtuuid] = (hop, cost)
+
+        for link in links.get(agtuuid, []):
+            if link.agtuuid in visited:
+                continue
+            if agtuuid != source and agtuuid not in neighbors.get(link.agtuuid, set()):
+                continue
+            heapq.heappush(queue, (cost + link_cost(link), link.agtuuid, hop or link.agtuuid))
+
+    return paths
+
+
+def compute_routes() -> None:
+    """Replace the routes with the first hops of the shortest paths through the kept link state records.
+
+    Peers are delivered to directly and get no route.
+    """
+    links = {record.object.agtuuid: record.object.links for record in Collection[LinkStateRecord]('link_states').find()}
+    links[CONFIG.agtuuid] = current_links()
+
+    peers = {peer.object.agtuuid for peer in Collection[Peer]('peers').find()}
+    paths = {
+        agtuuid: path for agtuuid, path in shortest_paths(links, CONFIG.agtuuid).items()
+        if agtuuid not in peers
+    }
+
+    routes = Collection[Route]('routes')
+    for route in routes.find():
+        hop, cost = paths.pop(route.object.agtuuid, (None, None))
+        if hop != route.object.gtwuuid:
+            route.destroy()
+            if hop is not None:
+                routes.upsert_object(Route(agtuuid=route.object.agtuuid, gtwuuid=hop, weight=cost))
+        elif route.object.weight != cost:
+            route.object.weight = cost
+            route.commit()
+
+    for agtuuid, (hop, cost) in paths.items():
+        routes.upsert_object(Route(agtuuid=agtuuid, gtwuuid=hop, weight=cost))
+
+
+@scheduled(every_secs=1)
+def link_state_routing() -> None:
+    """Recompute the routes within a second of a change to the link state records, in link state mode."""
+    global ROUTED_LINK_STATE_SIGNAL # pylint: disable=global-statement
+
+    if CONFIG.routing_mode != RoutingMode.LINK_STATE or read_signal(LINK_STATE_SIGNAL_PATH) == ROUTED_LINK_STATE_SIGNAL:
+        return
+
+    ROUTED_LINK_STATE_SIGNAL = read_signal(LINK_STATE_SIGNAL_PATH)
+    compute_routes()
+
+
+@scheduled(every_secs=60)
+def expire_link_states() -> None:
+    """Remove link state records not refreshed for 3 * advert_refresh_secs."""
+    cutoff = time() - 3 * CONFIG.advert_refresh_secs
+
+    if Collection[LinkStateRecord]('link_states').pop(receive_time=f'$lt:{cutoff}'):
+        touch_signal(LINK_STATE_SIGNAL_PATH)
+
+    Collection[LinkStateRecord]('link_states').vacuum()
+
+
+collection = Collection[LinkStateRecord]('link_states')
+collection.create_attribute('agtuuid', "/agtuuid")
+collection.create_attribute('receive_time', "/receive_time")
@@ -7,256 +7,977 @@ messages and provides functions to push, pull, and pop messages from the queue.
 
 Key features:
 - In-memory message queue with persistence support
-- Smart gateway selection for multi-hop message delivery
+- Smart gateway selection for multi-hop message delivery, spreading messages
+  across equal cost gateways in proportion to their measured throughput while
+  keeping the messages of a ticket on one gateway
 - Automatic message expiration based on timeout configuration
 - Message polling for agents without direct URLs
+- Priority classes with first in first out delivery within a class and
+  round-robin fairness across destinations when draining the queue
+- Per next hop backoff and circuit breaking, a per-second replay budget, and
+  dead letters for messages that expire undelivered (see stembot.delivery)
+- Global and per-destination quotas on the queued messages and bytes, checked
+  against counts kept as messages are queued and removed, with load shedding
+  that drops the oldest messages of the same or a lower priority class or
+  rejects new messages when the queue is full
+- Poll responses limited by message count and size when the messages are
+  popped from the queue, with the rest left queued for the next poll
+- Long polling and polling channels, waiting until messages for the poller or
+  its subtree are queued, signalled across worker processes by a file per
+  polling agent whose modification time is updated whenever a message it polls
+  for is queued
 """
 
+import asyncio
+import hashlib
+import json
 import logging
 
-from time import time
-from typing import List
+from itertools import zip_longest
+from math import ceil, log
+from random import choices, shuffle
+from time import perf_counter, time
+from typing import Dict, List
 
-from stembot.enums import NetworkMessageType
+from stembot.delivery import acquire_hop, dead_letter, deferred_hops, get_hop_health
+from stembot.delivery import count_queued, count_shed, get_queue_usage, get_shed_counters, record_failure
+from stembot.delivery import record_success, reset_queue_usage
+from stembot.enums import ControlFormType, MessagePriority, NetworkMessageType, ShedPolicy, UpperCaseStrEnum
 from stembot.executor.agent import AgentClient
 from stembot.models.config import CONFIG
 from stembot.scheduling import scheduled
 from stembot.dao import Collection
+from stembot.dao.object import Object
+from stembot.dao.utils import get_uuid_str
+from stembot.models.delivery import QueueStats
 from stembot.models.network import Acknowledgement, NetworkMessage, NetworkMessagesRequest, NetworkTicket
+from stembot.models.network import MulticastRequest, MulticastResponse, MulticastResult
 from stembot.models.routing import Peer, Route
+from stembot.peering import measure_peer
+from stembot.regions import route_keys
+from stembot.signals import keyed_signal_path, read_signal, touch_signal, wait_signals
+
+# Control forms whose tickets carry file payloads or other bulk data
+BULK_FORM_TYPES = (
+    ControlFormType.WRITE_FILE,
+    ControlFormType.LOAD_FILE,
+    ControlFormType.WRITE_FILE_CHUNK,
+    ControlFormType.LOAD_FILE_CHUNK,
+    ControlFormType.GET_FILE_SIGNATURE,
+    ControlFormType.LOAD_FILE_DELTA,
+    ControlFormType.WRITE_FILE_DELTA,
+    ControlFormType.BENCHMARK
+)
+
+TICKET_TYPES = (
+    NetworkMessageType.TICKET_REQUEST,
+    NetworkMessageType.TICKET_RESPONSE,
+    NetworkMessageType.MULTICAST_REQUEST,
+    NetworkMessageType.MULTICAST_RESPONSE
+)
+
+# Requests a control form whitelist applies to, answered with an error response when rejected
+REQUEST_TYPES = (NetworkMessageType.TICKET_REQUEST, NetworkMessageType.MULTICAST_REQUEST)
+
+# Queued messages are popped in priority class order, oldest first within a class
+MESSAGE_ORDER = 'priority,timestamp'
+
+# A full queue drops messages in the lowest priority class first, oldest first within a class
+SHED_ORDER = '-priority,timestamp'
+
+# Directory of the signals touched whenever a message is queued, one per polling agent,
+# so the long polls of the agent in every worker process notice it
+QUEUE_SIGNAL_PATH = 'messages.signals'
+
+
+def message_form_type(message: NetworkMessage) -> ControlFormType | None:
+    """Return the control form type of a ticket.
+
+    Args:
+        message: The network message to inspect.
+
+    Returns:
+        The message's form_type if assigned, otherwise the type of a ticket's
+        form, or None for messages that are not tickets.
+    """
+    if message.form_type is not None or message.type not in TICKET_TYPES:
+        return message.form_type
+
+    form = getattr(message, 'form', None)
+    form_type = form.get('type') if isinstance(form, dict) else getattr(form, 'type', None)
+    return ControlFormType(form_type) if form_type else None
+
+
+def message_priority(message: NetworkMessage) -> MessagePriority:
+    """Classify a network message into a delivery priority class.
+
+    Args:
+        message: The network message to classify.
+
+    Returns:
+        BULK for tickets carrying file transfer or benchmark forms, TICKET for
+        other tickets, and CONTROL for everything else.
+    """
+    if message.type not in TICKET_TYPES:
+        return MessagePriority.CONTROL
+
+    if message_form_type(message) in BULK_FORM_TYPES:
+        return MessagePriority.BULK
+
+    return MessagePriority.TICKET
+
+
+def fair_order(network_messages: List[NetworkMessage]) -> List[NetworkMessage]:
+    """Order messages by priority class and round-robin across destinations.
+
+    Within a priority class, destinations take turns so a backlog for one
+    destination does not delay messages for the others. Messages for the same
+    destination keep their relative order.
+
+    Args:
+        network_messages: Messages in first in first out order.
+
+    Returns:
+        The messages in delivery order.
+    """
+    classes: Dict[int, Dict[str | None, List[NetworkMessage]]] = {}
+    for message in network_messages:
+        priority = message_priority(message) if message.priority is None else message.priority
+        classes.setdefault(priority, {}).setdefault(message.dest, []).append(message)
+
+    ordered = []
+    for priority in sorted(classes):
+        for turn in zip_longest(*classes[priority].values()):
+            ordered.extend(message for message in turn if message is not None)
+    return ordered
+
+
+def equal_cost_gateways(*params: str) -> Dict[str, List[str]]:
+    """Return the lowest weight gateways for each destination with a route.
+
+    Args:
+        *params: Query parameter strings limiting the routes (e.g., 'agtuuid=agent-uuid').
+
+    Returns:
+        Sorted lists of the gateway agent UUIDs sharing the lowest route weight, keyed by
+        destination agent UUID.
+    """
+    weights:  Dict[str, int]       = {}
+    gateways: Dict[str, List[str]] = {}
+    for route in Collection[Route]('routes').find(*params):
+        if route.object.agtuuid not in weights or weights[route.object.agtuuid] > route.object.weight:
+            weights[route.object.agtuuid]  = route.object.weight
+            gateways[route.object.agtuuid] = [route.object.gtwuuid]
+        elif weights[route.object.agtuuid] == route.object.weight:
+            gateways[route.object.agtuuid].append(route.object.gtwuuid)
+    return {agtuuid: sorted(set(gtwuuids)) for agtuuid, gtwuuids in gateways.items()}
+
+
+def best_gateways() -> Dict[str, str]:
+    """Return the lowest weight gateway for each destination with a route.
+
+    Where several gateways share the lowest weight, the first by UUID is returned.
+
+    Returns:
+        A dictionary of gateway agent UUIDs keyed by destination agent UUID.
+    """
+    return {agtuuid: gtwuuids[0] for agtuuid, gtwuuids in equal_cost_gateways().items()}
+
+
+def flow_key(message: NetworkMessage) -> str | None:
+    """Return the flow a message belongs to, for keeping a flow on one gateway.
+
+    The requests, responses and traces of a ticket share the ticket's UUID, and
+    the messages of a multicast share the multicast's UUID. Other messages are
+    their own flow, so a requeued message is retried through the same gateway.
+
+    Args:
+        message: The network message.
+
+    Returns:
+        The flow key, or None if the message has none yet.
+    """
+    return getattr(message, 'tckuuid', None) or getattr(message, 'mcuuid', None) or message.msguuid
+
+
+def select_gateway(gateways: List[Peer], flow: str | None) -> Peer:
+    """Select one of several equal cost gateways in proportion to their measured capacity.
+
+    Uses weighted rendezvous hashing, so every message of a flow takes the same
+    gateway for as long as it remains one of the gateways, and a gateway that
+    comes or goes only moves its own share of the flows. A gateway whose
+    throughput has not been measured counts with the mean of the measured ones.
+
+    Args:
+        gateways: The equal cost gateway peers.
+        flow: The flow key of the message, or None to choose at random.
+
+    Returns:
+        The selected gateway peer.
+    """
+    measured = [peer.throughput_bps for peer in gateways if peer.throughput_bps]
+    default  = sum(measured) / len(measured) if measured else 1.0
+    capacity = [peer.throughput_bps or default for peer in gateways]
+
+    if flow is None:
+        return choices(gateways, weights=capacity)[0]
+
+    def score(index: int) -> float:
+        digest  = hashlib.blake2b(f'{flow}:{gateways[index].agtuuid}'.encode(), digest_size=8).digest()
+        uniform = (int.from_bytes(digest, 'big') + 1) / (2 ** 64 + 1)
+        return capacity[index] / -log(uniform)
+
+    return gateways[max(range(len(gateways)), key=score)]
+
+
+def next_hop(agtuuid: str, flow: str | None = None) -> Peer | None:
+    """Return the peer a message for a destination is delivered to.
+
+    A peer with the destination's UUID and a URL is delivered to directly.
+    Otherwise the message is delivered to one of the lowest weight gateways of
+    the most specific route to the destination (see stembot.regions.route_keys)
+    that is a peer with a URL, selected by select_gateway().
+    Gateways backing off after failed deliveries are only selected if every
+    gateway is backing off.
+
+    Args:
+        agtuuid: UUID of the destination agent.
+        flow: Flow key of the message (see flow_key()), or None.
+
+    Returns:
+        The next hop peer, or None if there is no peer to deliver to.
+    """
+    peers = Collection[Peer]('peers')
+    for peer in peers.find(agtuuid=agtuuid, url="$!eq:None"):
+        return peer.object
+
+    keys     = route_keys(agtuuid)
+    gateways = equal_cost_gateways(f'agtuuid=$oneof:{",".join(keys)}')
+    gtwuuids = next((gateways[key] for key in keys if key in gateways), None)
+    if not gtwuuids:
+        return None
+
+    gateways = [peer.object for peer in peers.find(agtuuid=f'$oneof:{",".join(gtwuuids)}', url="$!eq:None")]
+    if len(gateways) > 1:
+        deferred = set(deferred_hops())
+        gateways = [peer for peer in gateways if peer.agtuuid not in deferred] or gateways
+
+    return select_gateway(gateways, flow) if gateways else None
+
+
+def undeliverable_destinations() -> List[str]:
+    """Return known destinations that cannot currently be delivered to.
+
+    These are destinations without a next hop peer to deliver to (such as
+    agents that poll for their messages) and destinations whose next hops are
+    all backing off after failed deliveries.
+
+    Returns:
+        A list of destination agent UUIDs.
+    """
+    urls     = {peer.object.agtuuid: peer.object.url for peer in Collection[Peer]('peers').find()}
+    gateways = equal_cost_gateways()
+    deferred = set(deferred_hops())
+
+    undeliverable = []
+    for agtuuid in set(urls) | set(gateways):
+        hops = [agtuuid] if urls.get(agtuuid) else gateways.get(agtuuid, [])
+        if not any(urls.get(hop) and hop not in deferred for hop in hops):
+            undeliverable.append(agtuuid)
+    return undeliverable
+
+
+def message_size(message: NetworkMessage) -> int:
+    """Return the approximate bytes a message occupies in the message queue.
+
+    The size is measured when the message is queued and stored with it, so it
+    is only measured for messages that predate it.
+    """
+    if message.size is None:
+        return len(json.dumps(message.model_dump(mode='json')))
+    return message.size
+
+
+def uncount_messages(messages: List[NetworkMessage]) -> None:
+    """Subtract messages removed from the message queue from the counts of queued messages."""
+    removed: Dict[str | None, tuple[int, int]] = {}
+    for message in messages:
+        count, size = removed.get(message.dest, (0, 0))
+        removed[message.dest] = (count + 1, size + message_size(message))
+
+    for dest, (count, size) in removed.items():
+        count_queued(dest, -count, -size)
+
+
+def pop_queued_messages(*params: str, **kwparams: str) -> List[NetworkMessage]:
+    """Remove and return queued messages, subtracting them from the counts of queued messages.
+
+    Args:
+        *params: Query parameter strings (e.g., 'dest=$!eq:agent-uuid').
+        **kwparams: Query parameters to filter messages (e.g., dest='agent-uuid').
+
+    Returns:
+        The removed messages.
+    """
+    popped = [message.object for message in Collection[NetworkMessage]('messages').pop(*params, **kwparams)]
+    uncount_messages(popped)
+    return popped
+
+
+def select_shed_victims(
+    message: NetworkMessage,
+    excess: tuple[int, int],
+    exclude: List[str],
+    *params: str
+) -> List[Object[NetworkMessage]] | None:
+    """Select the queued messages to drop to make room for a new message.
+
+    Victims are the oldest queued messages in the new message's priority class
+    or a lower one, taken from the lowest priority class first. Only as many
+    candidates are loaded as are needed, and their stored sizes are used.
+
+    Args:
+        message: The new network message.
+        excess: Tuple of (messages, bytes) that must be dropped.
+        exclude: Object UUIDs of queued messages already selected for dropping.
+        *params: Query parameter strings limiting the victims (e.g., 'dest=agent-uuid').
+
+    Returns:
+        The queued messages to drop, or None if dropping every candidate would
+        not make enough room.
+    """
+    messages = Collection[NetworkMessage]('messages')
+    count, size = excess
+
+    victims = []
+    for objuuid in messages.find_objuuids(*params, priority=f'$gte:{message.priority}', order_by=SHED_ORDER):
+        if count <= 0 and size <= 0:
+            break
+
+        if objuuid in exclude:
+            continue
+
+        victim = messages.get_object(objuuid)
+        victims.append(victim)
+        count -= 1
+        size  -= message_size(victim.object)
+
+    return victims if count <= 0 and size <= 0 else None
+
+
+def shed_network_messages(message: NetworkMessage) -> str | None:
+    """Make room in the message queue for a new message.
+
+    Checks the new message against the per-destination and global queue
+    quotas. When a quota would be exceeded, the DROP_OLDEST shed policy drops
+    queued messages of the same or a lower priority class to make room, and
+    the REJECT_NEWEST shed policy rejects the new message. A message that
+    cannot be made room for is rejected. Dropped and rejected messages are
+    counted per destination.
+
+    Args:
+        message: The new network message.
+
+    Returns:
+        None if the message may be queued, otherwise why it was rejected.
+    """
+    size  = message_size(message)
+    usage = get_queue_usage()
+
+    dest_count, dest_size = usage.get(message.dest, (0, 0))
+    dest_excess = (dest_count + 1 - CONFIG.dest_max_messages, dest_size + size - CONFIG.dest_max_bytes)
+
+    queue_count  = sum(count for count, _ in usage.values())
+    queue_size   = sum(used for _, used in usage.values())
+    queue_excess = (queue_count + 1 - CONFIG.queue_max_messages, queue_size + size - CONFIG.queue_max_bytes)
+
+    if max(*dest_excess, *queue_excess) <= 0:
+        return None
+
+    if CONFIG.shed_policy == ShedPolicy.REJECT_NEWEST:
+        return f'Message queue for {message.dest} is full.'
+
+    victims = []
+    if max(dest_excess) > 0:
+        victims = select_shed_victims(message, dest_excess, [], f'dest={message.dest}')
+        if victims is None:
+            return f'Message queue for {message.dest} is full.'
+
+        queue_excess = (
+            queue_excess[0] - len(victims),
+            queue_excess[1] - sum(message_size(victim.object) for victim in victims)
+        )
+
+    if max(queue_excess) > 0:
+        more_victims = select_shed_victims(message, queue_excess, [victim.objuuid for victim in victims])
+        if more_victims is None:
+            return 'Message queue is full.'
+        victims.extend(more_victims)
+
+    uncount_messages([victim.object for victim in victims])
+
+    dropped: Dict[str | None, int] = {}
+    for victim in victims:
+        dropped[victim.object.dest] = dropped.get(victim.object.dest, 0) + 1
+        victim.destroy()
+
+    for dest, count in dropped.items():
+        logging.warning('Message queue full, dropped %d messages for %s', count, dest)
+        count_shed(dest, dropped=count)
+
+    return None
+
+
+def reject_ticket(message: NetworkMessage, error: str) -> None:
+    """Service a ticket request on behalf of the requester with an error response.
+
+    Args:
+        message: The rejected ticket request.
+        error: Why the ticket request was rejected.
+    """
+    ticket = NetworkTicket.model_validate(message.model_dump())
+    ticket.type = NetworkMessageType.TICKET_RESPONSE
+    ticket.src, ticket.dest = ticket.dest, ticket.src
+    ticket.msguuid = None
+    ticket.error = error
+    push_network_message(ticket)
+
+
+def reject_multicast(message: NetworkMessage, error: str) -> None:
+    """Answer a multicast request on behalf of its destinations with error results.
+
+    Args:
+        message: The rejected multicast request.
+        error: Why the multicast request was rejected.
+    """
+    request = MulticastRequest.model_validate(message.model_dump())
+    push_network_message(
+        MulticastResponse(
+            dest=request.src,
+            mcuuid=request.mcuuid,
+            results=[MulticastResult(agtuuid=dst, form=request.form, error=error) for dst in request.dsts]
+        )
+    )
+
+
+def reject_request(message: NetworkMessage, error: str) -> None:
+    """Answer a rejected ticket or multicast request with an error response.
+
+    Args:
+        message: The rejected request.
+        error: Why the request was rejected.
+    """
+    if message.type == NetworkMessageType.TICKET_REQUEST:
+        reject_ticket(message, error)
+    elif message.type == NetworkMessageType.MULTICAST_REQUEST:
+        reject_multicast(message, error)
+
 
 def push_network_message(message: NetworkMessage) -> None:
     """Add a message to the in-memory message queue.
 
     Stores a network message in the message queue for later delivery or polling.
-    Messages are kept in memory until delivered or expired.
+    Messages are kept in memory until delivered or expired. Messages are
+    assigned a msguuid and a priority class, and tickets their form type, the
+    first time they are queued and keep them when they are requeued or forwarded.
+    Their size is measured whenever they are queued, stored with them, and
+    added to the counts of queued messages the queue quotas are checked against.
+    A message requeued while still queued replaces its queued copy in the counts.
+
+    When the queue is full, load is shed according to the shed policy. A
+    rejected ticket or multicast request is answered with an error response; other
+    rejected messages are discarded.
 
     Args:
         message: The network message to queue.
     """
     messages = Collection[NetworkMessage]('messages')
     logging.debug(message.type)
-    messages.upsert_object(message)
+    if message.msguuid is None:
+        message.msguuid = get_uuid_str()
+    if message.form_type is None:
+        message.form_type = message_form_type(message)
+    if message.priority is None:
+        message.priority = message_priority(message)
+    message.size = None
+    message.size = message_size(message)
+
+    if error := shed_network_messages(message):
+        logging.warning('Rejecting %s for %s: %s', message.type, message.dest, error)
+        count_shed(message.dest, rejected=1)
+        reject_request(message, error)
+        return
+
+    if messages.insert_object(message) is None:
+        # Requeued while still queued, so the replaced message stops being counted
+        replaced = messages.get_object(message.objuuid).object
+        messages.upsert_object(message)
+        count_queued(replaced.dest, -1, -(replaced.size or 0))
+    count_queued(message.dest, 1, message.size)
+    touch_queue_signals(message.dest)
+
+
+def queue_signal_path(agtuuid: str) -> str:
+    """Return the path of the signal that wakes the long polls of a polling agent."""
+    return keyed_signal_path(QUEUE_SIGNAL_PATH, agtuuid)
 
 
-def pull_network_messages(message: NetworkMessagesRequest) -> List[NetworkMessage]:
-    """Retrieve all messages destined for an agent and messages routed through it.
+def touch_queue_signals(dest: str | None) -> None:
+    """Wake the long polls of the agents that poll for a destination's messages.
+
+    These are the destination itself and its lowest weight gateway, the agents
+    whose polled_destinations() include the destination. A poller that becomes
+    a destination's gateway after its messages were queued collects them on its
+    next poll.
+
+    Args:
+        dest: UUID of the destination the message was queued for, or None.
+    """
+    if dest is None:
+        return
+
+    touch_signal(queue_signal_path(dest))
+    for gtwuuid in equal_cost_gateways(f'agtuuid={dest}').get(dest, [])[:1]:
+        touch_signal(queue_signal_path(gtwuuid))
+
+
+
+def get_queue_stats() -> List[QueueStats]:
+    """Return the message queue usage and shedding counters per destination.
+
+    Returns:
+        A list of QueueStats objects for destinations with queued or shed messages.
+    """
+    usage    = Collection[NetworkMessage]('messages').measure('dest')
+    counters = get_shed_counters()
+
+    stats = {}
+    for dest, (count, size) in usage.items():
+        dest = None if dest == 'None' else dest
+        stats[dest] = QueueStats(dest=dest, messages=count, size=size)
+
+    for dest, counter in counters.items():
+        stats.setdefault(dest, QueueStats(dest=dest))
+        stats[dest].dropped  = counter.dropped
+        stats[dest].rejected = counter.rejected
+
+    return list(stats.values())
+
+
+def polled_destinations(agtuuid: str) -> List[str]:
+    """Return the destinations whose messages an agent polls for.
+
+    Args:
+        agtuuid: The UUID of the polling agent.
+
+    Returns:
+        The polling agent's UUID followed by the UUIDs of the agents that route
+        through it as a gateway.
+    """
+    agtuuids = [agtuuid]
+    for dest, gtwuuid in best_gateways().items():
+        if gtwuuid == agtuuid:
+            agtuuids.append(dest)
+    return agtuuids
+
+
+def pull_network_messages(
+    message: NetworkMessagesRequest,
+    limit: int,
+    max_bytes: int,
+    dests: List[str] | None = None
+) -> List[NetworkMessage]:
+    """Retrieve messages destined for an agent and messages routed through it.
 
     Returns messages destined for the specified agent as well as messages destined
     for other agents that route through this agent as a gateway. Useful for
     determining which messages should be processed locally vs. forwarded.
 
+    The limits are shared evenly across the destinations so one backlog cannot
+    use up the whole request, and are applied by the queries popping the
+    messages, so messages that do not fit stay queued. The destinations take
+    their shares in random order, and whatever a destination leaves of its share
+    is shared by the destinations after it. The first message of a destination
+    is popped even if it exceeds the destination's share of bytes, so an
+    oversized message cannot get stuck in the queue.
+
     Args:
         message: The network message request containing the agent UUID.
+        limit: The maximum number of messages to retrieve.
+        max_bytes: The maximum number of bytes of messages to retrieve.
+        dests: The destinations polled for, from polled_destinations(), or None to look them up.
 
     Returns:
         A list of NetworkMessage objects destined for or routing through the agent.
     """
-    # Find the best gateway for each destination
-    gateway_map = {}
-    for route in Collection[Route]('routes').find():
-        if route.object.agtuuid in gateway_map:
-            if gateway_map[route.object.agtuuid]['weight'] > route.object.weight:
-                gateway_map[route.object.agtuuid] = {
-                    'weight':  route.object.weight,
-                    'gtwuuid': route.object.gtwuuid
-                }
-        else:
-            gateway_map[route.object.agtuuid] = {
-                'weight':  route.object.weight,
-                'gtwuuid': route.object.gtwuuid
-            }
-
-    # Get all the agent ids that route through 'agtuuid' as a gateway
-    # and include 'agtuuid'
-    agtuuids = [message.isrc]
-    for k, v in gateway_map.items():
-        if v['gtwuuid'] == message.isrc:
-            agtuuids.append(k)
-
-    # Get all messages for the agent and messages routing through it as a gateway
+    agtuuids = list(dests) if dests is not None else polled_destinations(message.isrc)
+    shuffle(agtuuids)
+
     network_messages: List[NetworkMessage] = []
-    for agtuuid in agtuuids:
-        network_messages.extend(
-            pop_network_messages(dest=agtuuid, limit=message.limit))
-        if message.limit and len(network_messages) >= message.limit:
+    for count, agtuuid in enumerate(agtuuids):
+        if limit < 1 or max_bytes < 1:
             break
 
-    return network_messages
+        popped = pop_network_messages(
+            *whitelist_params(message),
+            dest=agtuuid,
+            limit=ceil(limit / (len(agtuuids) - count)),
+            max_bytes=ceil(max_bytes / (len(agtuuids) - count))
+        )
 
+        limit     -= len(popped)
+        max_bytes -= sum(message_size(network_message) for network_message in popped)
+        network_messages.extend(popped)
 
-def filter_network_messages(
-    message: NetworkMessagesRequest,
-    network_messages: List[NetworkMessage]
-) -> List[NetworkMessage]:
+    return fair_order(network_messages)
+
+
+def pending_network_messages(message: NetworkMessagesRequest, dests: List[str] | None = None) -> bool:
+    """Check whether messages for an agent or routed through it are still queued.
+
+    Args:
+        message: The network message request containing the agent UUID.
+        dests: The destinations polled for, from polled_destinations(), or None to look them up.
+
+    Returns:
+        True if messages for the agent or its subtree are queued.
     """
-    Filter network messages based on the provided whitelists in the request.
+    messages = Collection[NetworkMessage]('messages')
+    return any(
+        messages.find_objuuids(*whitelist_params(message), dest=agtuuid, limit=1)
+        for agtuuid in (dests if dests is not None else polled_destinations(message.isrc))
+    )
+
+
+def index_values(values: List[UpperCaseStrEnum]) -> str:
+    """Join enum members into the subject of a $oneof query on an indexed attribute.
+
+    Messages queued by push_network_message are indexed by the members' names,
+    while messages indexed when an attribute is added to an existing queue are
+    indexed by the members' values, so both are matched.
+
+    Args:
+        values: The enum members to match.
+
+    Returns:
+        The comma separated names and values of the members.
+    """
+    return ','.join(f'{value},{value.value}' for value in values)
+
+
+def whitelist_params(message: NetworkMessagesRequest) -> List[str]:
+    """Return the query parameters selecting the queued messages a request's network whitelist allows.
 
     Args:
         message: The network message request containing whitelists.
-        network_messages: The list of network messages to filter.
 
     Returns:
-        A list of NetworkMessage objects that pass the whitelists.
+        A list of query parameter strings, empty if the request has no network whitelist.
     """
-    # Apply network message whitelist if provided in the request.
     if whitelist := message.network_whitelist:
-        logging.debug('Applying network message whitelist: %s', whitelist)
-        filtered_messages = []
+        return [f'type=$oneof:{index_values(whitelist)}']
+    return []
 
-        for msg in network_messages:
-            if msg.type in whitelist:
-                filtered_messages.append(msg)
-                continue
 
-            logging.debug('Dropping network message: %s', msg.type)
+def drop_network_message(message: NetworkMessage, error: str) -> None:
+    """Drop a message a whitelist does not allow, rejecting ticket and multicast requests.
+
+    Args:
+        message: The dropped message.
+        error: Why the message was dropped.
+    """
+    logging.debug('Dropping %s: %s', message.type, error)
+    reject_request(message, error)
+
 
-            if msg.type == NetworkMessageType.TICKET_REQUEST:
-                # Service the ticket on behalf of the requester with an error response.
-                ticket = NetworkTicket.model_validate(msg.model_dump())
-                ticket.type = NetworkMessageType.TICKET_RESPONSE
-                ticket.src, ticket.dest = ticket.dest, ticket.src
-                ticket.error = f"Network message type '{msg.type}' is not allowed by whitelist."
-                push_network_message(ticket)
+def reject_network_messages(message: NetworkMessagesRequest, dests: List[str] | None = None) -> None:
+    """Remove the queued messages for a polling agent and its subtree that its whitelists do not allow.
 
-        network_messages = filtered_messages
+    The messages are selected by their indexed type and form type, so allowed
+    messages are left queued and rejected messages are not revalidated as
+    tickets to be filtered.
+
+    Args:
+        message: The network message request containing agent UUID and whitelists.
+        dests: The destinations polled for, from polled_destinations(), or None to look them up.
+    """
+    if dests is None:
+        dests = polled_destinations(message.isrc)
+    dests = f'dest=$oneof:{",".join(dests)}'
+
+    if whitelist := message.network_whitelist:
+        logging.debug('Applying network message whitelist: %s', whitelist)
+        for msg in pop_queued_messages(dests, f'type=$!oneof:{index_values(whitelist)}'):
+            drop_network_message(msg, f"Network message type '{msg.type}' is not allowed by whitelist.")
 
-    # Apply control form whitelist if provided in the request.
-    # For any ticket request messages, check if the form type is in the whitelist.
-    # If not, respond with an error and drop the message.
     if whitelist := message.control_whitelist:
         logging.debug('Applying control form whitelist: %s', whitelist)
-        filtered_messages = []
+        for msg in pop_queued_messages(
+            dests,
+            f'type=$oneof:{index_values(REQUEST_TYPES)}',
+            f'form_type=$!oneof:{index_values(whitelist)}',
+            'form_type=$!eq:None'
+        ):
+            drop_network_message(msg, f"Control form type '{msg.form_type}' is not allowed by whitelist.")
+
+
+def filter_network_messages(
+    message: NetworkMessagesRequest,
+    network_messages: List[NetworkMessage]
+) -> List[NetworkMessage]:
+    """
+    Filter network messages based on the provided whitelists in the request.
 
-        for msg in network_messages:
-            match msg.type:
-                case NetworkMessageType.TICKET_REQUEST:
-                    ticket = NetworkTicket.model_validate(msg.model_dump())
-                    if ticket.form.type not in whitelist:
-                        logging.debug('Dropping control form: %s', ticket.form.type)
+    Only the messages' type and form_type headers are inspected, so messages
+    are not revalidated as tickets to be filtered.
 
-                        # Service the ticket on behalf of the requester with an error response.
-                        ticket.type = NetworkMessageType.TICKET_RESPONSE
-                        ticket.src, ticket.dest = ticket.dest, ticket.src
-                        ticket.error = f"Control form type '{ticket.form.type}' is not allowed by whitelist."
-                        push_network_message(ticket)
-                        continue
+    Args:
+        message: The network message request containing whitelists.
+        network_messages: The list of network messages to filter.
 
-            filtered_messages.append(msg)
+    Returns:
+        A list of NetworkMessage objects that pass the whitelists.
+    """
+    filtered_messages = []
+    for msg in network_messages:
+        # Apply network message whitelist if provided in the request.
+        if message.network_whitelist and msg.type not in message.network_whitelist:
+            drop_network_message(msg, f"Network message type '{msg.type}' is not allowed by whitelist.")
+            continue
+
+        # Apply control form whitelist to ticket and multicast requests if provided in the request.
+        if message.control_whitelist and msg.type in REQUEST_TYPES:
+            form_type = message_form_type(msg)
+            if form_type not in message.control_whitelist:
+                drop_network_message(msg, f"Control form type '{form_type}' is not allowed by whitelist.")
+                continue
 
-        network_messages = filtered_messages
+        filtered_messages.append(msg)
 
-    return network_messages
+    return filtered_messages
 
 
-def pull_filtered_network_messages(message: NetworkMessagesRequest) -> List[NetworkMessage]:
+def pull_filtered_network_messages(
+    message: NetworkMessagesRequest,
+    dests: List[str] | None = None
+) -> List[NetworkMessage]:
     """
     Retrieve and filter network messages based on the provided request.
 
     This function combines the retrieval of network messages for the specified
     agent and applies filtering based on the whitelists provided in the request.
+    Messages the whitelists do not allow are rejected before any are
+    retrieved, and only messages of the whitelisted types are retrieved. At
+    most the request's limit and max_bytes are retrieved, capped by
+    poll_max_messages and poll_max_bytes. The destinations polled for are
+    looked up once and shared by the queries.
 
     Args:
-        message: The network message request containing agent UUID and whitelists.
+        message: The network message request containing agent UUID, limits, and whitelists.
+        dests: The destinations polled for, from polled_destinations(), or None to look them up.
 
     Returns:
         A list of NetworkMessage objects that are both retrieved and filtered.
     """
+    limit     = min(message.limit or CONFIG.poll_max_messages, CONFIG.poll_max_messages)
+    max_bytes = min(message.max_bytes or CONFIG.poll_max_bytes, CONFIG.poll_max_bytes)
+    if dests is None:
+        dests = polled_destinations(message.isrc)
+
+    reject_network_messages(message, dests)
+
     filtered_network_messages = []
-    while network_messages := pull_network_messages(message):
-        filtered_network_messages.extend(filter_network_messages(message, network_messages))
-        if message.limit and len(filtered_network_messages) >= message.limit:
+    while limit > 0 and max_bytes > 0:
+        network_messages = pull_network_messages(message, limit, max_bytes, dests)
+        if not network_messages:
             break
+
+        limit     -= len(network_messages)
+        max_bytes -= sum(message_size(network_message) for network_message in network_messages)
+        filtered_network_messages.extend(filter_network_messages(message, network_messages))
     return filtered_network_messages
 
 
-def pop_network_messages(**kwargs) -> List[NetworkMessage]:
+async def wait_network_messages(
+    message: NetworkMessagesRequest,
+    timeout_secs: float,
+    dests: List[str] | None = None
+) -> List[NetworkMessage]:
+    """Retrieve and filter network messages, waiting for them if none are queued.
+
+    When there are no messages for the requesting agent or its subtree, waits
+    until a message is queued or the timeout elapses. Waiting checks the
+    requesting agent's queue signal rather than the message queue, so an idle
+    wait does not query the queue and is only woken by messages it polls for.
+    Messages are pulled in a thread rather than on the event loop.
+
+    Args:
+        message: The network message request containing agent UUID and whitelists.
+        timeout_secs: Seconds to wait for messages.
+        dests: The destinations polled for, from polled_destinations(), or None to look them up.
+
+    Returns:
+        A list of NetworkMessage objects, empty if none were queued before the timeout.
+    """
+    deadline = time() + timeout_secs
+    path     = queue_signal_path(message.isrc)
+    while True:
+        signal = read_signal(path)
+        network_messages = await asyncio.to_thread(pull_filtered_network_messages, message, dests)
+        if network_messages or time() >= deadline:
+            return network_messages
+
+        await wait_signals({path: signal}, deadline)
+
+
+async def long_poll_network_messages(
+    message: NetworkMessagesRequest,
+    dests: List[str] | None = None
+) -> List[NetworkMessage]:
+    """Retrieve and filter network messages for a long poll.
+
+    When there are no messages for the requesting agent or its subtree, the
+    request is held open until a message is queued or the request's wait_secs
+    (at most long_poll_secs) elapses.
+
+    Args:
+        message: The network message request containing agent UUID, whitelists, and wait_secs.
+        dests: The destinations polled for, from polled_destinations(), or None to look them up.
+
+    Returns:
+        A list of NetworkMessage objects, empty if none were queued before the wait elapsed.
+    """
+    return await wait_network_messages(message, min(message.wait_secs or 0, CONFIG.long_poll_secs), dests)
+
+
+def pop_network_messages(*args, **kwargs) -> List[NetworkMessage]:
     """Remove and return messages matching the specified criteria.
 
     Retrieves all messages matching the filter criteria and removes them from
     the message queue. Common criteria include 'dest' for destination agent UUID.
+    Messages are returned in priority class order, oldest first within a class,
+    unless another order_by is given.
 
     Args:
+        *args: Query parameter strings (e.g., 'dest=$!eq:agent-uuid').
         **kwargs: Query parameters to filter messages (e.g., dest='agent-uuid').
 
     Returns:
         A list of NetworkMessage objects matching the criteria.
     """
-    return [message.object for message in Collection[NetworkMessage]('messages').pop(**kwargs)]
+    kwargs.setdefault('order_by', MESSAGE_ORDER)
+    return pop_queued_messages(*args, **kwargs)
+
+
+def pop_replayable_messages() -> List[NetworkMessage]:
+    """Remove and return the queued messages to replay this second.
+
+    Messages for destinations that cannot currently be delivered to are left
+    in the queue, and at most retry_budget messages are returned.
+
+    Returns:
+        A list of NetworkMessage objects in delivery order.
+    """
+    params = ['dest=$!eq:None']
+    if undeliverable := undeliverable_destinations():
+        params.append(f'dest=$!oneof:{",".join(undeliverable)}')
+    return fair_order(pop_network_messages(*params, limit=CONFIG.retry_budget))
 
 
 def forward_network_message(message: NetworkMessage) -> None:
     """Forward a message to its destination via direct delivery or gateway routing.
 
-    Attempts to deliver a message to its destination agent. First tries direct
-    delivery to a peer with the destination's UUID. If no direct peer is available,
-    selects the best gateway based on route weights and forwards through it.
-    If delivery fails and the agent polls for messages, the message is re-queued.
+    Attempts to deliver a message to its next hop: a peer with the destination's
+    UUID if one is available, otherwise the best gateway based on route weights.
+    If there is no next hop, the next hop is backing off after failed deliveries,
+    or the delivery fails, the message is re-queued. The round trip, or failure,
+    is folded into the next hop's link metrics (see stembot.peering.measure_peer),
+    except for round trips that include executing a request (see
+    measures_round_trip()).
 
     Args:
         message: The network message to forward.
     """
-    peers  = Collection[Peer]('peers')
-    routes = Collection[Route]('routes')
-
-    # First try direct delivery to the destination agent
-    # Find a peer that a message and forward it directly.
-    # If the peer is unreachable or polls for messages, push the message back to the queue.
-    for peer in peers.find(agtuuid=message.dest, url="$!eq:None"):
-        try:
-            client = AgentClient(url=peer.object.url)
-
-            acknowledgement = Acknowledgement(
-                **client.send_network_message(message).model_dump()
-            )
-
-            if acknowledgement.error:
-                logging.error(acknowledgement.error)
-        except Exception as exception: # pylint: disable=broad-except
-            logging.error('Failed to send network message to %s: %s', peer.object.url, exception)
-            push_network_message(message)
-        return
+    hop = next_hop(message.dest, flow_key(message))
 
-    # If no direct peer is found, find the best gateway for the destination and forward to the gateway.
-    # The best gateway is the one with the lowest weight route to the destination.
-    weight = None
-    best_gtwuuid = None
-    for route in routes.find(agtuuid=message.dest):
-        if weight is None or float(route.object.weight) < float(weight):
-            weight = route.object.weight
-            best_gtwuuid = route.object.gtwuuid
-
-    # If a gateway is found, forward the message to the gateway.
-    # If the gateway is unreachable or polls for messages, push the message back to the queue.
-    for peer in peers.find(agtuuid=best_gtwuuid, url="$!eq:None"):
-        try:
-            client = AgentClient(url=peer.object.url)
-
-            acknowledgement = Acknowledgement(
-                **client.send_network_message(message).model_dump()
-            )
-
-            if acknowledgement.error:
-                logging.error(acknowledgement.error)
-        except Exception as exception: # pylint: disable=broad-except
-            logging.error('Failed to send network message to %s: %s', peer.object.url, exception)
-            push_network_message(message)
+    if hop is None or not acquire_hop(hop.agtuuid):
+        push_network_message(message)
         return
 
-    push_network_message(message)
+    bulk = (message_priority(message) if message.priority is None else message.priority) == MessagePriority.BULK
+
+    try:
+        client = AgentClient(url=hop.url)
+
+        start = perf_counter()
+        acknowledgement = Acknowledgement(
+            **client.send_network_message(message).model_dump()
+        )
+        if measures_round_trip(message, hop):
+            measure_peer(hop, perf_counter() - start, client.transferred_bytes if bulk else 0)
+
+        record_success(hop.agtuuid)
+
+        if acknowledgement.error:
+            logging.error(acknowledgement.error)
+    except Exception as exception: # pylint: disable=broad-except
+        logging.error('Failed to send network message to %s: %s', hop.url, exception)
+        record_failure(hop.agtuuid, str(exception))
+        measure_peer(hop, None)
+        push_network_message(message)
+
+
+def measures_round_trip(message: NetworkMessage, hop: Peer) -> bool:
+    """Check whether the round trip of a delivery samples the link to the next hop.
+
+    A ticket or multicast request delivered to its destination is executed
+    before it is acknowledged, so its round trip measures the request rather
+    than the link. Messages the next hop forwards or processes in passing, such
+    as pings and advertisements, are acknowledged without executing anything.
+
+    Args:
+        message: The delivered message.
+        hop: The next hop it was delivered to.
+
+    Returns:
+        True if the round trip is a sample of the link's round trip time or throughput.
+    """
+    return message.dest != hop.agtuuid or message.type not in REQUEST_TYPES
+
+
+def undelivered_reason(message: NetworkMessage) -> tuple[str, str | None]:
+    """Explain why a queued message has not been delivered.
+
+    Args:
+        message: The undelivered network message.
+
+    Returns:
+        Tuple of (reason, next hop agent UUID or None).
+    """
+    hop = next_hop(message.dest, flow_key(message))
+    if hop is None:
+        return f'No next hop to {message.dest}', None
+
+    if health := get_hop_health(hop.agtuuid):
+        return (
+            f'Next hop {hop.agtuuid} {health.state} after {health.failures} failed deliveries: {health.error}',
+            hop.agtuuid
+        )
+
+    return f'Message timed out waiting for next hop {hop.agtuuid}', hop.agtuuid
 
 
 @scheduled(every_secs=CONFIG.message_timeout_secs)
 def expire_network_messages() -> None:
-    """Remove messages that have exceeded the configured timeout period.
+    """Dead letter messages that have exceeded the configured timeout period.
 
-    Scans the message queue for messages older than message_timeout_secs
-    and removes them. Prevents old messages from accumulating indefinitely.
+    Scans the message queue for messages older than message_timeout_secs,
+    removes them, and keeps them as dead letters with the reason they could
+    not be delivered. Prevents old messages from accumulating indefinitely.
     """
-    messages = Collection[NetworkMessage]('messages')
-    for message in messages.pop(timestamp=f'$lt:{time()-CONFIG.message_timeout_secs}'):
-        logging.warning(message.object.type)
-        logging.debug(message.object)
+    for message in pop_queued_messages(timestamp=f'$lt:{time()-CONFIG.message_timeout_secs}'):
+        reason, hop = undelivered_reason(message)
+        dead_letter(message, reason, hop)
 
 
 @scheduled(every_secs=60)
@@ -265,11 +986,23 @@ def vacuum_network_messages() -> None:
 
     Performs a vacuum operation on the message collection to reclaim space
     from deleted messages and optimize query performance. Should be run
-    periodically to maintain efficient storage of messages.
+    periodically to maintain efficient storage of messages. The counts of
+    queued messages are reset to the measured usage of the queue, correcting
+    any drift from messages queued or removed while the counts were updated.
     """
-    Collection[NetworkMessage]('messages').vacuum()
+    messages = Collection[NetworkMessage]('messages')
+    messages.vacuum()
+    reset_queue_usage({
+        None if dest == 'None' else dest: usage for dest, usage in messages.measure('dest').items()
+    })
+
 
+# Indexed attributes of the collections this module owns, keyed by collection name
+INDEXED_ATTRIBUTES = {
+    'messages': (NetworkMessage, ('dest', 'timestamp', 'priority', 'type', 'form_type', 'size')),
+}
 
-collection = Collection[NetworkMessage]('messages')
-collection.create_attribute('dest', "/dest")
-collection.create_attribute('timestamp', "/timestamp")
+for name, (model, attributes) in INDEXED_ATTRIBUTES.items():
+    collection = Collection[model](name)
+    for attribute in attributes:
+        collection.create_attribute(attribute, f'/{attribute}')
@@ -7,14 +7,18 @@ from pathlib import Path
 
 from typing import Annotated
 
-from pydantic import AfterValidator, AnyUrl, BaseModel, Field, IPvAnyAddress, PositiveInt
+from pydantic import AfterValidator, AnyUrl, BaseModel, Field, IPvAnyAddress, NonNegativeInt, PositiveInt
 from pydantic_extra_types.domain import DomainStr
 
 from stembot.dao import kvstore
 from stembot.dao.utils import get_uuid_str
+from stembot.enums import RoutingMode, ShedPolicy
 
 CONFIG = None
 
+# Encryption key of an agent that was never given a secret
+DEFAULT_KEY = hashlib.sha256(b'changeme').digest()[:32]
+
 
 class LogLevel(IntEnum):
     """Log level enum mapping to standard logging module constants."""
@@ -84,8 +88,41 @@ class Config(BaseModel):
         peer_timeout_secs: Seconds before an unresponsive peer is considered dead (default: 60).
         peer_refresh_secs: Seconds between peer refresh cycles (default: 30).
         max_weight: Maximum weight value for routes in routing decisions (default: 600).
+        advert_refresh_secs: Seconds between full route tables advertised to a peer that acknowledges
+                             advertisements (default: 300). Only changed routes are advertised in between.
+        hold_down_secs: Seconds a destination whose last route was lost only accepts routes at or below the lost
+                        route's weight (default: 10, 0 disables hold downs).
+        routing_mode: DISTANCE_VECTOR to advertise route tables to peers, or LINK_STATE to flood signed link
+                      state records and route along latency weighted shortest paths (default: DISTANCE_VECTOR).
+                      Every agent in a network must use the same mode.
         ticket_timeout_secs: Seconds before a ticket is considered expired (default: 600).
         message_timeout_secs: Seconds before a pending message is discarded (default: 600).
+        framed_wire: Send requests as frames with raw binary payloads instead of JSON text
+                     (default: False). Only enable when every peer understands frames.
+        retry_backoff_secs: Delay before retrying a next hop after its first failed delivery,
+                            doubling with each further failure (default: 1).
+        retry_backoff_max_secs: Maximum delay between retries of a failing next hop (default: 300).
+        breaker_threshold: Consecutive failed deliveries that open a next hop's circuit breaker
+                           (default: 5). An open breaker lets one probe delivery through per retry.
+        retry_budget: Maximum queued messages replayed per second (default: 100).
+        dead_letter_secs: Seconds dead letters are kept for inspection (default: 86400).
+        dedup_window_secs: Seconds receipts of messages are kept to drop repeated deliveries (default: 1200).
+                           Should exceed message_timeout_secs so requeued messages are recognized.
+        queue_max_messages: Maximum messages held in the message queue (default: 10000).
+        queue_max_bytes: Maximum bytes held in the message queue (default: 256 MiB).
+        dest_max_messages: Maximum messages held in the message queue for one destination (default: 1000).
+        dest_max_bytes: Maximum bytes held in the message queue for one destination (default: 64 MiB).
+        shed_policy: How a full message queue sheds load (default: DROP_OLDEST). Rejected
+                     ticket requests are answered with an error ticket response.
+        long_poll_secs: Seconds a messages request from a polling agent is held open waiting for
+                        messages (default: 20, 0 disables long polling). Must stay below the 60 second
+                        client read timeout and the peer timeout.
+        polling_channel: Poll peers over a persistent channel that streams messages as they are queued
+                         instead of with separate requests (default: False).
+        channel_window: Maximum messages per channel record and polled messages being routed at a time
+                        (default: 100).
+        poll_max_messages: Maximum messages returned to a polling agent per response (default: 1000).
+        poll_max_bytes: Maximum bytes of messages returned to a polling agent per response (default: 16 MiB).
 
     Example:
         The Config is automatically loaded on import:
@@ -93,35 +130,75 @@ class Config(BaseModel):
             print(CONFIG.agtuuid)
             print(CONFIG.socket_host)
     """
-    agtuuid:              Annotated[str, AfterValidator(validate_1_to_36_chars)]    = Field()
-    workers:              PositiveInt                                               = Field(default=2)
-    socket_host:          Annotated[IPvAnyAddress | DomainStr, AfterValidator(str)] = Field()
-    socket_port:          PositiveInt                                               = Field()
-    key:                  Annotated[bytes, AfterValidator(validate_32_bytes)]       = Field()
-    client_control_url:   Annotated[AnyUrl, AfterValidator(str)]                    = Field()
-    log_path:             Annotated[str, AfterValidator(touch_log_dir)]             = Field()
-    log_level_app:        LogLevel                                                  = Field(default=LogLevel.INFO)
-    log_level_api:        LogLevel                                                  = Field(default=LogLevel.WARNING)
-    peer_timeout_secs:    PositiveInt                                               = Field(default=60)
-    peer_refresh_secs:    PositiveInt                                               = Field(default=30)
-    max_weight:           PositiveInt                                               = Field(default=600)
-    ticket_timeout_secs:  PositiveInt                                               = Field(default=600)
-    message_timeout_secs: PositiveInt                                               = Field(default=600)
+    agtuuid:                Annotated[str, AfterValidator(validate_1_to_36_chars)]    = Field()
+    workers:                PositiveInt                                               = Field(default=2)
+    socket_host:            Annotated[IPvAnyAddress | DomainStr, AfterValidator(str)] = Field()
+    socket_port:            PositiveInt                                               = Field()
+    key:                    Annotated[bytes, AfterValidator(validate_32_bytes)]       = Field()
+    client_control_url:     Annotated[AnyUrl, AfterValidator(str)]                    = Field()
+    log_path:               Annotated[str, AfterValidator(touch_log_dir)]             = Field()
+    log_level_app:          LogLevel                                                  = Field(default=LogLevel.INFO)
+    log_level_api:          LogLevel                                                  = Field(default=LogLevel.WARNING)
+    peer_timeout_secs:      PositiveInt                                               = Field(default=60)
+    peer_refresh_secs:      PositiveInt                                               = Field(default=30)
+    max_weight:             PositiveInt                                               = Field(default=600)
+    advert_refresh_secs:    PositiveInt                                               = Field(default=300)
+    hold_down_secs:         NonNegativeInt                                            = Field(default=10)
+    routing_mode:           RoutingMode                                               = Field(default='distance_vector')
+    ticket_timeout_secs:    PositiveInt                                               = Field(default=600)
+    message_timeout_secs:   PositiveInt                                               = Field(default=600)
+    framed_wire:            bool                                                      = Field(default=False)
+    retry_backoff_secs:     PositiveInt                                               = Field(default=1)
+    retry_backoff_max_secs: PositiveInt                                               = Field(default=300)
+    breaker_threshold:      PositiveInt                                               = Field(default=5)
+    retry_budget:           PositiveInt                                               = Field(default=100)
+    dead_letter_secs:       PositiveInt                                               = Field(default=86400)
+    dedup_window_secs:      PositiveInt                                               = Field(default=1200)
+    queue_max_messages:     PositiveInt                                               = Field(default=10000)
+    queue_max_bytes:        PositiveInt                                               = Field(default=268435456)
+    dest_max_messages:      PositiveInt                                               = Field(default=1000)
+    dest_max_bytes:         PositiveInt                                               = Field(default=67108864)
+    shed_policy:            ShedPolicy                                                = Field(default='drop_oldest')
+    long_poll_secs:         NonNegativeInt                                            = Field(default=20, lt=60)
+    polling_channel:        bool                                                      = Field(default=False)
+    channel_window:         PositiveInt                                               = Field(default=100)
+    poll_max_messages:      PositiveInt                                               = Field(default=1000)
+    poll_max_bytes:         PositiveInt                                               = Field(default=16777216)
 
 
 def load_config():
     """Load configuration settings from the key-value store and return a Config instance."""
     global CONFIG # pylint: disable=global-statement
     CONFIG = Config(
-        agtuuid            = kvstore.get(name='agtuuid',            default=get_uuid_str()),
-        socket_host        = kvstore.get(name='socket_host',        default='0.0.0.0'),
-        socket_port        = kvstore.get(name='socket_port',        default=8080),
-        key                = kvstore.get(name='secret_digest',      default=hashlib.sha256(b'changeme').digest()[:32]),
-        client_control_url = kvstore.get(name='client_control_url', default='http://localhost:8080'),
-        log_path           = kvstore.get(name='log_path',           default='~/.stembot/logs'),
-        log_level_app      = kvstore.get(name='log_level_app',      default=LogLevel.INFO),
-        log_level_api      = kvstore.get(name='log_level_api',      default=LogLevel.WARNING),
-        workers            = kvstore.get(name='workers',            default=2)
+        agtuuid                = kvstore.get(name='agtuuid',                default=get_uuid_str()),
+        socket_host            = kvstore.get(name='socket_host',            default='0.0.0.0'),
+        socket_port            = kvstore.get(name='socket_port',            default=8080),
+        key                    = kvstore.get(name='secret_digest',          default=DEFAULT_KEY),
+        client_control_url     = kvstore.get(name='client_control_url',     default='http://localhost:8080'),
+        log_path               = kvstore.get(name='log_path',               default='~/.stembot/logs'),
+        log_level_app          = kvstore.get(name='log_level_app',          default=LogLevel.INFO),
+        log_level_api          = kvstore.get(name='log_level_api',          default=LogLevel.WARNING),
+        workers                = kvstore.get(name='workers',                default=2),
+        framed_wire            = kvstore.get(name='framed_wire',            default=False),
+        retry_backoff_secs     = kvstore.get(name='retry_backoff_secs',     default=1),
+        retry_backoff_max_secs = kvstore.get(name='retry_backoff_max_secs', default=300),
+        breaker_threshold      = kvstore.get(name='breaker_threshold',      default=5),
+        retry_budget           = kvstore.get(name='retry_budget',           default=100),
+        dead_letter_secs       = kvstore.get(name='dead_letter_secs',       default=86400),
+        dedup_window_secs      = kvstore.get(name='dedup_window_secs',      default=1200),
+        queue_max_messages     = kvstore.get(name='queue_max_messages',     default=10000),
+        queue_max_bytes        = kvstore.get(name='queue_max_bytes',        default=268435456),
+        dest_max_messages      = kvstore.get(name='dest_max_messages',      default=1000),
+        dest_max_bytes         = kvstore.get(name='dest_max_bytes',         default=67108864),
+        shed_policy            = kvstore.get(name='shed_policy',            default=ShedPolicy.DROP_OLDEST),
+        routing_mode           = kvstore.get(name='routing_mode',           default=RoutingMode.DISTANCE_VECTOR),
+        advert_refresh_secs    = kvstore.get(name='advert_refresh_secs',    default=300),
+        hold_down_secs         = kvstore.get(name='hold_down_secs',         default=10),
+        long_poll_secs         = kvstore.get(name='long_poll_secs',         default=20),
+        polling_channel        = kvstore.get(name='polling_channel',        default=False),
+        channel_window         = kvstore.get(name='channel_window',         default=100),
+        poll_max_messages      = kvstore.get(name='poll_max_messages',      default=1000),
+        poll_max_bytes         = kvstore.get(name='poll_max_bytes',         default=16777216)
     )
 
 
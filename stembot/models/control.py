@@ -3,11 +3,13 @@ from time import time
 from typing import List, Literal, Union
 from typing_extensions import Annotated
 
-from pydantic import AfterValidator, BaseModel, Field, HttpUrl, PositiveFloat, PositiveInt, StrictBool, ConfigDict
+from pydantic import AfterValidator, BaseModel, Field, HttpUrl, NonNegativeInt, PositiveFloat, PositiveInt, StrictBool
+from pydantic import ConfigDict, NonNegativeFloat
 
 from stembot.dao.utils import get_uuid_str
-from stembot.enums import ControlFormType
+from stembot.enums import ControlFormType, DigestType, FileCodec
 from stembot.models.config import CONFIG
+from stembot.models.delivery import DeadLetter, QueueStats
 from stembot.models.routing import Peer, Route
 
 
@@ -43,14 +45,22 @@ class LoadFile(ControlForm):
         error: Optional error message if the load operation failed.
         size: The size of the file in bytes.
         md5sum: MD5 checksum of the file for integrity verification.
+        codec: Codec to compress the content with (None lets the agent choose, set in response).
+        codecs: Codecs the destination can decompress, chosen from when no codec is set (None for zlib or none).
+        digest_type: Digest algorithm to verify the content with (None for md5sum).
+        digest: Digest of the content when digest_type is set (in response).
         type: Always set to ControlFormType.LOAD_FILE.
     """
-    b64zlib: str | None      = Field(default=None)
-    path:    str             = Field()
-    error:   str | None      = Field(default=None)
-    size:    int | None      = Field(default=None)
-    md5sum:  str | None      = Field(default=None)
-    type:    ControlFormType = Field(default=ControlFormType.LOAD_FILE)
+    b64zlib:     str | None             = Field(default=None)
+    path:        str                    = Field()
+    error:       str | None             = Field(default=None)
+    size:        int | None             = Field(default=None)
+    md5sum:      str | None             = Field(default=None)
+    codec:       FileCodec | None       = Field(default=None)
+    codecs:      List[FileCodec] | None = Field(default=None)
+    digest_type: DigestType | None      = Field(default=None)
+    digest:      str | None             = Field(default=None)
+    type:        ControlFormType        = Field(default=ControlFormType.LOAD_FILE)
 
 
 class WriteFile(ControlForm):
@@ -65,14 +75,180 @@ class WriteFile(ControlForm):
         error: Optional error message if the write operation failed.
         size: The size of the written file in bytes.
         md5sum: MD5 checksum of the written file for integrity verification.
+        codec: Codec the content is compressed with (None for zlib).
+        digest_type: Digest algorithm to verify the content with (None for md5sum).
+        digest: Expected digest of the content when digest_type is set.
+        atomic: Write to a temporary file and rename it into place once verified.
         type: Always set to ControlFormType.WRITE_FILE.
     """
-    b64zlib: str             = Field()
-    path:    str             = Field()
-    error:   str | None      = Field(default=None)
-    size:    int | None      = Field(default=None)
-    md5sum:  str | None      = Field(default=None)
-    type:    ControlFormType = Field(default=ControlFormType.WRITE_FILE)
+    b64zlib:     str               = Field()
+    path:        str               = Field()
+    error:       str | None        = Field(default=None)
+    size:        int | None        = Field(default=None)
+    md5sum:      str | None        = Field(default=None)
+    codec:       FileCodec | None  = Field(default=None)
+    digest_type: DigestType | None = Field(default=None)
+    digest:      str | None        = Field(default=None)
+    atomic:      bool              = Field(default=False)
+    type:        ControlFormType   = Field(default=ControlFormType.WRITE_FILE)
+
+
+class LoadFileChunk(ControlForm):
+    """Request to load a single chunk of a file from the remote agent.
+
+    Reads up to length bytes starting at offset so large files can be moved
+    in bounded pieces. A zero length request only reports the file size.
+
+    Attributes:
+        b64zlib: Base64-encoded zlib-compressed chunk content (in response).
+        path: The file path on the remote system to load.
+        offset: Byte offset of the chunk within the file.
+        length: Requested chunk length in bytes (actual length in response).
+        error: Optional error message if the load operation failed.
+        size: The total size of the file in bytes.
+        md5sum: MD5 checksum of the chunk for integrity verification.
+        codec: Codec to compress the content with (None lets the agent choose, set in response).
+        codecs: Codecs the destination can decompress, chosen from when no codec is set (None for zlib or none).
+        digest_type: Digest algorithm to verify the content with (None for md5sum).
+        digest: Digest of the content when digest_type is set (in response).
+        type: Always set to ControlFormType.LOAD_FILE_CHUNK.
+    """
+    b64zlib:     str | None             = Field(default=None)
+    path:        str                    = Field()
+    offset:      NonNegativeInt         = Field(default=0)
+    length:      NonNegativeInt         = Field()
+    error:       str | None             = Field(default=None)
+    size:        int | None             = Field(default=None)
+    md5sum:      str | None             = Field(default=None)
+    codec:       FileCodec | None       = Field(default=None)
+    codecs:      List[FileCodec] | None = Field(default=None)
+    digest_type: DigestType | None      = Field(default=None)
+    digest:      str | None             = Field(default=None)
+    type:        ControlFormType        = Field(default=ControlFormType.LOAD_FILE_CHUNK)
+
+
+class WriteFileChunk(ControlForm):
+    """Request to write a single chunk of a file to the remote agent.
+
+    Writes the chunk at offset without disturbing the rest of the file, so
+    chunks may arrive in any order and a transfer can be resumed.
+
+    Attributes:
+        b64zlib: Base64-encoded zlib-compressed chunk content to write.
+        path: The file path on the remote system where to write the chunk.
+        offset: Byte offset of the chunk within the file.
+        length: Length of the uncompressed chunk in bytes.
+        error: Optional error message if the write operation failed.
+        size: The total size of the file in bytes. The file is truncated to this size.
+        md5sum: MD5 checksum of the chunk for integrity verification.
+        codec: Codec the content is compressed with (None for zlib).
+        digest_type: Digest algorithm to verify the content with (None for md5sum).
+        digest: Expected digest of the content when digest_type is set.
+        type: Always set to ControlFormType.WRITE_FILE_CHUNK.
+    """
+    b64zlib:     str               = Field()
+    path:        str               = Field()
+    offset:      NonNegativeInt    = Field(default=0)
+    length:      NonNegativeInt    = Field()
+    error:       str | None        = Field(default=None)
+    size:        int | None        = Field(default=None)
+    md5sum:      str | None        = Field(default=None)
+    codec:       FileCodec | None  = Field(default=None)
+    digest_type: DigestType | None = Field(default=None)
+    digest:      str | None        = Field(default=None)
+    type:        ControlFormType   = Field(default=ControlFormType.WRITE_FILE_CHUNK)
+
+
+class GetFileSignature(ControlForm):
+    """Request the block checksums of a file on the remote agent.
+
+    The first step of a delta transfer. The destination reports a weak and a
+    strong checksum for each block of its existing copy of the file.
+
+    Attributes:
+        path: The file path on the remote system.
+        block_size: Block size in bytes (0 lets the agent choose, set in response).
+        size: The size of the file in bytes.
+        weak: Adler-32 checksum of each block (in response).
+        strong: Truncated BLAKE2b checksum of each block (in response).
+        error: Optional error message if the file could not be read.
+        type: Always set to ControlFormType.GET_FILE_SIGNATURE.
+    """
+    path:       str             = Field()
+    block_size: NonNegativeInt  = Field(default=0)
+    size:       int | None      = Field(default=None)
+    weak:       List[int]       = Field(default=[])
+    strong:     List[str]       = Field(default=[])
+    error:      str | None      = Field(default=None)
+    type:       ControlFormType = Field(default=ControlFormType.GET_FILE_SIGNATURE)
+
+
+class LoadFileDelta(ControlForm):
+    """Request to load a file from the remote agent as a delta.
+
+    The source encodes its file against the destination's block checksums and
+    returns only the data the destination does not already have.
+
+    Attributes:
+        b64zlib: Base64-encoded compressed delta (in response).
+        path: The file path on the remote system to load.
+        block_size: Block size of the destination's signature.
+        weak: The destination's weak block checksums (cleared in response).
+        strong: The destination's strong block checksums (cleared in response).
+        base_size: Size of the destination's file in bytes.
+        error: Optional error message if the load operation failed.
+        size: The size of the file in bytes.
+        md5sum: MD5 checksum of the whole file (if no digest_type is set).
+        codec: Codec to compress the delta with (None lets the agent choose, set in response).
+        codecs: Codecs the destination can decompress, chosen from when no codec is set (None for zlib or none).
+        digest_type: Digest algorithm to verify the file with (None for md5sum).
+        digest: Digest of the whole file when digest_type is set (in response).
+        type: Always set to ControlFormType.LOAD_FILE_DELTA.
+    """
+    b64zlib:     str | None             = Field(default=None)
+    path:        str                    = Field()
+    block_size:  PositiveInt            = Field()
+    weak:        List[int]              = Field(default=[])
+    strong:      List[str]              = Field(default=[])
+    base_size:   NonNegativeInt         = Field(default=0)
+    error:       str | None             = Field(default=None)
+    size:        int | None             = Field(default=None)
+    md5sum:      str | None             = Field(default=None)
+    codec:       FileCodec | None       = Field(default=None)
+    codecs:      List[FileCodec] | None = Field(default=None)
+    digest_type: DigestType | None      = Field(default=None)
+    digest:      str | None             = Field(default=None)
+    type:        ControlFormType        = Field(default=ControlFormType.LOAD_FILE_DELTA)
+
+
+class WriteFileDelta(ControlForm):
+    """Request to rebuild a file on the remote agent from a delta.
+
+    The destination combines blocks of its existing file with the literal data
+    in the delta into a temporary file, verifies it, and renames it into place.
+
+    Attributes:
+        b64zlib: Base64-encoded compressed delta to apply.
+        path: The file path on the remote system to rebuild.
+        block_size: Block size the delta was encoded with.
+        error: Optional error message if the write operation failed.
+        size: The size of the rebuilt file in bytes.
+        md5sum: MD5 checksum of the rebuilt file (if no digest_type is set).
+        codec: Codec the delta is compressed with (None for zlib).
+        digest_type: Digest algorithm to verify the file with (None for md5sum).
+        digest: Expected digest of the rebuilt file when digest_type is set.
+        type: Always set to ControlFormType.WRITE_FILE_DELTA.
+    """
+    b64zlib:     str               = Field()
+    path:        str               = Field()
+    block_size:  PositiveInt       = Field()
+    error:       str | None        = Field(default=None)
+    size:        int | None        = Field(default=None)
+    md5sum:      str | None        = Field(default=None)
+    codec:       FileCodec | None  = Field(default=None)
+    digest_type: DigestType | None = Field(default=None)
+    digest:      str | None        = Field(default=None)
+    type:        ControlFormType   = Field(default=ControlFormType.WRITE_FILE_DELTA)
 
 
 class SyncProcess(ControlForm):
@@ -189,10 +365,52 @@ class GetConfig(ControlForm):
 
     Attributes:
         config: Dictionary of configuration key-value pairs.
+        codecs: Codecs the agent can compress and decompress file payloads with.
         type: Always set to ControlFormType.GET_CONFIG.
     """
-    config: dict | None     = Field(default=None)
-    type:   ControlFormType = Field(default=ControlFormType.GET_CONFIG)
+    config: dict | None            = Field(default=None)
+    codecs: List[FileCodec] | None = Field(default=None)
+    type:   ControlFormType        = Field(default=ControlFormType.GET_CONFIG)
+
+
+class GetDeadLetters(ControlForm):
+    """Request to retrieve messages that expired before they could be delivered.
+
+    Queries the agent for its dead letters, optionally only those for one
+    destination, and optionally removes the returned dead letters.
+
+    Attributes:
+        dest: Only return dead letters for this destination agent (None for all).
+        purge: Remove the returned dead letters from the agent.
+        dead_letters: List of DeadLetter objects.
+        type: Always set to ControlFormType.GET_DEAD_LETTERS.
+    """
+    dest:         str | None       = Field(default=None)
+    purge:        StrictBool       = Field(default=False)
+    dead_letters: List[DeadLetter] = Field(default=[])
+    type:         ControlFormType  = Field(default=ControlFormType.GET_DEAD_LETTERS)
+
+
+class GetQueueStats(ControlForm):
+    """Request to retrieve the message queue usage and shedding counters.
+
+    Queries the agent for the messages and bytes in its message queue and the
+    messages it has shed, in total and per destination.
+
+    Attributes:
+        messages: Messages in the message queue.
+        size: Bytes in the message queue.
+        dropped: Queued messages dropped to make room for newer messages.
+        rejected: New messages rejected because the queue was full.
+        destinations: List of QueueStats objects, one per destination.
+        type: Always set to ControlFormType.GET_QUEUE_STATS.
+    """
+    messages:     NonNegativeInt   = Field(default=0)
+    size:         NonNegativeInt   = Field(default=0)
+    dropped:      NonNegativeInt   = Field(default=0)
+    rejected:     NonNegativeInt   = Field(default=0)
+    destinations: List[QueueStats] = Field(default=[])
+    type:         ControlFormType  = Field(default=ControlFormType.GET_QUEUE_STATS)
 
 
 class Benchmark(ControlForm):
@@ -225,6 +443,28 @@ class Hop(BaseModel):
     type_str: str   = Field()
 
 
+# Control forms that can be delivered to other agents in tickets
+TicketForm = Union[
+    CreatePeer,
+    DiscoverPeer,
+    DeletePeers,
+    GetPeers,
+    GetRoutes,
+    GetConfig,
+    GetDeadLetters,
+    GetQueueStats,
+    SyncProcess,
+    WriteFile,
+    LoadFile,
+    WriteFileChunk,
+    LoadFileChunk,
+    GetFileSignature,
+    WriteFileDelta, # Must precede LoadFileDelta, whose fields are a superset
+    LoadFileDelta,
+    Benchmark
+]
+
+
 class ControlFormTicket(ControlForm):
     """A ticket for asynchronous control form delivery and tracking.
 
@@ -252,18 +492,7 @@ class ControlFormTicket(ControlForm):
     tracing:      bool         = Field(default=False)
     hops:         List[Hop]    = Field(default=[])
 
-    form: Union[
-        CreatePeer,
-        DiscoverPeer,
-        DeletePeers,
-        GetPeers,
-        GetRoutes,
-        GetConfig,
-        SyncProcess,
-        WriteFile,
-        LoadFile,
-        Benchmark
-    ] = Field()
+    form:         TicketForm   = Field()
 
     type: Literal[
         ControlFormType.CREATE_TICKET,
@@ -289,6 +518,28 @@ class CheckTicket(ControlForm):
     type:         ControlFormType = Field(default=ControlFormType.CHECK_TICKET)
 
 
+class WaitTicket(ControlForm):
+    """Request to wait for a ticket to be serviced.
+
+    Held open by the agent until the ticket's response is recorded or wait_secs
+    elapses, then returned with the same timing information as CheckTicket. Lets
+    clients learn a ticket was serviced as soon as it happens without polling.
+
+    Attributes:
+        tckuuid: UUID of the ticket to wait for.
+        wait_secs: Seconds to wait for the ticket to be serviced. The agent caps this
+                   below the client's read timeout.
+        create_time: Timestamp when the ticket was originally created, or None if it does not exist.
+        service_time: Time in seconds the ticket took to service, or None if not yet complete.
+        type: Always set to ControlFormType.WAIT_TICKET.
+    """
+    tckuuid:      str             = Field()
+    wait_secs:    PositiveFloat   = Field(default=30.0)
+    create_time:  float | None    = Field(default=None)
+    service_time: float | None    = Field(default=None)
+    type:         ControlFormType = Field(default=ControlFormType.WAIT_TICKET)
+
+
 class CloseTicket(ControlForm):
     """Request to close an existing ticket.
 
@@ -301,3 +552,79 @@ class CloseTicket(ControlForm):
     """
     tckuuid:      str             = Field()
     type:         ControlFormType = Field(default=ControlFormType.CLOSE_TICKET)
+
+
+class CreateTickets(ControlForm):
+    """Request to create tickets delivering the same control form to many agents.
+
+    Creates one ticket per destination in a single request to the local agent,
+    instead of one CREATE_TICKET request per destination.
+
+    Attributes:
+        dsts: UUIDs of the destination agents, one ticket is created for each.
+        form: The control form delivered to every destination.
+        tracing: Whether to trace the tickets' paths through the network.
+        tickets: The created tickets' UUIDs and create times, in the order of dsts.
+        type: Always set to ControlFormType.CREATE_TICKETS.
+    """
+    dsts:         List[str]         = Field()
+    form:         TicketForm        = Field()
+    tracing:      bool              = Field(default=False)
+    tickets:      List[CheckTicket] = Field(default=[])
+    type:         ControlFormType   = Field(default=ControlFormType.CREATE_TICKETS)
+
+
+class CheckTickets(ControlForm):
+    """Request to check the status of many tickets.
+
+    With wait_secs, the request is held open until at least one of the tickets is
+    serviced or no longer exists, or wait_secs (at most 30 seconds) elapses.
+
+    Attributes:
+        tckuuids: UUIDs of the tickets to check.
+        wait_secs: Seconds to wait for a ticket to be serviced (default: 0, no wait).
+        tickets: The status of each ticket, in the order of tckuuids. create_time is
+                 None for tickets that do not exist.
+        type: Always set to ControlFormType.CHECK_TICKETS.
+    """
+    tckuuids:     List[str]         = Field()
+    wait_secs:    NonNegativeFloat  = Field(default=0.0)
+    tickets:      List[CheckTicket] = Field(default=[])
+    type:         ControlFormType   = Field(default=ControlFormType.CHECK_TICKETS)
+
+
+class CollectTickets(ControlForm):
+    """Request to read and close the serviced tickets among many tickets.
+
+    Serviced tickets are returned and removed in one operation. Tickets that are
+    still pending are left open to be collected later.
+
+    Attributes:
+        tckuuids: UUIDs of the tickets to collect.
+        tickets: The serviced tickets, read and closed.
+        type: Always set to ControlFormType.COLLECT_TICKETS.
+    """
+    tckuuids:     List[str]               = Field()
+    tickets:      List[ControlFormTicket] = Field(default=[])
+    type:         ControlFormType         = Field(default=ControlFormType.COLLECT_TICKETS)
+
+
+class MulticastTicket(ControlForm):
+    """Request to create tickets delivering the same control form to many agents as a multicast.
+
+    Unlike CreateTickets, one copy of the form is sent per next hop with the
+    destinations reached through it, and split again at each agent along the way,
+    so each link carries one copy. Results are aggregated on the way back and
+    service the tickets, which are checked and collected like any other ticket.
+    Multicast tickets are not traced.
+
+    Attributes:
+        dsts: UUIDs of the destination agents, one ticket is created for each.
+        form: The control form delivered to every destination.
+        tickets: The created tickets' UUIDs and create times, in the order of dsts.
+        type: Always set to ControlFormType.MULTICAST_TICKET.
+    """
+    dsts:         List[str]         = Field()
+    form:         TicketForm        = Field()
+    tickets:      List[CheckTicket] = Field(default=[])
+    type:         ControlFormType   = Field(default=ControlFormType.MULTICAST_TICKET)
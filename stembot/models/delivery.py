@@ -0,0 +1,124 @@
+"""This module implements the schema for message delivery state."""
+from time import time
+from typing import Any, Dict
+
+from pydantic import BaseModel, Field, NonNegativeInt
+
+from stembot.enums import BreakerState
+
+
+class HopHealth(BaseModel):
+    """Delivery health of a next hop peer.
+
+    Tracks consecutive delivery failures to a peer so that deliveries back off
+    exponentially, and opens a circuit breaker once the failures reach the
+    configured threshold. Peers without a record are healthy.
+
+    Attributes:
+        agtuuid: UUID of the next hop agent.
+        state: Circuit breaker state of the next hop.
+        failures: Consecutive failed deliveries to the next hop.
+        retry_time: Timestamp before which deliveries to the next hop are deferred.
+        error: The error from the most recent failed delivery.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    agtuuid:    str            = Field()
+    state:      BreakerState   = Field(default=BreakerState.CLOSED)
+    failures:   NonNegativeInt = Field(default=0)
+    retry_time: float | None   = Field(default=None)
+    error:      str | None     = Field(default=None)
+    objuuid:    str | None     = Field(default=None)
+    coluuid:    str | None     = Field(default=None)
+
+
+class DeadLetter(BaseModel):
+    """A network message that could not be delivered before it expired.
+
+    Bulk payloads are dropped from the message before it is stored; the
+    remaining fields are kept for inspection.
+
+    Attributes:
+        message: The undelivered network message.
+        dest: UUID of the message's destination agent.
+        hop: UUID of the next hop the message was waiting on, if any.
+        reason: Why the message could not be delivered.
+        dead_time: Timestamp when the message was dead lettered.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    message:   Dict[str, Any] = Field()
+    dest:      str | None     = Field(default=None)
+    hop:       str | None     = Field(default=None)
+    reason:    str            = Field()
+    dead_time: float          = Field(default_factory=time)
+    objuuid:   str | None     = Field(default=None)
+    coluuid:   str | None     = Field(default=None)
+
+
+class ShedCounter(BaseModel):
+    """Counts of messages shed from the message queue for one destination.
+
+    Attributes:
+        dest: UUID of the shed messages' destination agent.
+        dropped: Queued messages dropped to make room for newer messages.
+        rejected: New messages rejected because the queue was full.
+        shed_time: Timestamp when a message for the destination was last shed.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    dest:      str | None     = Field(default=None)
+    dropped:   NonNegativeInt = Field(default=0)
+    rejected:  NonNegativeInt = Field(default=0)
+    shed_time: float          = Field(default_factory=time)
+    objuuid:   str | None     = Field(default=None)
+    coluuid:   str | None     = Field(default=None)
+
+
+class QueueUsage(BaseModel):
+    """Counts of the messages queued for one destination, kept as messages are queued and removed.
+
+    Attributes:
+        dest: UUID of the queued messages' destination agent.
+        messages: Messages queued for the destination.
+        size: Bytes queued for the destination.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    dest:     str | None = Field(default=None)
+    messages: int        = Field(default=0)
+    size:     int        = Field(default=0)
+    objuuid:  str | None = Field(default=None)
+    coluuid:  str | None = Field(default=None)
+
+
+class QueueStats(BaseModel):
+    """Message queue usage and shedding counters for one destination.
+
+    Attributes:
+        dest: UUID of the destination agent.
+        messages: Messages queued for the destination.
+        size: Bytes queued for the destination.
+        dropped: Queued messages for the destination dropped to make room for newer messages.
+        rejected: New messages for the destination rejected because the queue was full.
+    """
+    dest:     str | None     = Field(default=None)
+    messages: NonNegativeInt = Field(default=0)
+    size:     NonNegativeInt = Field(default=0)
+    dropped:  NonNegativeInt = Field(default=0)
+    rejected: NonNegativeInt = Field(default=0)
+
+
+class Receipt(BaseModel):
+    """Receipt of a network message, kept to drop repeated deliveries of the message.
+
+    Attributes:
+        msguuid: UUID of the received message.
+        receipt_time: Timestamp when the message was first received.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    msguuid:      str        = Field()
+    receipt_time: float      = Field(default_factory=time)
+    objuuid:      str | None = Field(default=None)
+    coluuid:      str | None = Field(default=None)
@@ -0,0 +1,56 @@
+"""This module implements the schema for multicast distribution state."""
+from time import time
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+from stembot.models.network import MulticastResult
+
+
+class MulticastGroup(BaseModel):
+    """An agent's part in the distribution tree of a multicast.
+
+    Created when an agent splits a multicast request among its next hops, and
+    kept until the multicast expires so results from its branches can be
+    aggregated and returned upstream.
+
+    Attributes:
+        mcuuid: UUID of the multicast.
+        upstream: UUID of the agent results are returned to, or None on the originating agent.
+        dsts: UUIDs of the destinations reached through this agent, including itself.
+        tickets: UUIDs of the tickets serviced by the results, by destination, on the originating agent.
+        create_time: Timestamp when the group was created.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    mcuuid:      str            = Field()
+    upstream:    str | None     = Field(default=None)
+    dsts:        List[str]      = Field(default=[])
+    tickets:     Dict[str, str] = Field(default={})
+    create_time: float          = Field(default_factory=time)
+    objuuid:     str | None     = Field(default=None)
+    coluuid:     str | None     = Field(default=None)
+
+
+class MulticastReceipt(BaseModel):
+    """A result received for a multicast group.
+
+    Receipts are kept until the multicast expires so the group knows when every
+    destination has answered. The result is dropped once it has been sent upstream.
+
+    Attributes:
+        mcuuid: UUID of the multicast.
+        agtuuid: UUID of the destination the result is for.
+        result: The result, or None once it has been sent upstream.
+        sent: Whether the result has been sent upstream.
+        receipt_time: Timestamp when the result was received.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    mcuuid:       str                    = Field()
+    agtuuid:      str                    = Field()
+    result:       MulticastResult | None = Field(default=None)
+    sent:         bool                   = Field(default=False)
+    receipt_time: float                  = Field(default_factory=time)
+    objuuid:      str | None             = Field(default=None)
+    coluuid:      str | None             = Field(default=None)
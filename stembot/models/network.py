@@ -2,14 +2,16 @@
 from time import time
 from typing import List, Literal, Union
 
-from pydantic import BaseModel, Field, ConfigDict, PositiveInt
+from pydantic import BaseModel, Field, ConfigDict, NonNegativeInt, PositiveInt
 
 from stembot.dao.utils import get_uuid_str
-from stembot.enums import ControlFormType, NetworkMessageType
+from stembot.enums import ControlFormType, MessagePriority, NetworkMessageType
 from stembot.models.config import CONFIG
 from stembot.models.control import Benchmark, CreatePeer, DiscoverPeer, GetConfig, GetPeers, Hop
-from stembot.models.control import GetRoutes, LoadFile, SyncProcess, WriteFile
-from stembot.models.routing import Route
+from stembot.models.control import GetRoutes, LoadFile, LoadFileChunk, SyncProcess, WriteFile, WriteFileChunk
+from stembot.models.control import GetDeadLetters, GetFileSignature, GetQueueStats, LoadFileDelta, WriteFileDelta
+from stembot.models.control import TicketForm
+from stembot.models.routing import Link, Route
 
 
 class NetworkMessage(BaseModel):
@@ -26,16 +28,26 @@ class NetworkMessage(BaseModel):
         timestamp: Unix timestamp when the message was created.
         objuuid: Optional object UUID for data object association.
         coluuid: Optional collection UUID for data collection association.
+        priority: Delivery priority class, assigned when the message is first queued.
+        form_type: Control form type of a ticket, assigned when the message is first queued so
+                   whitelists can select tickets without loading them.
+        msguuid: Message UUID, assigned when the message is first sent or queued and kept when it is
+                 resent, so receivers can drop repeated deliveries.
+        size: Approximate bytes the message occupies in the message queue, measured whenever it is queued.
     """
     model_config = ConfigDict(extra='allow')
 
-    type:      NetworkMessageType = Field()
-    dest:      str | None         = Field(default=None)
-    src:       str                = Field(default=CONFIG.agtuuid)
-    isrc:      str | None         = Field(default=None)
-    timestamp: float | None       = Field(default_factory=time)
-    objuuid:   str | None         = Field(default=None)
-    coluuid:   str | None         = Field(default=None)
+    type:      NetworkMessageType     = Field()
+    dest:      str | None             = Field(default=None)
+    src:       str                    = Field(default=CONFIG.agtuuid)
+    isrc:      str | None             = Field(default=None)
+    timestamp: float | None           = Field(default_factory=time)
+    objuuid:   str | None             = Field(default=None)
+    coluuid:   str | None             = Field(default=None)
+    priority:  MessagePriority | None = Field(default=None)
+    form_type: ControlFormType | None = Field(default=None)
+    msguuid:   str | None             = Field(default=None)
+    size:      NonNegativeInt | None  = Field(default=None)
 
 
 class Ping(NetworkMessage):
@@ -55,16 +67,29 @@ class NetworkMessagesRequest(NetworkMessage):
 
     Polls a peer agent for any messages that are waiting to be delivered.
     The response contains a NetworkMessagesResponse with a list of messages.
+    A request with wait_secs is a long poll: when no messages are waiting, the
+    peer holds the request open until messages arrive or wait_secs elapses. A
+    request with stream opens a persistent channel over which the peer streams
+    a NetworkMessagesResponse whenever messages arrive (see stembot.executor.channel).
+    The peer never returns more than its own poll_max_messages and poll_max_bytes,
+    whatever the request's limit and max_bytes.
 
     Attributes:
         limit: Optional limit on the number of messages to retrieve.
+        max_bytes: Optional limit on the size of the messages to retrieve. At least one
+                   message is retrieved if any are waiting.
         network_whitelist: Optional list of NetworkMessageType values to filter messages.
         control_whitelist: Optional list of ControlFormType values to filter messages.
+        wait_secs: Optional seconds to wait for messages when none are waiting.
+        stream: Open a persistent channel instead of returning a single response.
         type: Always set to NetworkMessageType.MESSAGES_REQUEST.
     """
     limit:             PositiveInt | None              = Field(default=None)
+    max_bytes:         PositiveInt | None              = Field(default=None)
     network_whitelist: List[NetworkMessageType] | None = Field(default=None)
     control_whitelist: List[ControlFormType] | None    = Field(default=None)
+    wait_secs:         PositiveInt | None              = Field(default=None)
+    stream:            bool                            = Field(default=False)
 
     type:  NetworkMessageType = Field(default=NetworkMessageType.MESSAGES_REQUEST)
 
@@ -93,26 +118,81 @@ class Advertisement(NetworkMessage):
     Broadcasts routing information to peers to help establish network paths.
     Contains a list of routes the agent knows about.
 
+    Sequenced advertisements carry a seq number. A sequenced advertisement
+    without a base_seq is a full table that replaces the routes learned from
+    the advertising agent. One with a base_seq carries only the routes changed
+    and withdrawn since that sequence number, and is applied only by a peer whose
+    last applied advertisement from the agent has that sequence number.
+    Advertisements without a seq are full tables that only lower route weights.
+
     Attributes:
         routes: List of Route objects the agent is advertising.
         agtuuid: UUID of the advertising agent.
+        seq: Sequence number of the advertisement, or None for an unsequenced full table.
+        base_seq: Sequence number of the advertisement the changes are relative to, or None for a full table.
+        withdrawn: UUIDs of the destinations no longer reachable through the agent since base_seq.
         type: Always set to NetworkMessageType.ADVERTISEMENT.
     """
-    routes:  List[Route]        = Field(default=[])
-    agtuuid: str                = Field()
-    type:    NetworkMessageType = Field(default=NetworkMessageType.ADVERTISEMENT)
+    routes:    List[Route]           = Field(default=[])
+    agtuuid:   str                   = Field()
+    seq:       NonNegativeInt | None = Field(default=None)
+    base_seq:  NonNegativeInt | None = Field(default=None)
+    withdrawn: List[str]             = Field(default=[])
+    type:      NetworkMessageType    = Field(default=NetworkMessageType.ADVERTISEMENT)
+
+
+class AdvertisementAck(NetworkMessage):
+    """Acknowledgement of the last sequenced advertisement a peer applied.
+
+    Sent by the receiver of a sequenced advertisement. Changes are advertised
+    relative to the acknowledged advertisement, and an acknowledgement of an
+    advertisement the advertising agent does not recognize makes it send a full table.
+
+    Attributes:
+        agtuuid: UUID of the acknowledging agent.
+        seq: Sequence number of the last advertisement applied from the advertising agent, or None if none was.
+        type: Always set to NetworkMessageType.ADVERTISEMENT_ACK.
+    """
+    agtuuid: str                   = Field()
+    seq:     NonNegativeInt | None = Field(default=None)
+    type:    NetworkMessageType    = Field(default=NetworkMessageType.ADVERTISEMENT_ACK)
+
+
+class LinkState(NetworkMessage):
+    """Signed record of an agent's links to its peers, flooded to every agent in link state mode.
+
+    Each agent keeps the record with the highest sequence number from every
+    other agent, and computes its routes along the shortest paths through
+    the links they describe.
+
+    Attributes:
+        agtuuid: UUID of the agent the links are from.
+        seq: Sequence number of the record, increasing with each record the agent originates.
+        links: The agent's links to its peers, with their measured round trip times and loss.
+        signature: HMAC-SHA256 of the agent UUID, sequence number and links, keyed with the network key.
+        type: Always set to NetworkMessageType.LINK_STATE.
+    """
+    agtuuid:   str                = Field()
+    seq:       NonNegativeInt     = Field()
+    links:     List[Link]         = Field(default=[])
+    signature: str | None         = Field(default=None)
+    type:      NetworkMessageType = Field(default=NetworkMessageType.LINK_STATE)
 
 
 class NetworkMessagesResponse(NetworkMessage):
     """Response to a NetworkMessagesRequest containing pending messages.
 
     Returns a list of messages that were waiting to be delivered to the requester.
+    When more messages are waiting than fit in one response, more is set so the
+    requester polls again immediately.
 
     Attributes:
         messages: List of pending NetworkMessage objects.
+        more: Whether more messages are waiting for the requester.
         type: Always set to NetworkMessageType.MESSAGES_RESPONSE.
     """
     messages: List[NetworkMessage] = Field(default=[])
+    more:     bool                 = Field(default=False)
     type:     NetworkMessageType   = Field(default=NetworkMessageType.MESSAGES_RESPONSE)
 
 
@@ -172,7 +252,14 @@ class NetworkTicket(NetworkMessage):
         SyncProcess,
         WriteFile,
         LoadFile,
+        WriteFileChunk,
+        LoadFileChunk,
+        GetFileSignature,
+        WriteFileDelta, # Must precede LoadFileDelta, whose fields are a superset
+        LoadFileDelta,
         GetConfig,
+        GetDeadLetters,
+        GetQueueStats,
         Benchmark
     ] = Field()
 
@@ -180,3 +267,49 @@ class NetworkTicket(NetworkMessage):
         NetworkMessageType.TICKET_REQUEST,
         NetworkMessageType.TICKET_RESPONSE
     ] = Field(default=NetworkMessageType.TICKET_REQUEST)
+
+
+class MulticastResult(BaseModel):
+    """The result of a multicast request's form on one destination.
+
+    Attributes:
+        agtuuid: UUID of the destination agent.
+        form: The serviced control form, or the requested form if it could not be serviced.
+        error: Optional error message if the form could not be delivered or serviced.
+    """
+    agtuuid: str        = Field()
+    form:    TicketForm = Field()
+    error:   str | None = Field(default=None)
+
+
+class MulticastRequest(NetworkMessage):
+    """Request to execute a control form on a set of destination agents.
+
+    Sent to the next hop of a branch of the distribution tree, with the subset of
+    destinations reached through that hop. The receiving agent services the form
+    if it is a destination and splits the remaining destinations by its own next
+    hops, so each link carries one copy of the form.
+
+    Attributes:
+        mcuuid: UUID of the multicast, shared by every copy of the request.
+        dsts: UUIDs of the destination agents reached through the receiving agent.
+        form: The control form to service on every destination.
+        type: Always set to NetworkMessageType.MULTICAST_REQUEST.
+    """
+    mcuuid: str                = Field(default_factory=get_uuid_str)
+    dsts:   List[str]          = Field(default=[])
+    form:   TicketForm         = Field()
+    type:   NetworkMessageType = Field(default=NetworkMessageType.MULTICAST_REQUEST)
+
+
+class MulticastResponse(NetworkMessage):
+    """Aggregated results of a multicast request returned to the agent that sent it.
+
+    Attributes:
+        mcuuid: UUID of the multicast.
+        results: Results collected from destinations in the branch since the last response.
+        type: Always set to NetworkMessageType.MULTICAST_RESPONSE.
+    """
+    mcuuid:  str                   = Field()
+    results: List[MulticastResult] = Field(default=[])
+    type:    NetworkMessageType    = Field(default=NetworkMessageType.MULTICAST_RESPONSE)
@@ -1,5 +1,8 @@
 """This module implements the schema for routing information."""
-from pydantic import BaseModel, Field, StrictBool
+from time import time
+from typing import Dict, List
+
+from pydantic import BaseModel, Field, NonNegativeFloat, NonNegativeInt, StrictBool
 
 class Route(BaseModel):
     """A route to another agent through a gateway.
@@ -34,13 +37,144 @@ class Peer(BaseModel):
         destroy_time: Timestamp when this peer should be destroyed/removed.
         refresh_time: Timestamp when this peer's information should be refreshed.
         url: HTTP/HTTPS URL to reach the peer agent.
+        rtt_ms: Smoothed round trip time to the peer in milliseconds, or None if not measured.
+        loss: Smoothed fraction of failed round trips to the peer, from 0 to 1.
+        throughput_bps: Smoothed throughput of bulk transfers to the peer in bytes per second,
+                        or None if not measured.
+        measure_time: Timestamp when the link to the peer was last measured, or None if never.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    agtuuid:        str | None              = Field(default=None)
+    polling:        StrictBool              = Field(default=False)
+    destroy_time:   float | None            = Field(default=None)
+    refresh_time:   float | None            = Field(default=None)
+    url:            str | None              = Field(default=None)
+    rtt_ms:         NonNegativeFloat | None = Field(default=None)
+    loss:           float                   = Field(default=0.0, ge=0.0, le=1.0)
+    throughput_bps: NonNegativeFloat | None = Field(default=None)
+    measure_time:   float | None            = Field(default=None)
+    objuuid:        str | None              = Field(default=None)
+    coluuid:        str | None              = Field(default=None)
+
+
+class RouteSession(BaseModel):
+    """The sequenced advertisements applied from a gateway.
+
+    Routes learned from a gateway with a live session are kept at their
+    advertised weights instead of being aged.
+
+    Attributes:
+        gtwuuid: UUID of the advertising gateway agent.
+        seq: Sequence number of the last advertisement applied from the gateway.
+        receive_time: Timestamp when the last advertisement from the gateway was applied.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    gtwuuid:      str            = Field()
+    seq:          NonNegativeInt = Field()
+    receive_time: float          = Field(default_factory=time)
+    objuuid:      str | None     = Field(default=None)
+    coluuid:      str | None     = Field(default=None)
+
+
+class AdvertisedTable(BaseModel):
+    """The route tables advertised to a peer.
+
+    Keeps the table of each advertisement sent to the peer until a later one is
+    acknowledged, so changes can be advertised relative to the last table the
+    peer acknowledged.
+
+    Attributes:
+        agtuuid: UUID of the peer.
+        seq: Sequence number of the last advertisement sent to the peer.
+        acked_seq: Sequence number of the last advertisement the peer acknowledged, or None.
+        ack_time: Timestamp of the last acknowledgement processed.
+        full_time: Timestamp when a full table was last sent to the peer.
+        tables: Route weights by destination of each unacknowledged and the acknowledged advertisement,
+                keyed by sequence number.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    agtuuid:   str                       = Field()
+    seq:       NonNegativeInt            = Field(default=0)
+    acked_seq: NonNegativeInt | None     = Field(default=None)
+    ack_time:  float                     = Field(default=0.0)
+    full_time: float                     = Field(default=0.0)
+    tables:    Dict[str, Dict[str, int]] = Field(default={})
+    objuuid:   str | None                = Field(default=None)
+    coluuid:   str | None                = Field(default=None)
+
+
+class RouteAck(BaseModel):
+    """The last advertisement acknowledgement received from a peer.
+
+    Attributes:
+        agtuuid: UUID of the peer.
+        seq: Sequence number the peer acknowledged, or None if it applied none.
+        ack_time: Timestamp when the acknowledgement was received.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    agtuuid:  str                   = Field()
+    seq:      NonNegativeInt | None = Field(default=None)
+    ack_time: float                 = Field(default_factory=time)
+    objuuid:  str | None            = Field(default=None)
+    coluuid:  str | None            = Field(default=None)
+
+
+class HoldDown(BaseModel):
+    """A destination whose last route was lost, held down against worse routes.
+
+    Until the hold down expires, routes to the destination are only accepted at
+    or below the weight of the route that was lost, so stale routes still being
+    advertised by other agents are not mistaken for an alternative path.
+
+    Attributes:
+        agtuuid: UUID of the destination agent.
+        weight: Weight of the route that was lost.
+        expire_time: Timestamp when the hold down expires.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    agtuuid:     str        = Field()
+    weight:      int        = Field()
+    expire_time: float      = Field()
+    objuuid:     str | None = Field(default=None)
+    coluuid:     str | None = Field(default=None)
+
+
+class Link(BaseModel):
+    """A link from an agent to one of its peers, with its measured quality.
+
+    Attributes:
+        agtuuid: UUID of the peer at the other end of the link.
+        rtt_ms: Smoothed round trip time to the peer in milliseconds, or None if not measured.
+        loss: Smoothed fraction of failed round trips to the peer, from 0 to 1.
+        objuuid: Optional object UUID for data object association.
+        coluuid: Optional collection UUID for data collection association.
+    """
+    agtuuid: str                     = Field()
+    rtt_ms:  NonNegativeFloat | None = Field(default=None)
+    loss:    float                   = Field(default=0.0, ge=0.0, le=1.0)
+    objuuid: str | None              = Field(default=None)
+    coluuid: str | None              = Field(default=None)
+
+
+class LinkStateRecord(BaseModel):
+    """The latest link state record received from, or originated by, an agent.
+
+    Attributes:
+        agtuuid: UUID of the agent the links are from.
+        seq: Sequence number of the record; records with a lower number are older.
+        links: The agent's links to its peers.
+        receive_time: Timestamp when the record was received or originated.
         objuuid: Optional object UUID for data object association.
         coluuid: Optional collection UUID for data collection association.
     """
-    agtuuid:      str | None   = Field(default=None)
-    polling:      StrictBool   = Field(default=False)
-    destroy_time: float | None = Field(default=None)
-    refresh_time: float | None = Field(default=None)
-    url:          str | None   = Field(default=None)
-    objuuid:      str | None   = Field(default=None)
-    coluuid:      str | None   = Field(default=None)
+    agtuuid:      str            = Field()
+    seq:          NonNegativeInt = Field()
+    links:        List[Link]     = Field(default=[])
+    receive_time: float          = Field(default_factory=time)
+    objuuid:      str | None     = Field(default=None)
+    coluuid:      str | None     = Field(default=None)
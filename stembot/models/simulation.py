@@ -0,0 +1,56 @@
+"""This module implements the schema for network simulation results."""
+from typing import List
+
+from pydantic import BaseModel, Field, NonNegativeFloat, NonNegativeInt
+
+
+class SimulationCycle(BaseModel):
+    """The measurements of one advertisement cycle of a simulated network.
+
+    Attributes:
+        cycle: Number of the cycle, from 1.
+        advertisements: Advertisements sent during the cycle.
+        advertisement_bytes: Bytes of the advertisements sent during the cycle.
+        ack_bytes: Bytes of the advertisement acknowledgements sent during the cycle.
+        changed_agents: Agents whose routes changed during the cycle.
+        mean_table_size: Mean number of destinations in the route tables of the live agents.
+        max_table_size: Largest number of destinations in the route table of a live agent.
+        cpu_secs: Processor time spent on the cycle in seconds.
+        elapsed_secs: Wall clock time spent on the cycle in seconds.
+    """
+    cycle:               NonNegativeInt   = Field()
+    advertisements:      NonNegativeInt   = Field(default=0)
+    advertisement_bytes: NonNegativeInt   = Field(default=0)
+    ack_bytes:           NonNegativeInt   = Field(default=0)
+    changed_agents:      NonNegativeInt   = Field(default=0)
+    mean_table_size:     NonNegativeFloat = Field(default=0.0)
+    max_table_size:      NonNegativeInt   = Field(default=0)
+    cpu_secs:            NonNegativeFloat = Field(default=0.0)
+    elapsed_secs:        NonNegativeFloat = Field(default=0.0)
+
+
+class SimulationReport(BaseModel):
+    """The measurements of a simulation run from a cold start, or from a failure, to convergence.
+
+    Attributes:
+        agents: Number of live agents simulated.
+        links: Number of links between live agents.
+        cycles: The measurements of each cycle run.
+        converged: Whether the routes stopped changing within the cycles allowed.
+        convergence_cycles: Cycles run until the routes stopped changing, or None if they did not.
+        convergence_secs: Wall clock seconds until the routes stopped changing, or None if they did not.
+        checked_pairs: Agent pairs whose routes were followed after the run.
+        connected_pairs: Checked agent pairs joined by a path of links between live agents.
+        reachable_pairs: Connected agent pairs whose routes led to the destination.
+        mean_path_length: Mean hops along the routes of the reachable pairs.
+    """
+    agents:             NonNegativeInt          = Field()
+    links:              NonNegativeInt          = Field()
+    cycles:             List[SimulationCycle]   = Field(default_factory=list)
+    converged:          bool                    = Field(default=False)
+    convergence_cycles: NonNegativeInt | None   = Field(default=None)
+    convergence_secs:   NonNegativeFloat | None = Field(default=None)
+    checked_pairs:      NonNegativeInt          = Field(default=0)
+    connected_pairs:    NonNegativeInt          = Field(default=0)
+    reachable_pairs:    NonNegativeInt          = Field(default=0)
+    mean_path_length:   NonNegativeFloat | None = Field(default=None)
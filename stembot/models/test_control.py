@@ -6,23 +6,36 @@ Both implementations must produce and consume identical JSON strings.
 import json
 import unittest
 
-from stembot.enums import ControlFormType
+from stembot.enums import ControlFormType, FileCodec
 from stembot.models.control import (
     Benchmark,
     CheckTicket,
+    CheckTickets,
     CloseTicket,
+    CollectTickets,
     ControlFormTicket,
     CreatePeer,
+    CreateTickets,
     DeletePeers,
     DiscoverPeer,
     GetConfig,
+    GetDeadLetters,
+    GetFileSignature,
+    GetQueueStats,
     GetPeers,
     GetRoutes,
     Hop,
     LoadFile,
+    LoadFileChunk,
+    LoadFileDelta,
+    MulticastTicket,
     SyncProcess,
+    WaitTicket,
     WriteFile,
+    WriteFileChunk,
+    WriteFileDelta,
 )
+from stembot.models.delivery import DeadLetter, QueueStats
 from stembot.models.routing import Peer, Route
 
 #pylint: disable=too-many-public-methods, too-many-lines, too-few-public-methods
@@ -39,7 +52,8 @@ class TestControlFormSerialization(unittest.TestCase):
         self.assert_json_eq(
             form,
             '{"type":"load_file","error":null,"objuuid":null,"coluuid":null,'
-            '"b64zlib":null,"path":"/etc/hosts","size":null,"md5sum":null}',
+            '"b64zlib":null,"path":"/etc/hosts","size":null,"md5sum":null,'
+            '"codec":null,"codecs":null,"digest_type":null,"digest":null}',
         )
 
     def test_load_file_response(self):
@@ -48,7 +62,7 @@ class TestControlFormSerialization(unittest.TestCase):
             form,
             '{"type":"load_file","error":null,"objuuid":null,"coluuid":null,'
             '"b64zlib":"abc123","path":"/etc/hosts","size":1024,'
-            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249"}',
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"codecs":null,"digest_type":null,"digest":null}',
         )
 
     # -- WriteFile --
@@ -58,7 +72,8 @@ class TestControlFormSerialization(unittest.TestCase):
         self.assert_json_eq(
             form,
             '{"type":"write_file","error":null,"objuuid":null,"coluuid":null,'
-            '"b64zlib":"abc123","path":"/tmp/out.txt","size":null,"md5sum":null}',
+            '"b64zlib":"abc123","path":"/tmp/out.txt","size":null,"md5sum":null,'
+            '"codec":null,"digest_type":null,"digest":null,"atomic":false}',
         )
 
     def test_write_file_response(self):
@@ -67,7 +82,83 @@ class TestControlFormSerialization(unittest.TestCase):
             form,
             '{"type":"write_file","error":null,"objuuid":null,"coluuid":null,'
             '"b64zlib":"abc123","path":"/tmp/out.txt","size":6,'
-            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249"}',
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"digest_type":null,"digest":null,"atomic":false}',
+        )
+
+    def test_write_file_with_codec(self):
+        form = WriteFile(b64zlib="abc123", path="/tmp/out.txt", codec=FileCodec.ZLIB_1)
+        self.assert_json_eq(
+            form,
+            '{"type":"write_file","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":"abc123","path":"/tmp/out.txt","size":null,"md5sum":null,'
+            '"codec":"zlib_1","digest_type":null,"digest":null,"atomic":false}',
+        )
+
+    # -- LoadFileChunk --
+
+    def test_load_file_chunk_request(self):
+        form = LoadFileChunk(path="/etc/hosts", offset=1024, length=512)
+        self.assert_json_eq(
+            form,
+            '{"type":"load_file_chunk","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":null,"path":"/etc/hosts","offset":1024,"length":512,"size":null,"md5sum":null,'
+            '"codec":null,"codecs":null,"digest_type":null,"digest":null}',
+        )
+
+    def test_load_file_chunk_response(self):
+        form = LoadFileChunk(
+            path="/etc/hosts", offset=1024, length=6, b64zlib="abc123",
+            size=1030, md5sum="d8e8fca2dc0f896fd7cb4cb0031ba249"
+        )
+        self.assert_json_eq(
+            form,
+            '{"type":"load_file_chunk","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":"abc123","path":"/etc/hosts","offset":1024,"length":6,"size":1030,'
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"codecs":null,"digest_type":null,"digest":null}',
+        )
+
+    # -- WriteFileChunk --
+
+    def test_write_file_chunk_request(self):
+        form = WriteFileChunk(
+            b64zlib="abc123", path="/tmp/out.txt", offset=1024, length=6,
+            size=1030, md5sum="d8e8fca2dc0f896fd7cb4cb0031ba249"
+        )
+        self.assert_json_eq(
+            form,
+            '{"type":"write_file_chunk","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":"abc123","path":"/tmp/out.txt","offset":1024,"length":6,"size":1030,'
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"digest_type":null,"digest":null}',
+        )
+
+    # -- Delta transfer --
+
+    def test_get_file_signature_response(self):
+        form = GetFileSignature(path="/etc/hosts", block_size=1024, size=1030, weak=[1, 2], strong=["aa", "bb"])
+        self.assert_json_eq(
+            form,
+            '{"type":"get_file_signature","error":null,"objuuid":null,"coluuid":null,'
+            '"path":"/etc/hosts","block_size":1024,"size":1030,"weak":[1,2],"strong":["aa","bb"]}',
+        )
+
+    def test_load_file_delta_request(self):
+        form = LoadFileDelta(path="/etc/hosts", block_size=1024, weak=[1, 2], strong=["aa", "bb"], base_size=1030)
+        self.assert_json_eq(
+            form,
+            '{"type":"load_file_delta","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":null,"path":"/etc/hosts","block_size":1024,"weak":[1,2],"strong":["aa","bb"],'
+            '"base_size":1030,"size":null,"md5sum":null,"codec":null,"codecs":null,"digest_type":null,"digest":null}',
+        )
+
+    def test_write_file_delta_request(self):
+        form = WriteFileDelta(
+            b64zlib="abc123", path="/tmp/out.txt", block_size=1024, size=6, md5sum="d8e8fca2dc0f896fd7cb4cb0031ba249"
+        )
+        self.assert_json_eq(
+            form,
+            '{"type":"write_file_delta","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":"abc123","path":"/tmp/out.txt","block_size":1024,"size":6,'
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"digest_type":null,"digest":null}',
         )
 
     # -- SyncProcess --
@@ -165,6 +256,9 @@ class TestControlFormSerialization(unittest.TestCase):
                     polling=False,
                     destroy_time=2000.0,
                     refresh_time=1000.0,
+                    rtt_ms=12.5,
+                    loss=0.25,
+                    measure_time=1500.0,
                 )
             ]
         )
@@ -172,7 +266,8 @@ class TestControlFormSerialization(unittest.TestCase):
             form,
             '{"type":"get_peers","error":null,"objuuid":null,"coluuid":null,'
             '"peers":[{"agtuuid":"a2","polling":false,"destroy_time":2000.0,'
-            '"refresh_time":1000.0,"url":"http://10.0.0.2:8080","objuuid":null,"coluuid":null}]}',
+            '"refresh_time":1000.0,"url":"http://10.0.0.2:8080","rtt_ms":12.5,"loss":0.25,'
+            '"throughput_bps":null,"measure_time":1500.0,"objuuid":null,"coluuid":null}]}',
         )
 
     # -- GetRoutes --
@@ -198,7 +293,7 @@ class TestControlFormSerialization(unittest.TestCase):
         form = GetConfig()
         self.assert_json_eq(
             form,
-            '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null}',
+            '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null,"codecs":null}',
         )
 
     def test_get_config_response(self):
@@ -206,7 +301,52 @@ class TestControlFormSerialization(unittest.TestCase):
         self.assert_json_eq(
             form,
             '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,'
-            '"config":{"agtuuid":"a1","port":8080}}',
+            '"config":{"agtuuid":"a1","port":8080},"codecs":null}',
+        )
+
+    # -- GetDeadLetters --
+
+    def test_get_dead_letters_request(self):
+        form = GetDeadLetters(dest="a2", purge=True)
+        self.assert_json_eq(
+            form,
+            '{"type":"get_dead_letters","error":null,"objuuid":null,"coluuid":null,'
+            '"dest":"a2","purge":true,"dead_letters":[]}',
+        )
+
+    def test_get_dead_letters_response(self):
+        form = GetDeadLetters(
+            dead_letters=[
+                DeadLetter(message={"type": "ping"}, dest="a2", hop="a3", reason="timed out", dead_time=1000.0)
+            ]
+        )
+        self.assert_json_eq(
+            form,
+            '{"type":"get_dead_letters","error":null,"objuuid":null,"coluuid":null,"dest":null,"purge":false,'
+            '"dead_letters":[{"message":{"type":"ping"},"dest":"a2","hop":"a3","reason":"timed out",'
+            '"dead_time":1000.0,"objuuid":null,"coluuid":null}]}',
+        )
+
+    # -- GetQueueStats --
+
+    def test_get_queue_stats_request(self):
+        form = GetQueueStats()
+        self.assert_json_eq(
+            form,
+            '{"type":"get_queue_stats","error":null,"objuuid":null,"coluuid":null,'
+            '"messages":0,"size":0,"dropped":0,"rejected":0,"destinations":[]}',
+        )
+
+    def test_get_queue_stats_response(self):
+        form = GetQueueStats(
+            messages=2, size=900, dropped=1,
+            destinations=[QueueStats(dest="a2", messages=2, size=900, dropped=1)]
+        )
+        self.assert_json_eq(
+            form,
+            '{"type":"get_queue_stats","error":null,"objuuid":null,"coluuid":null,'
+            '"messages":2,"size":900,"dropped":1,"rejected":0,'
+            '"destinations":[{"dest":"a2","messages":2,"size":900,"dropped":1,"rejected":0}]}',
         )
 
     # -- Hop --
@@ -283,6 +423,58 @@ class TestControlFormSerialization(unittest.TestCase):
             '"tckuuid":"t1","create_time":1000.0,"service_time":0.5}',
         )
 
+    # -- WaitTicket --
+
+    def test_wait_ticket(self):
+        form = WaitTicket(tckuuid="t1", wait_secs=10)
+        self.assert_json_eq(
+            form,
+            '{"type":"wait_ticket","error":null,"objuuid":null,"coluuid":null,'
+            '"tckuuid":"t1","wait_secs":10.0,"create_time":null,"service_time":null}',
+        )
+
+    # -- CreateTickets --
+
+    def test_create_tickets(self):
+        form = CreateTickets(dsts=["a", "b"], form=GetConfig())
+        self.assert_json_eq(
+            form,
+            '{"type":"create_tickets","error":null,"objuuid":null,"coluuid":null,"dsts":["a","b"],'
+            '"form":{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null,"codecs":null},'
+            '"tracing":false,"tickets":[]}',
+        )
+
+    # -- CheckTickets --
+
+    def test_check_tickets(self):
+        form = CheckTickets(tckuuids=["t1"], wait_secs=5)
+        self.assert_json_eq(
+            form,
+            '{"type":"check_tickets","error":null,"objuuid":null,"coluuid":null,'
+            '"tckuuids":["t1"],"wait_secs":5.0,"tickets":[]}',
+        )
+
+    # -- CollectTickets --
+
+    def test_collect_tickets(self):
+        form = CollectTickets(tckuuids=["t1", "t2"])
+        self.assert_json_eq(
+            form,
+            '{"type":"collect_tickets","error":null,"objuuid":null,"coluuid":null,'
+            '"tckuuids":["t1","t2"],"tickets":[]}',
+        )
+
+    # -- MulticastTicket --
+
+    def test_multicast_ticket(self):
+        form = MulticastTicket(dsts=["a", "b"], form=GetConfig())
+        self.assert_json_eq(
+            form,
+            '{"type":"multicast_ticket","error":null,"objuuid":null,"coluuid":null,"dsts":["a","b"],'
+            '"form":{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null,"codecs":null},'
+            '"tickets":[]}',
+        )
+
     # -- CloseTicket --
 
     def test_close_ticket(self):
@@ -328,7 +520,8 @@ class TestControlFormDeserialization(unittest.TestCase):
     def test_load_file_request(self):
         json_str = (
             '{"type":"load_file","error":null,"objuuid":null,"coluuid":null,'
-            '"b64zlib":null,"path":"/etc/hosts","size":null,"md5sum":null}'
+            '"b64zlib":null,"path":"/etc/hosts","size":null,"md5sum":null,'
+            '"codec":null,"digest_type":null,"digest":null}'
         )
         self.assertEqual(LoadFile.model_validate_json(json_str), LoadFile(path="/etc/hosts"))
 
@@ -336,7 +529,7 @@ class TestControlFormDeserialization(unittest.TestCase):
         json_str = (
             '{"type":"load_file","error":null,"objuuid":null,"coluuid":null,'
             '"b64zlib":"abc123","path":"/etc/hosts","size":1024,'
-            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249"}'
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"digest_type":null,"digest":null}'
         )
         self.assertEqual(
             LoadFile.model_validate_json(json_str),
@@ -348,7 +541,8 @@ class TestControlFormDeserialization(unittest.TestCase):
     def test_write_file_request(self):
         json_str = (
             '{"type":"write_file","error":null,"objuuid":null,"coluuid":null,'
-            '"b64zlib":"abc123","path":"/tmp/out.txt","size":null,"md5sum":null}'
+            '"b64zlib":"abc123","path":"/tmp/out.txt","size":null,"md5sum":null,'
+            '"codec":null,"digest_type":null,"digest":null,"atomic":false}'
         )
         self.assertEqual(
             WriteFile.model_validate_json(json_str),
@@ -359,13 +553,69 @@ class TestControlFormDeserialization(unittest.TestCase):
         json_str = (
             '{"type":"write_file","error":null,"objuuid":null,"coluuid":null,'
             '"b64zlib":"abc123","path":"/tmp/out.txt","size":6,'
-            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249"}'
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"digest_type":null,"digest":null,"atomic":false}'
         )
         self.assertEqual(
             WriteFile.model_validate_json(json_str),
             WriteFile(b64zlib="abc123", path="/tmp/out.txt", size=6, md5sum="d8e8fca2dc0f896fd7cb4cb0031ba249"),
         )
 
+    def test_write_file_with_codec(self):
+        json_str = (
+            '{"type":"write_file","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":"abc123","path":"/tmp/out.txt","size":null,"md5sum":null,'
+            '"codec":"none","digest_type":null,"digest":null,"atomic":false}'
+        )
+        self.assertEqual(
+            WriteFile.model_validate_json(json_str),
+            WriteFile(b64zlib="abc123", path="/tmp/out.txt", codec=FileCodec.NONE),
+        )
+
+    # -- LoadFileChunk --
+
+    def test_load_file_chunk_request(self):
+        json_str = (
+            '{"type":"load_file_chunk","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":null,"path":"/etc/hosts","offset":1024,"length":512,"size":null,"md5sum":null,'
+            '"codec":null,"digest_type":null,"digest":null}'
+        )
+        self.assertEqual(
+            LoadFileChunk.model_validate_json(json_str),
+            LoadFileChunk(path="/etc/hosts", offset=1024, length=512),
+        )
+
+    # -- WriteFileChunk --
+
+    def test_write_file_chunk_request(self):
+        json_str = (
+            '{"type":"write_file_chunk","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":"abc123","path":"/tmp/out.txt","offset":1024,"length":6,"size":1030,'
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"digest_type":null,"digest":null}'
+        )
+        self.assertEqual(
+            WriteFileChunk.model_validate_json(json_str),
+            WriteFileChunk(
+                b64zlib="abc123", path="/tmp/out.txt", offset=1024, length=6,
+                size=1030, md5sum="d8e8fca2dc0f896fd7cb4cb0031ba249"
+            ),
+        )
+
+    # -- Delta transfer --
+
+    def test_write_file_delta_request(self):
+        json_str = (
+            '{"type":"write_file_delta","error":null,"objuuid":null,"coluuid":null,'
+            '"b64zlib":"abc123","path":"/tmp/out.txt","block_size":1024,"size":6,'
+            '"md5sum":"d8e8fca2dc0f896fd7cb4cb0031ba249","codec":null,"digest_type":null,"digest":null}'
+        )
+        self.assertEqual(
+            WriteFileDelta.model_validate_json(json_str),
+            WriteFileDelta(
+                b64zlib="abc123", path="/tmp/out.txt", block_size=1024, size=6,
+                md5sum="d8e8fca2dc0f896fd7cb4cb0031ba249"
+            ),
+        )
+
     # -- SyncProcess --
 
     def test_sync_process_request_str_command(self):
@@ -487,19 +737,44 @@ class TestControlFormDeserialization(unittest.TestCase):
     # -- GetConfig --
 
     def test_get_config_request(self):
-        json_str = '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null}'
+        json_str = '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null,"codecs":null}'
         self.assertEqual(GetConfig.model_validate_json(json_str), GetConfig())
 
     def test_get_config_response(self):
         json_str = (
             '{"type":"get_config","error":null,"objuuid":null,"coluuid":null,'
-            '"config":{"agtuuid":"a1","port":8080}}'
+            '"config":{"agtuuid":"a1","port":8080},"codecs":null}'
         )
         self.assertEqual(
             GetConfig.model_validate_json(json_str),
             GetConfig(config={"agtuuid": "a1", "port": 8080}),
         )
 
+    # -- GetDeadLetters --
+
+    def test_get_dead_letters_request(self):
+        json_str = (
+            '{"type":"get_dead_letters","error":null,"objuuid":null,"coluuid":null,'
+            '"dest":"a2","purge":true,"dead_letters":[]}'
+        )
+        self.assertEqual(GetDeadLetters.model_validate_json(json_str), GetDeadLetters(dest="a2", purge=True))
+
+    # -- GetQueueStats --
+
+    def test_get_queue_stats_response(self):
+        json_str = (
+            '{"type":"get_queue_stats","error":null,"objuuid":null,"coluuid":null,'
+            '"messages":2,"size":900,"dropped":1,"rejected":0,'
+            '"destinations":[{"dest":"a2","messages":2,"size":900,"dropped":1,"rejected":0}]}'
+        )
+        self.assertEqual(
+            GetQueueStats.model_validate_json(json_str),
+            GetQueueStats(
+                messages=2, size=900, dropped=1,
+                destinations=[QueueStats(dest="a2", messages=2, size=900, dropped=1)]
+            ),
+        )
+
     # -- Hop --
 
     def test_hop(self):
@@ -582,6 +857,48 @@ class TestControlFormDeserialization(unittest.TestCase):
             CheckTicket(tckuuid="t1", create_time=1000.0, service_time=0.5),
         )
 
+    # -- WaitTicket --
+
+    def test_wait_ticket_serviced(self):
+        json_str = (
+            '{"type":"wait_ticket","error":null,"objuuid":null,"coluuid":null,'
+            '"tckuuid":"t1","wait_secs":10.0,"create_time":1000.0,"service_time":1000.5}'
+        )
+        self.assertEqual(
+            WaitTicket.model_validate_json(json_str),
+            WaitTicket(tckuuid="t1", wait_secs=10, create_time=1000.0, service_time=1000.5),
+        )
+
+    # -- CreateTickets --
+
+    def test_create_tickets_created(self):
+        json_str = (
+            '{"type":"create_tickets","error":null,"objuuid":null,"coluuid":null,"dsts":["a"],'
+            '"form":{"type":"get_config","error":null,"objuuid":null,"coluuid":null,"config":null,"codecs":null},'
+            '"tracing":false,"tickets":[{"type":"check_ticket","error":null,"objuuid":null,"coluuid":null,'
+            '"tckuuid":"t1","create_time":1000.0,"service_time":null}]}'
+        )
+        self.assertEqual(
+            CreateTickets.model_validate_json(json_str),
+            CreateTickets(dsts=["a"], form=GetConfig(), tickets=[CheckTicket(tckuuid="t1", create_time=1000.0)]),
+        )
+
+    # -- CheckTickets --
+
+    def test_check_tickets_checked(self):
+        json_str = (
+            '{"type":"check_tickets","error":null,"objuuid":null,"coluuid":null,"tckuuids":["t1"],'
+            '"wait_secs":0.0,"tickets":[{"type":"check_ticket","error":null,"objuuid":null,"coluuid":null,'
+            '"tckuuid":"t1","create_time":1000.0,"service_time":1000.5}]}'
+        )
+        self.assertEqual(
+            CheckTickets.model_validate_json(json_str),
+            CheckTickets(
+                tckuuids=["t1"],
+                tickets=[CheckTicket(tckuuid="t1", create_time=1000.0, service_time=1000.5)],
+            ),
+        )
+
     # -- CloseTicket --
 
     def test_close_ticket(self):
@@ -11,13 +11,18 @@ from stembot.models.control import SyncProcess
 from stembot.models.network import (
     Acknowledgement,
     Advertisement,
+    AdvertisementAck,
+    LinkState,
+    MulticastRequest,
+    MulticastResponse,
+    MulticastResult,
     NetworkMessagesRequest,
     NetworkMessagesResponse,
     NetworkTicket,
     Ping,
     TicketTraceResponse,
 )
-from stembot.models.routing import Route
+from stembot.models.routing import Link, Route
 
 
 class TestNetworkMessageSerialization(unittest.TestCase):
@@ -33,7 +38,7 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"ping","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null}',
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null}',
         )
 
     # -- NetworkMessagesRequest --
@@ -43,15 +48,18 @@ class TestNetworkMessageSerialization(unittest.TestCase):
             src="a1",
             timestamp=1000.0,
             limit=5,
+            max_bytes=65536,
             network_whitelist=[NetworkMessageType.PING, NetworkMessageType.TICKET_REQUEST],
             control_whitelist=[ControlFormType.GET_PEERS, ControlFormType.SYNC_PROCESS],
+            wait_secs=20,
         )
         self.assert_json_eq(
             msg,
             '{"type":"messages_request","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"limit":5,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,'
+            '"size":null,"limit":5,"max_bytes":65536,'
             '"network_whitelist":["ping","ticket_request"],'
-            '"control_whitelist":["get_peers","sync_process"]}',
+            '"control_whitelist":["get_peers","sync_process"],"wait_secs":20,"stream":false}',
         )
 
     # -- Acknowledgement --
@@ -61,7 +69,8 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"acknowledgement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"ack_type":"ping","forwarded":null,"error":null}',
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"ack_type":"ping","forwarded":null,"error":null}',
         )
 
     def test_acknowledgement_with_error(self):
@@ -74,7 +83,8 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"acknowledgement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"ack_type":"ticket_request","forwarded":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"ack_type":"ticket_request","forwarded":null,'
             '"error":"timeout"}',
         )
 
@@ -88,7 +98,8 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"acknowledgement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"ack_type":"ping","forwarded":"a2","error":null}',
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"ack_type":"ping","forwarded":"a2","error":null}',
         )
 
     # -- Advertisement --
@@ -98,7 +109,9 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"advertisement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"routes":[],"agtuuid":"a1"}',
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,'
+            '"size":null,"routes":[],"agtuuid":"a1",'
+            '"seq":null,"base_seq":null,"withdrawn":[]}',
         )
 
     def test_advertisement_with_routes(self):
@@ -111,9 +124,57 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"advertisement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
             '"routes":[{"agtuuid":"a2","gtwuuid":"a1","weight":1,"objuuid":null,"coluuid":null}],'
-            '"agtuuid":"a1"}',
+            '"agtuuid":"a1","seq":null,"base_seq":null,"withdrawn":[]}',
+        )
+
+    def test_advertisement_delta(self):
+        msg = Advertisement(
+            agtuuid="a1",
+            src="a1",
+            timestamp=1000.0,
+            routes=[Route(agtuuid="a2", gtwuuid="a1", weight=1)],
+            seq=5,
+            base_seq=3,
+            withdrawn=["a3"],
+        )
+        self.assert_json_eq(
+            msg,
+            '{"type":"advertisement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"routes":[{"agtuuid":"a2","gtwuuid":"a1","weight":1,"objuuid":null,"coluuid":null}],'
+            '"agtuuid":"a1","seq":5,"base_seq":3,"withdrawn":["a3"]}',
+        )
+
+    # -- LinkState --
+
+    def test_link_state(self):
+        msg = LinkState(
+            agtuuid="a1",
+            src="a1",
+            timestamp=1000.0,
+            seq=7,
+            links=[Link(agtuuid="a2", rtt_ms=12.5, loss=0.1), Link(agtuuid="a3")],
+            signature="ab12",
+        )
+        self.assert_json_eq(
+            msg,
+            '{"type":"link_state","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"agtuuid":"a1","seq":7,"links":[{"agtuuid":"a2","rtt_ms":12.5,"loss":0.1,"objuuid":null,"coluuid":null},'
+            '{"agtuuid":"a3","rtt_ms":null,"loss":0.0,"objuuid":null,"coluuid":null}],"signature":"ab12"}',
+        )
+
+    # -- AdvertisementAck --
+
+    def test_advertisement_ack(self):
+        msg = AdvertisementAck(agtuuid="a2", src="a2", dest="a1", timestamp=1000.0, seq=5)
+        self.assert_json_eq(
+            msg,
+            '{"type":"advertisement_ack","dest":"a1","src":"a2","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"agtuuid":"a2","seq":5}',
         )
 
     # -- NetworkMessagesResponse --
@@ -123,7 +184,8 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"messages_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"messages":[]}',
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,'
+            '"size":null,"messages":[],"more":false}',
         )
 
     def test_network_messages_response_with_ping(self):
@@ -135,9 +197,9 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"messages_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
             '"messages":[{"type":"ping","dest":null,"src":"b1","isrc":null,"timestamp":2000.0,'
-            '"objuuid":null,"coluuid":null}]}',
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null}],"more":false}',
         )
 
     # -- TicketTraceResponse --
@@ -153,7 +215,8 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"ticket_trace_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"tckuuid":"t1","hop_time":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"tckuuid":"t1","hop_time":1000.0,'
             '"network_ticket_type":"ticket_request"}',
         )
 
@@ -170,7 +233,8 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"ticket_request","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"tckuuid":"t1","error":null,"create_time":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"tckuuid":"t1","error":null,"create_time":null,'
             '"service_time":null,"tracing":false,'
             '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
             '"timeout":15,"command":"ls /","stdout":null,"stderr":null,'
@@ -195,7 +259,8 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         self.assert_json_eq(
             msg,
             '{"type":"ticket_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"tckuuid":"t1","error":null,"create_time":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"tckuuid":"t1","error":null,"create_time":null,'
             '"service_time":0.5,"tracing":false,'
             '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
             '"timeout":15,"command":"ls /","stdout":"bin\\n","stderr":null,'
@@ -203,6 +268,47 @@ class TestNetworkMessageSerialization(unittest.TestCase):
         )
 
 
+    # -- MulticastRequest --
+
+    def test_multicast_request(self):
+        msg = MulticastRequest(
+            mcuuid="m1",
+            src="a1",
+            dest="b1",
+            timestamp=1000.0,
+            dsts=["b1", "c1"],
+            form=SyncProcess(command="ls /"),
+        )
+        self.assert_json_eq(
+            msg,
+            '{"type":"multicast_request","dest":"b1","src":"a1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"mcuuid":"m1","dsts":["b1","c1"],'
+            '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
+            '"timeout":15,"command":"ls /","stdout":null,"stderr":null,'
+            '"status":null,"start_time":null,"elapsed_time":null}}',
+        )
+
+    # -- MulticastResponse --
+
+    def test_multicast_response(self):
+        msg = MulticastResponse(
+            mcuuid="m1",
+            src="b1",
+            dest="a1",
+            timestamp=1000.0,
+            results=[MulticastResult(agtuuid="c1", form=SyncProcess(command="ls /"), error="timed out")],
+        )
+        self.assert_json_eq(
+            msg,
+            '{"type":"multicast_response","dest":"a1","src":"b1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"mcuuid":"m1","results":[{"agtuuid":"c1",'
+            '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
+            '"timeout":15,"command":"ls /","stdout":null,"stderr":null,'
+            '"status":null,"start_time":null,"elapsed_time":null},"error":"timed out"}]}',
+        )
+
 class TestNetworkMessageDeserialization(unittest.TestCase):
     """Verify that canonical JSON strings deserialize to the expected model instances."""
 
@@ -211,7 +317,7 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_ping(self):
         json_str = (
             '{"type":"ping","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null}'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null}'
         )
         self.assertEqual(Ping.model_validate_json(json_str), Ping(src="a1", timestamp=1000.0))
 
@@ -220,9 +326,10 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_network_messages_request(self):
         json_str = (
             '{"type":"messages_request","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"limit":5,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,'
+            '"size":null,"limit":5,"max_bytes":65536,'
             '"network_whitelist":["ping","ticket_request"],'
-            '"control_whitelist":["get_peers","sync_process"]}'
+            '"control_whitelist":["get_peers","sync_process"],"wait_secs":20,"stream":false}'
         )
         self.assertEqual(
             NetworkMessagesRequest.model_validate_json(json_str),
@@ -230,8 +337,10 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
                 src="a1",
                 timestamp=1000.0,
                 limit=5,
+                max_bytes=65536,
                 network_whitelist=[NetworkMessageType.PING, NetworkMessageType.TICKET_REQUEST],
                 control_whitelist=[ControlFormType.GET_PEERS, ControlFormType.SYNC_PROCESS],
+                wait_secs=20,
             ),
         )
 
@@ -240,7 +349,8 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_acknowledgement_ping(self):
         json_str = (
             '{"type":"acknowledgement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"ack_type":"ping","forwarded":null,"error":null}'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"ack_type":"ping","forwarded":null,"error":null}'
         )
         self.assertEqual(
             Acknowledgement.model_validate_json(json_str),
@@ -250,7 +360,8 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_acknowledgement_with_error(self):
         json_str = (
             '{"type":"acknowledgement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"ack_type":"ticket_request","forwarded":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"ack_type":"ticket_request","forwarded":null,'
             '"error":"timeout"}'
         )
         self.assertEqual(
@@ -266,7 +377,8 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_acknowledgement_forwarded(self):
         json_str = (
             '{"type":"acknowledgement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"ack_type":"ping","forwarded":"a2","error":null}'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"ack_type":"ping","forwarded":"a2","error":null}'
         )
         self.assertEqual(
             Acknowledgement.model_validate_json(json_str),
@@ -283,7 +395,8 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_advertisement_empty_routes(self):
         json_str = (
             '{"type":"advertisement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"routes":[],"agtuuid":"a1"}'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,'
+            '"size":null,"routes":[],"agtuuid":"a1"}'
         )
         self.assertEqual(
             Advertisement.model_validate_json(json_str),
@@ -293,7 +406,7 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_advertisement_with_routes(self):
         json_str = (
             '{"type":"advertisement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
             '"routes":[{"agtuuid":"a2","gtwuuid":"a1","weight":1,"objuuid":null,"coluuid":null}],'
             '"agtuuid":"a1"}'
         )
@@ -307,12 +420,58 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
             ),
         )
 
+    def test_advertisement_delta(self):
+        json_str = (
+            '{"type":"advertisement","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"routes":[],"agtuuid":"a1","seq":5,"base_seq":3,"withdrawn":["a3"]}'
+        )
+        self.assertEqual(
+            Advertisement.model_validate_json(json_str),
+            Advertisement(agtuuid="a1", src="a1", timestamp=1000.0, seq=5, base_seq=3, withdrawn=["a3"]),
+        )
+
+    # -- LinkState --
+
+    def test_link_state(self):
+        json_str = (
+            '{"type":"link_state","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"agtuuid":"a1","seq":7,"links":[{"agtuuid":"a2","rtt_ms":12.5,"loss":0.1,"objuuid":null,"coluuid":null}],'
+            '"signature":"ab12"}'
+        )
+        self.assertEqual(
+            LinkState.model_validate_json(json_str),
+            LinkState(
+                agtuuid="a1",
+                src="a1",
+                timestamp=1000.0,
+                seq=7,
+                links=[Link(agtuuid="a2", rtt_ms=12.5, loss=0.1)],
+                signature="ab12",
+            ),
+        )
+
+    # -- AdvertisementAck --
+
+    def test_advertisement_ack(self):
+        json_str = (
+            '{"type":"advertisement_ack","dest":"a1","src":"a2","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"agtuuid":"a2","seq":null}'
+        )
+        self.assertEqual(
+            AdvertisementAck.model_validate_json(json_str),
+            AdvertisementAck(agtuuid="a2", src="a2", dest="a1", timestamp=1000.0),
+        )
+
     # -- NetworkMessagesResponse --
 
     def test_network_messages_response_empty(self):
         json_str = (
             '{"type":"messages_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"messages":[]}'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,'
+            '"size":null,"messages":[],"more":false}'
         )
         self.assertEqual(
             NetworkMessagesResponse.model_validate_json(json_str),
@@ -323,9 +482,9 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
         # messages items are deserialized as NetworkMessage base instances; verify JSON round-trip
         json_str = (
             '{"type":"messages_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
             '"messages":[{"type":"ping","dest":null,"src":"b1","isrc":null,"timestamp":2000.0,'
-            '"objuuid":null,"coluuid":null}]}'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null}],"more":false}'
         )
         result = NetworkMessagesResponse.model_validate_json(json_str)
         self.assertEqual(json.loads(result.model_dump_json()), json.loads(json_str))
@@ -335,7 +494,8 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_ticket_trace_response(self):
         json_str = (
             '{"type":"ticket_trace_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"tckuuid":"t1","hop_time":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"tckuuid":"t1","hop_time":1000.0,'
             '"network_ticket_type":"ticket_request"}'
         )
         self.assertEqual(
@@ -354,7 +514,8 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_network_ticket_request(self):
         json_str = (
             '{"type":"ticket_request","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"tckuuid":"t1","error":null,"create_time":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"tckuuid":"t1","error":null,"create_time":null,'
             '"service_time":null,"tracing":false,'
             '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
             '"timeout":15,"command":"ls /","stdout":null,"stderr":null,'
@@ -374,7 +535,8 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
     def test_network_ticket_response(self):
         json_str = (
             '{"type":"ticket_response","dest":null,"src":"a1","isrc":null,"timestamp":1000.0,'
-            '"objuuid":null,"coluuid":null,"tckuuid":"t1","error":null,"create_time":null,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"tckuuid":"t1","error":null,"create_time":null,'
             '"service_time":0.5,"tracing":false,'
             '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
             '"timeout":15,"command":"ls /","stdout":"bin\\n","stderr":null,'
@@ -399,5 +561,61 @@ class TestNetworkMessageDeserialization(unittest.TestCase):
         )
 
 
+    # -- MulticastRequest --
+
+    def test_multicast_request(self):
+        json_str = (
+            '{"type":"multicast_request","dest":"b1","src":"a1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"mcuuid":"m1","dsts":["b1","c1"],'
+            '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
+            '"timeout":15,"command":"ls /","stdout":null,"stderr":null,'
+            '"status":null,"start_time":null,"elapsed_time":null}}'
+        )
+        self.assertEqual(
+            MulticastRequest.model_validate_json(json_str),
+            MulticastRequest(
+                mcuuid="m1",
+                src="a1",
+                dest="b1",
+                timestamp=1000.0,
+                dsts=["b1", "c1"],
+                form=SyncProcess(command="ls /"),
+            ),
+        )
+
+    # -- MulticastResponse --
+
+    def test_multicast_response(self):
+        json_str = (
+            '{"type":"multicast_response","dest":"a1","src":"b1","isrc":null,"timestamp":1000.0,'
+            '"objuuid":null,"coluuid":null,"priority":null,"form_type":null,"msguuid":null,"size":null,'
+            '"mcuuid":"m1","results":[{"agtuuid":"c1",'
+            '"form":{"type":"sync_process","error":null,"objuuid":null,"coluuid":null,'
+            '"timeout":15,"command":"ls /","stdout":"bin\\n","stderr":null,'
+            '"status":0,"start_time":1000.0,"elapsed_time":0.1},"error":null}]}'
+        )
+        self.assertEqual(
+            MulticastResponse.model_validate_json(json_str),
+            MulticastResponse(
+                mcuuid="m1",
+                src="b1",
+                dest="a1",
+                timestamp=1000.0,
+                results=[
+                    MulticastResult(
+                        agtuuid="c1",
+                        form=SyncProcess(
+                            command="ls /",
+                            stdout="bin\n",
+                            status=0,
+                            start_time=1000.0,
+                            elapsed_time=0.1,
+                        ),
+                    )
+                ],
+            ),
+        )
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,195 @@
+"""Multicast delivery of a control form to many agents along a distribution tree.
+
+A multicast request carries one copy of a control form and the set of agents
+it is for. Each agent that receives it services the form if it is one of the
+destinations, and splits the remaining destinations by the next hop they are
+reached through (see stembot.messaging.next_hop), sending one copy per next hop.
+Each link therefore carries one copy of the form, however many destinations
+are reached through it.
+
+Aggregation:
+- Each agent that splits a request records a group in the multicasts
+  collection, with the agent the request came from (its upstream).
+- Results from the destinations in its branches are kept as receipts in the
+  multicast_receipts collection. They are sent upstream together in one
+  response once every destination has answered, and otherwise every second,
+  so each link carries one response per second per multicast at most.
+- On the originating agent the results service one ticket per destination,
+  which are checked and collected like any other ticket.
+- Groups and receipts expire after ticket_timeout_secs.
+"""
+
+import logging
+
+from threading import Thread
+from time import time
+from typing import Dict, List
+
+from stembot.dao import Collection
+from stembot.enums import NetworkMessageType
+from stembot.messaging import best_gateways, forward_network_message
+from stembot.models.config import CONFIG
+from stembot.models.multicast import MulticastGroup, MulticastReceipt
+from stembot.models.network import MulticastRequest, MulticastResponse, MulticastResult, NetworkTicket
+from stembot.models.routing import Peer
+from stembot.regions import route_keys
+from stembot.scheduling import scheduled
+from stembot.ticketing import service_ticket
+
+
+def split_destinations(dsts: List[str]) -> Dict[str, List[str]]:
+    """Group destinations by the next hop they are reached through.
+
+    A destination that is a peer is its own next hop, other destinations are
+    reached through the lowest weight gateway of their most specific route. Destinations without a route
+    are their own branch, so they are queued until a route is learned. This
+    agent is left out.
+
+    Args:
+        dsts: UUIDs of the destination agents.
+
+    Returns:
+        The destinations reached through each next hop, keyed by the next hop's UUID.
+    """
+    peers    = {peer.object.agtuuid for peer in Collection[Peer]('peers').find()}
+    gateways = best_gateways()
+
+    branches = {}
+    for dst in dict.fromkeys(dsts):
+        if dst == CONFIG.agtuuid:
+            continue
+        hop = dst if dst in peers else next((gateways[key] for key in route_keys(dst) if key in gateways), dst)
+        branches.setdefault(hop, []).append(dst)
+    return branches
+
+
+def open_multicast(
+    request: MulticastRequest,
+    upstream: str | None,
+    tickets: Dict[str, str] | None = None
+) -> List[MulticastRequest]:
+    """Record this agent's group for a multicast request and split it among the next hops.
+
+    Args:
+        request: The multicast request received or originated by this agent.
+        upstream: UUID of the agent to return results to, or None on the originating agent.
+        tickets: UUIDs of the tickets serviced by the results, by destination, on the originating agent.
+
+    Returns:
+        One copy of the request per next hop, each for the destinations reached through it.
+    """
+    Collection[MulticastGroup]('multicasts').upsert_object(
+        MulticastGroup(
+            mcuuid=request.mcuuid,
+            upstream=upstream,
+            dsts=list(dict.fromkeys(request.dsts)),
+            tickets=tickets or {}
+        )
+    )
+
+    return [
+        MulticastRequest(dest=hop, mcuuid=request.mcuuid, dsts=dsts, form=request.form)
+        for hop, dsts in split_destinations(request.dsts).items()
+    ]
+
+
+def record_multicast_results(mcuuid: str, results: List[MulticastResult]) -> None:
+    """Keep results for a multicast group, returning them at once if every destination has answered.
+
+    Args:
+        mcuuid: UUID of the multicast.
+        results: Results from destinations in this agent's branches, or from this agent.
+    """
+    receipts = Collection[MulticastReceipt]('multicast_receipts')
+    for result in results:
+        receipts.upsert_object(MulticastReceipt(mcuuid=mcuuid, agtuuid=result.agtuuid, result=result))
+
+    for group in Collection[MulticastGroup]('multicasts').find(mcuuid=mcuuid):
+        if len(receipts.find(mcuuid=mcuuid)) >= len(group.object.dsts):
+            flush_multicast(group.object)
+
+
+def flush_multicast(group: MulticastGroup) -> None:
+    """Return the results a multicast group has not yet returned.
+
+    The results are claimed by popping them, so a result is returned once even
+    when the group is flushed concurrently. Sent upstream in one response, or
+    on the originating agent used to service the destinations' tickets.
+
+    Args:
+        group: The multicast group to flush.
+    """
+    receipts = Collection[MulticastReceipt]('multicast_receipts')
+    claimed  = receipts.pop(mcuuid=group.mcuuid, sent='False')
+    if not claimed:
+        return
+
+    results = []
+    for receipt in claimed:
+        results.append(receipt.object.result)
+        receipts.upsert_object(
+            MulticastReceipt(
+                mcuuid=group.mcuuid,
+                agtuuid=receipt.object.agtuuid,
+                sent=True,
+                receipt_time=receipt.object.receipt_time
+            )
+        )
+
+    if group.upstream is not None:
+        response = MulticastResponse(dest=group.upstream, mcuuid=group.mcuuid, results=results)
+        Thread(target=forward_network_message, args=(response,)).start()
+        return
+
+    for result in results:
+        if tckuuid := group.tickets.get(result.agtuuid):
+            service_ticket(
+                NetworkTicket(
+                    tckuuid=tckuuid,
+                    form=result.form,
+                    error=result.error,
+                    type=NetworkMessageType.TICKET_RESPONSE
+                )
+            )
+
+
+@scheduled(every_secs=1)
+def flush_multicasts() -> None:
+    """Return the results multicast groups are holding, whether or not every destination has answered."""
+    groups   = Collection[MulticastGroup]('multicasts')
+    receipts = Collection[MulticastReceipt]('multicast_receipts')
+    for mcuuid in {receipt.object.mcuuid for receipt in receipts.find(sent='False')}:
+        found = groups.find(mcuuid=mcuuid)
+        if not found:
+            logging.warning('Dropping results for unknown multicast %s', mcuuid)
+            receipts.pop(mcuuid=mcuuid, sent='False')
+        for group in found:
+            flush_multicast(group.object)
+
+
+@scheduled(every_secs=60)
+def expire_multicasts() -> None:
+    """Remove multicast groups and receipts older than ticket_timeout_secs."""
+    cutoff = time() - CONFIG.ticket_timeout_secs
+
+    for group in Collection[MulticastGroup]('multicasts').pop(create_time=f'$lt:{cutoff}'):
+        logging.debug('Expiring multicast %s', group.object.mcuuid)
+
+    Collection[MulticastReceipt]('multicast_receipts').pop(receipt_time=f'$lt:{cutoff}')
+
+
+@scheduled(every_secs=60)
+def vacuum_multicasts() -> None:
+    """Vacuum the multicast collections to reclaim space from expired groups and receipts."""
+    Collection[MulticastGroup]('multicasts').vacuum()
+    Collection[MulticastReceipt]('multicast_receipts').vacuum()
+
+
+collection = Collection[MulticastGroup]('multicasts')
+collection.create_attribute('mcuuid', "/mcuuid")
+collection.create_attribute('create_time', "/create_time")
+
+collection = Collection[MulticastReceipt]('multicast_receipts')
+collection.create_attribute('mcuuid', "/mcuuid")
+collection.create_attribute('sent', "/sent")
+collection.create_attribute('receipt_time', "/receipt_time")
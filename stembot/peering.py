@@ -12,22 +12,92 @@ paths to reach other agents either directly or through gateway peers, with weigh
 path cost. All peer and route data is maintained in both persistent storage and in-memory
 caches for fast lookups during message routing.
 
+Routes are advertised with split horizon and poisoned reverse: a destination is
+advertised to the peer its best route goes through at max_weight, which the peer
+treats as unreachable, so two agents never route a destination through each other.
+A destination whose last route is lost is held down for hold_down_secs, accepting
+only routes no worse than the lost one, and routes through a gateway that stopped
+advertising or whose circuit breaker opened are withdrawn. Changes to the routes
+touch the route signal, and the agent advertises to its peers within a second of
+a change rather than waiting for the next periodic advertisement.
+
+Advertisements are sequenced per peer. A peer acknowledges the last advertisement
+it applied, and is then advertised only the routes changed and withdrawn since the
+acknowledged table, with a full table every advert_refresh_secs or whenever
+the peer acknowledges an advertisement this agent does not recognize. Routes learned
+from sequenced advertisements are set to their advertised weights rather than aged,
+for as long as the advertising gateway keeps advertising. Advertisements without a
+sequence number, from agents predating them, are applied as before. Agents with
+hierarchical UUIDs advertise summary and default routes between regions (see
+stembot.regions).
+
+Each agent measures the links to its peers. Every message forwarded to a peer
+is a round trip sample: small messages sample the round trip time, bulk
+transfers sample the throughput, and failed deliveries sample the loss. Peers
+with a URL that carried no traffic for PROBE_SECS are pinged instead. The
+smoothed estimates are kept on the peer, at most once every MEASURE_SECS per
+peer, and set the link weight added to the weight of routes learned through
+the peer, in place of a hop count of 1, so routes prefer fast links over the
+first gateway found at an equal hop count.
+
 Key functions:
-- touch_peer(): Refresh or create peer entry
+- touch_peer(): Refresh or create peer entry, at most once per refresh interval
+- measure_peer(): Fold a round trip to a peer into its link metrics
+- link_weight(): Weight added to routes learned through a peer
 - create_peer(): Register a new peer with optional TTL and polling
 - process_route_advertisement(): Handle incoming route information from peers
-- create_route_advertisement(): Build advertisements to share local topology
+- process_advertisement_ack(): Record a peer's acknowledgement of an advertisement
+- route_table(): Compute the best routes to share local topology
+- create_route_advertisement(): Build the advertisement of a route table to a peer
 - prune(): Clean up expired and invalid peers and routes
 """
 
-from time import time
-from typing import List
+import logging
+
+from threading import Thread
+from time import perf_counter, time
+from typing import Dict, List
 
 from stembot.dao import Collection
+from stembot.delivery import broken_hops
+from stembot.executor.agent import AgentClient
 from stembot.models.config import CONFIG
-from stembot.models.network import Advertisement
-from stembot.models.routing import Peer, Route
+from stembot.models.network import Advertisement, AdvertisementAck, Ping
+from stembot.models.routing import AdvertisedTable, HoldDown, Peer, Route, RouteAck, RouteSession
+from stembot.regions import accepted_route, summarize_weights
 from stembot.scheduling import scheduled
+from stembot.signals import read_signal, touch_signal
+
+# Routes through a gateway that has not advertised for this long are withdrawn
+ROUTE_SESSION_SECS = 30
+MAX_ADVERTISED_TABLES = 4
+
+# File whose modification time signals the advertising task that routes changed
+ROUTE_SIGNAL_PATH = 'routes.signal'
+
+# Weight of a new sample in a peer's smoothed link metrics
+LINK_SMOOTHING = 0.2
+
+# Successful round trips to a peer are sampled at most this often
+MEASURE_SECS = 1
+
+# Peers with a URL not measured for this long are pinged
+PROBE_SECS = 30
+
+# Round trip time in milliseconds that adds 1 to the weight of a link
+RTT_MS_PER_WEIGHT = 10.0
+
+# Highest weight of a link, however slow or lossy
+MAX_LINK_WEIGHT = 100
+
+# Signal touched whenever peers are deleted, so every worker process forgets the peers it touched
+PEER_SIGNAL_PATH = 'peers.signal'
+
+# When the next touch of each peer must reach the peers collection, keyed by agent UUID
+TOUCHED_PEERS: Dict[str, float] = {}
+
+# The peer signal when TOUCHED_PEERS was last checked against it
+TOUCHED_PEER_SIGNAL = 0
 
 def touch_peer(agtuuid: str) -> None:
     """Touch a peer to refresh its timestamps or create it if not present.
@@ -36,20 +106,43 @@ def touch_peer(agtuuid: str) -> None:
     doesn't exist or has expired (no URL and refresh time exceeded), creates it
     with the configured peer timeout value.
 
+    Touches are coalesced in memory: after a touch reaches the peers collection,
+    further touches of the peer return without reading it until the peer's
+    refresh time, or for peer_refresh_secs if the peer has none, so a peer
+    sending many messages costs one peer write per refresh interval. Each
+    worker process coalesces its own touches, and forgets them all when any
+    worker deletes a peer, so a deleted peer is created again on its next touch.
+
     Args:
         agtuuid: The agent UUID of the peer to touch.
     """
+    global TOUCHED_PEER_SIGNAL # pylint: disable=global-statement
+    now = time()
+
+    if (signal := read_signal(PEER_SIGNAL_PATH)) != TOUCHED_PEER_SIGNAL:
+        TOUCHED_PEERS.clear()
+        TOUCHED_PEER_SIGNAL = signal
+
+    if TOUCHED_PEERS.get(agtuuid, 0) > now:
+        return
+
     peers = Collection[Peer]('peers').find(agtuuid=agtuuid)
 
     if len(peers) == 0:
-        create_peer(agtuuid, ttl=CONFIG.peer_timeout_secs)
+        peer = create_peer(agtuuid, ttl=CONFIG.peer_timeout_secs).object
+    elif (
+        not peers[0].object.url and
+        peers[0].object.refresh_time and
+        peers[0].object.refresh_time < now
+    ):
+        peer = create_peer(agtuuid, ttl=CONFIG.peer_timeout_secs).object
     else:
-        if (
-            not peers[0].object.url and
-            peers[0].object.refresh_time and
-            peers[0].object.refresh_time < time()
-        ):
-            create_peer(agtuuid, ttl=CONFIG.peer_timeout_secs)
+        peer = peers[0].object
+
+    if not peer.url and peer.refresh_time:
+        TOUCHED_PEERS[agtuuid] = peer.refresh_time
+    else:
+        TOUCHED_PEERS[agtuuid] = now + CONFIG.peer_refresh_secs
 
 
 def delete_peer(agtuuid: str) -> None:
@@ -62,6 +155,8 @@ def delete_peer(agtuuid: str) -> None:
         agtuuid: The agent UUID of the peer to delete.
     """
     Collection[Peer]('peers').pop(agtuuid=agtuuid)
+    touch_signal(PEER_SIGNAL_PATH)
+    touch_signal(ROUTE_SIGNAL_PATH)
 
 
 def delete_peers() -> None:
@@ -71,6 +166,8 @@ def delete_peers() -> None:
     in-memory cache and persistent storage.
     """
     Collection[Peer]('peers').pop()
+    touch_signal(PEER_SIGNAL_PATH)
+    touch_signal(ROUTE_SIGNAL_PATH)
 
 
 
@@ -100,6 +197,7 @@ def create_peer(agtuuid: str, url: str | None = None, ttl: int | None = None, po
         peer = peers[0]
     else:
         peer = peer_collection.get_object()
+        touch_signal(ROUTE_SIGNAL_PATH)
 
     peer.object.agtuuid = agtuuid
     peer.object.url     = url
@@ -117,17 +215,188 @@ def create_peer(agtuuid: str, url: str | None = None, ttl: int | None = None, po
     return peer
 
 
+
+def held_down(agtuuid: str, weight: int) -> bool:
+    """Check whether a route to a destination is refused by the destination's hold down.
+
+    Args:
+        agtuuid: The destination agent UUID of the route.
+        weight: The weight of the route.
+
+    Returns:
+        True if the destination is held down at a lower weight.
+    """
+    return any(
+        hold_down.object.weight < weight for hold_down
+        in Collection[HoldDown]('hold_downs').find(agtuuid=agtuuid, expire_time=f'$gt:{time()}')
+    )
+
+
+def link_weight(peer: Peer | None) -> int:
+    """Return the weight of the link to a peer, added to the weight of routes learned through it.
+
+    The weight is the smoothed round trip time in units of RTT_MS_PER_WEIGHT,
+    inflated by the smoothed loss. A link whose round trip time has not been
+    measured weighs 1, as a hop did before links were measured.
+
+    Args:
+        peer: The peer, or None if it is not known.
+
+    Returns:
+        The weight of the link, from 1 to MAX_LINK_WEIGHT.
+    """
+    if peer is None:
+        return 1
+
+    rtt_ms = RTT_MS_PER_WEIGHT if peer.rtt_ms is None else peer.rtt_ms
+    weight = round(rtt_ms / (1.0 - min(peer.loss, 0.9)) / RTT_MS_PER_WEIGHT)
+    return min(MAX_LINK_WEIGHT, max(1, weight))
+
+
+def measure_peer(peer: Peer, elapsed_secs: float | None, transferred_bytes: int = 0) -> None:
+    """Fold a round trip to a peer into the peer's smoothed link metrics.
+
+    Successful round trips are sampled at most once every MEASURE_SECS, so
+    forwarding a burst of messages writes the peer once. Failures are always
+    sampled. If the link weight changes, the routes learned through the peer
+    are reweighted by the difference.
+
+    Args:
+        peer: The peer, as read when the round trip started.
+        elapsed_secs: Duration of the round trip in seconds, or None if it failed.
+        transferred_bytes: Bytes exchanged by a bulk transfer, which samples the throughput
+                           rather than the round trip time, or 0 for a small message.
+    """
+    if elapsed_secs is not None and peer.measure_time and time() - peer.measure_time < MEASURE_SECS:
+        return
+
+    peers = Collection[Peer]('peers')
+    found = peers.find(agtuuid=peer.agtuuid)
+    if not found:
+        return
+
+    peer       = found[0]
+    old_weight = link_weight(peer.object)
+
+    if elapsed_secs is None:
+        peer.object.loss = peer.object.loss + LINK_SMOOTHING * (1.0 - peer.object.loss)
+    else:
+        peer.object.loss = peer.object.loss * (1.0 - LINK_SMOOTHING)
+        if transferred_bytes:
+            throughput_bps = transferred_bytes / max(elapsed_secs, 1e-6)
+            peer.object.throughput_bps = smoothed(peer.object.throughput_bps, throughput_bps)
+        else:
+            peer.object.rtt_ms = smoothed(peer.object.rtt_ms, elapsed_secs * 1000.0)
+
+    peer.object.measure_time = time()
+    peer.commit()
+
+    if (change := link_weight(peer.object) - old_weight) != 0:
+        reweigh_gateway(peer.object.agtuuid, change)
+
+
+def smoothed(estimate: float | None, sample: float) -> float:
+    """Return an estimate moved LINK_SMOOTHING of the way towards a new sample.
+
+    Args:
+        estimate: The current estimate, or None if there is none.
+        sample: The new sample.
+
+    Returns:
+        The new estimate, or the sample if there was no estimate.
+    """
+    return sample if estimate is None else estimate + LINK_SMOOTHING * (sample - estimate)
+
+
+def reweigh_gateway(gtwuuid: str, change: int) -> None:
+    """Change the weight of every route through a gateway whose link weight changed.
+
+    Args:
+        gtwuuid: The gateway agent UUID.
+        change: The change in the gateway's link weight.
+    """
+    for route in Collection[Route]('routes').find(gtwuuid=gtwuuid):
+        route.object.weight = max(1, route.object.weight + change)
+        route.commit()
+    touch_signal(ROUTE_SIGNAL_PATH)
+
+
+def probe_peer(peer: Peer) -> None:
+    """Ping a peer and fold the round trip into its link metrics.
+
+    Args:
+        peer: The peer to probe.
+    """
+    try:
+        start = perf_counter()
+        AgentClient(url=peer.url).send_network_message(Ping(dest=peer.agtuuid))
+        measure_peer(peer, perf_counter() - start)
+    except Exception as exception: # pylint: disable=broad-except
+        logging.debug('Failed to probe %s: %s', peer.agtuuid, exception)
+        measure_peer(peer, None)
+
+
 def delete_route(agtuuid: str, gtwuuid: str) -> None:
     """Delete a specific route from the in-memory route collection.
 
     Removes a route identified by its destination agent UUID and gateway UUID
-    from the in-memory route cache.
+    from the in-memory route cache. If it was the last route to the destination,
+    holds the destination down for hold_down_secs.
 
     Args:
         agtuuid: The destination agent UUID of the route.
         gtwuuid: The gateway agent UUID of the route.
     """
-    Collection[Route]('routes').pop(agtuuid=agtuuid, gtwuuid=gtwuuid)
+    delete_routes(agtuuid=agtuuid, gtwuuid=gtwuuid)
+
+
+def delete_routes(*params: str, **kwparams: str) -> None:
+    """Delete the routes matching a query, holding down the destinations left without a route.
+
+    The routes are popped with one query, and the destinations that lost their
+    last route are found with one more, however many routes are deleted.
+
+    Args:
+        *params: Query parameter strings selecting the routes (e.g., 'gtwuuid=agent-uuid').
+        **kwparams: Query keyword parameters selecting the routes.
+    """
+    routes  = Collection[Route]('routes')
+    deleted = routes.pop(*params, **kwparams)
+    if not deleted:
+        return
+
+    touch_signal(ROUTE_SIGNAL_PATH)
+
+    if not CONFIG.hold_down_secs:
+        return
+
+    weights = {}
+    for route in deleted:
+        weights[route.object.agtuuid] = min(route.object.weight, weights.get(route.object.agtuuid, route.object.weight))
+
+    for route in routes.find(agtuuid=f'$oneof:{",".join(weights)}'):
+        weights.pop(route.object.agtuuid, None)
+
+    if not weights:
+        return
+
+    hold_downs = Collection[HoldDown]('hold_downs')
+    hold_downs.delete(agtuuid=f'$oneof:{",".join(weights)}')
+    for agtuuid, weight in weights.items():
+        hold_downs.upsert_object(HoldDown(agtuuid=agtuuid, weight=weight, expire_time=time() + CONFIG.hold_down_secs))
+
+
+def withdraw_gateway(gtwuuid: str) -> None:
+    """Delete the routes through a gateway and forget the advertisements applied from it.
+
+    The gateway's next delta advertisement is rejected, so it advertises a full
+    table once it is reachable again.
+
+    Args:
+        gtwuuid: The gateway agent UUID.
+    """
+    delete_routes(gtwuuid=gtwuuid)
+    Collection[RouteSession]('route_sessions').delete(gtwuuid=gtwuuid)
 
 
 def age_routes(v: int) -> None:
@@ -135,17 +404,31 @@ def age_routes(v: int) -> None:
 
     Implements route aging by incrementing the weight of all routes by the specified
     value. Routes that exceed the configured maximum weight are removed from the
-    collection, effectively aging them out of the system.
+    collection, effectively aging them out of the system. Routes through a gateway
+    that applied a sequenced advertisement within ROUTE_SESSION_SECS are kept at
+    their advertised weights, and routes through a gateway whose session lapsed or
+    whose circuit breaker is open are withdrawn. Routes are expired and aged with
+    one query each rather than one per route.
 
     Args:
         v: The amount to increment each route's weight by.
     """
-    for route in Collection[Route]('routes').find():
-        if route.object.weight > CONFIG.max_weight:
-            route.destroy()
-        else:
-            route.object.weight = route.object.weight + v
-            route.commit()
+    sessions = Collection[RouteSession]('route_sessions')
+
+    live_gtwuuids = {
+        session.object.gtwuuid for session
+        in sessions.find(receive_time=f'$gt:{time() - ROUTE_SESSION_SECS}')
+    }
+
+    lapsed_gtwuuids = {session.object.gtwuuid for session in sessions.find()} - live_gtwuuids
+
+    for gtwuuid in lapsed_gtwuuids | set(broken_hops()):
+        withdraw_gateway(gtwuuid)
+
+    aged = f'$!oneof:{",".join(live_gtwuuids)}' if live_gtwuuids else '$!eq:None'
+
+    delete_routes(gtwuuid=aged, weight=f'$gt:{CONFIG.max_weight}')
+    Collection[Route]('routes').increment('weight', v, gtwuuid=aged)
 
 
 def create_route(agtuuid: str, gtwuuid: str, weight: int) -> None:
@@ -154,12 +437,16 @@ def create_route(agtuuid: str, gtwuuid: str, weight: int) -> None:
     Creates a new route or updates an existing one with better (lower) weight.
     If multiple routes exist for the same agtuuid/gtwuuid pair, removes duplicates
     and creates a single route. Routes are stored in the in-memory collection only.
+    Routes refused by the destination's hold down are ignored.
 
     Args:
         agtuuid: The destination agent UUID of the route.
         gtwuuid: The gateway agent UUID through which to reach the destination.
         weight: The weight/cost of the route (lower is better).
     """
+    if held_down(agtuuid, weight):
+        return
+
     routes = Collection[Route]('routes')
 
     matches = routes.find(agtuuid=agtuuid, gtwuuid=gtwuuid)
@@ -182,6 +469,7 @@ def create_route(agtuuid: str, gtwuuid: str, weight: int) -> None:
         if route.object.weight > weight:
             route.object.weight = weight
             route.commit()
+            touch_signal(ROUTE_SIGNAL_PATH)
     else:
         # Never seen this agtuuid/gtwuuid combination before
         # So create the route.
@@ -190,31 +478,144 @@ def create_route(agtuuid: str, gtwuuid: str, weight: int) -> None:
             agtuuid=agtuuid,
             weight=weight
         )
+        touch_signal(ROUTE_SIGNAL_PATH)
+
+
+def set_route(agtuuid: str, gtwuuid: str, weight: int) -> None:
+    """Set the weight of a route, creating it if not present.
+
+    Unlike create_route(), the weight is set even if it is higher than the
+    route's current weight, as advertised by a sequenced advertisement. A route
+    refused by the destination's hold down is deleted instead.
+
+    Args:
+        agtuuid: The destination agent UUID of the route.
+        gtwuuid: The gateway agent UUID through which to reach the destination.
+        weight: The weight/cost of the route (lower is better).
+    """
+    if held_down(agtuuid, weight):
+        if Collection[Route]('routes').pop(agtuuid=agtuuid, gtwuuid=gtwuuid):
+            touch_signal(ROUTE_SIGNAL_PATH)
+        return
+
+    routes  = Collection[Route]('routes')
+    matches = routes.find(agtuuid=agtuuid, gtwuuid=gtwuuid)
+
+    for route in matches[1:]:
+        route.destroy()
+
+    if matches:
+        if matches[0].object.weight != weight:
+            matches[0].object.weight = weight
+            matches[0].commit()
+            touch_signal(ROUTE_SIGNAL_PATH)
+    else:
+        routes.build_object(gtwuuid=gtwuuid, agtuuid=agtuuid, weight=weight)
+        touch_signal(ROUTE_SIGNAL_PATH)
 
 
-def process_route_advertisement(advertisement: Advertisement) -> None:
+def process_route_advertisement(advertisement: Advertisement) -> AdvertisementAck | None:
     """Process a route advertisement and create routes for advertised destinations.
 
     Extracts routes from an advertisement received from another agent and creates
     local routes to those destinations through the advertising agent as a gateway.
-    Ignores routes to self and already-known peers. Increments advertised weights
-    by 1 to account for the additional hop through this agent.
+    Ignores routes to self and already-known peers, and summary and default
+    routes refused by stembot.regions.accepted_route(). Increments advertised weights
+    by the weight of the link to the advertising agent. Routes advertised
+    at max_weight or above are unreachable through the agent, and are deleted.
+
+    A sequenced full table replaces the routes through the advertising agent. A
+    sequenced delta is applied only if it is relative to the last advertisement
+    applied from the agent, and is otherwise ignored so the agent sends the
+    changes again, or a full table. Unsequenced advertisements only lower route
+    weights and prune the collections.
 
     Args:
         advertisement: The route advertisement from a peer.
+
+    Returns:
+        An acknowledgement of the last advertisement applied from the agent for a
+        sequenced advertisement, or None for an unsequenced one.
     """
-    peers = Collection[Peer]('peers')
+    peers = {peer.object.agtuuid: peer.object for peer in Collection[Peer]('peers').find()}
 
-    ignored_agtuuids = [CONFIG.agtuuid] + [peer.object.agtuuid for peer in peers.find()]
+    ignored_agtuuids = [CONFIG.agtuuid] + list(peers)
+    weight           = link_weight(peers.get(advertisement.agtuuid))
+
+    routes = [
+        r for r in advertisement.routes
+        if r.agtuuid not in ignored_agtuuids and accepted_route(r.agtuuid, advertisement.agtuuid)
+    ]
 
-    for route in [r for r in advertisement.routes if r.agtuuid not in ignored_agtuuids]:
-        create_route(
-            route.agtuuid,
-            advertisement.agtuuid,
-            route.weight + 1
+    unreachable = [r.agtuuid for r in routes if r.weight >= CONFIG.max_weight]
+    routes      = [r for r in routes if r.weight < CONFIG.max_weight]
+
+    for agtuuid in unreachable:
+        delete_route(agtuuid, advertisement.agtuuid)
+
+    if advertisement.seq is None:
+        for route in routes:
+            create_route(
+                route.agtuuid,
+                advertisement.agtuuid,
+                route.weight + weight
+            )
+
+        prune()
+        return None
+
+    sessions = Collection[RouteSession]('route_sessions')
+    found    = sessions.find(gtwuuid=advertisement.agtuuid)
+    session  = found[0].object if found else None
+
+    if advertisement.base_seq is None:
+        advertised = {route.agtuuid for route in routes}
+        for route in Collection[Route]('routes').find(gtwuuid=advertisement.agtuuid):
+            if route.object.agtuuid not in advertised:
+                delete_route(route.object.agtuuid, advertisement.agtuuid)
+    elif session is not None and session.seq == advertisement.base_seq:
+        for agtuuid in advertisement.withdrawn:
+            delete_route(agtuuid, advertisement.agtuuid)
+    else:
+        return AdvertisementAck(
+            dest=advertisement.agtuuid,
+            agtuuid=CONFIG.agtuuid,
+            seq=session.seq if session is not None else None
         )
 
-    prune()
+    for route in routes:
+        set_route(route.agtuuid, advertisement.agtuuid, route.weight + weight)
+
+    sessions.upsert_object(
+        RouteSession(
+            gtwuuid=advertisement.agtuuid,
+            seq=advertisement.seq,
+            objuuid=session.objuuid if session is not None else None
+        )
+    )
+
+    return AdvertisementAck(dest=advertisement.agtuuid, agtuuid=CONFIG.agtuuid, seq=advertisement.seq)
+
+
+def process_advertisement_ack(ack: AdvertisementAck) -> None:
+    """Record a peer's acknowledgement of the last advertisement it applied.
+
+    The acknowledgement is reconciled with the tables advertised to the peer
+    when the next advertisement to it is created.
+
+    Args:
+        ack: The acknowledgement from the peer.
+    """
+    acks  = Collection[RouteAck]('route_acks')
+    found = acks.find(agtuuid=ack.agtuuid)
+
+    acks.upsert_object(
+        RouteAck(
+            agtuuid=ack.agtuuid,
+            seq=ack.seq,
+            objuuid=found[0].object.objuuid if found else None
+        )
+    )
 
 
 def get_peers() -> List[Peer]:
@@ -246,7 +647,9 @@ def prune() -> None:
 
     Cleans up the in-memory collections by removing deceased peers (whose destroy_time
     has passed) and routes that point to non-existent or locally-originated gateways.
-    Helps maintain consistency in the network topology state.
+    Helps maintain consistency in the network topology state. Also removes expired
+    hold downs. The peers are read once, and the routes are pruned with one query
+    for unknown gateways and one for destinations that are peers.
     """
     routes = Collection[Route]('routes')
     peers  = Collection[Peer]('peers')
@@ -256,47 +659,143 @@ def prune() -> None:
     for peer in peers.find():
         if peer.object.destroy_time and peer.object.destroy_time < time():
             peer.destroy()
+            touch_signal(PEER_SIGNAL_PATH)
+            touch_signal(ROUTE_SIGNAL_PATH)
             continue
         peer_agtuuids.append(peer.object.agtuuid)
 
-    for route in routes.find():
-        if (
-            route.object.gtwuuid not in peer_agtuuids or
-            len(peers.find_objuuids(agtuuid=route.object.agtuuid)) > 0 or
-            route.object.agtuuid == CONFIG.agtuuid
-        ):
-            route.destroy()
+    unknown = f'$!oneof:{",".join(peer_agtuuids)}' if peer_agtuuids else '$!eq:None'
 
+    delete_routes(gtwuuid=unknown)
+    routes.delete(agtuuid=f'$oneof:{",".join([CONFIG.agtuuid] + peer_agtuuids)}')
 
-# pylint: disable=no-member
-def create_route_advertisement() -> Advertisement:
-    """Create a route advertisement with current routes and directly-known peers.
+    Collection[RouteSession]('route_sessions').delete(gtwuuid=unknown)
+    Collection[AdvertisedTable]('advertised_tables').delete(agtuuid=unknown)
+    Collection[RouteAck]('route_acks').delete(agtuuid=unknown)
+    Collection[HoldDown]('hold_downs').delete(expire_time=f'$lt:{time()}')
 
-    Builds an advertisement message containing all routes in the in-memory collection
-    and routes to all known peers with no direct URL. This advertisement can be sent
-    to peers to help them discover network topology.
+
+def route_table() -> Dict[str, Route]:
+    """Compute the route table advertised to peers.
+
+    Prunes the collections, then takes the lowest weight route to each known
+    destination and a zero weight route to each peer, leaving out peers and
+    gateways whose circuit breakers are open.
 
     Returns:
-        An Advertisement object containing current routes and peer information.
+        The best route to each destination, keyed by destination UUID.
     """
     prune()
 
-    routes = Collection[Route]('routes')
-    peers  = Collection[Peer]('peers')
+    broken = set(broken_hops())
+    table  = {}
+
+    for route in Collection[Route]('routes').find():
+        if route.object.gtwuuid in broken:
+            continue
+        if route.object.agtuuid not in table or table[route.object.agtuuid].weight > route.object.weight:
+            table[route.object.agtuuid] = route.object
+
+    for peer in Collection[Peer]('peers').find(agtuuid="$!eq:None"):
+        if peer.object.agtuuid not in broken:
+            table[peer.object.agtuuid] = Route(agtuuid=peer.object.agtuuid, gtwuuid=peer.object.agtuuid, weight=0)
 
-    advertisement = Advertisement(agtuuid=CONFIG.agtuuid)
+    return table
 
-    for route in routes.find():
-        route.object.gtwuuid = CONFIG.agtuuid
-        advertisement.routes.append(route.object)
 
-    for peer in peers.find(agtuuid="$!eq:None"):
-        route = Route(agtuuid=peer.object.agtuuid, weight=0,gtwuuid=CONFIG.agtuuid)
-        advertisement.routes.append(route)
+def advertised_weights(agtuuid: str, table: Dict[str, Route]) -> Dict[str, int]:
+    """Return the route weights advertised to a peer, with split horizon and poisoned reverse.
+
+    Destinations whose best route goes through the peer are advertised at
+    max_weight, so the peer does not route them back through this agent. With
+    hierarchical agent UUIDs, destinations outside the peer's region are
+    summarized (see stembot.regions).
+
+    Args:
+        agtuuid: UUID of the peer to advertise to.
+        table: The route table from route_table().
+
+    Returns:
+        The weight advertised for each destination, keyed by destination UUID.
+    """
+    return summarize_weights(
+        agtuuid,
+        {
+            dst: CONFIG.max_weight if route.gtwuuid == agtuuid else route.weight
+            for dst, route in table.items() if dst != agtuuid
+        }
+    )
+
+
+def create_route_advertisement(agtuuid: str, table: Dict[str, Route]) -> Advertisement:
+    """Create the next sequenced advertisement of a route table to a peer.
+
+    Advertises the full table when the peer has not acknowledged an advertisement
+    still kept, or advert_refresh_secs have passed since the last full
+    table. Otherwise advertises the routes changed and withdrawn since the table
+    the peer last acknowledged. Keeps the table advertised for later changes.
+
+    Args:
+        agtuuid: UUID of the peer to advertise to.
+        table: The route table from route_table().
+
+    Returns:
+        An Advertisement addressed to the peer.
+    """
+    weights = advertised_weights(agtuuid, table)
+
+    tables = Collection[AdvertisedTable]('advertised_tables')
+    found  = tables.find(agtuuid=agtuuid)
+    if found:
+        state = found[0].object
+    else:
+        # Start from the clock so a restarted agent does not reuse sequence numbers
+        state = AdvertisedTable(agtuuid=agtuuid, seq=int(time() * 1000))
+
+    for ack in Collection[RouteAck]('route_acks').find(agtuuid=agtuuid):
+        if ack.object.ack_time > state.ack_time:
+            state.ack_time  = ack.object.ack_time
+            state.acked_seq = ack.object.seq if str(ack.object.seq) in state.tables else None
+
+    base = state.tables.get(str(state.acked_seq))
+
+    advertisement = Advertisement(dest=agtuuid, agtuuid=CONFIG.agtuuid, seq=state.seq + 1)
+
+    if base is None or time() - state.full_time >= CONFIG.advert_refresh_secs:
+        state.full_time = time()
+        changed = weights
+    else:
+        advertisement.base_seq  = state.acked_seq
+        advertisement.withdrawn = [dst for dst in base if dst not in weights]
+        changed = {dst: weight for dst, weight in weights.items() if base.get(dst) != weight}
+
+    advertisement.routes = [
+        Route(agtuuid=dst, weight=weight, gtwuuid=CONFIG.agtuuid)
+        for dst, weight in changed.items()
+    ]
+
+    state.seq = advertisement.seq
+    state.tables[str(state.seq)] = weights
+
+    kept = sorted(int(seq) for seq in state.tables)[-MAX_ADVERTISED_TABLES:]
+    state.tables = {
+        seq: routes for seq, routes in state.tables.items()
+        if int(seq) in kept or seq == str(state.acked_seq)
+    }
+
+    tables.upsert_object(state)
 
     return advertisement
 
 
+@scheduled(every_secs=10)
+def probe_peers() -> None:
+    """Ping the peers with a URL whose links have not been measured for PROBE_SECS."""
+    for peer in Collection[Peer]('peers').find(url="$!eq:None"):
+        if peer.object.measure_time is None or time() - peer.object.measure_time >= PROBE_SECS:
+            Thread(target=probe_peer, args=(peer.object,)).start()
+
+
 @scheduled(every_secs=60)
 def vacuum_peers() -> None:
     """Vacuum the peer collection to optimize storage.
@@ -319,12 +818,26 @@ def vacuum_routes() -> None:
     Collection[Route]('routes').vacuum()
 
 
-collection = Collection[Peer]('peers')
-collection.create_attribute('agtuuid', "/agtuuid")
-collection.create_attribute('polling', "/polling")
-collection.create_attribute('url', "/url")
-
-collection = Collection[Route]('routes')
-collection.create_attribute('agtuuid', "/agtuuid")
-collection.create_attribute('gtwuuid', "/gtwuuid")
-collection.create_attribute('weight', "/weight")
+@scheduled(every_secs=60)
+def vacuum_advertisements() -> None:
+    """Vacuum the advertisement state and hold down collections to reclaim space from deceased peers."""
+    Collection[RouteSession]('route_sessions').vacuum()
+    Collection[AdvertisedTable]('advertised_tables').vacuum()
+    Collection[RouteAck]('route_acks').vacuum()
+    Collection[HoldDown]('hold_downs').vacuum()
+
+
+# Indexed attributes of the collections this module owns, keyed by collection name
+INDEXED_ATTRIBUTES = {
+    'peers':             (Peer,            ('agtuuid', 'polling', 'url')),
+    'routes':            (Route,           ('agtuuid', 'gtwuuid', 'weight')),
+    'route_sessions':    (RouteSession,    ('gtwuuid', 'receive_time')),
+    'advertised_tables': (AdvertisedTable, ('agtuuid',)),
+    'route_acks':        (RouteAck,        ('agtuuid',)),
+    'hold_downs':        (HoldDown,        ('agtuuid', 'expire_time')),
+}
+
+for name, (model, attributes) in INDEXED_ATTRIBUTES.items():
+    collection = Collection[model](name)
+    for attribute in attributes:
+        collection.create_attribute(attribute, f'/{attribute}')
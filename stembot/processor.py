@@ -9,34 +9,60 @@ for new messages, and advertising routes to maintain network topology informatio
 Encryption protocol:
 - Request and response bodies are raw binary AES-256 EAX ciphertext (Content-Type: application/binary).
 - The AES nonce and MAC tag are transmitted as hex strings in the Nonce and Tag HTTP headers respectively.
+- The plain text is JSON, or a frame (Content-Type: application/x-stembot-frame) with bulk payloads carried as raw
+  bytes. Responses use the format of the request.
+- A messages request with stream set is answered with a stream of separately sealed records instead
+  (Content-Type: application/x-stembot-channel, see stembot.executor.channel).
 """
-from threading import Thread
+from threading import BoundedSemaphore, Thread
+from typing import AsyncIterator, Dict, List
+import asyncio
 import traceback
 import logging
 
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
 from Crypto.Cipher import AES
 
 from stembot.executor.agent import AgentClient
-from stembot.executor.file import load_file_to_form, write_file_from_form
+from stembot.executor.channel import CHANNEL_CONTENT_TYPE, HEARTBEAT_SECS, seal_record
+from stembot.executor.codec import available_codecs
+from stembot.executor.frame import BINARY_CONTENT_TYPE, FRAME_CONTENT_TYPE, dump_body, load_body
+from stembot.executor.file import load_file_chunk_to_form, load_file_to_form, write_file_chunk_from_form
+from stembot.executor.file import write_file_from_form
+from stembot.executor.file import get_file_signature_to_form, load_file_delta_to_form, write_file_delta_from_form
 from stembot.executor.process import sync_process
 from stembot.logger import init_logger
+from stembot.enums import RoutingMode
 from stembot.models.config import CONFIG
 from stembot.ticketing import check_ticket, close_ticket, dedup_trace, read_ticket, service_ticket, service_trace
+from stembot.ticketing import collect_tickets, wait_ticket, wait_tickets
 from stembot.dao import Collection
-from stembot.messaging import forward_network_message, pop_network_messages, pull_filtered_network_messages
+from stembot.delivery import acquire_hop, get_dead_letters, is_repeated, record_failure, record_receipt, record_success
+from stembot.messaging import forward_network_message, pop_replayable_messages, pull_filtered_network_messages
+from stembot.messaging import get_queue_stats, long_poll_network_messages, wait_network_messages
+from stembot.messaging import pending_network_messages, polled_destinations
+from stembot.linkstate import originate_link_state, process_link_state
+from stembot.multicast import open_multicast, record_multicast_results
 from stembot.peering import touch_peer
-from stembot.peering import process_route_advertisement
+from stembot.peering import process_advertisement_ack, process_route_advertisement
 from stembot.peering import age_routes
-from stembot.peering import create_route_advertisement
+from stembot.peering import ROUTE_SIGNAL_PATH, create_route_advertisement, route_table
 from stembot.peering import create_peer, delete_peer, delete_peers, get_peers, get_routes
 from stembot.scheduling import scheduled
-from stembot.models.control import Benchmark, CheckTicket, CloseTicket, ControlForm
+from stembot.signals import read_signal
+from stembot.models.control import Benchmark, CheckTicket, CloseTicket, ControlForm, WaitTicket
 from stembot.models.control import ControlFormType, CreatePeer, DeletePeers, DiscoverPeer, GetConfig
 from stembot.models.control import GetRoutes, ControlFormTicket, LoadFile, SyncProcess, WriteFile, GetPeers
-from stembot.models.network import Acknowledgement, Advertisement, NetworkMessage, NetworkMessageType, Ping
+from stembot.models.control import LoadFileChunk, WriteFileChunk
+from stembot.models.control import GetFileSignature, LoadFileDelta, WriteFileDelta
+from stembot.models.control import GetDeadLetters, GetQueueStats
+from stembot.models.control import CheckTickets, CollectTickets, CreateTickets, MulticastTicket
+from stembot.models.network import Acknowledgement, Advertisement, AdvertisementAck, NetworkMessage, NetworkMessageType
+from stembot.models.network import LinkState, Ping
 from stembot.models.network import NetworkMessagesRequest, NetworkMessagesResponse, NetworkTicket, TicketTraceResponse
-from stembot.models.routing import Peer
+from stembot.models.network import MulticastRequest, MulticastResponse, MulticastResult
+from stembot.models.routing import Peer, Route
 
 # Initialize the logger when the module is imported
 # Worker threads use this module as an entry point,
@@ -46,6 +72,12 @@ init_logger()
 # Create FastAPI app instance
 app = FastAPI()
 
+# UUIDs of the peers with a poll in flight
+POLLING = set()
+
+# The route signal when routes were last advertised to the peers
+ADVERTISED_ROUTE_SIGNAL = 0
+
 
 @app.post("/control")
 async def control_handler(request: Request) -> Response:
@@ -55,7 +87,8 @@ async def control_handler(request: Request) -> Response:
     and written to the Nonce and Tag headers as hex strings. The processing logic is handled in the
     `process_control_form` function, which matches on the form type and executes the corresponding action. This
     endpoint will always return the same type of control form that was sent in the request, populated with the
-    response data or error information if an exception occurred.
+    response data or error information if an exception occurred. WAIT_TICKET and CHECK_TICKETS forms are awaited
+    here instead, so a client waiting on tickets does not hold up the worker.
 
     Args:
         request: The incoming HTTP request containing the encrypted control form.
@@ -71,15 +104,22 @@ async def control_handler(request: Request) -> Response:
 
     request_cipher.verify(tag)
 
-    form = ControlForm.model_validate_json(raw_message.decode())
+    framed = request.headers.get('Content-Type') == FRAME_CONTENT_TYPE
+    form   = load_body(ControlForm, raw_message, framed)
 
     try:
         logging.debug(form.type)
-        raw_message = process_control_form(form).model_dump_json().encode()
+        if form.type == ControlFormType.WAIT_TICKET:
+            form_out = await wait_ticket(WaitTicket(**form.model_dump()))
+        elif form.type == ControlFormType.CHECK_TICKETS:
+            form_out = await wait_tickets(CheckTickets(**form.model_dump()))
+        else:
+            form_out = process_control_form(form)
+        raw_message = dump_body(form_out, framed)
     except Exception as exception: # pylint: disable=broad-except
         logging.error(exception)
         form.error  = str(exception)
-        raw_message = form.model_dump_json().encode()
+        raw_message = dump_body(form, framed)
 
     response_cipher = AES.new(CONFIG.key, AES.MODE_EAX)
 
@@ -87,6 +127,7 @@ async def control_handler(request: Request) -> Response:
 
     return Response(
         content=cipher_text,
+        media_type=FRAME_CONTENT_TYPE if framed else BINARY_CONTENT_TYPE,
         headers={
             'Nonce': response_cipher.nonce.hex(),
             'Tag': tag.hex()
@@ -103,7 +144,7 @@ async def mpi_handler(request: Request) -> Response:
     in the `route_network_message` function, which determines how to handle the message based on its type and
     destination. If the message is destined for the current agent, it will be processed directly; otherwise, it
     will be forwarded to the appropriate peer. The response is typically an acknowledgement of receipt or an error
-    message if processing fails.
+    message if processing fails. A message that was already received is acknowledged without being processed again.
 
     Args:
         request: The incoming HTTP request containing the encrypted network message.
@@ -119,8 +160,8 @@ async def mpi_handler(request: Request) -> Response:
 
     request_cipher.verify(tag)
 
-    message = NetworkMessage.model_validate_json(raw_message.decode())
-
+    framed  = request.headers.get('Content-Type') == FRAME_CONTENT_TYPE
+    message = load_body(NetworkMessage, raw_message, framed)
 
     if isrc := message.isrc:
         touch_peer(isrc)
@@ -128,7 +169,20 @@ async def mpi_handler(request: Request) -> Response:
     if message.dest is None:
         message.dest = CONFIG.agtuuid
 
-    raw_message = route_network_message(message).model_dump_json().encode()
+    if is_repeated(message):
+        message_out = Acknowledgement(ack_type=message.type, src=message.src, dest=message.dest)
+    elif message.type == NetworkMessageType.MESSAGES_REQUEST and message.dest == CONFIG.agtuuid:
+        messages_request = NetworkMessagesRequest(**message.model_dump())
+        if messages_request.stream:
+            return StreamingResponse(
+                stream_network_messages(messages_request, framed),
+                media_type=CHANNEL_CONTENT_TYPE
+            )
+        message_out = await process_messages_request(messages_request)
+    else:
+        message_out = route_received_message(message)
+
+    raw_message = dump_body(message_out, framed)
 
     response_cipher = AES.new(CONFIG.key, AES.MODE_EAX)
 
@@ -136,6 +190,7 @@ async def mpi_handler(request: Request) -> Response:
 
     return Response(
         content=cipher_text,
+        media_type=FRAME_CONTENT_TYPE if framed else BINARY_CONTENT_TYPE,
         headers={
             'Nonce': response_cipher.nonce.hex(),
             'Tag': tag.hex()
@@ -186,6 +241,16 @@ def process_control_form(form: ControlForm) -> ControlForm:
             form = load_file_to_form(LoadFile(**form.model_dump()))
         case ControlFormType.WRITE_FILE:
             form = write_file_from_form(WriteFile(**form.model_dump()))
+        case ControlFormType.LOAD_FILE_CHUNK:
+            form = load_file_chunk_to_form(LoadFileChunk(**form.model_dump()))
+        case ControlFormType.WRITE_FILE_CHUNK:
+            form = write_file_chunk_from_form(WriteFileChunk(**form.model_dump()))
+        case ControlFormType.GET_FILE_SIGNATURE:
+            form = get_file_signature_to_form(GetFileSignature(**form.model_dump()))
+        case ControlFormType.LOAD_FILE_DELTA:
+            form = load_file_delta_to_form(LoadFileDelta(**form.model_dump()))
+        case ControlFormType.WRITE_FILE_DELTA:
+            form = write_file_delta_from_form(WriteFileDelta(**form.model_dump()))
         case ControlFormType.CREATE_TICKET:
             form = create_form_ticket(ControlFormTicket(**form.model_dump()))
         case ControlFormType.READ_TICKET:
@@ -194,9 +259,26 @@ def process_control_form(form: ControlForm) -> ControlForm:
             close_ticket(CloseTicket(**form.model_dump()))
         case ControlFormType.CHECK_TICKET:
             form = check_ticket(CheckTicket(**form.model_dump()))
+        case ControlFormType.CREATE_TICKETS:
+            form = create_form_tickets(CreateTickets(**form.model_dump()))
+        case ControlFormType.COLLECT_TICKETS:
+            form = collect_tickets(CollectTickets(**form.model_dump()))
+        case ControlFormType.MULTICAST_TICKET:
+            form = create_multicast_ticket(MulticastTicket(**form.model_dump()))
         case ControlFormType.GET_CONFIG:
             form = GetConfig(**form.model_dump())
             form.config = CONFIG.model_dump(exclude={'key'})
+            form.codecs = available_codecs()
+        case ControlFormType.GET_DEAD_LETTERS:
+            form = GetDeadLetters(**form.model_dump())
+            form.dead_letters = get_dead_letters(dest=form.dest, purge=form.purge)
+        case ControlFormType.GET_QUEUE_STATS:
+            form = GetQueueStats(**form.model_dump())
+            form.destinations = get_queue_stats()
+            form.messages     = sum(stats.messages for stats in form.destinations)
+            form.size         = sum(stats.size for stats in form.destinations)
+            form.dropped      = sum(stats.dropped for stats in form.destinations)
+            form.rejected     = sum(stats.rejected for stats in form.destinations)
         case ControlFormType.BENCHMARK:
             form = Benchmark(**form.model_dump())
             if size := form.inbound_size:
@@ -244,12 +326,89 @@ def create_form_ticket(control_form_ticket: ControlFormTicket) -> ControlFormTic
 
     # Clear content of returning control form ticket
     # to avoid sending potentially large data back through the network.
-    if ticket.object.type is ControlFormType.WRITE_FILE:
-        ticket.object.form['b64zlib'] = ""
+    if ticket.object.form.type in (
+        ControlFormType.WRITE_FILE, ControlFormType.WRITE_FILE_CHUNK, ControlFormType.WRITE_FILE_DELTA
+    ):
+        ticket.object.form.b64zlib = ""
 
     return ticket.object
 
 
+def create_form_tickets(form: CreateTickets) -> CreateTickets:
+    """Create tickets delivering the same control form to many destinations.
+
+    Args:
+        form: The CreateTickets form containing the control form and destinations.
+
+    Returns:
+        The CreateTickets form with the UUID and create time of each created ticket.
+    """
+    form.tickets = []
+    tickets = [
+        create_form_ticket(ControlFormTicket(dst=dst, form=form.form.model_copy(deep=True), tracing=form.tracing))
+        for dst in form.dsts
+    ]
+    for ticket in tickets:
+        form.tickets.append(CheckTicket(tckuuid=ticket.tckuuid, create_time=ticket.create_time))
+
+    # Return the form as cleared by create_form_ticket to avoid sending large payloads back.
+    if tickets:
+        form.form = tickets[-1].form
+    return form
+
+
+def create_multicast_ticket(form: MulticastTicket) -> MulticastTicket:
+    """Create tickets delivering the same control form to many destinations as a multicast.
+
+    Stores one ticket per destination and originates a multicast request for all
+    of them, whose results service the tickets.
+
+    Args:
+        form: The MulticastTicket form containing the control form and destinations.
+
+    Returns:
+        The MulticastTicket form with the UUID and create time of each created ticket.
+    """
+    form.dsts    = list(dict.fromkeys(form.dsts))
+    form.tickets = []
+
+    tickets  = Collection[ControlFormTicket]('tickets')
+    tckuuids = {}
+    for dst in form.dsts:
+        ticket = tickets.upsert_object(ControlFormTicket(dst=dst, form=form.form)).object
+        tckuuids[dst] = ticket.tckuuid
+        form.tickets.append(CheckTicket(tckuuid=ticket.tckuuid, create_time=ticket.create_time))
+
+    process_multicast_request(MulticastRequest(dest=CONFIG.agtuuid, dsts=form.dsts, form=form.form), None, tckuuids)
+    return form
+
+
+def process_multicast_request(
+    request: MulticastRequest,
+    upstream: str | None,
+    tckuuids: Dict[str, str] | None = None
+) -> None:
+    """Split a multicast request among the next hops and service its form if this agent is a destination.
+
+    Args:
+        request: The multicast request received or originated by this agent.
+        upstream: UUID of the agent to return results to, or None on the originating agent.
+        tckuuids: UUIDs of the tickets serviced by the results, by destination, on the originating agent.
+    """
+    for branch in open_multicast(request, upstream, tckuuids):
+        route_network_message(branch)
+
+    if CONFIG.agtuuid in request.dsts:
+        form = request.form.model_copy(deep=True)
+        try:
+            form = process_control_form(form)
+        except Exception as exception: # pylint: disable=broad-except
+            form.error = str(exception)
+            logging.error('Encountered exception with multicast %s: %s', request.mcuuid, exception)
+
+        record_multicast_results(request.mcuuid, [MulticastResult(agtuuid=CONFIG.agtuuid, form=form)])
+
+
 def route_network_message(message_in: NetworkMessage) -> NetworkMessage:
     """Route a network message to its destination or forward it to an intermediate peer.
 
@@ -301,6 +460,108 @@ def route_network_message(message_in: NetworkMessage) -> NetworkMessage:
     )
 
 
+def route_received_message(message: NetworkMessage) -> NetworkMessage:
+    """Route a message received from another agent and record its receipt.
+
+    The receipt is recorded only once the message was processed, or handed
+    on to be forwarded or queued, so a delivery that fails here is processed
+    again when the sender retries it.
+
+    Args:
+        message: The received message.
+
+    Returns:
+        An acknowledgement of receipt (or other response from processing).
+    """
+    message_out = route_network_message(message)
+    if not (isinstance(message_out, Acknowledgement) and message_out.error):
+        record_receipt(message)
+    return message_out
+
+
+def messages_response(
+    message: NetworkMessagesRequest,
+    network_messages: List[NetworkMessage],
+    dests: List[str] | None = None
+) -> NetworkMessagesResponse:
+    """Build the response to a messages request.
+
+    Args:
+        message: The messages request.
+        network_messages: The messages retrieved for the requesting agent.
+        dests: The destinations polled for, from polled_destinations(), or None to look them up.
+
+    Returns:
+        A MESSAGES_RESPONSE flagging whether more messages are waiting for the requesting agent.
+    """
+    return NetworkMessagesResponse(
+        messages=network_messages,
+        more=pending_network_messages(message, dests),
+        type=NetworkMessageType.MESSAGES_RESPONSE,
+        dest=message.isrc
+    )
+
+
+async def process_messages_request(message: NetworkMessagesRequest) -> NetworkMessage:
+    """Process a messages request, holding long polls open until messages arrive.
+
+    Requests with wait_secs wait for messages for the requesting agent or its
+    subtree without blocking the event loop, so idle polling agents cost one
+    open request per long_poll_secs instead of one request per second.
+
+    Args:
+        message: The messages request.
+
+    Returns:
+        A MESSAGES_RESPONSE, or an acknowledgement with the error if processing failed.
+    """
+    try:
+        dests            = await asyncio.to_thread(polled_destinations, message.isrc)
+        network_messages = await long_poll_network_messages(message, dests)
+        return await asyncio.to_thread(messages_response, message, network_messages, dests)
+    except: # pylint: disable=bare-except
+        return Acknowledgement(
+            ack_type=message.type,
+            src=message.src,
+            dest=message.dest,
+            error=traceback.format_exc()
+        )
+
+
+async def stream_network_messages(message: NetworkMessagesRequest, framed: bool) -> AsyncIterator[bytes]:
+    """Stream the records of a polling channel until the polling agent disconnects.
+
+    Writes a record with the messages for the polling agent or its subtree as
+    soon as they are queued, at most the request's limit per record, and an
+    empty record every heartbeat. The first record is written immediately, as
+    is the next record while more messages are waiting.
+    Records are only produced as fast as the polling agent reads them, so a
+    slow polling agent leaves its messages queued here. The queue is queried
+    in a thread for each record rather than on the event loop.
+
+    Args:
+        message: The messages request that opened the channel.
+        framed: Write the records' plain text as frames rather than JSON text.
+
+    Yields:
+        Sealed records, each a NetworkMessagesResponse.
+    """
+    logging.info('Opened polling channel for %s', message.isrc)
+    timeout_secs = 0
+    try:
+        while True:
+            if message.isrc:
+                touch_peer(message.isrc)
+
+            dests            = await asyncio.to_thread(polled_destinations, message.isrc)
+            network_messages = await wait_network_messages(message, timeout_secs, dests)
+            response         = await asyncio.to_thread(messages_response, message, network_messages, dests)
+            yield seal_record(dump_body(response, framed))
+            timeout_secs = 0 if response.more else HEARTBEAT_SECS
+    finally:
+        logging.info('Closed polling channel for %s', message.isrc)
+
+
 def process_network_message(message: NetworkMessage) -> NetworkMessage | None:
     """Process a network message based on its type and generate an appropriate response.
 
@@ -319,8 +580,15 @@ def process_network_message(message: NetworkMessage) -> NetworkMessage | None:
     match message.type:
         case NetworkMessageType.PING:
             pass
-        case NetworkMessageType.ADVERTISEMENT:
-            process_route_advertisement(Advertisement(**message.model_dump()))
+        case NetworkMessageType.ADVERTISEMENT if CONFIG.routing_mode == RoutingMode.DISTANCE_VECTOR:
+            if ack := process_route_advertisement(Advertisement(**message.model_dump())):
+                route_network_message(ack)
+        case NetworkMessageType.ADVERTISEMENT_ACK:
+            process_advertisement_ack(AdvertisementAck(**message.model_dump()))
+        case NetworkMessageType.LINK_STATE if CONFIG.routing_mode == RoutingMode.LINK_STATE:
+            process_link_state(LinkState(**message.model_dump()))
+        case NetworkMessageType.ADVERTISEMENT | NetworkMessageType.LINK_STATE:
+            logging.debug('Ignoring %s in %s routing mode', message.type, CONFIG.routing_mode)
         case NetworkMessageType.TICKET_REQUEST:
             ticket = NetworkTicket(**message.model_dump())
             try:
@@ -331,17 +599,22 @@ def process_network_message(message: NetworkMessage) -> NetworkMessage | None:
 
             ticket.src, ticket.dest = ticket.dest, ticket.src
             ticket.type = NetworkMessageType.TICKET_RESPONSE
+            ticket.msguuid = None
             route_network_message(ticket)
         case NetworkMessageType.TICKET_RESPONSE:
             service_ticket(NetworkTicket(**message.model_dump()))
         case NetworkMessageType.TICKET_TRACE_RESPONSE:
             service_trace(TicketTraceResponse(**message.model_dump()))
+        case NetworkMessageType.MULTICAST_REQUEST:
+            multicast_request = MulticastRequest(**message.model_dump())
+            process_multicast_request(multicast_request, multicast_request.src)
+        case NetworkMessageType.MULTICAST_RESPONSE:
+            multicast_response = MulticastResponse(**message.model_dump())
+            record_multicast_results(multicast_response.mcuuid, multicast_response.results)
         case NetworkMessageType.MESSAGES_REQUEST:
-            return NetworkMessagesResponse(
-                messages=pull_filtered_network_messages(NetworkMessagesRequest(**message.model_dump())),
-                type=NetworkMessageType.MESSAGES_RESPONSE,
-                dest=message.isrc
-            )
+            messages_request = NetworkMessagesRequest(**message.model_dump())
+            dests            = polled_destinations(messages_request.isrc)
+            return messages_response(messages_request, pull_filtered_network_messages(messages_request, dests), dests)
         case _:
             logging.warning('Unknown network message type encountered')
 
@@ -352,62 +625,147 @@ def replay():
 
     Background worker that runs on a 1-second timer. Retrieves all stored network
     messages with a null destination and routes them through the network. Each message
-    is routed in a separate background thread to avoid blocking.
+    is routed in a separate background thread to avoid blocking. Messages are replayed
+    by priority class, taking turns between destinations within a class. Messages for
+    destinations whose next hop is backing off stay queued, and at most retry_budget
+    messages are replayed per run.
     """
-    for message in pop_network_messages(dest='$!eq:None'):
+    for message in pop_replayable_messages():
         route_network_message(message)
 
 
-def poll(peer: Peer):
-    """Poll a peer for pending network messages via the MESSAGES_REQUEST protocol.
+def receive_polled_messages(network_message: NetworkMessage, window: BoundedSemaphore) -> bool:
+    """Route the messages of a poll response locally.
 
-    Sends a MESSAGES_REQUEST to the specified peer and processes the response.
-    If messages are returned, each is routed locally in a separate background thread.
-    If an error is received, logs it for debugging.
+    Messages that were already received are skipped, and each of the others
+    is routed in a separate background thread. At most window messages are
+    routed at a time; receiving more waits for one to finish, so a busy agent
+    stops reading from its peer rather than piling up threads.
 
     Args:
-        peer: The peer to poll for messages.
-    """
-    client = AgentClient(url=peer.url)
+        network_message: The poll response.
+        window: Limits the messages being routed at a time.
 
-    network_message = client.send_network_message(NetworkMessagesRequest())
+    Returns:
+        True if the response contained messages or more messages are waiting.
+    """
+    def route(message: NetworkMessage):
+        try:
+            route_received_message(message)
+        finally:
+            window.release()
 
     match network_message.type:
         case NetworkMessageType.MESSAGES_RESPONSE:
             network_messages = NetworkMessagesResponse(**network_message.model_dump())
-            for network_message in network_messages.messages:
-                Thread(target=route_network_message, args=(network_message,)).start()
+            for message in network_messages.messages:
+                if is_repeated(message):
+                    continue
+                window.acquire() # pylint: disable=consider-using-with
+                Thread(target=route, args=(message,)).start()
+            return len(network_messages.messages) > 0 or network_messages.more
         case NetworkMessageType.ACKNOWLEDGEMENT:
             acknowledment = Acknowledgement(**network_message.model_dump())
             if acknowledment.error:
                 logging.error(acknowledment.error)
 
+    return False
+
+
+def poll(peer: Peer):
+    """Poll a peer for pending network messages via the MESSAGES_REQUEST protocol.
+
+    With polling_channel enabled, opens a persistent channel to the peer over
+    which it streams messages as they are queued, until the connection closes.
+    Otherwise sends a long polling MESSAGES_REQUEST, which the peer holds open
+    for up to long_poll_secs until messages are queued, and polls again
+    immediately while messages are returned or more are waiting. Either way the next poll is left to
+    polling(). The peer's hop health records one success once the first
+    response arrives, rather than one per response, and one failure if the
+    poll fails, so failed polls back off like failed deliveries to the peer.
+
+    Args:
+        peer: The peer to poll for messages.
+    """
+    client    = AgentClient(url=peer.url)
+    window    = BoundedSemaphore(CONFIG.channel_window)
+    connected = False
+
+    def received():
+        nonlocal connected
+        if not connected:
+            record_success(peer.agtuuid)
+            connected = True
+
+    try:
+        if CONFIG.polling_channel:
+            for network_message in client.open_channel(NetworkMessagesRequest(limit=CONFIG.channel_window)):
+                received()
+                receive_polled_messages(network_message, window)
+        else:
+            while True:
+                network_message = client.send_network_message(
+                    NetworkMessagesRequest(wait_secs=CONFIG.long_poll_secs or None)
+                )
+                received()
+                if not receive_polled_messages(network_message, window):
+                    break
+    except Exception as exception: # pylint: disable=broad-except
+        logging.error('Failed to poll %s: %s', peer.url, exception)
+        record_failure(peer.agtuuid, str(exception))
+    finally:
+        POLLING.discard(peer.agtuuid)
+
 
 @scheduled(every_secs=1)
 def polling():
     """Poll all peers configured for polling in search of pending messages.
 
     Background worker that runs on a 1-second timer. Finds all peers with polling
-    enabled and spawns a background thread to poll each one for pending messages.
-    Responses are processed and routed locally.
+    enabled and spawns a background thread to poll each one for pending messages,
+    unless a poll of the peer is already in flight or the peer is backing off
+    after failed polls. A closed channel is reopened on the next run. Responses
+    are processed and routed locally.
     """
     for peer in Collection[Peer]('peers').find(url='$!eq:None', polling=True):
-        Thread(target=poll, args=(peer.object,)).start()
+        if peer.object.agtuuid not in POLLING and acquire_hop(peer.object.agtuuid):
+            POLLING.add(peer.object.agtuuid)
+            Thread(target=poll, args=(peer.object,)).start()
 
 
-def advertise(peer: Peer):
+def advertise(peer: Peer, table: Dict[str, Route]):
     """Send a route advertisement to a specific peer.
 
-    Creates a route advertisement containing the current agent's routes and
-    sends it to the specified peer. Used by ad_worker to periodically share
-    network topology information.
+    Creates a route advertisement of the current agent's route table, carrying
+    only the routes changed since the table the peer last acknowledged where
+    possible, and sends it to the specified peer. Used by advertise_peers() to
+    share network topology information.
 
     Args:
         peer: The peer to send the advertisement to.
+        table: The route table to advertise, from route_table().
     """
-    advertisement = create_route_advertisement()
-    advertisement.dest = peer.agtuuid
-    route_network_message(advertisement)
+    route_network_message(create_route_advertisement(peer.agtuuid, table))
+
+
+def advertise_peers():
+    """Advertise the current agent's routes to all known peers.
+
+    The route table is computed once and shared by the advertisements to every
+    peer, and the route signal it reflects is recorded so triggered_advertizing()
+    only advertises again after the routes change. In link state mode, originates
+    a link state record instead if this agent's links changed.
+    """
+    global ADVERTISED_ROUTE_SIGNAL # pylint: disable=global-statement
+    ADVERTISED_ROUTE_SIGNAL = read_signal(ROUTE_SIGNAL_PATH)
+
+    if CONFIG.routing_mode == RoutingMode.LINK_STATE:
+        originate_link_state()
+        return
+
+    table = route_table()
+    for peer in Collection[Peer]('peers').find():
+        Thread(target=advertise, args=(peer.object, table)).start()
 
 
 @scheduled(every_secs=10)
@@ -416,8 +774,21 @@ def advertizing():
 
     Runs periodically age routes and
     advertise the current agent's routes to all known peers. Helps maintain
-    network topology information and clean up stale routes.
+    network topology information and clean up stale routes. Routes are not
+    aged in link state mode, where they are computed from link state records.
     """
-    age_routes(1)
-    for peer in Collection[Peer]('peers').find():
-        Thread(target=advertise, args=(peer.object,)).start()
+    if CONFIG.routing_mode == RoutingMode.DISTANCE_VECTOR:
+        age_routes(1)
+    advertise_peers()
+
+
+@scheduled(every_secs=1)
+def triggered_advertizing():
+    """Advertise to all peers within a second of a change to the routes or peers.
+
+    Changes between the periodic advertisements, such as routes learned or
+    withdrawn and peers created or deleted, touch the route signal. Changes
+    within the same second are advertised together.
+    """
+    if read_signal(ROUTE_SIGNAL_PATH) != ADVERTISED_ROUTE_SIGNAL:
+        advertise_peers()
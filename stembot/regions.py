@@ -0,0 +1,146 @@
+"""Hierarchical addressing with summarized routes between regions.
+
+Agents whose UUIDs take the form <region>/<name>, such as east/web-01, belong
+to the region before the slash. Agents with plain UUIDs belong to no region and
+route as before. Within a region agents keep a route to every other agent of
+the region, but outside it the region is reached through a single summary
+route, keyed <region>/*, and inside it the rest of the network is reached
+through a single default route, keyed *. Routing state then grows with the
+size of an agent's own region and the number of regions, rather than with the
+size of the network.
+
+Summary and default routes are ordinary destinations of the route tables, so
+they are advertised, acknowledged, aged, held down and poisoned like any
+other route. They are created when a route table is advertised:
+- To a peer in another region, or in no region, the agent's own region is
+  advertised as one summary route at weight 0, and default routes are left out.
+- To a peer in the same region, every destination outside the region is
+  advertised as one default route at the lowest of their weights.
+
+An agent in a region that peers with agents in other regions is that region's
+gateway; other agents of the region are leaves, which only hold the routes of
+their region and the default route their gateways advertise. A region is
+expected to stay connected internally: a gateway that lost its way to part of
+its region still advertises the whole region.
+
+Messages are forwarded along the most specific route to their destination:
+an exact route, then the summary route of the destination's region, then the
+default route. Agents never use a summary or default route to reach an agent
+of their own region.
+"""
+
+from typing import Dict, List
+
+from stembot.models.config import CONFIG
+
+# Separates an agent's region from its name in a hierarchical agent UUID
+REGION_SEPARATOR = '/'
+
+# Destination of the default route
+DEFAULT_ROUTE = '*'
+
+
+def region_of(agtuuid: str | None) -> str | None:
+    """Return the region of an agent or summary route destination.
+
+    Args:
+        agtuuid: The agent UUID or route destination.
+
+    Returns:
+        The region, or None if the agent belongs to no region or the destination is the default route.
+    """
+    if not agtuuid or REGION_SEPARATOR not in agtuuid:
+        return None
+    return agtuuid.rsplit(REGION_SEPARATOR, 1)[0]
+
+
+def summary_route(region: str) -> str:
+    """Return the destination of the summary route of a region.
+
+    Args:
+        region: The region.
+
+    Returns:
+        The summary route destination, <region>/*.
+    """
+    return f'{region}{REGION_SEPARATOR}*'
+
+
+def is_summary_route(agtuuid: str) -> bool:
+    """Check whether a route destination is a summary or default route rather than an agent."""
+    return agtuuid == DEFAULT_ROUTE or agtuuid.endswith(f'{REGION_SEPARATOR}*')
+
+
+def route_keys(agtuuid: str) -> List[str]:
+    """Return the route destinations that may lead to an agent, most specific first.
+
+    Args:
+        agtuuid: UUID of the destination agent.
+
+    Returns:
+        The agent itself, then the summary route of its region and the default
+        route, unless the agent is in this agent's region.
+    """
+    region = region_of(agtuuid)
+    own    = region_of(CONFIG.agtuuid)
+
+    keys = [agtuuid]
+    if region is not None and region != own:
+        keys.append(summary_route(region))
+    if own is not None and region != own:
+        keys.append(DEFAULT_ROUTE)
+    return keys
+
+
+def accepted_route(agtuuid: str, gtwuuid: str) -> bool:
+    """Check whether a route advertised by a peer is kept.
+
+    Summary routes of this agent's own region are refused, as the region's
+    agents are reached by exact routes, and default routes are only accepted
+    from peers in the same region.
+
+    Args:
+        agtuuid: The destination of the route.
+        gtwuuid: UUID of the advertising peer.
+
+    Returns:
+        True if the route is kept.
+    """
+    own = region_of(CONFIG.agtuuid)
+
+    if agtuuid == DEFAULT_ROUTE:
+        return own is not None and region_of(gtwuuid) == own
+
+    return not (own is not None and agtuuid == summary_route(own))
+
+
+def summarize_weights(agtuuid: str, weights: Dict[str, int]) -> Dict[str, int]:
+    """Summarize the route weights advertised to a peer by region.
+
+    Args:
+        agtuuid: UUID of the peer to advertise to.
+        weights: The weight advertised for each destination, keyed by destination.
+
+    Returns:
+        The weights with the destinations outside the peer's region summarized, keyed by destination.
+    """
+    own = region_of(CONFIG.agtuuid)
+    if own is None:
+        return {dst: weight for dst, weight in weights.items() if dst != DEFAULT_ROUTE}
+
+    if region_of(agtuuid) == own:
+        external   = [weight for dst, weight in weights.items() if region_of(dst) != own]
+        summarized = {
+            dst: weight for dst, weight in weights.items()
+            if region_of(dst) == own and not is_summary_route(dst)
+        }
+        if external:
+            summarized[DEFAULT_ROUTE] = min(external)
+    else:
+        summarized = {
+            dst: weight for dst, weight in weights.items()
+            if region_of(dst) != own and dst != DEFAULT_ROUTE
+        }
+        summarized[summary_route(own)] = 0
+
+    return summarized
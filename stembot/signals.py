@@ -0,0 +1,80 @@
+"""Signals between worker processes carried by the modification times of files.
+
+A signal is a file whose modification time is set, in nanoseconds, whenever
+the state it stands for changes. A task or wait in any worker process keeps
+the signal it last read and compares it with the file's, so checking for a
+change costs one stat() rather than a query.
+
+Keyed signals keep one file per key, such as one per ticket, in a directory,
+so a change to one key only wakes the waits on that key.
+"""
+
+from pathlib import Path
+from time import time, time_ns
+from typing import Dict
+import asyncio
+import hashlib
+import os
+
+# How often a wait checks its signals
+SIGNAL_SECS = 0.05
+
+
+def keyed_signal_path(path: str, key: str) -> str:
+    """Return the path of the signal for one key of a keyed signal.
+
+    Args:
+        path: Path of the directory holding the keyed signal.
+        key: The key, such as a ticket or agent UUID.
+
+    Returns:
+        The path of the key's signal file.
+    """
+    return os.path.join(path, hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+
+
+def touch_signal(path: str) -> None:
+    """Signal a change by setting the modification time of a signal file to now.
+
+    Args:
+        path: Path of the signal file, created with its directory if missing.
+    """
+    now = time_ns()
+    try:
+        Path(path).touch()
+    except FileNotFoundError:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).touch()
+    os.utime(path, ns=(now, now))
+
+
+def read_signal(path: str) -> int:
+    """Return when a signal was last touched in nanoseconds since the epoch, or 0 if never.
+
+    Args:
+        path: Path of the signal file.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def clear_signal(path: str) -> None:
+    """Remove a signal file, such as a ticket's once the ticket is gone.
+
+    Args:
+        path: Path of the signal file.
+    """
+    Path(path).unlink(missing_ok=True)
+
+
+async def wait_signals(signals: Dict[str, int], deadline: float) -> None:
+    """Wait without blocking the event loop until a signal changes or a deadline passes.
+
+    Args:
+        signals: The signals last read, keyed by the paths of their files.
+        deadline: Time since the epoch in seconds to stop waiting at.
+    """
+    while time() < deadline and all(read_signal(path) == signal for path, signal in signals.items()):
+        await asyncio.sleep(SIGNAL_SECS)
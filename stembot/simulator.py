@@ -0,0 +1,524 @@
+"""In-process network simulator for measuring distance vector routing at scale.
+
+The simulator runs a network of virtual agents in one process, so changes to
+stembot.peering and stembot.messaging can be measured on topologies of
+thousands of agents without starting a container per agent.
+
+Agents:
+- Each virtual agent has a store directory of its own holding the collections
+  of a real agent. An agent is made the current agent by changing into its
+  store directory and setting CONFIG.agtuuid, so the routing code runs
+  unchanged. Stores are created under /dev/shm where it exists, which keeps
+  them in memory.
+- Opening a collection connects to its store and creates its tables, which
+  would dominate the cost of a cycle. Each agent keeps its collections open
+  for the whole run, and while it is the current agent the routing modules
+  are handed its open collections instead of opening new ones. The stores are
+  only used by the simulating process, so their collections are synchronized
+  with a lock in memory rather than a lock file.
+- Agents are linked by peers with a URL, as after peer discovery. Agents of
+  the regions topology have hierarchical UUIDs (see stembot.regions).
+
+Transport:
+- SimulatedTransport stands in for AgentClient. Messages are serialized in
+  the configured wire format, counted, and handed to the destination agent as
+  the processor would hand them to stembot.peering, along with the
+  acknowledgements they produce. Nothing is encrypted or sent over a socket.
+
+Cycles:
+- A cycle is one run of the advertising task on every live agent: routes are
+  aged, the route table is computed, and an advertisement is created for each
+  peer. The advertisements and their acknowledgements are then delivered, so
+  routes spread one hop per cycle.
+- The network has converged after a cycle in which no agent's routes changed.
+- A failed agent stops advertising, and the circuit breakers of its peers'
+  links to it are opened, as after failed deliveries.
+
+Timers keep to the wall clock, so hold downs and full table refreshes span
+fewer cycles the slower the cycles run. Route sessions are stretched to cover
+the slowest cycle, as every live agent advertises once per cycle.
+"""
+
+import logging
+import os
+import random
+import shutil
+import tempfile
+
+from collections import deque
+from threading import RLock
+from time import perf_counter, process_time
+from typing import Dict, List, Tuple
+
+import click
+
+from stembot import delivery, messaging, peering
+from stembot.dao import Collection
+from stembot.dao.utils import LOCKS
+from stembot.delivery import record_failure
+from stembot.executor.frame import dump_body, load_body
+from stembot.messaging import next_hop
+from stembot.models.config import CONFIG
+from stembot.models.network import Advertisement, AdvertisementAck, NetworkMessage, NetworkMessageType
+from stembot.models.simulation import SimulationCycle, SimulationReport
+from stembot.peering import age_routes, create_peer, create_route_advertisement, process_advertisement_ack
+from stembot.peering import ROUTE_SIGNAL_PATH, process_route_advertisement, route_table
+from stembot.signals import read_signal
+
+# Directory in memory that stores are created under where it exists
+MEMORY_DIR = '/dev/shm'
+
+# Modules run by the simulation whose collections are opened through their Collection name
+COLLECTION_MODULES = (delivery, messaging, peering)
+
+# Indexed attributes of the collections of each virtual agent, as defined by the modules owning them
+STORE_ATTRIBUTES = {
+    name: attributes for module in COLLECTION_MODULES for name, (_, attributes) in module.INDEXED_ATTRIBUTES.items()
+}
+
+
+class AgentCollections:
+    """Stand-in for Collection that hands out a virtual agent's open collections, opening and indexing each once."""
+
+    def __init__(self, store_path: str):
+        self.store_path  = store_path
+        self.collections = {}
+
+    def __getitem__(self, model):
+        def factory(collection_name: str, connection_str: str = None, in_memory: bool = False) -> Collection:
+            if collection_name not in self.collections:
+                connection_str = connection_str or os.path.join(self.store_path, f'{collection_name}.sqlite')
+                LOCKS.setdefault(connection_str, RLock())
+                collection = Collection[model](collection_name, connection_str, in_memory)
+                for attribute in STORE_ATTRIBUTES.get(collection_name, ()):
+                    collection.create_attribute(attribute, f'/{attribute}')
+                self.collections[collection_name] = collection
+            return self.collections[collection_name]
+
+        return factory
+
+
+class VirtualAgent:
+    """A simulated agent with a store of its own, entered as a context to make it the current agent."""
+
+    def __init__(self, agtuuid: str, store_path: str):
+        self.agtuuid    = agtuuid
+        self.store_path = store_path
+        self.peers      = []
+        self.failed     = False
+        self.signal     = 0
+
+        self.collections = AgentCollections(store_path)
+        self._saved      = []
+
+        os.makedirs(store_path, exist_ok=True)
+
+    def __enter__(self) -> 'VirtualAgent':
+        self._saved.append((os.getcwd(), CONFIG.agtuuid, [module.Collection for module in COLLECTION_MODULES]))
+        os.chdir(self.store_path)
+        CONFIG.agtuuid = self.agtuuid
+        for module in COLLECTION_MODULES:
+            module.Collection = self.collections
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        cwd, CONFIG.agtuuid, collections = self._saved.pop()
+        for module, collection in zip(COLLECTION_MODULES, collections):
+            module.Collection = collection
+        os.chdir(cwd)
+
+
+class SimulatedTransport:
+    """Stand-in for AgentClient that queues serialized messages for delivery between virtual agents."""
+
+    def __init__(self, agents: Dict[str, VirtualAgent]):
+        self.agents = agents
+        self.queue  = deque()
+        self.sent   = {}
+
+    def send_network_message(self, message: NetworkMessage) -> None:
+        """Serialize a message from the current agent and queue it for its destination.
+
+        Messages to failed agents are dropped.
+
+        Args:
+            message: The message to send.
+        """
+        if self.agents[message.dest].failed:
+            return
+
+        message.isrc = CONFIG.agtuuid
+        body = dump_body(message, CONFIG.framed_wire)
+
+        self.sent[message.type] = self.sent.get(message.type, 0) + len(body)
+        self.queue.append((message.dest, body))
+
+    def deliver(self) -> None:
+        """Deliver the queued messages, and the messages their delivery produces, until none are left."""
+        while self.queue:
+            dest, body = self.queue.popleft()
+            with self.agents[dest]:
+                message = load_body(NetworkMessage, body, CONFIG.framed_wire)
+                match message.type:
+                    case NetworkMessageType.ADVERTISEMENT:
+                        if ack := process_route_advertisement(Advertisement(**message.model_dump())):
+                            self.send_network_message(ack)
+                    case NetworkMessageType.ADVERTISEMENT_ACK:
+                        process_advertisement_ack(AdvertisementAck(**message.model_dump()))
+
+
+def random_links(agtuuids: List[str], degree: int, rng: random.Random) -> List[Tuple[str, str]]:
+    """Link agents into a random connected graph.
+
+    Each agent is linked to a random agent before it, forming a spanning tree,
+    and further random links are added until the mean degree is reached.
+
+    Args:
+        agtuuids: UUIDs of the agents to link.
+        degree: The mean number of links of each agent.
+        rng: The random number generator.
+
+    Returns:
+        The links, each a pair of agent UUIDs.
+    """
+    links = {tuple(sorted((agtuuid, agtuuids[rng.randrange(i)]))) for i, agtuuid in enumerate(agtuuids) if i}
+    wanted = min(len(agtuuids) * degree // 2, len(agtuuids) * (len(agtuuids) - 1) // 2)
+
+    while len(links) < wanted:
+        a, b = rng.sample(agtuuids, 2)
+        links.add(tuple(sorted((a, b))))
+
+    return sorted(links)
+
+
+def build_topology(
+    topology: str, agents: int, degree: int, regions: int, rng: random.Random
+) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Return the agent UUIDs and links of a topology.
+
+    The flat topology is a random connected graph of agents with plain UUIDs.
+    The regions topology splits the agents into regions, each a random connected
+    graph whose first agent is the region's gateway, and links the gateways
+    into a random connected graph.
+
+    Args:
+        topology: flat or regions.
+        agents: Number of agents.
+        degree: The mean number of links of each agent.
+        regions: Number of regions of the regions topology.
+        rng: The random number generator.
+
+    Returns:
+        The agent UUIDs and the links, each a pair of agent UUIDs.
+    """
+    if topology == 'flat':
+        agtuuids = [f'agent-{i:05d}' for i in range(agents)]
+        return agtuuids, random_links(agtuuids, degree, rng)
+
+    members = [
+        [f'r{region:03d}/agent-{i:05d}' for i in range(len(range(region, agents, regions)))]
+        for region in range(regions)
+    ]
+    members = [region for region in members if region]
+
+    links = random_links([region[0] for region in members], degree, rng)
+    for region in members:
+        links += random_links(region, degree, rng)
+
+    return [agtuuid for region in members for agtuuid in region], links
+
+
+class Simulation:
+    """A network of virtual agents exchanging route advertisements over a simulated transport."""
+
+    def __init__(self, agtuuids: List[str], links: List[Tuple[str, str]], store_dir: str):
+        self.agents = {
+            agtuuid: VirtualAgent(agtuuid, os.path.join(store_dir, f'{i:05d}'))
+            for i, agtuuid in enumerate(agtuuids)
+        }
+        self.transport = SimulatedTransport(self.agents)
+        self.cycles    = 0
+
+        for a, b in links:
+            self.agents[a].peers.append(b)
+            self.agents[b].peers.append(a)
+
+        for agent in self.agents.values():
+            with agent:
+                for agtuuid in agent.peers:
+                    create_peer(agtuuid, url=f'sim://{agtuuid}')
+                agent.signal = read_signal(ROUTE_SIGNAL_PATH)
+
+    def live_agents(self) -> List[VirtualAgent]:
+        """Return the agents that have not failed."""
+        return [agent for agent in self.agents.values() if not agent.failed]
+
+    def live_links(self) -> int:
+        """Return the number of links between agents that have not failed."""
+        return sum(
+            len([peer for peer in agent.peers if not self.agents[peer].failed])
+            for agent in self.live_agents()
+        ) // 2
+
+    def fail(self, agtuuids: List[str]) -> None:
+        """Fail agents and open the circuit breakers of their peers' links to them.
+
+        Args:
+            agtuuids: UUIDs of the agents to fail.
+        """
+        for agtuuid in agtuuids:
+            self.agents[agtuuid].failed = True
+
+        for agtuuid in agtuuids:
+            for peer in self.agents[agtuuid].peers:
+                if self.agents[peer].failed:
+                    continue
+                with self.agents[peer]:
+                    for _ in range(CONFIG.breaker_threshold):
+                        record_failure(agtuuid, 'simulated failure')
+
+    def run_cycle(self) -> SimulationCycle:
+        """Run the advertising task on every live agent and deliver the advertisements.
+
+        Returns:
+            The measurements of the cycle.
+        """
+        self.cycles += 1
+        self.transport.sent.clear()
+
+        start_cpu  = process_time()
+        start_wall = perf_counter()
+
+        sizes = []
+        for agent in self.live_agents():
+            with agent:
+                age_routes(1)
+                table = route_table()
+                sizes.append(len(table))
+                for peer in agent.peers:
+                    if not self.agents[peer].failed:
+                        self.transport.send_network_message(create_route_advertisement(peer, table))
+
+        self.transport.deliver()
+
+        changed = 0
+        for agent in self.live_agents():
+            with agent:
+                signal = read_signal(ROUTE_SIGNAL_PATH)
+            if signal != agent.signal:
+                agent.signal = signal
+                changed += 1
+
+        return SimulationCycle(
+            cycle=self.cycles,
+            advertisements=2 * self.live_links(),
+            advertisement_bytes=self.transport.sent.get(NetworkMessageType.ADVERTISEMENT, 0),
+            ack_bytes=self.transport.sent.get(NetworkMessageType.ADVERTISEMENT_ACK, 0),
+            changed_agents=changed,
+            mean_table_size=sum(sizes) / len(sizes) if sizes else 0.0,
+            max_table_size=max(sizes, default=0),
+            cpu_secs=process_time() - start_cpu,
+            elapsed_secs=perf_counter() - start_wall
+        )
+
+    def converge(self, max_cycles: int, report_cycle=None) -> SimulationReport:
+        """Run cycles until the routes stop changing or the cycles allowed are run.
+
+        Route sessions are stretched to cover the slowest cycle for the run.
+
+        Args:
+            max_cycles: Most cycles to run.
+            report_cycle: Optional callable receiving the measurements of each cycle.
+
+        Returns:
+            The measurements of the run.
+        """
+        report = SimulationReport(agents=len(self.live_agents()), links=self.live_links())
+
+        session_secs = peering.ROUTE_SESSION_SECS
+        try:
+            for _ in range(max_cycles):
+                cycle = self.run_cycle()
+                report.cycles.append(cycle)
+                if report_cycle:
+                    report_cycle(cycle)
+
+                peering.ROUTE_SESSION_SECS = max(peering.ROUTE_SESSION_SECS, 2 * cycle.elapsed_secs)
+
+                if cycle.changed_agents == 0:
+                    report.converged          = True
+                    report.convergence_cycles = len(report.cycles) - 1
+                    report.convergence_secs   = sum(cycle.elapsed_secs for cycle in report.cycles[:-1])
+                    break
+        finally:
+            peering.ROUTE_SESSION_SECS = session_secs
+
+        return report
+
+    def trace(self, src: str, dest: str) -> int | None:
+        """Follow the routes from one live agent to another.
+
+        Args:
+            src: UUID of the agent the path starts from.
+            dest: UUID of the destination agent.
+
+        Returns:
+            The hops along the path, or None if the routes do not lead to the destination.
+        """
+        agtuuid = src
+        for hops in range(1, len(self.agents) + 1):
+            with self.agents[agtuuid]:
+                peer = next_hop(dest)
+            if peer is None or self.agents[peer.agtuuid].failed:
+                return None
+            if peer.agtuuid == dest:
+                return hops
+            agtuuid = peer.agtuuid
+        return None
+
+    def connected(self, src: str, dest: str) -> bool:
+        """Check whether a path of links between live agents joins two agents."""
+        seen  = {src}
+        queue = deque([src])
+        while queue:
+            agtuuid = queue.popleft()
+            if agtuuid == dest:
+                return True
+            for peer in self.agents[agtuuid].peers:
+                if peer not in seen and not self.agents[peer].failed:
+                    seen.add(peer)
+                    queue.append(peer)
+        return False
+
+    def check(self, report: SimulationReport, pairs: int, rng: random.Random) -> None:
+        """Follow the routes between random pairs of live agents and record how many reach their destination.
+
+        Args:
+            report: The measurements of the run, updated with the pairs checked.
+            pairs: Number of agent pairs to check.
+            rng: The random number generator.
+        """
+        live = [agent.agtuuid for agent in self.live_agents()]
+        if len(live) < 2:
+            return
+
+        lengths = []
+        for _ in range(pairs):
+            src, dest = rng.sample(live, 2)
+            if not self.connected(src, dest):
+                continue
+            report.connected_pairs += 1
+            if (hops := self.trace(src, dest)) is not None:
+                lengths.append(hops)
+
+        report.checked_pairs    = pairs
+        report.reachable_pairs  = len(lengths)
+        report.mean_path_length = sum(lengths) / len(lengths) if lengths else None
+
+
+def format_cycle(cycle: SimulationCycle) -> str:
+    """Format the measurements of a cycle as a row of the cycle table."""
+    return (
+        f"   {cycle.cycle:<6} "
+        f"{cycle.advertisements:<8} "
+        f"{cycle.advertisement_bytes:<14} "
+        f"{cycle.ack_bytes:<10} "
+        f"{cycle.changed_agents:<8} "
+        f"{cycle.mean_table_size:<9.1f} "
+        f"{cycle.max_table_size:<7} "
+        f"{cycle.cpu_secs:<9.3f} "
+        f"{cycle.elapsed_secs:.3f}"
+    )
+
+
+def echo_header(title: str, simulation: Simulation) -> None:
+    """Print the title of a run and the header of its cycle table."""
+    click.echo()
+    click.echo(f"{title}: {len(simulation.live_agents())} agents, {simulation.live_links()} links")
+    click.echo(
+        f"   {'Cycle':.<6} {'Adverts':.<8} {'Advert Bytes':.<14} {'Ack Bytes':.<10} "
+        f"{'Changed':.<8} {'Mean Tbl':.<9} {'Max Tbl':.<7} {'CPU (s)':.<9} Elapsed (s)"
+    )
+
+
+def echo_summary(report: SimulationReport) -> None:
+    """Print the convergence and reachability of a run."""
+    if report.converged:
+        click.echo(f"   Converged after {report.convergence_cycles} cycles in {report.convergence_secs:.3f}s")
+    else:
+        click.echo(f"   Not converged after {len(report.cycles)} cycles")
+
+    if report.checked_pairs:
+        path_length = f"{report.mean_path_length:.2f}" if report.mean_path_length is not None else "-"
+        click.echo(
+            f"   Reachable pairs: {report.reachable_pairs}:{report.connected_pairs} connected "
+            f"of {report.checked_pairs} checked, mean path length {path_length}"
+        )
+
+
+@click.command()
+@click.option('-n', '--agents', type=int, default=100, help='Number of agents (default: 100)')
+@click.option(
+    '-t', '--topology', type=click.Choice(['flat', 'regions']), default='flat',
+    help='A flat random graph, or regions joined by their gateways (default: flat)'
+)
+@click.option('-d', '--degree', type=int, default=3, help='Mean links per agent (default: 3)')
+@click.option('-r', '--regions', type=int, default=10, help='Regions of the regions topology (default: 10)')
+@click.option('-c', '--max-cycles', type=int, default=100, help='Most cycles run to convergence (default: 100)')
+@click.option('-f', '--fail', type=int, default=0, help='Agents failed after convergence (default: 0)')
+@click.option('-p', '--pairs', type=int, default=100, help='Agent pairs whose routes are followed (default: 100)')
+@click.option('-s', '--seed', type=int, default=0, help='Random seed for the topology and failures (default: 0)')
+@click.option('--store-dir', type=click.Path(file_okay=False, exists=True), help='Directory for the agent stores')
+@click.option('--keep', is_flag=True, help='Keep the agent stores after the run')
+def main(
+    agents: int, topology: str, degree: int, regions: int, max_cycles: int, fail: int, pairs: int, seed: int,
+    store_dir: str | None, keep: bool
+):
+    """Simulate a network of agents in process and measure how its routes converge.
+
+    Runs advertisement cycles on every agent until the routes stop changing,
+    reporting for each cycle the advertisements sent and their bytes, the
+    agents whose routes changed, the route table sizes and the processor time
+    spent, then follows the routes between random pairs of agents. With --fail,
+    fails random agents other than region gateways and measures reconvergence.
+    The agent stores are created in a temporary directory, under /dev/shm
+    unless --store-dir is given.
+    """
+    assert agents > 1 and degree > 0 and regions > 0 and max_cycles > 0 and fail >= 0 and pairs >= 0
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    rng = random.Random(seed)
+    agtuuids, links = build_topology(topology, agents, degree, regions, rng)
+
+    if store_dir is None and os.path.isdir(MEMORY_DIR):
+        store_dir = MEMORY_DIR
+    store_dir = tempfile.mkdtemp(prefix='stembot-sim-', dir=store_dir)
+
+    try:
+        start = perf_counter()
+        simulation = Simulation(agtuuids, links, store_dir)
+        click.echo(f"Created {len(agtuuids)} agents in {store_dir} in {perf_counter() - start:.3f}s")
+
+        runs = [('Cold start', [])]
+        if fail:
+            gateways   = {agtuuid for agtuuid in agtuuids if agtuuid.endswith('/agent-00000')}
+            candidates = [agtuuid for agtuuid in agtuuids if agtuuid not in gateways]
+            failed     = rng.sample(candidates, min(fail, max(len(candidates) - 1, 0)))
+            runs.append((f'Failed {len(failed)} agents', failed))
+
+        for title, failed in runs:
+            simulation.fail(failed)
+            echo_header(title, simulation)
+            report = simulation.converge(max_cycles, lambda cycle: click.echo(format_cycle(cycle)))
+            simulation.check(report, pairs, rng)
+            echo_summary(report)
+    finally:
+        if keep:
+            click.echo(f"Kept the agent stores in {store_dir}")
+        else:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main() # pylint: disable=no-value-for-parameter
@@ -0,0 +1,175 @@
+"""Unit tests for next hop backoff, circuit breaking, dead letters, and receipts."""
+import os
+import tempfile
+import unittest
+from time import time
+from unittest.mock import patch
+
+from stembot.dao import Collection
+from stembot.delivery import acquire_hop, backoff_secs, dead_letter, deferred_hops, get_dead_letters
+from stembot.delivery import expire_receipts, get_hop_health, is_repeated, record_failure, record_receipt, record_success
+from stembot.enums import BreakerState, NetworkMessageType
+from stembot.models.config import CONFIG
+from stembot.models.control import WriteFile
+from stembot.models.delivery import DeadLetter, HopHealth, Receipt
+from stembot.models.network import NetworkMessagesRequest, NetworkTicket, Ping
+
+
+class _DeliveryTestCase(unittest.TestCase):
+    """Run each test against empty hops and dead_letters collections in a temporary directory."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+        self.hops = Collection[HopHealth]('hops')
+        self.hops.create_attribute('agtuuid', '/agtuuid')
+        self.hops.create_attribute('retry_time', '/retry_time')
+
+        self.dead_letters = Collection[DeadLetter]('dead_letters')
+        self.dead_letters.create_attribute('dest', '/dest')
+        self.dead_letters.create_attribute('dead_time', '/dead_time')
+
+        self.receipts = Collection[Receipt]('receipts')
+        self.receipts.create_attribute('msguuid', '/msguuid')
+        self.receipts.create_attribute('receipt_time', '/receipt_time')
+
+    def expire_backoff(self, agtuuid: str):
+        hop = self.hops.find(agtuuid=agtuuid)[0]
+        hop.object.retry_time = time() - 1
+        hop.commit()
+
+
+class TestBackoff(unittest.TestCase):
+    """Verify the backoff delay grows exponentially up to the maximum."""
+
+    def test_backoff_doubles_and_caps(self):
+        with patch('stembot.delivery.uniform', return_value=1.0):
+            delays = [backoff_secs(failures) for failures in range(1, 12)]
+
+        base = CONFIG.retry_backoff_secs
+        self.assertEqual(delays[:3], [base, base * 2, base * 4])
+        self.assertEqual(delays[-1], CONFIG.retry_backoff_max_secs)
+
+    def test_backoff_is_jittered_down(self):
+        for _ in range(20):
+            self.assertGreaterEqual(backoff_secs(3), CONFIG.retry_backoff_secs * 2)
+            self.assertLessEqual(backoff_secs(3), CONFIG.retry_backoff_secs * 4)
+
+
+class TestCircuitBreaker(_DeliveryTestCase):
+    """Verify backoff, breaker opening, probing, and closing."""
+
+    def test_healthy_hop_is_available(self):
+        self.assertTrue(acquire_hop('peer'))
+        self.assertIsNone(get_hop_health('peer'))
+
+    def test_failure_defers_hop(self):
+        record_failure('peer', 'refused')
+
+        self.assertFalse(acquire_hop('peer'))
+        self.assertEqual(deferred_hops(), ['peer'])
+        self.assertEqual(get_hop_health('peer').state, BreakerState.CLOSED)
+
+        self.expire_backoff('peer')
+        self.assertTrue(acquire_hop('peer'))
+        self.assertEqual(deferred_hops(), [])
+
+    def test_breaker_opens_at_threshold_and_probes_once(self):
+        for _ in range(CONFIG.breaker_threshold):
+            record_failure('peer', 'refused')
+
+        health = get_hop_health('peer')
+        self.assertEqual(health.state, BreakerState.OPEN)
+        self.assertEqual(health.failures, CONFIG.breaker_threshold)
+
+        self.expire_backoff('peer')
+        self.assertTrue(acquire_hop('peer'))
+        self.assertEqual(get_hop_health('peer').state, BreakerState.HALF_OPEN)
+        self.assertFalse(acquire_hop('peer'))
+
+    def test_failed_probe_reopens_breaker(self):
+        for _ in range(CONFIG.breaker_threshold):
+            record_failure('peer', 'refused')
+        self.expire_backoff('peer')
+        acquire_hop('peer')
+
+        record_failure('peer', 'refused')
+
+        health = get_hop_health('peer')
+        self.assertEqual(health.state, BreakerState.OPEN)
+        self.assertEqual(health.failures, CONFIG.breaker_threshold + 1)
+
+    def test_success_closes_breaker(self):
+        for _ in range(CONFIG.breaker_threshold):
+            record_failure('peer', 'refused')
+
+        record_success('peer')
+
+        self.assertIsNone(get_hop_health('peer'))
+        self.assertTrue(acquire_hop('peer'))
+
+
+class TestDeadLetters(_DeliveryTestCase):
+    """Verify dead letters are stored, filtered, and purged."""
+
+    def test_dead_letter_drops_bulk_payload(self):
+        ticket = NetworkTicket(
+            dest='agent-b', form=WriteFile(b64zlib='eJwDAAAAAAE=', path='/tmp/out'),
+            type=NetworkMessageType.TICKET_REQUEST
+        )
+        dead_letter(ticket, 'No next hop to agent-b')
+
+        dead_letters = get_dead_letters()
+        self.assertEqual(len(dead_letters), 1)
+        self.assertEqual(dead_letters[0].reason, 'No next hop to agent-b')
+        self.assertEqual(dead_letters[0].message['form']['path'], '/tmp/out')
+        self.assertNotIn('b64zlib', dead_letters[0].message['form'])
+
+    def test_filter_by_dest_and_purge(self):
+        dead_letter(Ping(dest='agent-b', timestamp=1), 'timed out', 'agent-b')
+        dead_letter(Ping(dest='agent-c', timestamp=2), 'timed out', 'agent-b')
+
+        self.assertEqual([d.dest for d in get_dead_letters(dest='agent-c')], ['agent-c'])
+        self.assertEqual([d.dest for d in get_dead_letters(purge=True)], ['agent-b', 'agent-c'])
+        self.assertEqual(get_dead_letters(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class TestReceipts(_DeliveryTestCase):
+    """Verify repeated deliveries of a message are recognized."""
+
+    def test_repeated_message(self):
+        self.assertFalse(is_repeated(Ping(dest="a", msguuid="m1")))
+        self.assertTrue(record_receipt(Ping(dest="a", msguuid="m1")))
+        self.assertTrue(is_repeated(Ping(dest="a", msguuid="m1")))
+        self.assertFalse(is_repeated(Ping(dest="a", msguuid="m2")))
+
+    def test_receipt_recorded_once(self):
+        self.assertTrue(record_receipt(Ping(dest="a", msguuid="m1")))
+        self.assertFalse(record_receipt(Ping(dest="a", msguuid="m1")))
+        self.assertEqual(len(self.receipts.find(msguuid="m1")), 1)
+
+    def test_messages_without_msguuid_and_messages_requests_repeat(self):
+        self.assertFalse(record_receipt(Ping(dest="a")))
+        self.assertFalse(is_repeated(Ping(dest="a")))
+        self.assertFalse(record_receipt(NetworkMessagesRequest(dest="a", msguuid="m1")))
+        self.assertFalse(is_repeated(NetworkMessagesRequest(dest="a", msguuid="m1")))
+
+    @patch.object(CONFIG, "dedup_window_secs", 60)
+    def test_expired_receipt(self):
+        record_receipt(Ping(dest="a", msguuid="m1"))
+        receipt = self.receipts.find(msguuid="m1")[0]
+        receipt.object.receipt_time = time() - 61
+        receipt.commit()
+
+        expire_receipts()
+
+        self.assertFalse(is_repeated(Ping(dest="a", msguuid="m1")))
+
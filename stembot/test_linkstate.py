@@ -0,0 +1,142 @@
+"""Unit tests for link state records and shortest path routing."""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from stembot.dao import Collection
+from stembot.models.config import CONFIG
+from stembot.models.network import LinkState
+from stembot.models.routing import Link, LinkStateRecord, Peer, Route
+from stembot.linkstate import compute_routes, link_cost, originate_link_state, process_link_state
+from stembot.linkstate import shortest_paths, sign_link_state
+
+
+class _InlineThread:
+    """Stand-in for Thread that runs its target when started."""
+
+    def __init__(self, target, args):
+        self.target = target
+        self.args   = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+def link_state(agtuuid: str, seq: int, links: list, **kwargs) -> LinkState:
+    return LinkState(agtuuid=agtuuid, seq=seq, links=links, signature=sign_link_state(agtuuid, seq, links), **kwargs)
+
+
+class _LinkStateTestCase(unittest.TestCase):
+    """Run each test against empty collections in a temporary directory, with peers b and c, capturing floods."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+        peers = Collection[Peer]('peers')
+        peers.create_attribute('agtuuid', '/agtuuid')
+        peers.create_attribute('url', '/url')
+        for agtuuid, rtt_ms in (('b', 10.0), ('c', 50.0)):
+            peers.upsert_object(Peer(agtuuid=agtuuid, url=f'http://{agtuuid}:8080/mpi', rtt_ms=rtt_ms))
+
+        routes = Collection[Route]('routes')
+        routes.create_attribute('agtuuid', '/agtuuid')
+        routes.create_attribute('gtwuuid', '/gtwuuid')
+
+        records = Collection[LinkStateRecord]('link_states')
+        records.create_attribute('agtuuid', '/agtuuid')
+        records.create_attribute('receive_time', '/receive_time')
+
+        self.flooded = []
+        for patcher in (
+            patch('stembot.linkstate.Thread', _InlineThread),
+            patch('stembot.linkstate.forward_network_message', self.flooded.append)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestLinkCost(unittest.TestCase):
+    """Verify link costs follow round trip times and grow with loss."""
+
+    def test_link_cost(self):
+        self.assertEqual(link_cost(Link(agtuuid='b', rtt_ms=10.0)), 10)
+        self.assertEqual(link_cost(Link(agtuuid='b', rtt_ms=10.0, loss=0.5)), 20)
+        self.assertEqual(link_cost(Link(agtuuid='b', rtt_ms=0.1)), 1)
+        self.assertEqual(link_cost(Link(agtuuid='b')), 100)
+
+
+class TestProcessLinkState(_LinkStateTestCase):
+    """Verify records are checked, kept when newer, and flooded on to the other peers."""
+
+    def test_newer_record_is_kept_and_flooded(self):
+        self.assertTrue(process_link_state(link_state('d', 5, [Link(agtuuid='b')], isrc='b')))
+
+        self.assertEqual([message.dest for message in self.flooded], ['c'])
+        self.assertEqual(Collection[LinkStateRecord]('link_states').find(agtuuid='d')[0].object.seq, 5)
+
+    def test_older_record_is_dropped(self):
+        process_link_state(link_state('d', 5, [Link(agtuuid='b')], isrc='b'))
+        self.assertFalse(process_link_state(link_state('d', 5, [], isrc='c')))
+        self.assertFalse(process_link_state(link_state('d', 4, [], isrc='c')))
+        self.assertEqual(len(self.flooded), 1)
+
+    def test_tampered_record_is_dropped(self):
+        record = link_state('d', 5, [Link(agtuuid='b', rtt_ms=100.0)], isrc='b')
+        record.links[0].rtt_ms = 1.0
+
+        self.assertFalse(process_link_state(record))
+        self.assertEqual(Collection[LinkStateRecord]('link_states').find(), [])
+
+    def test_originates_only_when_links_change(self):
+        originated = originate_link_state()
+        self.assertEqual({link.agtuuid for link in originated.links}, {'b', 'c'})
+        self.assertEqual(sorted(message.dest for message in self.flooded), ['b', 'c'])
+        self.assertIsNone(originate_link_state())
+
+        Collection[Peer]('peers').upsert_object(
+            Collection[Peer]('peers').find(agtuuid='c')[0].object.model_copy(update={'rtt_ms': 100.0})
+        )
+        self.assertGreater(originate_link_state().seq, originated.seq)
+
+
+class TestShortestPaths(_LinkStateTestCase):
+    """Verify routes follow the lowest latency paths over links confirmed in both directions."""
+
+    def test_prefers_lower_latency_over_fewer_hops(self):
+        links = {
+            'a': [Link(agtuuid='b', rtt_ms=10.0), Link(agtuuid='c', rtt_ms=10.0)],
+            'b': [Link(agtuuid='a', rtt_ms=10.0), Link(agtuuid='d', rtt_ms=200.0), Link(agtuuid='e', rtt_ms=10.0)],
+            'c': [Link(agtuuid='a', rtt_ms=10.0), Link(agtuuid='e', rtt_ms=10.0)],
+            'd': [Link(agtuuid='b', rtt_ms=200.0), Link(agtuuid='e', rtt_ms=10.0)],
+            'e': [Link(agtuuid='b', rtt_ms=10.0), Link(agtuuid='c', rtt_ms=10.0), Link(agtuuid='d', rtt_ms=10.0)],
+        }
+        paths = shortest_paths(links, 'a')
+        self.assertEqual(paths['d'][1], 30)
+        self.assertEqual(paths['b'], ('b', 10))
+
+    def test_ignores_links_not_confirmed_by_the_other_end(self):
+        links = {
+            'a': [Link(agtuuid='b', rtt_ms=10.0)],
+            'b': [Link(agtuuid='a', rtt_ms=10.0), Link(agtuuid='d', rtt_ms=10.0)],
+            'd': [],
+        }
+        self.assertNotIn('d', shortest_paths(links, 'a'))
+
+    def test_compute_routes_replaces_routes(self):
+        Collection[Route]('routes').upsert_object(Route(agtuuid='x', gtwuuid='b', weight=1))
+        process_link_state(link_state('b', 1, [Link(agtuuid=CONFIG.agtuuid), Link(agtuuid='d', rtt_ms=500.0)]))
+        process_link_state(link_state('c', 1, [Link(agtuuid=CONFIG.agtuuid), Link(agtuuid='d', rtt_ms=5.0)]))
+        process_link_state(link_state('d', 1, [Link(agtuuid='b'), Link(agtuuid='c')]))
+
+        compute_routes()
+
+        self.assertEqual(
+            [(route.object.agtuuid, route.object.gtwuuid, route.object.weight)
+             for route in Collection[Route]('routes').find()],
+            [('d', 'c', 55)]
+        )
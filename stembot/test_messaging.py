@@ -1,15 +1,26 @@
 """Unit tests for message queue filtering behavior."""
+import asyncio
 import os
 import tempfile
+import threading
 import unittest
-from unittest.mock import patch
+from time import time
+from unittest.mock import MagicMock, patch
 
 from stembot.dao import Collection
-from stembot.enums import ControlFormType, NetworkMessageType
-from stembot.messaging import pull_filtered_network_messages
-from stembot.models.control import SyncProcess
+from stembot.delivery import count_queued, get_queue_usage, get_shed_counters
+from stembot.enums import ControlFormType, MessagePriority, NetworkMessageType, ShedPolicy
+from stembot.messaging import fair_order, message_priority, pop_network_messages, pull_filtered_network_messages
+from stembot.messaging import forward_network_message, next_hop, pop_replayable_messages, push_network_message
+from stembot.messaging import get_queue_stats, long_poll_network_messages, message_size, queue_signal_path
+from stembot.messaging import flow_key, pending_network_messages, undeliverable_destinations
+from stembot.messaging import vacuum_network_messages
+from stembot.models.config import CONFIG
+from stembot.models.control import GetPeers, SyncProcess, WriteFile
+from stembot.models.delivery import QueueUsage, ShedCounter
 from stembot.models.network import NetworkMessage, NetworkMessagesRequest, NetworkTicket, Ping
-from stembot.models.routing import Route
+from stembot.models.routing import Peer, Route
+from stembot.signals import read_signal, touch_signal
 
 
 class _CollectionRouter:
@@ -24,8 +35,8 @@ class _CollectionRouter:
         return factory
 
 
-class TestPullNetworkMessagesWhitelist(unittest.TestCase):
-    """Verify whitelist filtering and error-ticket requeueing."""
+class _MessageQueueTestCase(unittest.TestCase):
+    """Prepare temporary message and route collections for messaging tests."""
 
     def setUp(self):
         self.tempdir = tempfile.TemporaryDirectory()
@@ -35,12 +46,28 @@ class TestPullNetworkMessagesWhitelist(unittest.TestCase):
         self.messages = Collection[NetworkMessage]("messages")
         self.messages.create_attribute("dest", "/dest")
         self.messages.create_attribute("timestamp", "/timestamp")
+        self.messages.create_attribute("priority", "/priority")
+        self.messages.create_attribute("type", "/type")
+        self.messages.create_attribute("form_type", "/form_type")
+        self.messages.create_attribute("size", "/size")
+
+        self.queue_usage = Collection[QueueUsage]("queue_usage")
+        self.queue_usage.create_attribute("dest", "/dest")
+        self.queue_usage.create_attribute("messages", "/messages")
+        self.queue_usage.create_attribute("size", "/size")
 
         self.routes = Collection[Route]("routes")
+        self.routes.create_attribute("agtuuid", "/agtuuid")
+        self.routes.create_attribute("gtwuuid", "/gtwuuid")
+
+        self.peers = Collection[Peer]("peers")
+        self.peers.create_attribute("agtuuid", "/agtuuid")
+        self.peers.create_attribute("url", "/url")
 
         _CollectionRouter.collections = {
             "messages": self.messages,
             "routes": self.routes,
+            "peers": self.peers,
         }
         self.collection_patch = patch("stembot.messaging.Collection", _CollectionRouter)
         self.collection_patch.start()
@@ -52,10 +79,15 @@ class TestPullNetworkMessagesWhitelist(unittest.TestCase):
     def tearDown(self):
         self.messages.destroy()
         self.routes.destroy()
+        self.peers.destroy()
 
     def _seed_routes(self):
         self.routes.upsert_object(Route(agtuuid="relay", gtwuuid="src", weight=1))
 
+
+class TestPullNetworkMessagesWhitelist(_MessageQueueTestCase):
+    """Verify whitelist filtering and error-ticket requeueing."""
+
     def test_network_whitelist_filters_disallowed_ticket_and_enqueues_error(self):
         self._seed_routes()
 
@@ -120,3 +152,445 @@ class TestPullNetworkMessagesWhitelist(unittest.TestCase):
         self.assertEqual(response.dest, "origin")
         self.assertIn("not allowed by whitelist", response.error)
         self.assertEqual(response.form['type'], ControlFormType.SYNC_PROCESS)
+
+
+    def test_queued_whitelists_select_by_index(self):
+        """Queued messages are filtered by their indexed headers without being revalidated as tickets."""
+        self._seed_routes()
+        push_network_message(Ping(src="origin", dest="relay"))
+        push_network_message(_ticket("src", GetPeers(), 1))
+        push_network_message(_ticket("relay", SyncProcess(command="echo hi"), 2))
+        push_network_message(_ticket("other", SyncProcess(command="echo hi"), 3))
+
+        request = NetworkMessagesRequest(
+            src="origin",
+            isrc="src",
+            network_whitelist=[NetworkMessageType.TICKET_REQUEST],
+            control_whitelist=[ControlFormType.GET_PEERS],
+        )
+
+        with patch.object(NetworkTicket, "model_validate", wraps=NetworkTicket.model_validate) as model_validate:
+            messages = pull_filtered_network_messages(request)
+
+        self.assertEqual([message.form_type for message in messages], [ControlFormType.GET_PEERS])
+        self.assertEqual(model_validate.call_count, 1)
+
+        pending = sorted((message.object.type, message.object.dest) for message in self.messages.find())
+        self.assertEqual(
+            pending,
+            [(NetworkMessageType.TICKET_REQUEST, "other"), (NetworkMessageType.TICKET_RESPONSE, "origin")]
+        )
+
+
+def _ticket(dest: str, form, timestamp: float) -> NetworkTicket:
+    return NetworkTicket(
+        src="origin", dest=dest, form=form, type=NetworkMessageType.TICKET_REQUEST, timestamp=timestamp
+    )
+
+
+class TestMessagePriority(unittest.TestCase):
+    """Verify priority classification and fair ordering."""
+
+    def test_message_priority(self):
+        self.assertEqual(message_priority(Ping(dest="a")), MessagePriority.CONTROL)
+        self.assertEqual(message_priority(_ticket("a", SyncProcess(command="true"), 1)), MessagePriority.TICKET)
+        self.assertEqual(message_priority(_ticket("a", WriteFile(b64zlib="", path="/x"), 1)), MessagePriority.BULK)
+
+    def test_fair_order(self):
+        """Classes are ordered by priority and destinations take turns within a class."""
+        bulk    = [_ticket("a", WriteFile(b64zlib="", path=f"/{i}"), i) for i in range(3)]
+        other   = _ticket("b", WriteFile(b64zlib="", path="/b"), 5)
+        ping    = Ping(dest="c", timestamp=9)
+        ordered = fair_order([*bulk, other, ping])
+
+        self.assertEqual(ordered, [ping, bulk[0], other, bulk[1], bulk[2]])
+
+
+class TestMessageQueueOrder(_MessageQueueTestCase):
+    """Verify queued messages drain by priority and fairly across destinations."""
+
+    def test_push_assigns_priority(self):
+        push_network_message(_ticket("a", WriteFile(b64zlib="", path="/x"), 1))
+        self.assertEqual(self.messages.find()[0].object.priority, MessagePriority.BULK)
+
+    def test_push_assigns_form_type(self):
+        push_network_message(_ticket("a", WriteFile(b64zlib="", path="/x"), 1))
+        push_network_message(Ping(dest="b"))
+        self.assertEqual(self.messages.find(dest="a")[0].object.form_type, ControlFormType.WRITE_FILE)
+        self.assertIsNone(self.messages.find(dest="b")[0].object.form_type)
+
+    def test_pop_orders_by_priority_then_age(self):
+        push_network_message(_ticket("a", WriteFile(b64zlib="", path="/x"), 1))
+        push_network_message(_ticket("a", SyncProcess(command="true"), 3))
+        push_network_message(_ticket("a", SyncProcess(command="true"), 2))
+        push_network_message(Ping(dest="a", timestamp=4))
+
+        self.assertEqual(
+            [message.timestamp for message in pop_network_messages(dest="$!eq:None")],
+            [4, 2, 3, 1]
+        )
+
+    def test_limited_pull_is_shared_across_destinations(self):
+        """A backlog for one destination cannot use up a limited poll."""
+        self._seed_routes()
+        for i in range(5):
+            push_network_message(_ticket("src", WriteFile(b64zlib="", path=f"/{i}"), i))
+        push_network_message(Ping(src="origin", dest="relay", timestamp=10))
+
+        messages = pull_filtered_network_messages(NetworkMessagesRequest(src="origin", isrc="src", limit=2))
+
+        self.assertEqual([message.dest for message in messages], ["relay", "src"])
+
+
+class TestPollLimits(_MessageQueueTestCase):
+    """Verify poll responses are limited when popped and the rest stays queued."""
+
+    def _push_pings(self, dest: str, count: int):
+        for i in range(count):
+            push_network_message(Ping(src="origin", dest=dest, timestamp=i))
+
+    def test_limit_is_exact_across_destinations(self):
+        self._seed_routes()
+        self._push_pings("src", 3)
+        self._push_pings("relay", 3)
+
+        request  = NetworkMessagesRequest(src="origin", isrc="src", limit=3)
+        messages = pull_filtered_network_messages(request)
+
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(len(self.messages.find()), 3)
+        self.assertTrue(pending_network_messages(request))
+
+    def test_limit_uses_other_destinations_share(self):
+        """A destination with too few messages leaves its share to the others."""
+        self._seed_routes()
+        self._push_pings("src", 5)
+        self._push_pings("relay", 1)
+
+        messages = pull_filtered_network_messages(NetworkMessagesRequest(src="origin", isrc="src", limit=4))
+
+        self.assertEqual(sorted(message.dest for message in messages), ["relay", "src", "src", "src"])
+
+    def test_max_bytes(self):
+        self._push_pings("src", 4)
+        size = message_size(self.messages.find()[0].object)
+
+        request  = NetworkMessagesRequest(src="origin", isrc="src", max_bytes=2 * size)
+        messages = pull_filtered_network_messages(request)
+
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(len(self.messages.find()), 2)
+
+    def test_oversized_message_is_pulled(self):
+        self._push_pings("src", 2)
+
+        messages = pull_filtered_network_messages(NetworkMessagesRequest(src="origin", isrc="src", max_bytes=1))
+
+        self.assertEqual(len(messages), 1)
+
+    @patch.object(CONFIG, "poll_max_messages", 2)
+    def test_unlimited_request_is_capped(self):
+        self._push_pings("src", 5)
+
+        request = NetworkMessagesRequest(src="origin", isrc="src", limit=100)
+
+        self.assertEqual(len(pull_filtered_network_messages(request)), 2)
+        self.assertEqual(len(pull_filtered_network_messages(request.model_copy(update={"limit": None}))), 2)
+
+    def test_nothing_pending(self):
+        request = NetworkMessagesRequest(src="origin", isrc="src")
+        self._push_pings("other", 1)
+
+        self.assertFalse(pending_network_messages(request))
+        self._push_pings("src", 1)
+        self.assertEqual(len(pull_filtered_network_messages(request)), 1)
+        self.assertFalse(pending_network_messages(request))
+
+
+class TestForwarding(_MessageQueueTestCase):
+    """Verify next hop selection, backoff on failed deliveries, and replay exclusions."""
+
+    def setUp(self):
+        super().setUp()
+        self.peers.upsert_object(Peer(agtuuid="gateway", url="http://gateway:8080"))
+        self.peers.upsert_object(Peer(agtuuid="poller"))
+        self.routes.upsert_object(Route(agtuuid="far", gtwuuid="gateway", weight=2))
+        self.routes.upsert_object(Route(agtuuid="far", gtwuuid="poller", weight=1))
+        self.routes.upsert_object(Route(agtuuid="farther", gtwuuid="gateway", weight=1))
+
+    def test_next_hop(self):
+        self.assertEqual(next_hop("gateway").agtuuid, "gateway")
+        self.assertEqual(next_hop("farther").agtuuid, "gateway")
+        self.assertIsNone(next_hop("far"))
+        self.assertIsNone(next_hop("unknown"))
+
+    @patch("stembot.messaging.record_failure")
+    @patch("stembot.messaging.acquire_hop", return_value=True)
+    @patch("stembot.messaging.AgentClient")
+    def test_failed_delivery_records_failure_and_requeues(self, client, _acquire_hop, record_failure):
+        client.return_value.send_network_message.side_effect = ConnectionError("refused")
+
+        forward_network_message(Ping(dest="farther"))
+
+        record_failure.assert_called_once_with("gateway", "refused")
+        self.assertEqual(len(self.messages.find()), 1)
+        self.assertGreater(self.peers.find(agtuuid="gateway")[0].object.loss, 0.0)
+
+    @patch("stembot.messaging.acquire_hop", return_value=False)
+    @patch("stembot.messaging.AgentClient")
+    def test_deferred_hop_is_not_attempted(self, client, _acquire_hop):
+        forward_network_message(Ping(dest="farther"))
+
+        client.assert_not_called()
+        self.assertEqual(len(self.messages.find()), 1)
+
+    @patch("stembot.messaging.record_success")
+    @patch("stembot.messaging.acquire_hop", return_value=True)
+    @patch("stembot.messaging.AgentClient")
+    def test_delivery_records_success(self, client, _acquire_hop, record_success):
+        client.return_value.send_network_message.return_value = MagicMock(
+            model_dump=lambda: {"type": "acknowledgement", "ack_type": "ping"}
+        )
+
+        forward_network_message(Ping(dest="gateway"))
+
+        record_success.assert_called_once_with("gateway")
+        self.assertEqual(self.messages.find(), [])
+        self.assertIsNotNone(self.peers.find(agtuuid="gateway")[0].object.rtt_ms)
+
+    @patch("stembot.messaging.acquire_hop", return_value=True)
+    @patch("stembot.messaging.AgentClient")
+    def test_executed_requests_are_not_measured(self, client, _acquire_hop):
+        client.return_value.send_network_message.return_value = MagicMock(
+            model_dump=lambda: {"type": "acknowledgement", "ack_type": "ticket_request"}
+        )
+
+        forward_network_message(NetworkTicket(dest="gateway", form=SyncProcess(command="sleep 1")))
+        self.assertIsNone(self.peers.find(agtuuid="gateway")[0].object.rtt_ms)
+
+        forward_network_message(NetworkTicket(dest="farther", form=SyncProcess(command="sleep 1")))
+        self.assertIsNotNone(self.peers.find(agtuuid="gateway")[0].object.rtt_ms)
+
+    @patch("stembot.messaging.deferred_hops", return_value=["gateway"])
+    def test_replay_skips_undeliverable_destinations(self, _deferred_hops):
+        for dest in ("gateway", "farther", "far", "poller", "unknown"):
+            push_network_message(Ping(dest=dest))
+
+        self.assertEqual([message.dest for message in pop_replayable_messages()], ["unknown"])
+        self.assertEqual(len(self.messages.find()), 4)
+
+    @patch("stembot.messaging.undeliverable_destinations", return_value=[])
+    def test_replay_without_undeliverable_destinations(self, _undeliverable_destinations):
+        for dest in ("gateway", "poller"):
+            push_network_message(Ping(dest=dest))
+
+        self.assertEqual(sorted(message.dest for message in pop_replayable_messages()), ["gateway", "poller"])
+        self.assertEqual(self.messages.find(), [])
+
+    @patch.object(CONFIG, "retry_budget", 2)
+    def test_replay_budget(self):
+        for _ in range(3):
+            push_network_message(Ping(dest="unknown"))
+
+        self.assertEqual(len(pop_replayable_messages()), 2)
+        self.assertEqual(len(self.messages.find()), 1)
+
+
+class TestEqualCostMultipath(_MessageQueueTestCase):
+    """Verify messages are spread across equal cost gateways by capacity, keeping each ticket on one gateway."""
+
+    def setUp(self):
+        super().setUp()
+        self.peers.upsert_object(Peer(agtuuid="fast", url="http://fast:8080", throughput_bps=3e6))
+        self.peers.upsert_object(Peer(agtuuid="slow", url="http://slow:8080", throughput_bps=1e6))
+        self.peers.upsert_object(Peer(agtuuid="backup", url="http://backup:8080"))
+        self.routes.upsert_object(Route(agtuuid="far", gtwuuid="fast", weight=2))
+        self.routes.upsert_object(Route(agtuuid="far", gtwuuid="slow", weight=2))
+        self.routes.upsert_object(Route(agtuuid="far", gtwuuid="backup", weight=3))
+
+    def test_spread_by_capacity(self):
+        hops = [next_hop("far", f"flow-{index}").agtuuid for index in range(400)]
+
+        self.assertEqual(set(hops), {"fast", "slow"})
+        self.assertGreater(hops.count("fast"), 2 * hops.count("slow"))
+
+    def test_ticket_flow_affinity(self):
+        request  = NetworkTicket(dest="far", form=GetPeers())
+        response = NetworkTicket(dest="far", form=GetPeers(), tckuuid=request.tckuuid)
+        trace    = NetworkMessage(**NetworkTicket(dest="far", form=GetPeers(), tckuuid=request.tckuuid).model_dump())
+
+        self.assertEqual(flow_key(request), flow_key(trace))
+        self.assertEqual(
+            {next_hop("far", flow_key(message)).agtuuid for message in (request, response, trace) * 10},
+            {next_hop("far", flow_key(request)).agtuuid}
+        )
+
+    def test_deferred_gateway_is_avoided(self):
+        with patch("stembot.messaging.deferred_hops", return_value=["fast"]):
+            self.assertEqual({next_hop("far", f"flow-{index}").agtuuid for index in range(20)}, {"slow"})
+            self.assertNotIn("far", undeliverable_destinations())
+
+        with patch("stembot.messaging.deferred_hops", return_value=["fast", "slow"]):
+            self.assertIn("far", undeliverable_destinations())
+
+
+class TestLoadShedding(_MessageQueueTestCase):
+    """Verify queue quotas, shedding policies, and shedding counters."""
+
+    def setUp(self):
+        super().setUp()
+        self.shed_counters = Collection[ShedCounter]("shed_counters")
+        self.shed_counters.create_attribute("dest", "/dest")
+
+    def timestamps(self, **kwargs):
+        return sorted(message.object.timestamp for message in self.messages.find(**kwargs))
+
+    @patch.object(CONFIG, "dest_max_messages", 2)
+    def test_drop_oldest_for_destination(self):
+        for timestamp in (1, 2, 3):
+            push_network_message(Ping(dest="a", timestamp=timestamp))
+        push_network_message(Ping(dest="b", timestamp=4))
+
+        self.assertEqual(self.timestamps(dest="a"), [2, 3])
+        self.assertEqual(self.timestamps(dest="b"), [4])
+        self.assertEqual(get_shed_counters()["a"].dropped, 1)
+
+    @patch.object(CONFIG, "dest_max_messages", 2)
+    def test_drop_oldest_lower_priority_first(self):
+        push_network_message(_ticket("a", WriteFile(b64zlib="", path="/1"), 1))
+        push_network_message(Ping(dest="a", timestamp=2))
+        push_network_message(Ping(dest="a", timestamp=3))
+
+        self.assertEqual(self.timestamps(dest="a"), [2, 3])
+
+    @patch.object(CONFIG, "dest_max_messages", 2)
+    def test_rejected_ticket_gets_error_response(self):
+        push_network_message(Ping(dest="a", timestamp=1))
+        push_network_message(Ping(dest="a", timestamp=2))
+        push_network_message(_ticket("a", WriteFile(b64zlib="", path="/3"), 3))
+
+        self.assertEqual(self.timestamps(dest="a"), [1, 2])
+        response = NetworkTicket.model_validate(self.messages.find(dest="origin")[0].object.model_dump())
+        self.assertEqual(response.type, NetworkMessageType.TICKET_RESPONSE)
+        self.assertIn("full", response.error)
+        self.assertEqual(get_shed_counters()["a"].rejected, 1)
+
+    @patch.object(CONFIG, "shed_policy", ShedPolicy.REJECT_NEWEST)
+    @patch.object(CONFIG, "queue_max_messages", 2)
+    def test_reject_newest(self):
+        for dest, timestamp in (("a", 1), ("b", 2), ("c", 3)):
+            push_network_message(Ping(dest=dest, timestamp=timestamp))
+
+        self.assertEqual(self.timestamps(), [1, 2])
+        self.assertEqual(get_shed_counters()["c"].rejected, 1)
+
+    def test_drop_oldest_across_destinations_for_bytes(self):
+        size = message_size(self.messages.upsert_object(Ping(dest="z", timestamp=0)).object)
+        self.messages.pop(dest="z")
+        with patch.object(CONFIG, "queue_max_bytes", size * 2 + size // 2):
+            for dest, timestamp in (("a", 1), ("b", 2), ("c", 3)):
+                push_network_message(Ping(dest=dest, timestamp=timestamp))
+
+        self.assertEqual(self.timestamps(), [2, 3])
+        self.assertEqual(get_shed_counters()["a"].dropped, 1)
+
+    @patch.object(CONFIG, "queue_max_bytes", 10)
+    def test_oversized_message_is_rejected(self):
+        push_network_message(Ping(dest="a", timestamp=1))
+
+        self.assertEqual(self.messages.find(), [])
+        self.assertEqual(get_shed_counters()["a"].rejected, 1)
+
+    @patch.object(CONFIG, "dest_max_messages", 1)
+    def test_queue_stats(self):
+        push_network_message(Ping(dest="a", timestamp=1))
+        push_network_message(Ping(dest="a", timestamp=2))
+        push_network_message(Ping(dest="b", timestamp=3))
+
+        stats = {stat.dest: stat for stat in get_queue_stats()}
+        self.assertEqual((stats["a"].messages, stats["a"].dropped), (1, 1))
+        self.assertEqual((stats["b"].messages, stats["b"].dropped), (1, 0))
+        self.assertGreater(stats["a"].size, 0)
+
+
+    @patch.object(CONFIG, "dest_max_messages", 2)
+    def test_queue_usage_is_counted(self):
+        for dest, timestamp in (("a", 1), ("a", 2), ("a", 3), ("b", 4)):
+            push_network_message(Ping(dest=dest, timestamp=timestamp))
+        pop_network_messages(dest="b")
+
+        usage = get_queue_usage()
+        self.assertEqual(usage["a"][0], 2)
+        self.assertEqual(usage["b"], (0, 0))
+        self.assertEqual(usage["a"][1], sum(message.object.size for message in self.messages.find(dest="a")))
+
+    def test_requeued_message_is_counted_once(self):
+        message = Ping(dest="a", timestamp=1, objuuid="m1")
+        push_network_message(message)
+        push_network_message(message)
+
+        self.assertEqual(len(self.messages.find(dest="a")), 1)
+        self.assertEqual(get_queue_usage()["a"], (1, self.messages.find(dest="a")[0].object.size))
+
+    def test_vacuum_resets_queue_usage(self):
+        push_network_message(Ping(dest="a", timestamp=1))
+        count_queued("a", 5, 500)
+
+        vacuum_network_messages()
+
+        self.assertEqual(get_queue_usage()["a"], self.messages.measure("dest")["a"])
+
+
+class TestLongPoll(_MessageQueueTestCase):
+    """Verify long polls return queued messages, wake on new messages, and time out."""
+
+    def setUp(self):
+        super().setUp()
+        # Long polls pull in a thread, which must open its own collections.
+        self.collection_patch.stop()
+
+    def long_poll(self, wait_secs):
+        return asyncio.run(long_poll_network_messages(NetworkMessagesRequest(isrc="src", wait_secs=wait_secs)))
+
+    def test_push_touches_queue_signals_of_pollers(self):
+        self._seed_routes()
+        self.routes.upsert_object(Route(agtuuid="relay", gtwuuid="other", weight=2))
+
+        push_network_message(Ping(dest="relay"))
+        self.assertGreater(read_signal(queue_signal_path("relay")), 0)
+        self.assertGreater(read_signal(queue_signal_path("src")), 0)
+        self.assertEqual(read_signal(queue_signal_path("other")), 0)
+
+        push_network_message(Ping(dest="elsewhere"))
+        self.assertGreater(read_signal(queue_signal_path("elsewhere")), 0)
+
+    def test_queued_messages_return_immediately(self):
+        push_network_message(Ping(dest="src"))
+
+        start = time()
+        self.assertEqual([message.dest for message in self.long_poll(30)], ["src"])
+        self.assertLess(time() - start, 1)
+
+    def test_wakes_when_message_is_queued(self):
+        def push_later():
+            Collection[NetworkMessage]("messages").upsert_object(Ping(dest="src", priority=MessagePriority.CONTROL))
+            touch_signal(queue_signal_path("src"))
+
+        timer = threading.Timer(0.2, push_later)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        start = time()
+        self.assertEqual([message.dest for message in self.long_poll(30)], ["src"])
+        self.assertLess(time() - start, 5)
+
+    def test_times_out_empty(self):
+        start = time()
+        self.assertEqual(self.long_poll(1), [])
+        self.assertGreaterEqual(time() - start, 1)
+
+    @patch.object(CONFIG, "long_poll_secs", 0)
+    def test_disabled_returns_immediately(self):
+        start = time()
+        self.assertEqual(self.long_poll(30), [])
+        self.assertLess(time() - start, 1)
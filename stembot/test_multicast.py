@@ -0,0 +1,159 @@
+"""Unit tests for multicast splitting and result aggregation."""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from stembot.dao import Collection
+from stembot.enums import ControlFormType, NetworkMessageType
+from stembot.messaging import reject_request
+from stembot.models.config import CONFIG
+from stembot.models.control import ControlFormTicket, SyncProcess
+from stembot.models.delivery import QueueUsage
+from stembot.models.multicast import MulticastGroup, MulticastReceipt
+from stembot.models.network import MulticastRequest, MulticastResponse, MulticastResult, NetworkMessage
+from stembot.models.routing import Peer, Route
+from stembot.multicast import flush_multicasts, open_multicast, record_multicast_results, split_destinations
+
+
+class _InlineThread:
+    """Stand-in for Thread that runs its target when started."""
+
+    def __init__(self, target, args):
+        self.target = target
+        self.args   = args
+
+    def start(self):
+        self.target(*self.args)
+
+
+class _MulticastTestCase(unittest.TestCase):
+    """Run each test against empty collections in a temporary directory, capturing forwarded messages."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+        peers = Collection[Peer]('peers')
+        peers.create_attribute('agtuuid', '/agtuuid')
+        peers.create_attribute('url', '/url')
+        for agtuuid in ('b', 'c'):
+            peers.upsert_object(Peer(agtuuid=agtuuid, url=f'http://{agtuuid}:8080/mpi'))
+
+        routes = Collection[Route]('routes')
+        routes.upsert_object(Route(agtuuid='d', gtwuuid='b', weight=1))
+        routes.upsert_object(Route(agtuuid='e', gtwuuid='b', weight=1))
+        routes.upsert_object(Route(agtuuid='e', gtwuuid='c', weight=2))
+
+        groups = Collection[MulticastGroup]('multicasts')
+        groups.create_attribute('mcuuid', '/mcuuid')
+        groups.create_attribute('create_time', '/create_time')
+
+        receipts = Collection[MulticastReceipt]('multicast_receipts')
+        receipts.create_attribute('mcuuid', '/mcuuid')
+        receipts.create_attribute('sent', '/sent')
+        receipts.create_attribute('receipt_time', '/receipt_time')
+
+        tickets = Collection[ControlFormTicket]('tickets')
+        tickets.create_attribute('tckuuid', '/tckuuid')
+
+        queue_usage = Collection[QueueUsage]('queue_usage')
+        for attribute in ('dest', 'messages', 'size'):
+            queue_usage.create_attribute(attribute, f'/{attribute}')
+
+        self.forwarded = []
+        for patcher in (
+            patch('stembot.multicast.Thread', _InlineThread),
+            patch('stembot.multicast.forward_network_message', self.forwarded.append)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def result(self, agtuuid: str) -> MulticastResult:
+        return MulticastResult(agtuuid=agtuuid, form=SyncProcess(command='true', status=0))
+
+
+class TestSplitDestinations(_MulticastTestCase):
+    """Verify destinations are grouped by the next hop they are reached through."""
+
+    def test_groups_by_next_hop(self):
+        self.assertEqual(
+            split_destinations(['b', 'c', 'd', 'e', 'x', CONFIG.agtuuid, 'd']),
+            {'b': ['b', 'd', 'e'], 'c': ['c'], 'x': ['x']},
+        )
+
+    def test_open_multicast_sends_one_copy_per_next_hop(self):
+        request = MulticastRequest(dsts=['b', 'd', 'e', 'c'], form=SyncProcess(command='true'))
+        branches = open_multicast(request, upstream='a')
+
+        self.assertEqual({branch.dest: branch.dsts for branch in branches}, {'b': ['b', 'd', 'e'], 'c': ['c']})
+        self.assertEqual({branch.mcuuid for branch in branches}, {request.mcuuid})
+
+        group = Collection[MulticastGroup]('multicasts').find(mcuuid=request.mcuuid)[0].object
+        self.assertEqual((group.upstream, group.dsts), ('a', ['b', 'd', 'e', 'c']))
+
+
+class TestAggregation(_MulticastTestCase):
+    """Verify results are returned upstream together, and service tickets on the originating agent."""
+
+    def open(self, dsts, upstream='a', tickets=None) -> MulticastRequest:
+        request = MulticastRequest(dsts=dsts, form=SyncProcess(command='true'))
+        open_multicast(request, upstream, tickets)
+        return request
+
+    def test_results_are_returned_once_every_destination_answered(self):
+        request = self.open(['b', 'd'])
+
+        record_multicast_results(request.mcuuid, [self.result('b')])
+        self.assertEqual(self.forwarded, [])
+
+        record_multicast_results(request.mcuuid, [self.result('d')])
+        self.assertEqual(len(self.forwarded), 1)
+        response = self.forwarded[0]
+        self.assertIsInstance(response, MulticastResponse)
+        self.assertEqual(response.dest, 'a')
+        self.assertEqual(sorted(result.agtuuid for result in response.results), ['b', 'd'])
+
+    def test_flush_returns_partial_results_once(self):
+        request = self.open(['b', 'd'])
+        record_multicast_results(request.mcuuid, [self.result('b')])
+
+        flush_multicasts()
+        flush_multicasts()
+        self.assertEqual([[result.agtuuid for result in response.results] for response in self.forwarded], [['b']])
+
+        record_multicast_results(request.mcuuid, [self.result('d')])
+        self.assertEqual([[result.agtuuid for result in response.results] for response in self.forwarded][-1], ['d'])
+
+    def test_originating_agent_services_tickets(self):
+        tickets = Collection[ControlFormTicket]('tickets')
+        ticket  = tickets.upsert_object(ControlFormTicket(dst='b', form=SyncProcess(command='true'))).object
+        request = self.open(['b'], upstream=None, tickets={'b': ticket.tckuuid})
+
+        record_multicast_results(request.mcuuid, [self.result('b')])
+
+        serviced = tickets.find(tckuuid=ticket.tckuuid)[0].object
+        self.assertIsNotNone(serviced.service_time)
+        self.assertEqual(serviced.form.status, 0)
+        self.assertEqual(self.forwarded, [])
+
+
+class TestRejectMulticast(_MulticastTestCase):
+    """Verify a rejected multicast request is answered with an error result per destination."""
+
+    def test_reject_answers_each_destination(self):
+        messages = Collection[NetworkMessage]('messages')
+        request  = MulticastRequest(src='a', dest='b', dsts=['b', 'd'], form=SyncProcess(command='true'))
+
+        reject_request(NetworkMessage(**request.model_dump()), 'not allowed')
+
+        queued = [message.object for message in messages.find()]
+        self.assertEqual([message.type for message in queued], [NetworkMessageType.MULTICAST_RESPONSE])
+        response = MulticastResponse(**queued[0].model_dump())
+        self.assertEqual(response.dest, 'a')
+        self.assertEqual([(result.agtuuid, result.error) for result in response.results],
+                         [('b', 'not allowed'), ('d', 'not allowed')])
+        self.assertEqual(response.results[0].form.type, ControlFormType.SYNC_PROCESS)
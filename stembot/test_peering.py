@@ -0,0 +1,345 @@
+"""Unit tests for sequenced route advertisements, split horizon, hold downs, link metrics and peer touches."""
+import os
+import tempfile
+import unittest
+from time import time
+
+from stembot.dao import Collection
+from stembot.delivery import record_failure
+from stembot.models.config import CONFIG
+from stembot.models.delivery import HopHealth
+from stembot.models.network import Advertisement, AdvertisementAck
+from stembot.models.routing import AdvertisedTable, HoldDown, Peer, Route, RouteAck, RouteSession
+from stembot.peering import age_routes, create_route_advertisement, delete_route, link_weight, measure_peer
+from stembot.peering import PEER_SIGNAL_PATH, TOUCHED_PEERS, delete_peer, process_advertisement_ack, prune, touch_peer
+from stembot.peering import ROUTE_SIGNAL_PATH, process_route_advertisement, route_table
+from stembot.signals import read_signal, touch_signal
+
+
+class _PeeringTestCase(unittest.TestCase):
+    """Run each test against empty collections in a temporary directory, with peers b and c."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+        peers = Collection[Peer]('peers')
+        peers.create_attribute('agtuuid', '/agtuuid')
+        peers.create_attribute('url', '/url')
+        for agtuuid in ('b', 'c'):
+            peers.upsert_object(Peer(agtuuid=agtuuid, url=f'http://{agtuuid}:8080/mpi'))
+
+        routes = Collection[Route]('routes')
+        routes.create_attribute('agtuuid', '/agtuuid')
+        routes.create_attribute('gtwuuid', '/gtwuuid')
+        routes.create_attribute('weight', '/weight')
+
+        sessions = Collection[RouteSession]('route_sessions')
+        sessions.create_attribute('gtwuuid', '/gtwuuid')
+        sessions.create_attribute('receive_time', '/receive_time')
+
+        Collection[AdvertisedTable]('advertised_tables').create_attribute('agtuuid', '/agtuuid')
+        Collection[RouteAck]('route_acks').create_attribute('agtuuid', '/agtuuid')
+
+        hold_downs = Collection[HoldDown]('hold_downs')
+        hold_downs.create_attribute('agtuuid', '/agtuuid')
+        hold_downs.create_attribute('expire_time', '/expire_time')
+
+        hops = Collection[HopHealth]('hops')
+        hops.create_attribute('agtuuid', '/agtuuid')
+        hops.create_attribute('state', '/state')
+
+    def routes(self) -> dict:
+        return {
+            (route.object.agtuuid, route.object.gtwuuid): route.object.weight
+            for route in Collection[Route]('routes').find()
+        }
+
+    def advertisement(self, weights: dict, **kwargs) -> Advertisement:
+        return Advertisement(
+            agtuuid='b',
+            routes=[Route(agtuuid=agtuuid, gtwuuid='b', weight=weight) for agtuuid, weight in weights.items()],
+            **kwargs
+        )
+
+    def table(self, weights: dict, gtwuuid: str = 'c') -> dict:
+        return {agtuuid: Route(agtuuid=agtuuid, gtwuuid=gtwuuid, weight=weight) for agtuuid, weight in weights.items()}
+
+
+class TestProcessRouteAdvertisement(_PeeringTestCase):
+    """Verify full tables and deltas are applied, and deltas from an unknown base are rejected."""
+
+    def test_unsequenced_advertisement_is_not_acknowledged(self):
+        self.assertIsNone(process_route_advertisement(self.advertisement({'d': 1})))
+        self.assertEqual(self.routes(), {('d', 'b'): 2})
+
+    def test_full_table_replaces_routes_through_gateway(self):
+        Collection[Route]('routes').upsert_object(Route(agtuuid='x', gtwuuid='b', weight=1))
+        Collection[Route]('routes').upsert_object(Route(agtuuid='d', gtwuuid='b', weight=1))
+
+        ack = process_route_advertisement(self.advertisement({'d': 4, 'c': 0, CONFIG.agtuuid: 0}, seq=10))
+
+        self.assertEqual((ack.dest, ack.seq), ('b', 10))
+        self.assertEqual(self.routes(), {('d', 'b'): 5})
+
+    def test_delta_applies_to_matching_base(self):
+        process_route_advertisement(self.advertisement({'d': 1, 'e': 1}, seq=10))
+
+        ack = process_route_advertisement(self.advertisement({'f': 2}, seq=11, base_seq=10, withdrawn=['e']))
+
+        self.assertEqual(ack.seq, 11)
+        self.assertEqual(self.routes(), {('d', 'b'): 2, ('f', 'b'): 3})
+
+    def test_delta_from_unknown_base_is_rejected(self):
+        self.assertIsNone(process_route_advertisement(self.advertisement({'d': 1}, seq=11, base_seq=10)).seq)
+
+        process_route_advertisement(self.advertisement({'d': 1}, seq=10))
+        ack = process_route_advertisement(self.advertisement({'e': 1}, seq=12, base_seq=11))
+
+        self.assertEqual(ack.seq, 10)
+        self.assertEqual(self.routes(), {('d', 'b'): 2})
+
+    def test_unreachable_routes_are_deleted(self):
+        process_route_advertisement(self.advertisement({'d': 1, 'e': 1}, seq=10))
+
+        process_route_advertisement(self.advertisement({'e': CONFIG.max_weight}, seq=11, base_seq=10))
+        self.assertEqual(self.routes(), {('d', 'b'): 2})
+
+        process_route_advertisement(self.advertisement({'d': CONFIG.max_weight}))
+        self.assertEqual(self.routes(), {})
+
+    def test_routes_through_live_session_are_not_aged(self):
+        process_route_advertisement(self.advertisement({'d': 1}, seq=10))
+        Collection[Route]('routes').upsert_object(Route(agtuuid='e', gtwuuid='c', weight=1))
+
+        age_routes(1)
+        self.assertEqual(self.routes(), {('d', 'b'): 2, ('e', 'c'): 2})
+
+        session = Collection[RouteSession]('route_sessions').find()[0].object
+        session.receive_time = time() - 60
+        Collection[RouteSession]('route_sessions').upsert_object(session)
+
+        age_routes(1)
+        self.assertEqual(self.routes(), {('e', 'c'): 3})
+        self.assertEqual(Collection[RouteSession]('route_sessions').find(), [])
+
+    def test_routes_through_broken_gateway_are_withdrawn(self):
+        process_route_advertisement(self.advertisement({'d': 1}, seq=10))
+        for _ in range(CONFIG.breaker_threshold):
+            record_failure('b', 'refused')
+
+        age_routes(1)
+        self.assertEqual(self.routes(), {})
+        self.assertNotIn('b', route_table())
+
+
+class TestAgeAndPrune(_PeeringTestCase):
+    """Verify routes are aged, expired and pruned in bulk."""
+
+    def test_aging_expires_routes_past_max_weight(self):
+        routes = Collection[Route]('routes')
+        routes.upsert_object(Route(agtuuid='d', gtwuuid='b', weight=CONFIG.max_weight))
+        routes.upsert_object(Route(agtuuid='e', gtwuuid='b', weight=CONFIG.max_weight + 1))
+        routes.upsert_object(Route(agtuuid='e', gtwuuid='c', weight=3))
+        routes.upsert_object(Route(agtuuid='f', gtwuuid='c', weight=CONFIG.max_weight + 1))
+
+        age_routes(2)
+
+        self.assertEqual(self.routes(), {('d', 'b'): CONFIG.max_weight + 2, ('e', 'c'): 5})
+        self.assertEqual([hold_down.object.agtuuid for hold_down in Collection[HoldDown]('hold_downs').find()], ['f'])
+
+    def test_prune_removes_routes_through_unknown_gateways_and_to_peers(self):
+        routes = Collection[Route]('routes')
+        routes.upsert_object(Route(agtuuid='d', gtwuuid='b', weight=1))
+        routes.upsert_object(Route(agtuuid='d', gtwuuid='x', weight=1))
+        routes.upsert_object(Route(agtuuid='c', gtwuuid='b', weight=1))
+        routes.upsert_object(Route(agtuuid=CONFIG.agtuuid, gtwuuid='b', weight=1))
+
+        prune()
+
+        self.assertEqual(self.routes(), {('d', 'b'): 1})
+        self.assertEqual(Collection[HoldDown]('hold_downs').find(), [])
+
+
+class TestHoldDown(_PeeringTestCase):
+    """Verify a destination that lost its last route only accepts routes no worse than the lost one."""
+
+    def setUp(self):
+        super().setUp()
+        process_route_advertisement(self.advertisement({'d': 2}, seq=10))
+        delete_route('d', 'b')
+
+    def test_worse_routes_are_refused(self):
+        process_route_advertisement(Advertisement(agtuuid='c', routes=[Route(agtuuid='d', gtwuuid='c', weight=5)]))
+        self.assertEqual(self.routes(), {})
+
+    def test_routes_no_worse_are_accepted(self):
+        process_route_advertisement(Advertisement(agtuuid='c', routes=[Route(agtuuid='d', gtwuuid='c', weight=2)]))
+        self.assertEqual(self.routes(), {('d', 'c'): 3})
+
+    def test_hold_down_expires(self):
+        hold_down = Collection[HoldDown]('hold_downs').find()[0].object
+        hold_down.expire_time = time() - 1
+        Collection[HoldDown]('hold_downs').upsert_object(hold_down)
+
+        process_route_advertisement(Advertisement(agtuuid='c', routes=[Route(agtuuid='d', gtwuuid='c', weight=5)]))
+        self.assertEqual(self.routes(), {('d', 'c'): 6})
+
+    def test_route_changes_touch_route_signal(self):
+        signal = read_signal(ROUTE_SIGNAL_PATH)
+        process_route_advertisement(self.advertisement({'e': 1}, seq=11, base_seq=10))
+        self.assertGreater(read_signal(ROUTE_SIGNAL_PATH), signal)
+
+
+class TestCreateRouteAdvertisement(_PeeringTestCase):
+    """Verify peers are sent full tables until they acknowledge one, then only changes."""
+
+    def test_route_table_takes_best_weights_and_peers(self):
+        Collection[Route]('routes').upsert_object(Route(agtuuid='d', gtwuuid='b', weight=3))
+        Collection[Route]('routes').upsert_object(Route(agtuuid='d', gtwuuid='c', weight=2))
+
+        self.assertEqual(
+            {dst: (route.gtwuuid, route.weight) for dst, route in route_table().items()},
+            {'b': ('b', 0), 'c': ('c', 0), 'd': ('c', 2)}
+        )
+
+    def test_split_horizon_with_poisoned_reverse(self):
+        table = {**self.table({'c': 0, 'd': 2}), **self.table({'e': 1}, 'b')}
+
+        advertisement = create_route_advertisement('b', table)
+
+        self.assertEqual(
+            {route.agtuuid: route.weight for route in advertisement.routes},
+            {'c': 0, 'd': 2, 'e': CONFIG.max_weight}
+        )
+
+    def test_full_table_until_acknowledged(self):
+        first  = create_route_advertisement('b', self.table({'c': 0, 'd': 2}))
+        second = create_route_advertisement('b', self.table({'c': 0, 'd': 2}))
+
+        self.assertEqual((first.dest, first.base_seq), ('b', None))
+        self.assertEqual(second.seq, first.seq + 1)
+        self.assertIsNone(second.base_seq)
+        self.assertEqual({route.agtuuid: route.weight for route in second.routes}, {'c': 0, 'd': 2})
+
+    def test_changes_since_acknowledged_table(self):
+        first = create_route_advertisement('b', self.table({'c': 0, 'd': 2, 'e': 1}))
+        process_advertisement_ack(AdvertisementAck(agtuuid='b', seq=first.seq))
+
+        delta = create_route_advertisement('b', self.table({'c': 0, 'd': 3, 'f': 1}))
+
+        self.assertEqual(delta.base_seq, first.seq)
+        self.assertEqual({route.agtuuid: route.weight for route in delta.routes}, {'d': 3, 'f': 1})
+        self.assertEqual(delta.withdrawn, ['e'])
+
+    def test_unknown_acknowledgement_forces_full_table(self):
+        first = create_route_advertisement('b', self.table({'c': 0}))
+        process_advertisement_ack(AdvertisementAck(agtuuid='b', seq=first.seq))
+        self.assertIsNotNone(create_route_advertisement('b', self.table({'c': 0})).base_seq)
+
+        process_advertisement_ack(AdvertisementAck(agtuuid='b', seq=None))
+        self.assertIsNone(create_route_advertisement('b', self.table({'c': 0})).base_seq)
+
+
+class TestLinkMetrics(_PeeringTestCase):
+    """Verify round trips are folded into peer link metrics, which weight the routes learned through the peer."""
+
+    def peer(self, agtuuid: str = 'b') -> Peer:
+        return Collection[Peer]('peers').find(agtuuid=agtuuid)[0].object
+
+    def test_link_weight(self):
+        self.assertEqual(link_weight(Peer(agtuuid='b')), 1)
+        self.assertEqual(link_weight(Peer(agtuuid='b', rtt_ms=2.0)), 1)
+        self.assertEqual(link_weight(Peer(agtuuid='b', rtt_ms=50.0)), 5)
+        self.assertEqual(link_weight(Peer(agtuuid='b', rtt_ms=50.0, loss=0.5)), 10)
+        self.assertEqual(link_weight(Peer(agtuuid='b', rtt_ms=1e6)), 100)
+        self.assertEqual(link_weight(None), 1)
+
+    def test_round_trips_are_smoothed(self):
+        measure_peer(self.peer(), 0.1)
+        self.assertEqual(self.peer().rtt_ms, 100.0)
+
+        peer = self.peer()
+        peer.measure_time = time() - 2
+        measure_peer(peer, 0.2)
+        self.assertAlmostEqual(self.peer().rtt_ms, 120.0)
+
+    def test_round_trips_are_coalesced(self):
+        measure_peer(self.peer(), 0.1)
+        measure_peer(self.peer(), 0.5)
+        self.assertEqual(self.peer().rtt_ms, 100.0)
+
+    def test_failures_and_bulk_transfers(self):
+        measure_peer(self.peer(), None)
+        measure_peer(self.peer(), None)
+        self.assertAlmostEqual(self.peer().loss, 0.36)
+
+        peer = self.peer()
+        peer.measure_time = time() - 2
+        measure_peer(peer, 2.0, 1000000)
+        self.assertEqual((self.peer().throughput_bps, self.peer().rtt_ms), (500000.0, None))
+
+    def test_routes_are_weighted_by_link(self):
+        measure_peer(self.peer('c'), 0.05)
+        process_route_advertisement(self.advertisement({'d': 1}, seq=10))
+        process_route_advertisement(Advertisement(agtuuid='c', routes=[Route(agtuuid='d', gtwuuid='c', weight=1)]))
+        self.assertEqual(self.routes(), {('d', 'b'): 2, ('d', 'c'): 6})
+
+    def test_weight_change_reweighs_routes(self):
+        process_route_advertisement(self.advertisement({'d': 1}, seq=10))
+        signal = read_signal(ROUTE_SIGNAL_PATH)
+
+        measure_peer(self.peer(), 0.1)
+
+        self.assertEqual(self.routes(), {('d', 'b'): 11})
+        self.assertGreater(read_signal(ROUTE_SIGNAL_PATH), signal)
+
+
+class TestTouchPeer(_PeeringTestCase):
+    """Verify touches of a peer reach the peers collection at most once per refresh interval."""
+
+    def setUp(self):
+        super().setUp()
+        TOUCHED_PEERS.clear()
+        self.addCleanup(TOUCHED_PEERS.clear)
+
+    def test_touches_are_coalesced(self):
+        touch_peer('d')
+        Collection[Peer]('peers').pop(agtuuid='d')
+
+        for _ in range(100):
+            touch_peer('d')
+
+        self.assertEqual(Collection[Peer]('peers').find(agtuuid='d'), [])
+        self.assertGreater(TOUCHED_PEERS['d'], time())
+
+    def test_touch_after_refresh_time_refreshes_peer(self):
+        touch_peer('d')
+        peer = Collection[Peer]('peers').find(agtuuid='d')[0]
+        peer.object.refresh_time = time() - 1
+        peer.commit()
+        TOUCHED_PEERS['d'] = time() - 1
+
+        touch_peer('d')
+
+        self.assertGreater(Collection[Peer]('peers').find(agtuuid='d')[0].object.refresh_time, time())
+
+    def test_deleted_peer_is_recreated(self):
+        touch_peer('d')
+        delete_peer('d')
+        touch_peer('d')
+
+        self.assertEqual(len(Collection[Peer]('peers').find(agtuuid='d')), 1)
+
+    def test_peer_deleted_by_another_worker_is_recreated(self):
+        touch_peer('d')
+        # Another worker process deletes the peer, leaving this process's touched peers alone
+        Collection[Peer]('peers').pop(agtuuid='d')
+        touch_signal(PEER_SIGNAL_PATH)
+
+        touch_peer('d')
+
+        self.assertEqual(len(Collection[Peer]('peers').find(agtuuid='d')), 1)
@@ -0,0 +1,119 @@
+"""Unit tests for hierarchical addressing and summarized routes between regions."""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from stembot.dao import Collection
+from stembot.messaging import next_hop
+from stembot.models.config import CONFIG
+from stembot.models.network import Advertisement
+from stembot.models.routing import Peer, Route
+from stembot.peering import advertised_weights, process_route_advertisement
+from stembot.regions import DEFAULT_ROUTE, accepted_route, region_of, route_keys, summarize_weights
+
+
+class TestRegions(unittest.TestCase):
+    """Verify regions are read from agent UUIDs and routes are looked up most specific first."""
+
+    def test_region_of(self):
+        self.assertEqual(region_of('east/web-01'), 'east')
+        self.assertEqual(region_of('east/*'), 'east')
+        self.assertIsNone(region_of('0f6f5f38-9f0e-4c1c-8d3b-0a5e6c7d8e9f'))
+        self.assertIsNone(region_of(DEFAULT_ROUTE))
+
+    @patch.object(CONFIG, 'agtuuid', 'east/web-01')
+    def test_route_keys(self):
+        self.assertEqual(route_keys('east/web-02'), ['east/web-02'])
+        self.assertEqual(route_keys('west/web-01'), ['west/web-01', 'west/*', '*'])
+        self.assertEqual(route_keys('flat'), ['flat', '*'])
+
+    @patch.object(CONFIG, 'agtuuid', 'flat')
+    def test_route_keys_outside_regions(self):
+        self.assertEqual(route_keys('west/web-01'), ['west/web-01', 'west/*'])
+        self.assertEqual(route_keys('other'), ['other'])
+
+    @patch.object(CONFIG, 'agtuuid', 'east/gw-01')
+    def test_accepted_route(self):
+        self.assertTrue(accepted_route('west/*', 'west/gw-01'))
+        self.assertFalse(accepted_route('east/*', 'west/gw-01'))
+        self.assertTrue(accepted_route(DEFAULT_ROUTE, 'east/gw-02'))
+        self.assertFalse(accepted_route(DEFAULT_ROUTE, 'west/gw-01'))
+
+
+class TestSummarizeWeights(unittest.TestCase):
+    """Verify a region is summarized to other regions and the rest of the network to the region."""
+
+    weights = {'east/web-02': 1, 'east/web-03': 2, 'west/*': 3, 'north/*': 5, 'flat': 4, DEFAULT_ROUTE: 7}
+
+    @patch.object(CONFIG, 'agtuuid', 'east/gw-01')
+    def test_same_region_peer_gets_default_route(self):
+        self.assertEqual(
+            summarize_weights('east/web-02', self.weights),
+            {'east/web-02': 1, 'east/web-03': 2, DEFAULT_ROUTE: 3}
+        )
+
+    @patch.object(CONFIG, 'agtuuid', 'east/gw-01')
+    def test_other_region_peer_gets_summary_route(self):
+        self.assertEqual(
+            summarize_weights('west/gw-01', self.weights),
+            {'east/*': 0, 'west/*': 3, 'north/*': 5, 'flat': 4}
+        )
+
+    @patch.object(CONFIG, 'agtuuid', 'flat-gw')
+    def test_agent_outside_regions_does_not_summarize(self):
+        self.assertEqual(
+            summarize_weights('west/gw-01', self.weights),
+            {dst: weight for dst, weight in self.weights.items() if dst != DEFAULT_ROUTE}
+        )
+
+
+class TestSummaryRouting(unittest.TestCase):
+    """Verify a leaf routes everything outside its region through the default route its gateway advertises."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+        patcher = patch.object(CONFIG, 'agtuuid', 'east/web-01')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        peers = Collection[Peer]('peers')
+        peers.create_attribute('agtuuid', '/agtuuid')
+        peers.create_attribute('url', '/url')
+        peers.upsert_object(Peer(agtuuid='east/gw-01', url='http://gw-01:8080/mpi'))
+        peers.upsert_object(Peer(agtuuid='east/web-02', url='http://web-02:8080/mpi'))
+
+        routes = Collection[Route]('routes')
+        routes.create_attribute('agtuuid', '/agtuuid')
+        routes.create_attribute('gtwuuid', '/gtwuuid')
+
+    def test_leaf_keeps_region_and_default_routes(self):
+        process_route_advertisement(
+            Advertisement(
+                agtuuid='east/gw-01',
+                routes=[
+                    Route(agtuuid='east/web-03', gtwuuid='east/gw-01', weight=1),
+                    Route(agtuuid='east/*', gtwuuid='east/gw-01', weight=0),
+                    Route(agtuuid=DEFAULT_ROUTE, gtwuuid='east/gw-01', weight=0),
+                ]
+            )
+        )
+
+        self.assertEqual(
+            sorted(route.object.agtuuid for route in Collection[Route]('routes').find()),
+            [DEFAULT_ROUTE, 'east/web-03']
+        )
+        self.assertEqual(next_hop('west/web-09').agtuuid, 'east/gw-01')
+        self.assertEqual(next_hop('east/web-03').agtuuid, 'east/gw-01')
+        self.assertIsNone(next_hop('east/web-04'))
+
+    def test_leaf_passes_default_route_on_within_region(self):
+        table = {DEFAULT_ROUTE: Route(agtuuid=DEFAULT_ROUTE, gtwuuid='east/gw-01', weight=1)}
+
+        self.assertEqual(advertised_weights('east/web-02', table), {DEFAULT_ROUTE: 1})
+        self.assertEqual(advertised_weights('east/gw-01', table), {DEFAULT_ROUTE: CONFIG.max_weight})
@@ -0,0 +1,55 @@
+"""Unit tests for signals between worker processes."""
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from time import time
+
+from stembot.signals import clear_signal, keyed_signal_path, read_signal, touch_signal, wait_signals
+
+
+class TestSignals(unittest.TestCase):
+    """Verify signals are touched, read, cleared and waited on."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+    def test_touch_and_clear(self):
+        self.assertEqual(read_signal('test.signal'), 0)
+        touch_signal('test.signal')
+        signal = read_signal('test.signal')
+        self.assertGreater(signal, 0)
+        touch_signal('test.signal')
+        self.assertGreater(read_signal('test.signal'), signal)
+        clear_signal('test.signal')
+        self.assertEqual(read_signal('test.signal'), 0)
+        clear_signal('test.signal')
+
+    def test_keyed_signals(self):
+        east = keyed_signal_path('test.signals', 'east/web-01')
+        west = keyed_signal_path('test.signals', 'west/web-01')
+        self.assertNotEqual(east, west)
+        self.assertEqual(os.path.dirname(east), 'test.signals')
+
+        touch_signal(east)
+        self.assertGreater(read_signal(east), 0)
+        self.assertEqual(read_signal(west), 0)
+
+    def test_wait_wakes_on_change(self):
+        timer = threading.Timer(0.2, touch_signal, args=('test.signal',))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        start = time()
+        asyncio.run(wait_signals({'other.signal': 0, 'test.signal': 0}, start + 30))
+        self.assertLess(time() - start, 5)
+
+    def test_wait_times_out(self):
+        start = time()
+        asyncio.run(wait_signals({'test.signal': 0}, start + 0.5))
+        self.assertGreaterEqual(time() - start, 0.5)
@@ -0,0 +1,76 @@
+"""Unit tests for the in-process network simulator."""
+import os
+import random
+import tempfile
+import unittest
+
+from stembot.models.config import CONFIG
+from stembot.simulator import Simulation, build_topology
+
+
+class TestBuildTopology(unittest.TestCase):
+    """Verify topologies are connected graphs of the requested size and degree."""
+
+    def test_flat_topology(self):
+        agtuuids, links = build_topology('flat', 20, 3, 1, random.Random(0))
+
+        self.assertEqual(len(agtuuids), 20)
+        self.assertEqual(len(links), 30)
+        self.assertTrue(all(a != b for a, b in links))
+
+    def test_regions_topology(self):
+        agtuuids, links = build_topology('regions', 20, 2, 4, random.Random(0))
+
+        self.assertEqual(len(agtuuids), 20)
+        self.assertEqual({agtuuid.split('/')[0] for agtuuid in agtuuids}, {'r000', 'r001', 'r002', 'r003'})
+        self.assertTrue(all(
+            a.split('/')[0] == b.split('/')[0] or (a.endswith('/agent-00000') and b.endswith('/agent-00000'))
+            for a, b in links
+        ))
+
+
+class TestSimulation(unittest.TestCase):
+    """Verify a simulated line of agents converges to routes along the line, and reconverges after a failure."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+        self.agtuuids = ['a', 'b', 'c', 'd', 'e']
+        self.simulation = Simulation(
+            self.agtuuids,
+            [('a', 'b'), ('b', 'c'), ('c', 'd'), ('d', 'e'), ('a', 'c')],
+            os.path.join(self.tempdir.name, 'agents')
+        )
+
+    def test_converges(self):
+        agtuuid = CONFIG.agtuuid
+
+        report = self.simulation.converge(20)
+
+        self.assertTrue(report.converged)
+        self.assertEqual(report.agents, 5)
+        self.assertEqual(report.links, 5)
+        self.assertEqual(report.cycles[-1].changed_agents, 0)
+        self.assertEqual(report.cycles[-1].mean_table_size, 4.0)
+        self.assertGreater(report.cycles[0].advertisement_bytes, 0)
+        self.assertEqual(self.simulation.trace('a', 'e'), 3)
+        self.assertEqual(CONFIG.agtuuid, agtuuid)
+        self.assertEqual(os.getcwd(), os.path.realpath(self.tempdir.name))
+
+    def test_reconverges_after_failure(self):
+        self.simulation.converge(20)
+        self.simulation.fail(['c'])
+
+        report = self.simulation.converge(20)
+        self.simulation.check(report, 20, random.Random(0))
+
+        self.assertTrue(report.converged)
+        self.assertEqual(report.agents, 4)
+        self.assertEqual(report.cycles[-1].mean_table_size, 1.0)
+        self.assertIsNone(self.simulation.trace('a', 'e'))
+        self.assertEqual(self.simulation.trace('a', 'b'), 1)
+        self.assertEqual(report.reachable_pairs, report.connected_pairs)
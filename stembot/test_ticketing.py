@@ -0,0 +1,125 @@
+"""Unit tests for waiting on, checking and collecting tickets."""
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from time import time
+
+from stembot.dao import Collection
+from stembot.models.control import CheckTickets, CollectTickets, ControlFormTicket, GetConfig, WaitTicket
+from stembot.models.network import NetworkTicket
+from stembot.signals import read_signal
+from stembot.ticketing import check_tickets, collect_tickets, service_ticket, ticket_signal_path, wait_ticket
+from stembot.ticketing import wait_tickets
+
+
+class _TicketTestCase(unittest.TestCase):
+    """Run each test against a tickets collection in a temporary directory."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tempdir.name)
+        self.addCleanup(self.tempdir.cleanup)
+        self.addCleanup(os.chdir, self.old_cwd)
+
+        self.tickets = Collection[ControlFormTicket]('tickets')
+        self.tickets.create_attribute('tckuuid', '/tckuuid')
+        self.tickets.create_attribute('service_time', '/service_time')
+        self.ticket = self.tickets.upsert_object(ControlFormTicket(form=GetConfig())).object
+
+    def service(self, tckuuid: str = None):
+        service_ticket(NetworkTicket(tckuuid=tckuuid or self.ticket.tckuuid, form=GetConfig(config={'a': 1})))
+
+
+class TestWaitTicket(_TicketTestCase):
+    """Verify waits return serviced tickets, wake when tickets are serviced, and time out."""
+
+    def wait(self, wait_secs):
+        return asyncio.run(wait_ticket(WaitTicket(tckuuid=self.ticket.tckuuid, wait_secs=wait_secs)))
+
+    def test_service_touches_ticket_signal(self):
+        self.assertEqual(read_signal(ticket_signal_path(self.ticket.tckuuid)), 0)
+        self.service()
+        self.assertGreater(read_signal(ticket_signal_path(self.ticket.tckuuid)), 0)
+        self.assertEqual(read_signal(ticket_signal_path('missing')), 0)
+
+    def test_serviced_ticket_returns_immediately(self):
+        self.service()
+
+        start = time()
+        wait = self.wait(30)
+        self.assertLess(time() - start, 1)
+        self.assertEqual(wait.create_time, self.ticket.create_time)
+        self.assertIsNotNone(wait.service_time)
+
+    def test_wakes_when_ticket_is_serviced(self):
+        timer = threading.Timer(0.2, self.service)
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        start = time()
+        self.assertIsNotNone(self.wait(30).service_time)
+        self.assertLess(time() - start, 5)
+
+    def test_times_out_pending(self):
+        start = time()
+        wait = self.wait(1)
+        self.assertGreaterEqual(time() - start, 1)
+        self.assertIsNone(wait.service_time)
+        self.assertEqual(wait.create_time, self.ticket.create_time)
+
+    def test_missing_ticket_returns_immediately(self):
+        start = time()
+        wait = asyncio.run(wait_ticket(WaitTicket(tckuuid='missing', create_time=1.0, wait_secs=30)))
+        self.assertLess(time() - start, 1)
+        self.assertIsNone(wait.create_time)
+
+
+
+class TestBatchTickets(_TicketTestCase):
+    """Verify many tickets are checked, waited on and collected in one request."""
+
+    def setUp(self):
+        super().setUp()
+        self.other = self.tickets.upsert_object(ControlFormTicket(form=GetConfig())).object
+        self.tckuuids = [self.ticket.tckuuid, self.other.tckuuid, 'missing']
+
+    def test_check_tickets(self):
+        self.service()
+
+        form = check_tickets(CheckTickets(tckuuids=self.tckuuids))
+        self.assertEqual([ticket.tckuuid for ticket in form.tickets], self.tckuuids)
+        self.assertIsNotNone(form.tickets[0].service_time)
+        self.assertEqual(form.tickets[1].create_time, self.other.create_time)
+        self.assertIsNone(form.tickets[1].service_time)
+        self.assertIsNone(form.tickets[2].create_time)
+
+    def test_wait_tickets_wakes_when_any_ticket_is_serviced(self):
+        timer = threading.Timer(0.2, self.service, args=(self.other.tckuuid,))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        start = time()
+        form  = asyncio.run(wait_tickets(CheckTickets(tckuuids=self.tckuuids[:2], wait_secs=30)))
+        self.assertLess(time() - start, 5)
+        self.assertIsNone(form.tickets[0].service_time)
+        self.assertIsNotNone(form.tickets[1].service_time)
+
+    def test_wait_tickets_without_wait_secs_returns_immediately(self):
+        start = time()
+        form  = asyncio.run(wait_tickets(CheckTickets(tckuuids=self.tckuuids[:2])))
+        self.assertLess(time() - start, 1)
+        self.assertEqual(len(form.tickets), 2)
+
+    def test_collect_tickets_reads_and_closes_serviced_tickets(self):
+        self.service()
+
+        form = collect_tickets(CollectTickets(tckuuids=self.tckuuids))
+        self.assertEqual([ticket.tckuuid for ticket in form.tickets], [self.ticket.tckuuid])
+        self.assertEqual(form.tickets[0].form.config, {'a': 1})
+        self.assertEqual(read_signal(ticket_signal_path(self.ticket.tckuuid)), 0)
+
+        self.assertEqual(collect_tickets(CollectTickets(tckuuids=self.tckuuids)).tickets, [])
+        self.assertEqual([ticket.object.tckuuid for ticket in self.tickets.find()], [self.other.tckuuid])
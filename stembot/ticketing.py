@@ -14,16 +14,27 @@ Key features:
 - Deduplication of trace messages for multi-hop delivery
 - Automatic expiration of old tickets and traces
 - Hop tracking for route tracing
+- Blocking waits on tickets, woken by the signal of a ticket when it is serviced
 """
 
 from time import time
+from typing import List
+import asyncio
 import logging
 
 from stembot.dao import Collection
 from stembot.models.config import CONFIG
 from stembot.scheduling import scheduled
+from stembot.signals import clear_signal, keyed_signal_path, read_signal, touch_signal, wait_signals
 from stembot.models.network import NetworkMessageType, NetworkTicket, TicketTraceResponse
-from stembot.models.control import CheckTicket, CloseTicket, ControlFormTicket, ControlFormType
+from stembot.models.control import CheckTicket, CheckTickets, CloseTicket, CollectTickets, ControlFormTicket
+from stembot.models.control import ControlFormType, WaitTicket
+
+# Directory of the signals that wake waits in every worker process when a ticket is serviced
+TICKET_SIGNAL_PATH = 'tickets.signals'
+
+# Longest a wait is held open, below the 60 second client read timeout
+MAX_WAIT_SECS = 30
 
 
 def read_ticket(control_form_ticket: ControlFormTicket) -> ControlFormTicket | None:
@@ -60,19 +71,20 @@ def close_ticket(form: CloseTicket) -> None:
         form: A CloseTicket object containing the tckuuid to delete.
     """
     Collection[ControlFormTicket]('tickets').pop(tckuuid=form.tckuuid)
+    clear_signal(ticket_signal_path(form.tckuuid))
 
 
-def check_ticket(form: CheckTicket) -> CheckTicket:
+def check_ticket(form: CheckTicket | WaitTicket) -> CheckTicket | WaitTicket:
     """Check the status of a ticket by UUID.
 
     Retrieves the current state of a ticket, including its form and service time.
     If the ticket is found, updates the form with the ticket's information.
 
     Args:
-        form: A CheckTicket object containing the tckuuid to check.
+        form: A CheckTicket or WaitTicket object containing the tckuuid to check.
 
     Returns:
-        The updated CheckTicket object with the ticket's current state.
+        The updated form with the ticket's current state.
     """
     tickets = Collection[ControlFormTicket]('tickets')
     for ticket in tickets.find(tckuuid=form.tckuuid):
@@ -81,12 +93,144 @@ def check_ticket(form: CheckTicket) -> CheckTicket:
     return form
 
 
+def find_tickets(tckuuid: str) -> List[ControlFormTicket]:
+    """Return the tickets with a UUID, for querying the ticket collection in a thread.
+
+    Args:
+        tckuuid: The UUID of the ticket.
+
+    Returns:
+        A list of the tickets found.
+    """
+    return [ticket.object for ticket in Collection[ControlFormTicket]('tickets').find(tckuuid=tckuuid)]
+
+
+async def wait_ticket(form: WaitTicket) -> WaitTicket:
+    """Wait for a ticket to be serviced and return its status.
+
+    Returns as soon as the ticket's response is recorded, the ticket no longer
+    exists, or wait_secs (capped at MAX_WAIT_SECS) elapses. Waiting checks the
+    ticket's signal rather than the ticket collection, so an idle wait does not
+    query the collection and is not woken by other tickets, and the collection
+    is queried in a thread rather than on the event loop.
+
+    Args:
+        form: A WaitTicket object containing the tckuuid to wait for.
+
+    Returns:
+        The updated WaitTicket object with the ticket's current state, with
+        create_time unset if the ticket does not exist.
+    """
+    deadline = time() + min(form.wait_secs, MAX_WAIT_SECS)
+    path     = ticket_signal_path(form.tckuuid)
+    while True:
+        signal = read_signal(path)
+        found  = await asyncio.to_thread(find_tickets, form.tckuuid)
+        form.create_time = None
+        for ticket in found:
+            form.create_time  = ticket.create_time
+            form.service_time = ticket.service_time
+
+        if not found or form.service_time is not None or time() >= deadline:
+            return form
+
+        await wait_signals({path: signal}, deadline)
+
+
+def check_tickets(form: CheckTickets) -> CheckTickets:
+    """Check the status of many tickets by UUID with one query.
+
+    Args:
+        form: A CheckTickets object containing the tckuuids to check.
+
+    Returns:
+        The updated CheckTickets object with each ticket's current state, with
+        create_time unset for tickets that do not exist.
+    """
+    found = {}
+    if form.tckuuids:
+        tickets = Collection[ControlFormTicket]('tickets')
+        for ticket in tickets.find(tckuuid=f'$oneof:{",".join(form.tckuuids)}'):
+            found[ticket.object.tckuuid] = ticket.object
+
+    form.tickets = [
+        CheckTicket(
+            tckuuid=tckuuid,
+            create_time=found[tckuuid].create_time if tckuuid in found else None,
+            service_time=found[tckuuid].service_time if tckuuid in found else None
+        ) for tckuuid in form.tckuuids
+    ]
+    return form
+
+
+async def wait_tickets(form: CheckTickets) -> CheckTickets:
+    """Check the status of many tickets, waiting for one to be serviced.
+
+    Returns as soon as any of the tickets is serviced or no longer exists, or
+    wait_secs (capped at MAX_WAIT_SECS) elapses. Returns after one check when
+    wait_secs is 0. Waiting checks the signals of the tickets, and the
+    collection is queried in a thread rather than on the event loop.
+
+    Args:
+        form: A CheckTickets object containing the tckuuids to wait for.
+
+    Returns:
+        The updated CheckTickets object with each ticket's current state.
+    """
+    deadline = time() + min(form.wait_secs, MAX_WAIT_SECS)
+    paths    = [ticket_signal_path(tckuuid) for tckuuid in form.tckuuids]
+    while True:
+        signals = {path: read_signal(path) for path in paths}
+        await asyncio.to_thread(check_tickets, form)
+
+        done = any(ticket.create_time is None or ticket.service_time is not None for ticket in form.tickets)
+        if done or not form.tickets or time() >= deadline:
+            return form
+
+        await wait_signals(signals, deadline)
+
+
+def collect_tickets(form: CollectTickets) -> CollectTickets:
+    """Read and close the serviced tickets among many tickets.
+
+    Serviced tickets are popped from the ticket collection with one query, so a
+    ticket is collected once even when collected concurrently. Pending tickets
+    are left in the collection.
+
+    Args:
+        form: A CollectTickets object containing the tckuuids to collect.
+
+    Returns:
+        The updated CollectTickets object with the serviced tickets.
+    """
+    form.tickets = []
+    if not form.tckuuids:
+        return form
+
+    tickets = Collection[ControlFormTicket]('tickets')
+    traces  = Collection[TicketTraceResponse]('traces')
+    for ticket in tickets.pop(tckuuid=f'$oneof:{",".join(form.tckuuids)}', service_time='$!eq:None'):
+        if ticket.object.tracing:
+            ticket.object.hops = [
+                trace.object.hop for trace in traces.find(tckuuid=ticket.object.tckuuid)
+            ]
+        ticket.object.type = ControlFormType.READ_TICKET
+        form.tickets.append(ticket.object)
+        clear_signal(ticket_signal_path(ticket.object.tckuuid))
+    return form
+
+
+def ticket_signal_path(tckuuid: str) -> str:
+    """Return the path of the signal that wakes the waits on a ticket when it is serviced."""
+    return keyed_signal_path(TICKET_SIGNAL_PATH, tckuuid)
+
+
 def service_ticket(network_ticket: NetworkTicket) -> None:
     """Update a ticket with the serviced control form and service time.
 
     Records the response from servicing a ticket by updating its contained form
-    with the response form and recording the service completion time. Thread-safe
-    via the @synchronized decorator.
+    with the response form and recording the service completion time, then wakes
+    any waits on the ticket. Thread-safe via the @synchronized decorator.
 
     Args:
         network_ticket: A network ticket containing the response form and tckuuid.
@@ -97,6 +241,7 @@ def service_ticket(network_ticket: NetworkTicket) -> None:
         ticket.object.error = network_ticket.error
         ticket.object.service_time = time()
         ticket.commit()
+        touch_signal(ticket_signal_path(ticket.object.tckuuid))
 
 
 def service_trace(ticket_trace: TicketTraceResponse) -> None:
@@ -168,6 +313,7 @@ def worker() -> None:
     tickets = Collection[ControlFormTicket]('tickets')
     for ticket in tickets.pop(create_time=f'$lt:{cutoff}'):
         logging.warning('Expiring ticket %s:%s', ticket.object.type, ticket.object.tckuuid)
+        clear_signal(ticket_signal_path(ticket.object.tckuuid))
 
     traces = Collection[TicketTraceResponse]('traces')
     for trace in traces.pop(hop_time=f'$lt:{cutoff}'):
@@ -204,3 +350,4 @@ collection.create_attribute('network_ticket_type', "/network_ticket_type")
 collection = Collection[ControlFormTicket]('tickets')
 collection.create_attribute('create_time', "/create_time")
 collection.create_attribute('tckuuid', "/tckuuid")
+collection.create_attribute('service_time', "/service_time")